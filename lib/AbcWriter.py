@@ -0,0 +1,300 @@
+from fractions import Fraction
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+import os
+
+from lib.Writer import Writer
+from lib.theory.Note import Note
+from lib.theory.NoteModifier import NoteModifier
+from lib.theory.OctaveType import OctaveType
+from lib.theory.Tuplet import Tuplet
+from lib.theory.Writeable import Writeable
+
+if TYPE_CHECKING:
+    from lib.Generator import Generator
+    from lib.Key import Key
+
+
+class AbcWriter:
+    """
+    Zapis pogrupowanych taktów (np. wyniku Generator.generate(group=True)) w notacji ABC.
+
+    Notacja ABC renderowana jest bezpośrednio w przeglądarce (np. abcjs), więc podgląd nie wymaga kompilacji
+    lilypondem. Każdy takt zamieniany jest na osobny napis, a tokeny nut i pauz są zapamiętywane (lru_cache), bo
+    w melodii powtarza się niewiele różnych kombinacji wysokości i wartości rytmicznych.
+
+    Znaki chromatyczne zapisywane są tak jak wymaga tego ABC: tylko wtedy, gdy różnią się od znaków przykluczowych
+    lub od znaku użytego wcześniej w tym samym takcie dla tej samej nuty.
+    """
+
+    # Długość jednostkowa (L:1/8). Długości nut zapisywane są jako wielokrotności tej wartości
+    unit_length: int = 8
+
+    # Liczba taktów w jednej linii pliku
+    bars_per_line: int = 4
+
+    # Klucze lilypond -> klucze ABC
+    clef_names: Dict[str, str] = {'G': 'treble', 'F': 'bass'}
+
+    accidental_signs: Dict[int, str] = {-2: '__', -1: '_', 0: '=', 1: '^', 2: '^^'}
+    key_accidental_signs: Dict[int, str] = {-1: 'b', 0: '', 1: '#'}
+
+    def __init__(self, filename: str):
+        """
+        Args:
+            filename:   Nazwa pliku (bez rozszerzenia)
+        """
+        self.filename: str = filename
+        self.lines: List[str] = []
+
+        self.source_dir = 'output/source'
+
+        # Zakresy dla kluczy (zob. Writer.default_clef_ranges)
+        self.clef_ranges: Dict[str, Tuple[Note, Note]] = dict(Writer.default_clef_ranges)
+
+    def set_source_dir(self, source_dir: str):
+        """
+        Ustaw folder na pliki ABC
+
+        Args:
+            source_dir:     Ścieżka do folderu
+        """
+        self.source_dir = source_dir.rstrip('/')
+
+    def export(self):
+        """Wyeksportuj dane do pliku ABC"""
+        if not os.path.isdir(self.source_dir):
+            os.makedirs(self.source_dir, exist_ok=True)
+
+        with open(f'{self.source_dir}/{self.filename}.abc', 'w') as f:
+            f.write('\n'.join(self.lines) + '\n')
+
+    # region Tokens
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def get_pitch(note: str, octave: OctaveType, accidental: bool) -> str:
+        """
+        Zamień nazwę nuty i oktawę na wysokość w notacji ABC (c' -> C, c'' -> c, c -> C,)
+
+        Args:
+            note:           Nazwa nuty w notacji lilypond (np. cis, bes)
+            octave:         Oktawa
+            accidental:     Czy zapisać znak chromatyczny (dla nuty bez znaków - kasownik)
+        """
+        octave_id = OctaveType.get_id(octave)
+        value = note.count('is') - note.count('es')
+        pitch = AbcWriter.accidental_signs[value] if accidental else ''
+
+        if octave_id <= 5:
+            return pitch + note[0].upper() + ',' * (5 - octave_id)
+
+        return pitch + note[0] + "'" * (octave_id - 6)
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def get_length(duration: int) -> str:
+        """
+        Zapisz długość wyrażoną w sześćdziesięcioczwórkach jako wielokrotność długości jednostkowej (np. 3, /, 3/2)
+        """
+        length = Fraction(duration * AbcWriter.unit_length, 64)
+
+        if length == 1:
+            return ''
+
+        if length.denominator == 1:
+            return str(length.numerator)
+
+        if length.numerator == 1 and length.denominator == 2:
+            return '/'
+
+        return f'{length.numerator if length.numerator != 1 else ""}/{length.denominator}'
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def get_duration(base_duration: int, modifiers: str) -> int:
+        """Pobierz długość elementu w sześćdziesięcioczwórkach na podstawie modyfikatorów w notacji lilypond"""
+        dots = modifiers.count('.')
+
+        return 64 // base_duration * (2 ** (dots + 1) - 1) // 2 ** dots
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def get_note_tokens(note: str, octave: OctaveType, base_duration: int, modifiers: str) -> Tuple[str, str]:
+        """
+        Pobierz token nuty bez znaku chromatycznego i ze znakiem (o tym, który zostanie użyty, decyduje stan taktu)
+
+        Args:
+            note:           Nazwa nuty w notacji lilypond
+            octave:         Oktawa
+            base_duration:  Bazowa wartość rytmiczna
+            modifiers:      Modyfikatory w notacji lilypond (np. '.~')
+        """
+        suffix = AbcWriter.get_length(AbcWriter.get_duration(base_duration, modifiers))
+        suffix += '-' if NoteModifier.TIE.value in modifiers else ''
+
+        return AbcWriter.get_pitch(note, octave, False) + suffix, AbcWriter.get_pitch(note, octave, True) + suffix
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def get_rest_token(base_duration: int, modifiers: str) -> str:
+        """
+        Pobierz token pauzy
+
+        Args:
+            base_duration:  Bazowa wartość rytmiczna
+            modifiers:      Modyfikatory w notacji lilypond (np. '.')
+        """
+        return 'z' + AbcWriter.get_length(AbcWriter.get_duration(base_duration, modifiers))
+
+    # endregion
+
+    # region Key
+
+    @staticmethod
+    def get_key_signature(key: Optional['Key']) -> Dict[str, str]:
+        """
+        Pobierz znaki przykluczowe tonacji jako słownik: nazwa nuty bez znaków -> nazwa nuty w tonacji (np. b -> bes).
+        Tonacje wymagające podwójnych znaków nie mają odpowiednika w ABC, więc są zapisywane jako C-dur ze znakami
+        przy nutach
+        """
+        signature = {name: name for name in Note.base_notes}
+
+        if key is not None and all(name.count('is') + name.count('es') <= 1 for name in key.degree_names):
+            signature.update({name[0]: name for name in key.degree_names})
+
+        return signature
+
+    @classmethod
+    def get_key_field(cls, key: Optional['Key']) -> str:
+        """Pobierz wartość pola K: dla tonacji (np. Bbm, F#, C)"""
+        if key is None or any(name.count('is') + name.count('es') > 1 for name in key.degree_names):
+            return 'C'
+
+        value = key.tonic.count('is') - key.tonic.count('es')
+        mode = 'm' if key.key_type.value == 'minor' else ''
+
+        return key.tonic[0].upper() + cls.key_accidental_signs[value] + mode
+
+    # endregion
+
+    def get_bar(self, bar: List[Writeable], signature: Dict[str, str], beat: int) -> str:
+        """
+        Zamień takt na napis w notacji ABC (bez kreski taktowej)
+
+        Args:
+            bar:        Takt
+            signature:  Znaki przykluczowe (zob. get_key_signature)
+            beat:       Długość grupy belkowanych nut w sześćdziesięcioczwórkach. Nuty krótsze niż ćwierćnuta
+                        w obrębie jednej grupy zapisywane są bez odstępu, więc są łączone belką
+        """
+        # Znaki chromatyczne obowiązujące do końca taktu: (nuta bez znaków, oktawa) -> nazwa nuty
+        accidentals: Dict[Tuple[str, OctaveType], str] = {}
+        parts: List[str] = []
+        position = 0
+
+        def render(elem: Writeable) -> Tuple[str, int]:
+            modifiers = ''.join([mod.value for mod in elem.modifiers])
+            duration = self.get_duration(elem.base_duration, modifiers)
+
+            if not isinstance(elem, Note):
+                return self.get_rest_token(elem.base_duration, modifiers), duration
+
+            # Nazwy nut w tonacji i w takcie porównujemy jako napisy, np. bes w tonacji F-dur nie wymaga znaku
+            note = elem.note
+            previous = accidentals.get((note[0], elem.octave), signature[note[0]])
+            accidentals[(note[0], elem.octave)] = note
+
+            return self.get_note_tokens(note, elem.octave, elem.base_duration, modifiers)[previous != note], duration
+
+        for elem in bar:
+            if isinstance(elem, Tuplet):
+                tokens = ''.join([render(inner)[0] for inner in elem.elements])
+                parts.append(f'({elem.numerator}:{elem.denominator}:{len(elem.elements)}{tokens}')
+                position += int(elem.get_span())
+                continue
+
+            token, duration = render(elem)
+
+            if len(parts) > 0 and position % beat != 0 and duration < 16 and parts[-1][0] != '(':
+                parts[-1] += token
+            else:
+                parts.append(token)
+
+            position += duration
+
+        return ' '.join(parts)
+
+    @staticmethod
+    def get_beat(metre: Tuple[int, int]) -> int:
+        """Pobierz długość grupy belkowanych nut w sześćdziesięcioczwórkach (w metrum złożonym - trzy miary)"""
+        n, m = metre
+
+        return 64 // m * (3 if m >= 8 and n % 3 == 0 and n > 3 else 1)
+
+    def parse(self, bars: List[List[Writeable]], metre: Tuple[int, int], key: Optional['Key'] = None,
+              clefs: bool = True) -> List[str]:
+        """
+        Zamień takty na napisy i dodaj je do danych wyjściowych, po bars_per_line taktów w linii
+
+        Args:
+            bars:   Lista taktów
+            metre:  Metrum
+            key:    Opcjonalna tonacja
+            clefs:  Jeśli True klucz jest zmieniany automatycznie na podstawie pierwszej nuty taktu
+
+        Returns:
+            Napisy kolejnych taktów
+        """
+        signature = self.get_key_signature(key)
+        key_field = self.get_key_field(key)
+        beat = self.get_beat(metre)
+
+        previous_clef = 'G'
+        strings: List[str] = []
+
+        for i, bar in enumerate(bars):
+            text = self.get_bar(bar, signature, beat)
+
+            clef = Writer.get_bar_clef(bar, self.clef_ranges, previous_clef) if clefs else None
+            if clef is not None:
+                text = f'[K:{key_field} clef={self.clef_names[clef]}] {text}'
+                previous_clef = clef
+
+            strings.append(text + (' |' if i != len(bars) - 1 else ' |]'))
+
+        for i in range(0, len(strings), self.bars_per_line):
+            self.lines.append(' '.join(strings[i:i + self.bars_per_line]))
+
+        return strings
+
+    def from_bars(self, bars: List[List[Writeable]], metre: Tuple[int, int], key: Optional['Key'] = None,
+                  title: Optional[str] = None):
+        """
+        Przetwórz pogrupowane takty (np. wynik generate(group=True)) na kompletny plik ABC
+
+        Args:
+            bars:   Lista taktów
+            metre:  Metrum
+            key:    Opcjonalna tonacja
+            title:  Tytuł. Domyślnie nazwa pliku
+        """
+        self.lines = [
+            'X:1',
+            f'T:{title if title is not None else self.filename}',
+            f'M:{metre[0]}/{metre[1]}',
+            f'L:1/{self.unit_length}',
+            f'K:{self.get_key_field(key)} clef=treble'
+        ]
+
+        self.parse(bars, metre, key)
+
+    def from_generator(self, generator: 'Generator', seed: Optional[int] = None):
+        """
+        Przetwórz dane z generatora
+
+        Args:
+            generator:  Skonfigurowany generator
+            seed:       Ziarno generatora liczb losowych
+        """
+        self.from_bars(generator.generate(group=True, seed=seed), generator.metre, generator.key)
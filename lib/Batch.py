@@ -0,0 +1,230 @@
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+import json
+import os
+import time
+
+from lib.Generator import Generator
+from lib.MidiWriter import MidiWriter
+from lib.NdjsonWriter import NdjsonWriter
+from lib.WavWriter import WavWriter
+from lib.Writer import Writer
+
+T = TypeVar('T')
+
+
+class Batch:
+    """
+    Generowanie wielu melodii o tych samych ustawieniach i zapisywanie ich do folderu.
+    Melodia o numerze i jest generowana z ziarnem seed + i, więc wynik nie zależy od liczby procesów.
+    """
+
+    # Formaty zapisywane bez udziału lilyponda
+    source_formats: List[str] = ['ly', 'midi', 'json', 'wav']
+
+    # Formaty wymagające kompilacji lilypondem
+    compiled_formats: List[str] = ['pdf', 'png', 'ps', 'svg']
+
+    # Liczba melodii przetwarzanych przez proces roboczy w jednym zadaniu
+    chunk_size: int = 64
+
+    def __init__(self, settings: Dict[str, Any], output_dir: str, formats: Optional[List[str]] = None,
+                 name: str = 'generated'):
+        """
+        Args:
+            settings:   Ustawienia generatora (format Generator.to_dict())
+            output_dir: Folder na pliki wynikowe
+            formats:    Lista formatów wyjściowych (domyślnie tylko ly)
+            name:       Przedrostek nazw plików
+
+        Raises:
+            ValueError:     Gdy podano nieobsługiwany format
+        """
+        self.settings: Dict[str, Any] = settings
+        self.output_dir: str = output_dir.rstrip('/')
+        self.formats: List[str] = formats if formats is not None else ['ly']
+        self.name: str = name
+
+        unknown = set(self.formats) - set(self.source_formats + self.compiled_formats)
+        if len(unknown) > 0:
+            raise ValueError(f'Formats are not supported: {", ".join(sorted(unknown))}')
+
+        # Walidacja ustawień przed uruchomieniem procesów roboczych
+        Generator.from_dict(settings)
+
+    def get_filename(self, idx: int) -> str:
+        """Pobierz nazwę pliku (bez rozszerzenia) dla melodii o podanym numerze"""
+        return f'{self.name}-{idx:06d}'
+
+    def render(self, generator: Generator, idx: int, seed: int):
+        """
+        Wygeneruj jedną melodię i zapisz ją we wszystkich wybranych formatach.
+        Melodia jest generowana raz, niezależnie od liczby formatów.
+
+        Args:
+            generator:  Skonfigurowany generator
+            idx:        Numer melodii
+            seed:       Ziarno generatora liczb losowych
+
+        Raises:
+            CompilationFailed:  Gdy kompilacja lilypondem zakończyła się błędem
+        """
+        filename = self.get_filename(idx)
+        bars = generator.generate(group=True, seed=seed)
+
+        if 'json' in self.formats:
+            with open(f'{self.output_dir}/{filename}.json', 'w') as f:
+                json.dump({'seed': seed, 'bars': [[str(elem) for elem in bar] for bar in bars]}, f)
+
+        if 'midi' in self.formats:
+            midi = MidiWriter(filename)
+            midi.set_output_dir(self.output_dir)
+            midi.metre = generator.metre
+            midi.parse(bars).export()
+
+        if 'wav' in self.formats:
+            wav = WavWriter(filename)
+            wav.set_output_dir(self.output_dir)
+            wav.parse(bars).export()
+
+        compiled = [ext for ext in self.formats if ext in self.compiled_formats]
+
+        if 'ly' in self.formats or len(compiled) > 0:
+            writer = Writer(filename)
+            writer.set_source_dir(self.output_dir)
+            writer.set_compiled_dir(self.output_dir)
+            writer.from_bars(bars, generator.metre, key=generator.key)
+            writer.export()
+
+            # Wszystkie formaty tworzone są jednym uruchomieniem lilyponda
+            if len(compiled) > 0:
+                writer.compile(compiled).check()
+
+            if 'ly' not in self.formats:
+                os.remove(f'{self.output_dir}/{filename}.ly')
+
+    def render_chunk(self, start: int, stop: int, seed: int) -> int:
+        """
+        Wygeneruj melodie o numerach [start, stop)
+
+        Returns:
+            Liczba wygenerowanych melodii
+        """
+        generator = Generator.from_dict(self.settings)
+
+        for idx in range(start, stop):
+            self.render(generator, idx, seed + idx)
+
+        return stop - start
+
+    def get_chunks(self, count: int) -> Iterator[Tuple[int, int]]:
+        """Podziel zakres melodii na fragmenty przetwarzane przez procesy robocze"""
+        for start in range(0, count, self.chunk_size):
+            yield start, min(start + self.chunk_size, count)
+
+    def encode_chunk(self, start: int, stop: int, seed: int) -> List[str]:
+        """
+        Wygeneruj melodie o numerach [start, stop) i zamień je na linie NDJSON (zob. NdjsonWriter.encode)
+
+        Returns:
+            Linie kolejnych melodii
+        """
+        generator = Generator.from_dict(self.settings)
+
+        return [NdjsonWriter.encode(generator.generate(group=True, seed=seed + idx), seed + idx)
+                for idx in range(start, stop)]
+
+    def iter_chunks(self, count: int, seed: int, workers: int, task: Callable[[int, int, int], T]) -> Iterator[T]:
+        """
+        Wykonaj task(start, stop, seed) dla kolejnych fragmentów i zwracaj wyniki w kolejności fragmentów.
+        Przy workers > 1 fragmenty są zlecane procesom roboczym na bieżąco, więc w pamięci nigdy nie ma więcej niż
+        kilka zadań na proces, niezależnie od liczby melodii.
+        """
+        if workers <= 1:
+            for start, stop in self.get_chunks(count):
+                yield task(start, stop, seed)
+
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunks = self.get_chunks(count)
+            pending = {}
+            finished: Dict[int, T] = {}
+            next_start = 0
+
+            while True:
+                while len(pending) + len(finished) < 2 * workers:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        break
+
+                    pending[executor.submit(task, chunk[0], chunk[1], seed)] = chunk[0]
+
+                if len(pending) == 0 and len(finished) == 0:
+                    break
+
+                if next_start not in finished:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        finished[pending.pop(future)] = future.result()
+
+                # Wyniki zwracane są w kolejności fragmentów, nawet jeśli procesy kończą je w innej kolejności
+                while next_start in finished:
+                    yield finished.pop(next_start)
+                    next_start += self.chunk_size
+
+    def run(self, count: int, seed: int, workers: int = 1,
+            progress: Optional[Callable[[int, int, float], None]] = None) -> int:
+        """
+        Wygeneruj melodie i zapisz je do plików w wybranych formatach
+
+        Args:
+            count:      Liczba melodii
+            seed:       Ziarno bazowe
+            workers:    Liczba procesów roboczych
+            progress:   Funkcja wywoływana po każdym fragmencie z argumentami (gotowe, wszystkie, sekundy)
+
+        Returns:
+            Liczba wygenerowanych melodii
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        done = 0
+        start_time = time.perf_counter()
+
+        for generated in self.iter_chunks(count, seed, workers, self.render_chunk):
+            done += generated
+
+            if progress is not None:
+                progress(done, count, time.perf_counter() - start_time)
+
+        return done
+
+    def stream(self, count: int, seed: int, writer: NdjsonWriter, workers: int = 1,
+               progress: Optional[Callable[[int, int, float], None]] = None) -> int:
+        """
+        Wygeneruj melodie i zapisz je kolejno przez otwarty NdjsonWriter (np. na standardowe wyjście), bez tworzenia
+        plików dla poszczególnych melodii. Procesy robocze zwracają gotowe linie, więc proces główny jedynie je
+        zapisuje
+
+        Args:
+            count:      Liczba melodii
+            seed:       Ziarno bazowe
+            writer:     Otwarty NdjsonWriter
+            workers:    Liczba procesów roboczych
+            progress:   Funkcja wywoływana po każdym fragmencie z argumentami (gotowe, wszystkie, sekundy)
+
+        Returns:
+            Liczba wygenerowanych melodii
+        """
+        done = 0
+        start_time = time.perf_counter()
+
+        for lines in self.iter_chunks(count, seed, workers, self.encode_chunk):
+            writer.add_lines(lines)
+            done += len(lines)
+
+            if progress is not None:
+                progress(done, count, time.perf_counter() - start_time)
+
+        return done
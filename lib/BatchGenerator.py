@@ -0,0 +1,259 @@
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+
+from lib.Generator import Generator
+from lib.MarkovModel import MarkovModel
+from lib.theory.Note import Note
+from lib.theory.NoteModifier import NoteModifier
+from lib.theory.Rest import Rest
+from lib.theory.RestModifier import RestModifier
+from lib.theory.Writeable import Writeable
+
+
+class BatchGenerator:
+    """
+    Generowanie wielu melodii o tych samych ustawieniach jednocześnie.
+
+    Stan wszystkich melodii (stan łańcucha wysokości, pozostała długość, liczba pauz pod rząd) przechowywany jest
+    w tablicach numpy, a każdy krok (decyzja o pauzie, losowanie wartości rytmicznej, kropki i wysokości) wykonywany
+    jest naraz dla całej partii. Rozkład wyników jest taki sam jak w Generator.generate, ale kolejność losowań jest
+    inna, więc to samo ziarno daje inne melodie niż Generator.generate. Ograniczenia (Generator.add_constraint) nie są
+    sprawdzane, a grupy niemiarowe (Generator.set_tuplets) nie są generowane.
+    """
+
+    def __init__(self, generator: Generator):
+        """
+        Args:
+            generator:  Skonfigurowany generator. Ustawienia są odczytywane w momencie tworzenia obiektu
+        """
+        self.generator: Generator = generator
+
+        # Wysokości losowane są z łańcucha Markowa generatora lub z łańcucha równoważnego losowaniu interwałów
+        # (z tonacją ograniczonego do dźwięków gamy)
+        self.model: MarkovModel = generator.get_pitch_model()
+
+        self.shortest_note_duration: int = generator.shortest_note_duration
+        self.lengths: np.ndarray = np.array(Generator.correct_note_lengths, dtype=np.int64)
+        self.durations_cumulative: np.ndarray = self.get_durations_cumulative()
+
+    def get_durations_cumulative(self) -> np.ndarray:
+        """
+        Wyznacz skumulowane prawdopodobieństwa wartości rytmicznych dla każdej pozostałej długości od 0 do
+        shortest_note_duration (dłuższe miejsce dopuszcza te same wartości co shortest_note_duration)
+
+        Returns:
+            Tablica o wymiarach (shortest_note_duration + 1, liczba wartości rytmicznych)
+        """
+        shortest = self.shortest_note_duration
+        remaining = np.arange(shortest + 1)[:, None]
+
+        # Te same warunki co w Generator.get_available_note_lengths
+        available = (shortest / self.lengths[None, :] <= remaining) & (self.lengths[None, :] <= shortest)
+
+        weights = np.where(available, np.asarray(self.generator.durations_probability, dtype=np.float64), 0)
+
+        # Gdy wszystkie dostępne wartości mają zerowe prawdopodobieństwo, losujemy je z rozkładu jednostajnego
+        weights = np.where(weights.sum(axis=1, keepdims=True) > 0, weights, available.astype(np.float64))
+
+        totals = weights.sum(axis=1, keepdims=True)
+        return np.cumsum(weights, axis=1) / np.where(totals > 0, totals, 1)
+
+    def draw_durations(self, remaining: np.ndarray, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Wylosuj wartości rytmiczne i kropki dla elementów, które mają do dyspozycji podaną długość
+
+        Args:
+            remaining:  Dostępne miejsce, podane w ilości shortest_note_duration
+            rng:        Generator liczb losowych
+
+        Returns:
+            Krotka (bazowe wartości rytmiczne, czy element ma kropkę)
+        """
+        shortest = self.shortest_note_duration
+
+        rows = self.durations_cumulative[np.minimum(remaining, shortest)]
+        base = self.lengths[np.count_nonzero(rows <= rng.random(len(remaining))[:, None], axis=1)]
+
+        # Kropka tylko wtedy, gdy nuta nie jest najkrótszą wartością i nuta z kropką mieści się w dostępnym miejscu.
+        # Generator nigdy nie dodaje podwójnej kropki (jej warunek nie może być spełniony), więc tutaj też jej nie ma
+        dot = (rng.random(len(remaining)) < 0.5) & (base < shortest) & (remaining * 2 >= shortest // base * 3)
+
+        return base, dot
+
+    def generate_arrays(self, count: int, seed: Optional[int] = None) \
+            -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Wygeneruj melodie w postaci tablic
+
+        Args:
+            count:  Liczba melodii
+            seed:   Ziarno generatora liczb losowych
+
+        Returns:
+            Krotka tablic o wymiarach (count, maksymalna liczba elementów): identyfikatory nut (-1 dla pauz), bazowe
+            wartości rytmiczne (0 za ostatnim elementem melodii), kropki oraz liczba elementów każdej melodii
+        """
+        generator = self.generator
+        rng = np.random.default_rng(seed)
+        shortest = self.shortest_note_duration
+
+        start = generator.start_note.get_id()
+        if not self.model.lowest <= start <= self.model.highest:
+            raise ValueError(f'Note {generator.start_note} is outside of the model range')
+
+        # Każdy element trwa co najmniej shortest_note_duration, więc tyle kroków wystarczy
+        steps = generator.get_all_bars_duration()
+
+        pitches = np.full((count, steps), -1, dtype=np.int64)
+        durations = np.zeros((count, steps), dtype=np.int64)
+        dots = np.zeros((count, steps), dtype=bool)
+        sizes = np.zeros(count, dtype=np.int64)
+
+        remaining = np.full(count, steps, dtype=np.int64)
+        consecutive_rests = np.zeros(count, dtype=np.int64)
+        states = self.model.get_states(np.full(count, start))
+
+        # Pierwsza nuta ma wysokość nuty początkowej, a jej wartość rytmiczna musi zmieścić się w melodii
+        # (jak w Generator.generate_fragment)
+        durations[:, 0], dots[:, 0] = self.draw_durations(np.minimum(remaining, shortest), rng)
+        pitches[:, 0] = start
+        remaining -= shortest // durations[:, 0] * np.where(dots[:, 0], 3, 2) // 2
+        sizes[:] = 1
+
+        for step in range(1, steps):
+            active = np.nonzero(remaining > 0)[0]
+            if len(active) == 0:
+                break
+
+            rest = (rng.random(len(active)) < generator.rest_probability) \
+                & (consecutive_rests[active] < generator.max_consecutive_rests)
+            consecutive_rests[active] = np.where(rest, consecutive_rests[active] + 1, 0)
+
+            notes = active[~rest]
+            next_pitches, states[notes] = self.model.step(states[notes], rng)
+            pitches[notes, step] = next_pitches
+
+            base, dot = self.draw_durations(remaining[active], rng)
+            durations[active, step] = base
+            dots[active, step] = dot
+
+            remaining[active] -= shortest // base * np.where(dot, 3, 2) // 2
+            sizes[active] += 1
+
+        # Ostatnia nuta każdej melodii dostaje wysokość nuty końcowej
+        is_note = pitches >= 0
+        last_note = is_note.shape[1] - 1 - np.argmax(is_note[:, ::-1], axis=1)
+        pitches[np.arange(count), last_note] = generator.end_note.get_id()
+
+        if generator.end_note_approach > 0:
+            self.approach_end_note(pitches, rng)
+
+        return pitches, durations, dots, sizes
+
+    def approach_end_note(self, pitches: np.ndarray, rng: np.random.Generator):
+        """
+        Zaplanuj wysokości ostatnich nut wszystkich melodii tak, aby doszły do nuty końcowej dozwolonymi interwałami
+        (zob. Generator.approach_end_note). Jeśli to niemożliwe, planowanych jest więcej nut, a melodie, dla których
+        dojście nie jest możliwe wcale, pozostają bez zmian
+
+        Args:
+            pitches:    Identyfikatory nut zwrócone przez generate_arrays, modyfikowane w miejscu
+            rng:        Generator liczb losowych
+        """
+        model = self.model
+        end = self.generator.end_note.get_id()
+
+        if not model.lowest <= end <= model.highest:
+            return
+
+        is_note = pitches >= 0
+
+        # Kolumny kolejnych nut każdej melodii (kolumny pauz trafiają na koniec)
+        note_columns = np.argsort(~is_note, axis=1, kind='stable')
+        note_counts = np.count_nonzero(is_note, axis=1)
+        steps = np.clip(np.minimum(self.generator.end_note_approach, note_counts - 1), 0, None)
+
+        pending = np.nonzero(steps > 0)[0]
+
+        while len(pending) > 0:
+            # Stan łańcucha po ostatniej niezmienianej nucie, z historią uzupełnioną pierwszą nutą jak w get_state
+            prefix_end = note_counts[pending] - steps[pending] - 1
+            states = np.zeros(len(pending), dtype=np.int64)
+            for offset in range(model.order - 1, -1, -1):
+                columns = note_columns[pending, np.maximum(prefix_end - offset, 0)]
+                states = states * model.size + pitches[pending, columns] - model.lowest
+
+            planned = model.plan_batch(states, end, steps[pending], rng)
+            found = planned[:, 0] >= 0
+
+            for step in range(planned.shape[1]):
+                changed = np.nonzero(planned[:, step] >= 0)[0]
+                columns = note_columns[pending[changed], prefix_end[changed] + 1 + step]
+                pitches[pending[changed], columns] = planned[changed, step]
+
+            # Pozostałe melodie próbujemy ponownie z jedną nutą więcej
+            pending = pending[~found]
+            steps[pending] += 1
+            pending = pending[steps[pending] < note_counts[pending]]
+
+    def to_writeables(self, pitches: np.ndarray, durations: np.ndarray, dots: np.ndarray,
+                      size: int) -> List[Writeable]:
+        """
+        Zamień jeden wiersz tablic zwróconych przez generate_arrays na listę nut i pauz
+
+        Args:
+            pitches:    Identyfikatory nut
+            durations:  Bazowe wartości rytmiczne
+            dots:       Kropki
+            size:       Liczba elementów melodii
+        """
+        generator = self.generator
+        last_note = max(i for i in range(size) if pitches[i] >= 0)
+        data: List[Writeable] = []
+
+        for i in range(size):
+            duration = int(durations[i])
+
+            if pitches[i] < 0:
+                elem = Rest(duration, [RestModifier.DOT] if dots[i] else [])
+            else:
+                elem = generator.get_note_from_id(int(pitches[i]), duration)
+
+                # Nuta początkowa i końcowa zachowują pisownię wybraną przez użytkownika
+                spelling = generator.end_note if i == last_note else generator.start_note if i == 0 else None
+                if spelling is not None:
+                    elem.note, elem.octave = spelling.note, spelling.octave
+
+                if dots[i]:
+                    elem.add_modifier(NoteModifier.DOT)
+
+            data.append(elem)
+
+        return data
+
+    def generate(self, count: int, group: bool = False, seed: Optional[int] = None) \
+            -> Union[List[List[Writeable]], List[List[List[Writeable]]]]:
+        """
+        Wygeneruj melodie
+
+        Args:
+            count:  Liczba melodii
+            group:  Jeżeli True to każda melodia będzie pogrupowana i rozbita na takty, tak jak w Generator.generate
+            seed:   Ziarno generatora liczb losowych. Te same parametry i ziarno dają te same melodie
+
+        Returns:
+            Lista melodii
+        """
+        pitches, durations, dots, sizes = self.generate_arrays(count, seed)
+        melodies = []
+
+        for i in range(count):
+            data = self.to_writeables(pitches[i], durations[i], dots[i], int(sizes[i]))
+
+            if group:
+                data = self.generator.group_bars(self.generator.split_to_bars(data))
+
+            melodies.append(data)
+
+        return melodies
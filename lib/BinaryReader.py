@@ -0,0 +1,176 @@
+from typing import Any, Dict, Iterator, List, Optional
+import json
+import os
+import struct
+
+import numpy as np
+
+from lib.BinaryWriter import BinaryWriter
+from lib.theory.Note import Note
+from lib.theory.NoteModifier import NoteModifier
+from lib.theory.OctaveType import OctaveType
+from lib.theory.Rest import Rest
+from lib.theory.RestModifier import RestModifier
+from lib.theory.Tuplet import Tuplet
+from lib.theory.Writeable import Writeable
+
+
+class BinaryReader:
+    """
+    Odczyt melodii zapisanych przez BinaryWriter.
+
+    Plik jest mapowany w pamięci, a melodie udostępniane są jako widoki tablicy rekordów (bez kopiowania
+    i deserializacji), więc przeglądanie korpusu z milionami melodii nie wymaga wczytywania go do pamięci.
+    Zamiana na nuty i pauzy (get_bars) wykonywana jest tylko na żądanie.
+    """
+
+    def __init__(self, filename: str):
+        """
+        Args:
+            filename:   Ścieżka do pliku
+        """
+        self.filename: str = filename
+
+        # Ustawienia generatora i ziarno bazowe zapisane w nagłówku
+        self.settings: Optional[Dict[str, Any]] = None
+        self.seed: Optional[int] = None
+
+        # Rekordy wszystkich melodii (zmapowane w pamięci) oraz indeks melodii
+        self.records: np.ndarray = np.zeros(0, dtype=BinaryWriter.record_dtype)
+        self.index: np.ndarray = np.zeros(0, dtype=BinaryWriter.index_dtype)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, idx: int) -> np.ndarray:
+        return self.get_melody(idx)
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        for idx in range(len(self.index)):
+            yield self.get_melody(idx)
+
+    def read(self):
+        """
+        Odczytaj nagłówek i indeks oraz zmapuj rekordy w pamięci
+
+        Raises:
+            ValueError:     Gdy plik nie jest poprawnym plikiem BinaryWriter lub ma nieobsługiwaną wersję
+        """
+        header_size = struct.calcsize(BinaryWriter.header_format)
+        footer_size = struct.calcsize(BinaryWriter.footer_format)
+        file_size = os.path.getsize(self.filename)
+
+        with open(self.filename, 'rb') as f:
+            header = f.read(header_size)
+            if len(header) < header_size or file_size < header_size + footer_size:
+                raise ValueError('Not a melody file')
+
+            magic, version, settings_length = struct.unpack(BinaryWriter.header_format, header)
+            if magic != BinaryWriter.magic:
+                raise ValueError('Not a melody file')
+
+            if version != BinaryWriter.version:
+                raise ValueError(f'Version {version} is not supported')
+
+            header_data = json.loads(f.read(settings_length).decode('utf-8'))
+
+            f.seek(file_size - footer_size)
+            index_offset, melody_count, footer_magic = struct.unpack(BinaryWriter.footer_format, f.read(footer_size))
+            if footer_magic != BinaryWriter.footer_magic:
+                raise ValueError('Melody file is incomplete')
+
+        self.settings = header_data['settings']
+        self.seed = header_data['seed']
+
+        # Rekordy zaczynają się za nagłówkiem wyrównanym do BinaryWriter.alignment bajtów
+        records_offset = header_size + settings_length
+        records_offset += -records_offset % BinaryWriter.alignment
+        record_count = (index_offset - records_offset) // BinaryWriter.record_dtype.itemsize
+
+        self.records = self.map(BinaryWriter.record_dtype, records_offset, record_count)
+        self.index = self.map(BinaryWriter.index_dtype, index_offset, melody_count)
+
+        return self
+
+    def map(self, dtype: np.dtype, offset: int, count: int) -> np.ndarray:
+        """Zmapuj w pamięci count rekordów typu dtype, zaczynając od podanego bajtu pliku (tylko do odczytu)"""
+        if count == 0:
+            return np.zeros(0, dtype=dtype)
+
+        return np.memmap(self.filename, dtype=dtype, mode='r', offset=offset, shape=(count,))
+
+    def get_melody(self, idx: int) -> np.ndarray:
+        """
+        Pobierz rekordy melodii (widok, bez kopiowania)
+
+        Args:
+            idx:    Numer melodii
+
+        Raises:
+            IndexError:     Gdy nie ma melodii o podanym numerze
+        """
+        start, count = int(self.index[idx]['start']), int(self.index[idx]['count'])
+
+        return self.records[start:start + count]
+
+    def get_seed(self, idx: int) -> Optional[int]:
+        """Pobierz ziarno, z którym wygenerowano melodię o podanym numerze"""
+        seed = int(self.index[idx]['seed'])
+
+        return None if seed < 0 else seed
+
+    def get_bars(self, idx: int) -> List[List[Writeable]]:
+        """
+        Odtwórz takty melodii o podanym numerze
+
+        Args:
+            idx:    Numer melodii
+        """
+        return self.to_bars(self.get_melody(idx), int(self.index[idx]['bars']))
+
+    @staticmethod
+    def to_bars(records: np.ndarray, bar_count: Optional[int] = None) -> List[List[Writeable]]:
+        """
+        Zamień rekordy jednej melodii na takty z nutami, pauzami i grupami niemiarowymi
+
+        Args:
+            records:    Rekordy melodii
+            bar_count:  Liczba taktów. Domyślnie wyznaczana z numeru taktu ostatniego rekordu
+        """
+        if bar_count is None:
+            bar_count = int(records['bar'][-1]) + 1 if len(records) > 0 else 0
+
+        bars: List[List[Writeable]] = [[] for _ in range(bar_count)]
+
+        # Elementy grupy niemiarowej zbierane są do momentu, w którym grupa się kończy
+        tuplet: List[Writeable] = []
+        tuplet_ratio = (0, 0)
+        tuplet_bar = 0
+
+        def flush_tuplet():
+            if len(tuplet) > 0:
+                bars[tuplet_bar].append(Tuplet(tuplet_ratio[0], tuplet_ratio[1], list(tuplet)))
+                tuplet.clear()
+
+        for pitch, step, alter, duration, modifiers, numerator, denominator, bar in records.tolist():
+            if pitch < 0:
+                elem: Writeable = Rest(duration, [mod for mod in RestModifier if modifiers & BinaryWriter.flags[mod]])
+            else:
+                base_note = Note.base_notes[step]
+                octave = (pitch - Note.base_notes_ids[base_note] - alter) // 12
+
+                elem = Note(base_note + Note.create_accidentals_string(alter), OctaveType.from_id(octave), duration,
+                            [mod for mod in NoteModifier if modifiers & BinaryWriter.flags[mod]])
+
+            if numerator == 0 or modifiers & BinaryWriter.TUPLET_START:
+                flush_tuplet()
+
+            if numerator == 0:
+                bars[bar].append(elem)
+            else:
+                tuplet.append(elem)
+                tuplet_ratio, tuplet_bar = (numerator, denominator), bar
+
+        flush_tuplet()
+
+        return bars
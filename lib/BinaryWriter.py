@@ -0,0 +1,183 @@
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+import json
+import struct
+
+import numpy as np
+
+from lib.theory.Note import Note
+from lib.theory.NoteModifier import NoteModifier
+from lib.theory.RestModifier import RestModifier
+from lib.theory.Tuplet import Tuplet
+from lib.theory.Writeable import Writeable
+
+
+class BinaryWriter:
+    """
+    Zapis wielu melodii (wyników Generator.generate(group=True)) do jednego pliku binarnego.
+
+    Układ pliku (liczby zapisane jako little-endian):
+        nagłówek:   magic, wersja, długość i treść ustawień generatora w formacie JSON, wyrównane do 16 bajtów
+        rekordy:    wszystkie elementy wszystkich melodii jako rekordy stałej długości (zob. record_dtype)
+        indeks:     dla każdej melodii pierwszy rekord, liczba rekordów, liczba taktów i ziarno (zob. index_dtype)
+        stopka:     położenie indeksu, liczba melodii i magic
+
+    Rekordy i indeks mają stałą długość, więc BinaryReader może je odczytywać bez deserializacji, bezpośrednio
+    z pliku zmapowanego w pamięci.
+    """
+
+    magic: bytes = b'MGENBIN\0'
+    footer_magic: bytes = b'MGENEND\0'
+    version: int = 1
+
+    # Nagłówek: magic, wersja, długość ustawień. Stopka: położenie indeksu, liczba melodii, magic
+    header_format: str = '<8sHxxI'
+    footer_format: str = '<QQ8s'
+    alignment: int = 16
+
+    # Pojedynczy element melodii. Pauza ma wysokość -1, a nuty grup niemiarowych mają niezerowe proporcje grupy
+    record_dtype: np.dtype = np.dtype([
+        ('pitch', '<i2'),                   # Identyfikator nuty (numer MIDI)
+        ('step', 'u1'),                     # Indeks nuty bazowej w Note.base_notes (pisownia)
+        ('alter', 'i1'),                    # Wartość znaków chromatycznych (pisownia)
+        ('duration', 'u1'),                 # Bazowa wartość rytmiczna
+        ('modifiers', 'u1'),                # Flagi modyfikatorów (zob. flags)
+        ('tuplet_numerator', 'u1'),
+        ('tuplet_denominator', 'u1'),
+        ('bar', '<u4')                      # Numer taktu, liczony od 0
+    ])
+
+    index_dtype: np.dtype = np.dtype([
+        ('start', '<u8'),
+        ('count', '<u4'),
+        ('bars', '<u4'),
+        ('seed', '<i8')                     # -1, jeśli melodia nie została wygenerowana z podanym ziarnem
+    ])
+
+    # Flagi modyfikatorów. TUPLET_START oznacza pierwszy element grupy niemiarowej
+    DOT: int = 1
+    DOUBLE_DOT: int = 2
+    TIE: int = 4
+    TUPLET_START: int = 8
+
+    flags: Dict[Any, int] = {
+        NoteModifier.DOT: DOT,
+        NoteModifier.DOUBLE_DOT: DOUBLE_DOT,
+        NoteModifier.TIE: TIE,
+        RestModifier.DOT: DOT,
+        RestModifier.DOUBLE_DOT: DOUBLE_DOT
+    }
+
+    def __init__(self, filename: str, settings: Optional[Dict[str, Any]] = None, seed: Optional[int] = None):
+        """
+        Args:
+            filename:   Ścieżka do pliku wynikowego
+            settings:   Ustawienia generatora (format Generator.to_dict()) zapisywane w nagłówku
+            seed:       Ziarno bazowe zapisywane w nagłówku
+        """
+        self.filename: str = filename
+        self.settings: Optional[Dict[str, Any]] = settings
+        self.seed: Optional[int] = seed
+
+        self.file: Optional[BinaryIO] = None
+        self.record_count: int = 0
+        self.index: List[Tuple[int, int, int, int]] = []
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def open(self):
+        """Utwórz plik i zapisz nagłówek"""
+        header = json.dumps({'settings': self.settings, 'seed': self.seed}).encode('utf-8')
+        data = struct.pack(self.header_format, self.magic, self.version, len(header)) + header
+
+        self.file = open(self.filename, 'wb')
+        self.file.write(data + b'\0' * (-len(data) % self.alignment))
+
+        self.record_count = 0
+        self.index = []
+
+        return self
+
+    def close(self):
+        """Zapisz indeks i stopkę, a następnie zamknij plik"""
+        if self.file is None:
+            return
+
+        index_offset = self.file.tell()
+
+        self.file.write(np.array(self.index, dtype=self.index_dtype).tobytes())
+        self.file.write(struct.pack(self.footer_format, index_offset, len(self.index), self.footer_magic))
+        self.file.close()
+        self.file = None
+
+    @classmethod
+    def get_records(cls, bars: List[List[Writeable]]) -> np.ndarray:
+        """
+        Zamień takty melodii na tablicę rekordów
+
+        Args:
+            bars:   Takty melodii
+
+        Raises:
+            ValueError:     Gdy proporcje grupy niemiarowej nie mieszczą się w rekordzie
+        """
+        rows = []
+
+        for bar_idx, bar in enumerate(bars):
+            for elem in bar:
+                if isinstance(elem, Tuplet):
+                    if elem.numerator > 255 or elem.denominator > 255:
+                        raise ValueError(f'Tuplet {elem.numerator}/{elem.denominator} cannot be stored')
+
+                    for i, inner in enumerate(elem.elements):
+                        rows.append(cls.get_record(inner, bar_idx, elem, i == 0))
+                else:
+                    rows.append(cls.get_record(elem, bar_idx))
+
+        return np.array(rows, dtype=cls.record_dtype)
+
+    @classmethod
+    def get_record(cls, elem: Writeable, bar: int, tuplet: Optional[Tuplet] = None, tuplet_start: bool = False) \
+            -> tuple:
+        """
+        Zamień nutę lub pauzę na rekord
+
+        Args:
+            elem:           Nuta lub pauza
+            bar:            Numer taktu
+            tuplet:         Grupa niemiarowa, do której należy element
+            tuplet_start:   Czy element jest pierwszym elementem grupy
+        """
+        modifiers = sum(cls.flags[mod] for mod in elem.modifiers) | (cls.TUPLET_START if tuplet_start else 0)
+        numerator, denominator = (tuplet.numerator, tuplet.denominator) if tuplet is not None else (0, 0)
+
+        if isinstance(elem, Note):
+            return (elem.get_id(), Note.base_notes_indexes[elem.get_base_note()], elem.get_accidentals_value(),
+                    elem.base_duration, modifiers, numerator, denominator, bar)
+
+        return -1, 0, 0, elem.base_duration, modifiers, numerator, denominator, bar
+
+    def add(self, bars: List[List[Writeable]], seed: Optional[int] = None):
+        """
+        Dopisz melodię do pliku
+
+        Args:
+            bars:   Takty melodii (wynik Generator.generate(group=True))
+            seed:   Ziarno, z którym wygenerowano melodię
+
+        Raises:
+            ValueError:     Gdy plik nie został otwarty
+        """
+        if self.file is None:
+            raise ValueError('File is not open')
+
+        records = self.get_records(bars)
+
+        self.file.write(records.tobytes())
+        self.index.append((self.record_count, len(records), len(bars), -1 if seed is None else seed))
+        self.record_count += len(records)
+
+        return self
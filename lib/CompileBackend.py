@@ -0,0 +1,56 @@
+from typing import List, Optional, Tuple
+import subprocess
+
+
+class CompileBackend:
+    """
+    Sposób uruchamiania lilyponda używany przez Writer.compile i Writer.compile_async. Domyślny backend uruchamia
+    osobny proces dla każdej kompilacji. Inne backendy (np. LilypondWorker) lub zastępstwa w testach nadpisują metody
+    run i run_async
+    """
+
+    def run(self, command: List[str], timeout: Optional[float] = None) -> Tuple[int, str]:
+        """
+        Uruchom kompilację
+
+        Args:
+            command:    Polecenie z Writer.get_compile_command (ostatni argument to plik źródłowy)
+            timeout:    Maksymalny czas kompilacji w sekundach
+
+        Returns:
+            Kod wyjścia i komunikaty lilyponda (standardowe wyjście błędów)
+
+        Raises:
+            subprocess.TimeoutExpired:  Gdy kompilacja trwała dłużej niż timeout (proces lilyponda jest kończony)
+        """
+        process = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+                                 errors='replace', timeout=timeout)
+
+        return process.returncode, process.stderr
+
+    async def run_async(self, command: List[str], timeout: Optional[float] = None) -> Tuple[int, str]:
+        """
+        Uruchom kompilację bez blokowania pętli zdarzeń (argumenty i wynik jak w run). Anulowanie zadania kończy
+        proces lilyponda
+
+        Raises:
+            asyncio.TimeoutError:   Gdy kompilacja trwała dłużej niż timeout (proces lilyponda jest kończony)
+        """
+        import asyncio
+
+        process = await asyncio.create_subprocess_exec(*command, stdout=asyncio.subprocess.DEVNULL,
+                                                       stderr=asyncio.subprocess.PIPE)
+
+        try:
+            _, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            # Anulowanie (również przez wait_for po przekroczeniu czasu) nie może zostawić działającego procesu
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            raise
+
+        return process.returncode, stderr.decode(errors='replace')
+
+    def close(self):
+        """Zwolnij zasoby backendu"""
@@ -0,0 +1,62 @@
+from typing import Any, Dict, List, Optional
+
+from lib.errors import CompilationFailed
+
+
+class CompileResult:
+    """
+    Wynik kompilacji pliku lilypond: kod wyjścia, czas trwania, ostrzeżenia i błędy z wyjścia lilyponda oraz ścieżki
+    utworzonych plików
+    """
+
+    def __init__(self, command: List[str], return_code: int, duration: float, output: str = '',
+                 output_paths: Optional[List[str]] = None):
+        """
+        Args:
+            command:        Uruchomione polecenie
+            return_code:    Kod wyjścia lilyponda
+            duration:       Czas kompilacji w sekundach
+            output:         Wyjście lilyponda (lilypond zapisuje komunikaty na standardowe wyjście błędów)
+            output_paths:   Ścieżki plików utworzonych przez kompilację
+        """
+        self.command: List[str] = command
+        self.return_code: int = return_code
+        self.duration: float = duration
+        self.output: str = output
+        self.output_paths: List[str] = output_paths if output_paths is not None else []
+
+        self.warnings: List[str] = []
+        self.errors: List[str] = []
+
+        for line in output.splitlines():
+            if 'warning:' in line:
+                self.warnings.append(line.strip())
+            elif 'error:' in line:
+                self.errors.append(line.strip())
+
+    @property
+    def success(self) -> bool:
+        """Czy kompilacja zakończyła się powodzeniem"""
+        return self.return_code == 0
+
+    def check(self):
+        """
+        Sprawdź czy kompilacja zakończyła się powodzeniem
+
+        Raises:
+            CompilationFailed:  Gdy lilypond zakończył się błędem
+        """
+        if not self.success:
+            raise CompilationFailed(self.return_code, self.errors)
+
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Zamień wynik na słownik (np. do zapisu w logach lub metrykach)"""
+        return {
+            'return_code': self.return_code,
+            'duration': self.duration,
+            'warnings': self.warnings,
+            'errors': self.errors,
+            'output_paths': self.output_paths
+        }
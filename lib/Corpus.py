@@ -0,0 +1,434 @@
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import copy
+import os
+import struct
+import time
+
+import numpy as np
+
+from lib.MarkovModel import MarkovModel
+from lib.MidiReader import MidiReader
+from lib.Parser import Parser
+from lib.theory.Interval import Interval
+from lib.theory.Note import Note
+from lib.theory.Writeable import Writeable
+
+
+def _get_duration_lookup() -> np.ndarray:
+    lookup = np.full(64 * 7 // 4 + 1, -1, dtype=np.int64)
+
+    for idx, length in enumerate(Writeable.correct_note_lengths):
+        # Nuta bez kropki, z kropką i z podwójną kropką (o ile da się ją zapisać w 64 częściach)
+        for multiplier in [4, 6, 7]:
+            if 64 // length * multiplier % 4 == 0:
+                lookup[64 // length * multiplier // 4] = idx
+
+    return lookup
+
+
+class Corpus:
+    """
+    Zliczanie statystyk melodii z plików lilypond (.ly) i MIDI (.mid) w celu wyznaczenia ustawień generatora.
+
+    Każdy plik przetwarzany jest jako jedna melodia (plik MIDI - jako osobna melodia dla każdej ścieżki). Pliki
+    lilypond czytane są linia po linii tokenizerem z Parser, a zliczenia przechowywane są w tablicach numpy o stałym
+    rozmiarze, więc zużycie pamięci nie zależy od wielkości korpusu.
+    """
+
+    # Obsługiwane rozszerzenia plików
+    ly_extensions: List[str] = ['.ly']
+    midi_extensions: List[str] = ['.mid', '.midi']
+
+    # Liczba zliczanych wysokości (identyfikatory nut od c,,,, do b'''''')
+    pitch_count: int = 11 * 12
+
+    # Liczba plików przetwarzanych przez proces roboczy w jednym zadaniu
+    chunk_size: int = 32
+
+    # Liczba argumentów komend, które nie należą do melodii (np. tonika w \key bes \major)
+    command_arguments: Dict[str, int] = {
+        '\\key': 2, '\\clef': 1, '\\time': 1, '\\tuplet': 1, '\\times': 1, '\\bar': 1, '\\version': 1, '\\new': 1,
+        '\\relative': 1, '\\transpose': 2, '\\partial': 1
+    }
+
+    # Liczba elementów pliku lilypond gromadzonych przed dodaniem ich do zliczeń
+    flush_size: int = 4096
+
+    # Długość w 64 częściach całej nuty -> indeks w Writeable.correct_note_lengths (-1 dla długości, których nie da się
+    # zapisać jedną nutą). Kropki nie zmieniają bazowej wartości rytmicznej, więc nuta z kropką zliczana jest jako jej
+    # wartość bazowa
+    duration_lookup: np.ndarray = _get_duration_lookup()
+
+    def __init__(self):
+        self.intervals: np.ndarray = np.zeros(13, dtype=np.int64)
+        self.notes: np.ndarray = np.zeros(12, dtype=np.int64)
+        self.durations: np.ndarray = np.zeros(len(Writeable.correct_note_lengths), dtype=np.int64)
+        self.transitions: np.ndarray = np.zeros((self.pitch_count, self.pitch_count), dtype=np.int64)
+
+        self.note_count: int = 0
+        self.rest_count: int = 0
+
+        # Liczba przetworzonych plików oraz plików pominiętych z powodu błędów
+        self.files: int = 0
+        self.skipped: int = 0
+
+    # region Counting
+
+    def add_melody(self, pitches: Sequence[int], lengths: Sequence[int], tied: Sequence[bool],
+                   previous: Optional[int] = None) -> Optional[int]:
+        """
+        Dodaj melodię (lub kolejny fragment melodii) do zliczeń
+
+        Args:
+            pitches:    Identyfikatory nut, -1 dla pauz
+            lengths:    Długości elementów w 64 częściach całej nuty, 0 jeśli nieznana
+            tied:       Czy element jest połączony łukiem z następnym
+            previous:   Ostatnia nuta poprzedniego fragmentu tej samej melodii (wynik poprzedniego wywołania).
+                        Fragment nie może zaczynać się kontynuacją nuty połączonej łukiem
+
+        Returns:
+            Ostatnia nuta melodii (lub previous, jeśli fragment nie zawiera nut)
+        """
+        pitches = np.asarray(pitches, dtype=np.int64)
+        lengths = np.asarray(lengths, dtype=np.int64)
+        tied = np.asarray(tied, dtype=bool)
+
+        if len(pitches) == 0:
+            return previous
+
+        # Nuta połączona łukiem z poprzednią nutą tej samej wysokości jest jej kontynuacją
+        continuation = np.zeros(len(pitches), dtype=bool)
+        continuation[1:] = tied[:-1] & (pitches[1:] == pitches[:-1]) & (pitches[1:] >= 0)
+
+        # Sumujemy długości kontynuacji z nutą, od której się zaczynają
+        group = np.cumsum(~continuation) - 1
+        merged = np.bincount(group, weights=lengths).astype(np.int64)
+        unknown = np.bincount(group, weights=lengths == 0) > 0
+        pitches = pitches[~continuation]
+
+        durations = np.where(merged < len(self.duration_lookup), merged, 0)
+        durations = self.duration_lookup[durations][~unknown]
+        durations = durations[durations >= 0]
+        self.durations += np.bincount(durations, minlength=len(self.durations))
+
+        is_note = (pitches >= 0) & (pitches < self.pitch_count)
+        self.note_count += int(np.count_nonzero(is_note))
+        self.rest_count += int(np.count_nonzero(pitches < 0))
+
+        notes = pitches[is_note]
+        self.notes += np.bincount(notes % 12, minlength=12)
+
+        # Interwały liczone są między kolejnymi nutami z pominięciem pauz, tak jak w generatorze
+        if previous is not None:
+            notes = np.concatenate([[previous], notes])
+
+        if len(notes) > 1:
+            np.add.at(self.transitions, (notes[:-1], notes[1:]), 1)
+
+            semitones = np.abs(np.diff(notes))
+            self.intervals += np.bincount(semitones[semitones <= 12], minlength=13)
+
+        return int(notes[-1]) if len(notes) > 0 else previous
+
+    def add_ly_file(self, filename: str):
+        """
+        Dodaj plik lilypond. Obsługiwany jest zapis bezwzględny (taki jak w plikach generowanych przez Writer),
+        pominięta wartość rytmiczna oznacza wartość poprzedniej nuty. Plik dzielony jest na tokeny przez
+        Parser.tokenize, argumenty komend (command_arguments) są pomijane, a zliczenia aktualizowane są co flush_size
+        elementów, więc zużycie pamięci nie zależy od długości pliku
+
+        Args:
+            filename:   Ścieżka do pliku
+        """
+        pitches, lengths, tied = [], [], []
+        previous = None
+        duration, dots = 4, ''
+        skipped = 0
+
+        with open(filename, errors='replace') as f:
+            for kind, match in Parser.tokenize(f, strict=False):
+                if skipped > 0:
+                    skipped -= 1
+                    continue
+
+                if kind == 'command':
+                    skipped = self.command_arguments.get(match.group(kind), 0)
+                    continue
+
+                if kind != 'element':
+                    continue
+
+                name, octave, length, modifiers, tie = match.group(6, 7, 8, 9, 10)
+
+                if length is not None:
+                    duration, dots = int(length), modifiers
+                elif modifiers != '':
+                    dots = modifiers
+
+                if name == 'r':
+                    pitches.append(-1)
+                else:
+                    name = Note.get_full_name(name)
+                    pitches.append(
+                        Note.base_notes_ids[name[0]] + 12 * (4 + octave.count("'") - octave.count(','))
+                        + name.count('is') - name.count('es')
+                    )
+
+                # Długości niebędące potęgą dwójki (lub dłuższe niż cała nuta) traktujemy jako nieznane
+                whole = 64 // duration if duration in Writeable.correct_note_lengths else 0
+                lengths.append(whole * {'': 4, '.': 6, '..': 7}[dots] // 4)
+                tied.append(tie != '')
+
+                # Fragment nie może kończyć się w środku nut połączonych łukiem
+                if len(pitches) >= self.flush_size and not tied[-1]:
+                    previous = self.add_melody(pitches, lengths, tied, previous)
+                    pitches, lengths, tied = [], [], []
+
+        self.add_melody(pitches, lengths, tied, previous)
+
+    def add_midi_file(self, filename: str):
+        """
+        Dodaj plik MIDI. Każda ścieżka traktowana jest jako osobna, jednogłosowa melodia: z nut rozpoczynających się
+        jednocześnie brana jest najwyższa, a przerwy pomiędzy nutami stają się pauzami
+
+        Args:
+            filename:   Ścieżka do pliku
+        """
+        reader = MidiReader(filename).read()
+
+        # Liczba tyknięć na 64 część całej nuty
+        ticks = reader.ticks_per_quarter / 16
+
+        for track in reader.tracks:
+            if len(track) == 0:
+                continue
+
+            data = np.array(track, dtype=np.int64)
+            data = data[np.lexsort((data[:, 2], data[:, 0]))]
+
+            # Nuty są posortowane po czasie rozpoczęcia i wysokości, więc najwyższa nuta jest ostatnia
+            last_at_start = np.append(data[1:, 0] != data[:-1, 0], True)
+            starts, durations, notes = data[last_at_start].T
+
+            # Nuta kończy się najpóźniej w momencie rozpoczęcia kolejnej
+            ends = np.minimum(starts + durations, np.append(starts[1:], starts[-1] + durations[-1]))
+            gaps = np.round((starts[1:] - ends[:-1]) / ticks).astype(np.int64)
+            lengths = np.round((ends - starts) / ticks).astype(np.int64)
+
+            # Przeplatamy nuty z pauzami i usuwamy pauzy zerowej długości
+            pitches = np.stack([notes, np.full(len(notes), -1)], axis=1).ravel()[:-1]
+            merged_lengths = np.stack([lengths, np.append(gaps, 0)], axis=1).ravel()[:-1]
+            keep = (pitches >= 0) | (merged_lengths > 0)
+
+            self.add_melody(pitches[keep], merged_lengths[keep], np.zeros(np.count_nonzero(keep), dtype=bool))
+
+    def add_file(self, filename: str) -> bool:
+        """
+        Dodaj plik lilypond lub MIDI. Pliki, których nie udało się odczytać, są pomijane
+
+        Args:
+            filename:   Ścieżka do pliku
+
+        Returns:
+            True jeśli plik został dodany
+        """
+        extension = os.path.splitext(filename)[1].lower()
+
+        try:
+            if extension in self.ly_extensions:
+                self.add_ly_file(filename)
+            elif extension in self.midi_extensions:
+                self.add_midi_file(filename)
+            else:
+                raise ValueError(f'Extension {extension} is not supported')
+        except (OSError, ValueError, IndexError, struct.error):
+            self.skipped += 1
+            return False
+
+        self.files += 1
+        return True
+
+    def merge(self, other: 'Corpus'):
+        """Dodaj zliczenia z innego korpusu"""
+        self.intervals += other.intervals
+        self.notes += other.notes
+        self.durations += other.durations
+        self.transitions += other.transitions
+        self.note_count += other.note_count
+        self.rest_count += other.rest_count
+        self.files += other.files
+        self.skipped += other.skipped
+
+        return self
+
+    # endregion
+
+    # region Results
+
+    @staticmethod
+    def to_percentages(counts: Sequence[float]) -> List[int]:
+        """
+        Zamień zliczenia na liczby całkowite sumujące się do 100 (metodą największych reszt)
+
+        Args:
+            counts:     Zliczenia, co najmniej jedno niezerowe
+        """
+        counts = np.asarray(counts, dtype=np.float64)
+        exact = counts * 100 / counts.sum()
+        result = np.floor(exact).astype(np.int64)
+
+        # Brakujące punkty procentowe przydzielamy elementom o największych resztach
+        missing = 100 - int(result.sum())
+        result[np.argsort(-(exact - result), kind='stable')[:missing]] += 1
+
+        return [int(item) for item in result]
+
+    def get_intervals_counts(self) -> np.ndarray:
+        """Zwróć zliczenia dla interwałów w kolejności Interval.names(). Tryton dzielony jest po równo na 4zw i 5zmn"""
+        semitones = np.array([Interval.interval_semitones[name] for name in Interval.names()])
+        shares = np.bincount(semitones)[semitones]
+
+        return self.intervals[semitones] / shares
+
+    def to_settings(self, base: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Zwróć ustawienia generatora (w formacie Generator.to_dict()) z prawdopodobieństwami wyznaczonymi z korpusu.
+        Prawdopodobieństwa, dla których nie zebrano żadnych danych, nie są ustawiane
+
+        Args:
+            base:   Ustawienia bazowe, uzupełniane o wyznaczone prawdopodobieństwa
+        """
+        settings = copy.deepcopy(base) if base is not None else {}
+
+        if self.note_count + self.rest_count > 0:
+            settings['rest_probability'] = round(self.rest_count / (self.note_count + self.rest_count), 4)
+
+        if self.intervals.sum() > 0:
+            settings['intervals_probability'] = self.to_percentages(self.get_intervals_counts())
+
+        if self.notes.sum() > 0:
+            settings['notes_probability'] = self.to_percentages(self.notes)
+
+        if self.durations.sum() > 0:
+            settings['durations_probability'] = self.to_percentages(self.durations)
+
+        return settings
+
+    def get_markov_model(self) -> MarkovModel:
+        """
+        Zwróć łańcuch Markowa rzędu 1 o zakresie od najniższej do najwyższej nuty występującej w korpusie
+
+        Raises:
+            ValueError:     Gdy korpus nie zawiera żadnej nuty
+        """
+        used = np.nonzero(self.transitions.sum(axis=0) + self.transitions.sum(axis=1))[0]
+        if len(used) == 0:
+            raise ValueError('Corpus does not contain any notes')
+
+        lowest, highest = int(used[0]), int(used[-1])
+        counts = self.transitions[lowest:highest + 1, lowest:highest + 1]
+
+        return MarkovModel.from_dense(1, lowest, counts)
+
+    # endregion
+
+    # region Files
+
+    @staticmethod
+    def iter_files(paths: Iterable[str]) -> Iterator[str]:
+        """
+        Wylistuj obsługiwane pliki. Foldery przeszukiwane są rekurencyjnie, a pliki zwracane na bieżąco
+
+        Args:
+            paths:  Ścieżki do plików i folderów
+        """
+        extensions = tuple(Corpus.ly_extensions + Corpus.midi_extensions)
+
+        for path in paths:
+            if not os.path.isdir(path):
+                yield path
+                continue
+
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+
+                for filename in sorted(files):
+                    if filename.lower().endswith(extensions):
+                        yield os.path.join(root, filename)
+
+    @staticmethod
+    def read_files(filenames: List[str]) -> 'Corpus':
+        """Przetwórz listę plików w jeden korpus"""
+        corpus = Corpus()
+
+        for filename in filenames:
+            corpus.add_file(filename)
+
+        return corpus
+
+    @staticmethod
+    def get_chunks(filenames: Iterable[str]) -> Iterator[List[str]]:
+        """Podziel pliki na fragmenty przetwarzane przez procesy robocze"""
+        chunk = []
+
+        for filename in filenames:
+            chunk.append(filename)
+
+            if len(chunk) == Corpus.chunk_size:
+                yield chunk
+                chunk = []
+
+        if len(chunk) > 0:
+            yield chunk
+
+    @staticmethod
+    def from_paths(paths: Iterable[str], workers: int = 1,
+                   progress: Optional[Callable[[int, float], None]] = None) -> 'Corpus':
+        """
+        Przetwórz wszystkie pliki z podanych ścieżek. Przy workers > 1 fragmenty są zlecane procesom roboczym na
+        bieżąco, więc lista plików nigdy nie jest wczytywana w całości
+
+        Args:
+            paths:      Ścieżki do plików i folderów
+            workers:    Liczba procesów roboczych
+            progress:   Funkcja wywoływana po każdym fragmencie z argumentami (przetworzone pliki, sekundy)
+        """
+        corpus = Corpus()
+        start_time = time.perf_counter()
+
+        def report(partial: Corpus):
+            corpus.merge(partial)
+
+            if progress is not None:
+                progress(corpus.files + corpus.skipped, time.perf_counter() - start_time)
+
+        chunks = Corpus.get_chunks(Corpus.iter_files(paths))
+
+        if workers <= 1:
+            for chunk in chunks:
+                report(Corpus.read_files(chunk))
+
+            return corpus
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = set()
+
+            while True:
+                while len(pending) < 2 * workers:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        break
+
+                    pending.add(executor.submit(Corpus.read_files, chunk))
+
+                if len(pending) == 0:
+                    break
+
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    report(future.result())
+
+        return corpus
+
+    # endregion
@@ -0,0 +1,59 @@
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from lib.theory.Writeable import Writeable
+
+if TYPE_CHECKING:
+    import numpy as np
+    from lib.Generator import Generator
+    from lib.theory.Note import Note
+
+
+class GenerationContext:
+    """
+    Stan pojedynczego przebiegu generowania melodii.
+
+    Generator przechowuje wyłącznie konfigurację, a wszystkie dane zmieniające się w trakcie generowania (wygenerowane
+    elementy, licznik pauz, generator liczb losowych) znajdują się w kontekście tworzonym dla każdego wywołania.
+    Dzięki temu jeden skonfigurowany obiekt Generator może być używany jednocześnie z wielu wątków.
+    """
+
+    def __init__(self, seed: Optional[int] = None, rng: Optional['np.random.Generator'] = None):
+        """
+        Args:
+            seed:   Ziarno generatora liczb losowych. Ignorowane, jeśli podano rng
+            rng:    Gotowy generator liczb losowych
+        """
+        # numpy jest importowane dopiero przy pierwszym generowaniu, aby sam import biblioteki był szybki
+        import numpy as np
+
+        self.seed: Optional[int] = seed
+        self.rng: np.random.Generator = rng if rng is not None else np.random.default_rng(seed)
+
+        self.generated_data: List[Writeable] = []
+        self.consecutive_rests: int = 0
+
+        # Zakodowany stan łańcucha Markowa (jeśli generator go używa), wyznaczany przy pierwszym losowaniu wysokości
+        self.markov_state: Optional[int] = None
+
+        # Dane wykorzystywane przez ograniczenia (Generator.add_constraint), aktualizowane przy dodawaniu elementów.
+        # Pozycje i czas trwania pauz podane są w ilości shortest_note_duration. Generowany fragment zaczyna się
+        # na pozycji start i kończy na pozycji length (dla całej melodii start wynosi 0, a length to jej długość)
+        self.generator: Optional['Generator'] = None
+        self.position: int = 0
+        self.start: int = 0
+        self.length: int = 0
+        self.rest_duration: int = 0
+        self.last_note: Optional['Note'] = None
+        self.lowest_note: Optional[int] = None
+        self.highest_note: Optional[int] = None
+        self.constraint_state: Dict[Any, Any] = {}
+
+    @property
+    def shortest_note_duration(self) -> int:
+        """Najkrótsza wartość rytmiczna generatora, w której ilości podane są pozycje i długości w kontekście"""
+        return self.generator.shortest_note_duration
+
+    @property
+    def fragment_length(self) -> int:
+        """Długość generowanego fragmentu (length - start), w ilości shortest_note_duration"""
+        return self.length - self.start
@@ -1,31 +1,48 @@
-from typing import Dict, List, Optional, Tuple, Union
+from fractions import Fraction
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, Union
 import copy
-import termcolor
 import math
-import numpy as np
+import threading
 
+from lib.GenerationContext import GenerationContext
+from lib.Key import Key
+from lib.KeyType import KeyType
+from lib.constraints.Constraint import Constraint
 from lib.theory.Interval import Interval
 from lib.theory.OctaveType import OctaveType
 from lib.theory.Note import Note
 from lib.theory.Rest import Rest
+from lib.theory.Tuplet import Tuplet
 from lib.theory.Writeable import Writeable
 from lib.theory.NoteModifier import NoteModifier
 from lib.theory.RestModifier import RestModifier
-from lib.errors import InvalidBaseNoteDuration, NoNotesError, InvalidMetre, IntervalNotSupported, NoteOutsideAmbitus
+from lib.errors import InvalidBaseNoteDuration, NoNotesError, InvalidMetre, IntervalNotSupported, NoteOutsideAmbitus, \
+    ConstraintsNotSatisfied
+
+if TYPE_CHECKING:
+    from lib.MarkovModel import MarkovModel
 
 
 class Generator:
     # Dozwolone wartości dla niektórych parametrów
-    correct_note_lengths: List[int] = [2 ** i for i in range(7)]
+    correct_note_lengths: List[int] = Writeable.correct_note_lengths
     correct_metre_rhythmic_values: List[int] = [16, 8, 4, 2]
 
-    shortest_note_duration: int = 16
+    # Blokada liczników ograniczeń, gdyż generate może być wywoływane z wielu wątków
+    _stats_lock = threading.Lock()
 
     def __init__(self):
         # Parametry rytmu
         self.metre: Tuple[int, int] = (4, 4)
         self.bar_count: int = 4
 
+        # Najkrótsza wartość rytmiczna. Długości i pozycje w trakcie generowania podawane są w jej ilości
+        self.shortest_note_duration: int = 16
+
+        # Podział taktu na grupy główne (liczby miar, np. [2, 2, 3] dla 7/8). None oznacza podział domyślny dla metrum
+        self.grouping: Optional[List[int]] = None
+
         # Parametry melodii
         self.start_note: Note = Note('c', OctaveType.LINE_1)
         self.end_note: Note = Note('c', OctaveType.LINE_1)
@@ -44,47 +61,55 @@ class Generator:
         self.notes_probability: List[int] = [9, 9, 9, 9, 8, 8, 8, 8, 8, 8, 8, 8]
         self.durations_probability: List[int] = [14, 14, 14, 14, 14, 15, 15]
 
-        # Wygenerowane dane
-        self.generated_data: List[Writeable] = []
+        # Prawdopodobieństwo, że zamiast pojedynczej nuty pojawi się grupa niemiarowa, oraz dozwolone proporcje grup
+        # (numerator, denominator), np. (3, 2) dla trioli
+        self.tuplet_probability: float = 0
+        self.tuplets: List[Tuple[int, int]] = [(3, 2)]
 
-        # Zmienne pomocnicze
-        self._consecutive_rests = 0
+        # Opcjonalna tonacja. Wysokości losowane są wtedy wyłącznie z dźwięków gamy i zapisywane zgodnie z tonacją
+        self.key: Optional[Key] = None
 
-    # region Static
+        # Opcjonalny łańcuch Markowa wybierający wysokości nut zamiast prawdopodobieństw interwałów
+        self.markov_model: Optional['MarkovModel'] = None
 
-    @staticmethod
-    def get_available_note_lengths(longest_duration: Optional[int] = None):
-        """
-        Zwraca listę dostępnych wartości rytmicznych na podstawie maksymalnej długości nuty podanej w ilości
-        lib.Generator.shortest_note_duration
+        # Liczba ostatnich nut, których wysokości są planowane tak, aby melodia doszła do nuty końcowej dozwolonymi
+        # interwałami. Przy 0 wysokość ostatniej nuty jest po prostu zastępowana nutą końcową
+        self.end_note_approach: int = 0
 
-        Args:
-            longest_duration:   Najdłuższa możliwa wartość rytmiczna, która może wystąpić podana w ilości
-                                lib.Generator.shortest_note_duration.
-                                Jeśli nie podano, skrypt zakłada że nuta o każdej długości jest dozwolona.
-        """
-        if longest_duration is None:
-            longest_duration = Generator.shortest_note_duration
+        # Łańcuch Markowa równoważny losowaniu interwałów wraz z ustawieniami, z których został wyznaczony
+        self._pitch_model: Optional[Tuple[Tuple, 'MarkovModel']] = None
 
-        return [
-            i for i in Generator.correct_note_lengths
-            if Generator.shortest_note_duration / i <= longest_duration and i <= Generator.shortest_note_duration
-        ]
+        # Ograniczenia sprawdzane w trakcie generowania. Element, który narusza ograniczenie, jest losowany ponownie
+        # (co najwyżej constraint_retries razy), a jeśli to nie pomoże, melodia jest porzucana i generowana od nowa
+        # (co najwyżej constraint_attempts razy)
+        self.constraints: List[Union[Constraint, Callable[[GenerationContext, Writeable], bool]]] = []
+        self.constraint_retries: int = 8
+        self.constraint_attempts: int = 100
+        self.constraint_stats: Dict[str, Any] = {}
+        self.reset_constraint_stats()
 
-    @staticmethod
-    def set_shortest_note_duration(duration: int):
-        """
-        Ustaw najkrótszą dozwoloną wartość rytmiczną
+        # Kontekst używany przez metody wywoływane bez jawnie podanego kontekstu. Po każdym wywołaniu generate()
+        # wskazuje na kontekst ostatnio zakończonego generowania. Tworzony przy pierwszym użyciu
+        self._context: Optional[GenerationContext] = None
 
-        Args:
-            duration:   Wartość rytmiczna
-        """
-        if duration not in Generator.correct_note_lengths:
-            raise InvalidBaseNoteDuration(duration)
+    @property
+    def generated_data(self) -> List[Writeable]:
+        """Ostatnio wygenerowane dane"""
+        return self._get_context(None).generated_data
 
-        Generator.shortest_note_duration = duration
+    @generated_data.setter
+    def generated_data(self, data: List[Writeable]):
+        self._get_context(None).generated_data = data
 
-    # endregion
+    def _get_context(self, context: Optional[GenerationContext]) -> GenerationContext:
+        """Zwróć podany kontekst lub kontekst domyślny, jeśli nie podano żadnego"""
+        if context is not None:
+            return context
+
+        if self._context is None:
+            self._context = GenerationContext()
+
+        return self._context
 
     # region Setters
 
@@ -101,6 +126,47 @@ class Generator:
         else:
             raise InvalidMetre((n, m))
 
+        # Podział ustawiony dla innej liczby miar przestaje obowiązywać
+        if self.grouping is not None and sum(self.grouping) != n:
+            self.grouping = None
+
+        return self
+
+    def set_grouping(self, parts: Optional[List[int]]):
+        """
+        Ustaw podział taktu na grupy główne, np. [2, 2, 3] lub [3, 2, 2] dla metrum 7/8
+
+        Args:
+            parts:  Liczby miar w kolejnych grupach lub None, aby wrócić do podziału domyślnego dla metrum
+
+        Raises:
+            ValueError:     Gdy grupy nie sumują się do liczby miar w takcie
+        """
+        if parts is not None:
+            parts = [int(part) for part in parts]
+
+            if len(parts) == 0 or any(part < 1 for part in parts) or sum(parts) != self.metre[0]:
+                raise ValueError(f'Grouping has to be a list of positive numbers summing to {self.metre[0]}')
+
+        self.grouping = parts
+
+        return self
+
+    def set_shortest_note_duration(self, duration: int):
+        """
+        Ustaw najkrótszą dozwoloną wartość rytmiczną
+
+        Args:
+            duration:   Wartość rytmiczna
+
+        Raises:
+            InvalidBaseNoteDuration:    Gdy wartość rytmiczna jest niepoprawna
+        """
+        if duration not in self.correct_note_lengths:
+            raise InvalidBaseNoteDuration(duration)
+
+        self.shortest_note_duration = duration
+
         return self
 
     def set_bar_count(self, bar_count: int):
@@ -143,6 +209,22 @@ class Generator:
         self.end_note = note
         return self
 
+    def set_end_note_approach(self, count: int):
+        """
+        Ustaw liczbę ostatnich nut, których wysokości są planowane tak, aby melodia doszła do nuty końcowej wyłącznie
+        dozwolonymi interwałami (zamiast zastąpienia wysokości ostatniej nuty). Jeśli w tylu krokach nie da się dojść
+        do nuty końcowej, planowanych jest więcej nut. Jeśli dojście nie jest możliwe wcale, ostatnia nuta jest
+        zastępowana nutą końcową, tak jak przy wartości 0
+
+        Args:
+            count:  Liczba nut (0 wyłącza planowanie)
+        """
+        if count < 0:
+            raise ValueError('Count cannot be negative')
+
+        self.end_note_approach = count
+        return self
+
     def set_ambitus(self, lowest: Optional[Note] = None, highest: Optional[Note] = None):
         """
         Ustaw ambitus generowanej melodii
@@ -276,11 +358,199 @@ class Generator:
 
         return self
 
+    def set_tuplets(self, probability: float, ratios: Optional[List[Tuple[int, int]]] = None):
+        """
+        Ustaw prawdopodobieństwo wystąpienia grupy niemiarowej zamiast nuty oraz dozwolone rodzaje grup
+
+        Args:
+            probability:    Prawdopodobieństwo, znormalizowane do 1. Przy 0 grupy nie są generowane
+            ratios:         Proporcje grup (numerator, denominator), np. [(3, 2), (5, 4)]. Jeśli nie podano,
+                            pozostają dotychczasowe
+
+        Raises:
+            ValueError:     Gdy prawdopodobieństwo lub proporcje są niepoprawne
+        """
+        if not 0 <= probability <= 1:
+            raise ValueError('Probability has to be between 0 and 1')
+
+        if ratios is not None:
+            ratios = [(int(numerator), int(denominator)) for numerator, denominator in ratios]
+
+            if len(ratios) == 0 or any(n < 2 or m < 1 or n == m for n, m in ratios):
+                raise ValueError('Tuplet ratios have to be pairs of different positive numbers')
+
+            self.tuplets = ratios
+
+        self.tuplet_probability = probability
+
+        return self
+
+    def set_key(self, tonic: Optional[str], key_type: KeyType = KeyType.MAJOR):
+        """
+        Ustaw tonację. Kolejne wysokości losowane są tylko spośród dźwięków gamy (nuta początkowa i końcowa nie są
+        zmieniane), a nuty zapisywane są zgodnie z tonacją. Przy łańcuchu Markowa ustawionym przez set_markov_model
+        tonacja wpływa tylko na pisownię
+
+        Args:
+            tonic:      Tonika w notacji lilypond bez oktawy (np. d, bes) lub None, aby wyłączyć tonację
+            key_type:   Rodzaj tonacji
+
+        Raises:
+            ValueError:     Gdy tonacja jest niepoprawna
+        """
+        self.key = None if tonic is None else Key(tonic, key_type)
+
+        return self
+
+    def set_markov_model(self, model: Optional['MarkovModel']):
+        """
+        Ustaw łańcuch Markowa, z którego losowane są wysokości kolejnych nut. Wartości rytmiczne i pauzy nadal
+        losowane są na podstawie prawdopodobieństw generatora
+
+        Args:
+            model:  Model lub None, aby wrócić do losowania interwałów
+
+        Raises:
+            ValueError:     Gdy ambitus generatora wykracza poza zakres modelu
+        """
+        if model is not None:
+            for note in self.ambitus.values():
+                if not model.lowest <= note.get_id() <= model.highest:
+                    raise ValueError(f'Note {note} is outside of the model range')
+
+        self.markov_model = model
+
+        return self
+
+    # endregion
+
+    # region Settings
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Zwróć ustawienia generatora w postaci słownika, który można zapisać jako JSON.
+        Nuty zapisywane są w notacji lilypond (np. c').
+        """
+        return {
+            'metre': list(self.metre),
+            'bar_count': self.bar_count,
+            'grouping': None if self.grouping is None else list(self.grouping),
+            'ambitus': {
+                'lowest': self.ambitus['lowest'].note + self.ambitus['lowest'].octave.value,
+                'highest': self.ambitus['highest'].note + self.ambitus['highest'].octave.value
+            },
+            'start_note': self.start_note.note + self.start_note.octave.value,
+            'end_note': self.end_note.note + self.end_note.octave.value,
+            'rest_probability': self.rest_probability,
+            'max_consecutive_rests': None if self.max_consecutive_rests == math.inf else self.max_consecutive_rests,
+            'intervals_probability': list(self.intervals_probability),
+            'notes_probability': list(self.notes_probability),
+            'durations_probability': list(self.durations_probability),
+            'shortest_note_duration': self.shortest_note_duration,
+            'end_note_approach': self.end_note_approach,
+            'tuplet_probability': self.tuplet_probability,
+            'tuplets': [list(ratio) for ratio in self.tuplets],
+            'key': None if self.key is None else {'tonic': self.key.tonic, 'type': self.key.key_type.value}
+        }
+
+    @staticmethod
+    def from_dict(settings: Dict[str, Any]) -> 'Generator':
+        """
+        Utwórz generator na podstawie słownika ustawień (w formacie zwracanym przez to_dict).
+        Pominięte klucze pozostawiają wartości domyślne. Ustawienia są walidowane przez odpowiednie metody set_*.
+
+        Args:
+            settings:   Słownik ustawień
+
+        Raises:
+            KeyError:       Jeśli słownik zawiera nieznany klucz
+        """
+        unknown = set(settings.keys()) - set(Generator().to_dict().keys())
+        if len(unknown) > 0:
+            raise KeyError(f'Unknown settings: {", ".join(sorted(unknown))}')
+
+        generator = Generator()
+
+        if 'shortest_note_duration' in settings:
+            generator.set_shortest_note_duration(settings['shortest_note_duration'])
+
+        if 'metre' in settings:
+            generator.set_metre(*settings['metre'])
+
+        if 'bar_count' in settings:
+            generator.set_bar_count(settings['bar_count'])
+
+        if settings.get('grouping') is not None:
+            generator.set_grouping(list(settings['grouping']))
+
+        # Ambitus musi zostać ustawiony przed nutą początkową i końcową, gdyż są one z nim porównywane.
+        # Ustawiamy go w całości, aby kolejność granic nie miała znaczenia
+        if 'ambitus' in settings:
+            lowest = Note.parse(settings['ambitus']['lowest'])
+            highest = Note.parse(settings['ambitus']['highest'])
+
+            if lowest > highest:
+                raise ValueError('Note is higher than current highest note')
+
+            generator.ambitus = {'lowest': lowest, 'highest': highest}
+
+        if 'start_note' in settings:
+            generator.set_start_note(Note.parse(settings['start_note']))
+
+        if 'end_note' in settings:
+            generator.set_end_note(Note.parse(settings['end_note']))
+
+        if 'rest_probability' in settings:
+            generator.set_rest_probability(settings['rest_probability'])
+
+        if 'max_consecutive_rests' in settings:
+            generator.set_max_consecutive_rests(settings['max_consecutive_rests'])
+
+        if 'intervals_probability' in settings:
+            generator.set_intervals_probability(list(settings['intervals_probability']))
+
+        if 'notes_probability' in settings:
+            generator.set_notes_probability(list(settings['notes_probability']))
+
+        if 'durations_probability' in settings:
+            generator.set_durations_probability(list(settings['durations_probability']))
+
+        if 'end_note_approach' in settings:
+            generator.set_end_note_approach(settings['end_note_approach'])
+
+        if 'tuplet_probability' in settings or 'tuplets' in settings:
+            generator.set_tuplets(settings.get('tuplet_probability', generator.tuplet_probability),
+                                  settings.get('tuplets'))
+
+        if settings.get('key') is not None:
+            generator.set_key(settings['key']['tonic'], KeyType(settings['key'].get('type', KeyType.MAJOR.value)))
+
+        return generator
+
     # endregion
 
     # region Random generation
 
-    def get_random_duration(self, longest_duration: Optional[int] = None, uniform_distribution: bool = False):
+    def get_available_note_lengths(self, longest_duration: Optional[int] = None) -> List[int]:
+        """
+        Zwraca listę dostępnych wartości rytmicznych na podstawie maksymalnej długości nuty podanej w ilości
+        shortest_note_duration
+
+        Args:
+            longest_duration:   Najdłuższa możliwa wartość rytmiczna, która może wystąpić podana w ilości
+                                shortest_note_duration.
+                                Jeśli nie podano, skrypt zakłada że nuta o każdej długości jest dozwolona.
+        """
+        if longest_duration is None:
+            longest_duration = self.shortest_note_duration
+
+        return [
+            i for i in self.correct_note_lengths
+            if self.shortest_note_duration / i <= longest_duration and i <= self.shortest_note_duration
+        ]
+
+    def get_random_duration(self, longest_duration: Optional[int] = None, uniform_distribution: bool = False,
+                            context: Optional[GenerationContext] = None) -> int:
         """
         Zwraca losową długość nuty na podstawie określonych prawdopodobieństw
 
@@ -290,11 +560,13 @@ class Generator:
                                     Jeśli nie podano, skrypt zakłada że nuta o każdej długości jest dozwolona.
             uniform_distribution:   Jeśli prawda, każda długość ma identyczne prawdopodobieństwo wylosowania.
                                     W przeciwnym wypadku pod uwagę brane jest pole prawdopodobieństwa
+            context:                Kontekst generowania. Jeśli nie podano, używany jest kontekst domyślny
         """
-        available = Generator.get_available_note_lengths(longest_duration=longest_duration)
+        rng = self._get_context(context).rng
+        available = self.get_available_note_lengths(longest_duration=longest_duration)
 
         if uniform_distribution:
-            return np.random.choice(available)
+            return int(rng.choice(available))
         else:
             start_idx = Generator.correct_note_lengths.index(available[0])
 
@@ -304,13 +576,14 @@ class Generator:
             p_sum = sum(p_available)
 
             if p_sum == 0:
-                return self.get_random_duration(longest_duration, True)
+                return self.get_random_duration(longest_duration, True, context)
 
             p = list(map(lambda dur: dur / p_sum, p_available))
 
-            return np.random.choice(available, p=p)
+            return int(rng.choice(available, p=p))
 
-    def get_random_note(self, longest_duration: Optional[int] = None) -> Note:
+    def get_random_note(self, longest_duration: Optional[int] = None,
+                        context: Optional[GenerationContext] = None) -> Note:
         """
         Wygeneruj nutę z losowymi parametrami o pewnej maksymalnej długości podanej w parametrze.
 
@@ -318,6 +591,7 @@ class Generator:
             longest_duration:   Najdłuższa możliwa wartość rytmiczna, która może wystąpić podana w ilości
                                 shortest_note_duration.
                                 Jeśli nie podano, skrypt zakłada że nuta o każdej długości jest dozwolona.
+            context:            Kontekst generowania. Jeśli nie podano, używany jest kontekst domyślny
 
         Returns:
             Nuta z losowymi parametrami o maksymalnej długości wynoszącej longest_duration
@@ -327,12 +601,13 @@ class Generator:
         if longest_duration is None:
             longest_duration = self.shortest_note_duration
 
+        rng = self._get_context(context).rng
         available_mods = []
 
-        base_note = np.random.choice(Note.base_notes)
-        octave = OctaveType.random()
-        base_duration = self.get_random_duration(longest_duration=longest_duration)
-        has_mod = np.random.choice([True, False])
+        base_note = Note.base_notes[rng.integers(len(Note.base_notes))]
+        octave = OctaveType.from_id(int(rng.integers(11)))
+        base_duration = self.get_random_duration(longest_duration=longest_duration, context=context)
+        has_mod = rng.random() < 0.5
 
         note = Note(note=base_note, octave=octave, base_duration=base_duration)
 
@@ -356,11 +631,12 @@ class Generator:
             available_mods.append(NoteModifier.DOUBLE_DOT)
 
         if has_mod and len(available_mods) > 0:
-            note.add_modifier(np.random.choice(available_mods))
+            note.add_modifier(available_mods[rng.integers(len(available_mods))])
 
         return note
 
-    def get_random_rest(self, longest_duration: Optional[int] = None) -> Rest:
+    def get_random_rest(self, longest_duration: Optional[int] = None,
+                        context: Optional[GenerationContext] = None) -> Rest:
         """
         Wygeneruj pauzę z losowymi parametrami o maksymalnej długości podanej w parametrze
 
@@ -368,6 +644,7 @@ class Generator:
             longest_duration:   Najdłuższa możliwa wartość rytmiczna, która może wystąpić podana w ilości
                                 shortest_note_duration.
                                 Jeśli nie podano, skrypt zakłada że nuta o każdej długości jest dozwolona.
+            context:            Kontekst generowania. Jeśli nie podano, używany jest kontekst domyślny
 
         Returns:
             Pauza z losowymi parametrami o maksymalnej długości wynoszącej longest_duration
@@ -378,10 +655,11 @@ class Generator:
             longest_duration = self.shortest_note_duration
 
         # Pobieramy listę dostępnych wartości rytmicznych i tworzymy listę dostępnych modyfikatorów
+        rng = self._get_context(context).rng
         available_mods = []
 
-        base_duration = self.get_random_duration(longest_duration=longest_duration)
-        has_mod = np.random.choice([True, False])
+        base_duration = self.get_random_duration(longest_duration=longest_duration, context=context)
+        has_mod = rng.random() < 0.5
 
         rest = Rest(base_duration=base_duration)
 
@@ -405,92 +683,459 @@ class Generator:
             available_mods.append(RestModifier.DOUBLE_DOT)
 
         if has_mod and len(available_mods) > 0:
-            rest.add_modifier(np.random.choice(available_mods))
+            rest.add_modifier(available_mods[rng.integers(len(available_mods))])
 
         return rest
 
     # endregion
 
+    # region Constraints
+
+    def add_constraint(self, constraint: Union[Constraint, Callable[[GenerationContext, Writeable], bool]]):
+        """
+        Dodaj ograniczenie sprawdzane dla każdego elementu w trakcie generowania
+
+        Args:
+            constraint:     Obiekt Constraint lub funkcja (kontekst, element) -> bool, zwracająca False, jeśli
+                            element nie może zostać dodany do melodii
+        """
+        if not isinstance(constraint, Constraint) and not callable(constraint):
+            raise TypeError('Constraint has to be a Constraint or a callable')
+
+        self.constraints.append(constraint)
+        return self
+
+    def clear_constraints(self):
+        """Usuń wszystkie ograniczenia"""
+        self.constraints = []
+        return self
+
+    def set_constraint_retries(self, retries: int, attempts: int):
+        """
+        Ustaw liczbę prób przy naruszeniu ograniczeń
+
+        Args:
+            retries:    Ile razy można ponownie wylosować element, który narusza ograniczenie
+            attempts:   Ile razy można rozpocząć generowanie melodii od nowa
+        """
+        if retries < 0 or attempts < 1:
+            raise ValueError('Retries cannot be negative and there has to be at least one attempt')
+
+        self.constraint_retries = retries
+        self.constraint_attempts = attempts
+        return self
+
+    def reset_constraint_stats(self):
+        """Wyzeruj liczniki ograniczeń"""
+        with self._stats_lock:
+            self.constraint_stats = {'accepted': 0, 'rejected': 0, 'retries': 0, 'violations': {}}
+
+    def get_constraint_stats(self) -> Dict[str, Any]:
+        """
+        Pobierz liczniki ograniczeń: liczbę zaakceptowanych i porzuconych melodii, liczbę ponownie wylosowanych
+        elementów oraz liczbę naruszeń każdego z ograniczeń
+        """
+        with self._stats_lock:
+            return {**self.constraint_stats, 'violations': dict(self.constraint_stats['violations'])}
+
+    def count_constraint_stats(self, key: str, violated: Optional[str] = None):
+        """Zwiększ licznik ograniczeń oraz, opcjonalnie, licznik naruszeń podanego ograniczenia"""
+        with self._stats_lock:
+            self.constraint_stats[key] += 1
+
+            if violated is not None:
+                violations = self.constraint_stats['violations']
+                violations[violated] = violations.get(violated, 0) + 1
+
+    @staticmethod
+    def get_constraint_name(constraint: Union[Constraint, Callable]) -> str:
+        """Pobierz nazwę ograniczenia używaną w statystykach"""
+        if isinstance(constraint, Constraint):
+            return constraint.name
+
+        return getattr(constraint, '__name__', repr(constraint))
+
+    def check_element(self, context: GenerationContext, element: Writeable) -> Optional[str]:
+        """
+        Sprawdź, czy element może zostać dodany do melodii
+
+        Returns:
+            Nazwa pierwszego naruszonego ograniczenia lub None
+        """
+        for constraint in self.constraints:
+            valid = constraint.check(context, element) if isinstance(constraint, Constraint) \
+                else constraint(context, element)
+
+            if not valid:
+                return self.get_constraint_name(constraint)
+
+        return None
+
+    def check_melody(self, context: GenerationContext) -> Optional[str]:
+        """
+        Sprawdź gotową melodię
+
+        Returns:
+            Nazwa pierwszego naruszonego ograniczenia lub None
+        """
+        for constraint in self.constraints:
+            if isinstance(constraint, Constraint) and not constraint.check_melody(context):
+                return self.get_constraint_name(constraint)
+
+        return None
+
+    def append_element(self, context: GenerationContext, element: Writeable):
+        """Dodaj element do melodii i zaktualizuj dane kontekstu wykorzystywane przez ograniczenia"""
+        for constraint in self.constraints:
+            if isinstance(constraint, Constraint):
+                constraint.update(context, element)
+
+        duration = element.get_duration(self.shortest_note_duration)
+
+        notes = self.get_notes([element])
+
+        for note in notes:
+            note_id = note.get_id()
+            context.last_note = note
+            context.lowest_note = note_id if context.lowest_note is None else min(context.lowest_note, note_id)
+            context.highest_note = note_id if context.highest_note is None else max(context.highest_note, note_id)
+
+        if len(notes) == 0:
+            context.rest_duration += duration
+
+        context.position += duration
+        context.generated_data.append(element)
+
+    def draw_element(self, context: GenerationContext, draw: Callable[[], Writeable]) -> Optional[Writeable]:
+        """
+        Wylosuj element spełniający ograniczenia i dodaj go do melodii. Po odrzuceniu elementu przywracany jest stan
+        kontekstu sprzed losowania (licznik pauz, stan łańcucha Markowa)
+
+        Args:
+            context:    Kontekst generowania
+            draw:       Funkcja losująca element
+
+        Returns:
+            Dodany element lub None, jeśli żaden z wylosowanych elementów nie spełnił ograniczeń
+        """
+        consecutive_rests, markov_state = context.consecutive_rests, context.markov_state
+
+        for retry in range(self.constraint_retries + 1):
+            element = draw()
+            violated = self.check_element(context, element)
+
+            if violated is None:
+                self.append_element(context, element)
+                return element
+
+            self.count_constraint_stats('retries', violated)
+            context.consecutive_rests, context.markov_state = consecutive_rests, markov_state
+
+        return None
+
+    # endregion
+
     # region Utility methods
 
-    def get_next_writeable(self, longest_duration: int) -> Writeable:
+    def get_next_writeable(self, longest_duration: int, context: Optional[GenerationContext] = None) -> Writeable:
         """
-        Wygeneruj losowy element (nutę lub pauzę) ograniczony poprzez maksymalną wartość rytmiczną,
+        Wygeneruj losowy element (nutę, pauzę lub grupę niemiarową) ograniczony poprzez maksymalną wartość rytmiczną,
         która może wystąpić.
-        UWAGA: Ta metoda będzie działać poprawnie tylko wtedy jeśli w kontenerze self.generated_data
+        UWAGA: Ta metoda będzie działać poprawnie tylko wtedy jeśli w kontenerze context.generated_data
         znajduje się co najmniej jedna nuta!
 
         Args:
             longest_duration:       Najkrótsza możliwa do wystąpienia wartość rytmiczna, podana w ilości
                                     shortest_note_duration
+            context:                Kontekst generowania. Jeśli nie podano, używany jest kontekst domyślny
 
         Raises:
             TypeError:      Gdy ostatnim elementem nie jest nuta
         """
-        generate_rest = np.random.choice([True, False], p=[self.rest_probability, 1 - self.rest_probability])
+        context = self._get_context(context)
+        rng = context.rng
+        generate_rest = rng.random() < self.rest_probability
 
-        if generate_rest and self._consecutive_rests < self.max_consecutive_rests:
-            self._consecutive_rests += 1
-            return self.get_random_rest(longest_duration=longest_duration)
+        if generate_rest and context.consecutive_rests < self.max_consecutive_rests:
+            context.consecutive_rests += 1
+            return self.get_random_rest(longest_duration=longest_duration, context=context)
         else:
-            self._consecutive_rests = 0
+            context.consecutive_rests = 0
 
-            last_note_idx = self.get_last_note_idx()
-            last_note = self.generated_data[last_note_idx]
+            # Bez grup niemiarowych nie losujemy dodatkowej liczby, aby wyniki dla danego ziarna się nie zmieniły
+            if self.tuplet_probability > 0 and rng.random() < self.tuplet_probability:
+                tuplet = self.get_random_tuplet(longest_duration, context)
 
-            assert isinstance(last_note, Note)
+                if tuplet is not None:
+                    return tuplet
 
-            # Losujemy do momentu, aż któraś z nut nie będzie się mieścić w naszym przedziale
-            while True:
-                # Wybieramy losowy interwał i tworzymy dwie nuty, jedną w górę drugą w dół o wylosowany interwał
-                interval = np.random.choice(Interval.names(), p=self.get_normalized_intervals_probability())
-                next_note_up = last_note + Interval(interval)
-                next_note_down = last_note - Interval(interval)
-
-                # Sprawdzamy czy nuty się mieszczą się w zadanym przez użytkownika
-                up_in_ambitus = next_note_up.between(self.ambitus['lowest'], self.ambitus['highest'])
-                down_in_ambitus = next_note_down.between(self.ambitus['lowest'], self.ambitus['highest'])
-
-                if up_in_ambitus and down_in_ambitus:
-                    # Jeśli obie z nut które zostały wygenerowane mieszczą się w ambitusie to korzystamy z
-                    # prawdopodobieństw wystąpienia dźwięków w ramach oktawy
-                    up_probability = self.notes_probability[next_note_up.get_id() % 12]
-                    down_probability = self.notes_probability[next_note_down.get_id() % 12]
-
-                    up_normalized_probability = up_probability / (up_probability + down_probability)
-                    probabilities = [up_normalized_probability, 1 - up_normalized_probability]
-
-                    elem = np.random.choice([next_note_up, next_note_down], p=probabilities)
-                    break
-                elif up_in_ambitus:
-                    elem = next_note_up
-                    break
-                elif down_in_ambitus:
-                    elem = next_note_down
-                    break
-
-            note_template = self.get_random_note(longest_duration=longest_duration)
+            elem = self.get_next_pitch(context)
+
+            note_template = self.get_random_note(longest_duration=longest_duration, context=context)
             note_template.note = elem.note
             note_template.octave = elem.octave
 
             return note_template
 
-    def get_last_note_idx(self) -> int:
+    def get_next_pitch(self, context: GenerationContext, last_note: Optional[Note] = None) -> Note:
+        """
+        Wylosuj wysokość kolejnej nuty
+
+        Args:
+            context:    Kontekst generowania
+            last_note:  Poprzednia nuta. Jeśli nie podano, jest to ostatnia nuta w context.generated_data
+
+        Returns:
+            Nuta o wylosowanej wysokości (wartość rytmiczna nie ma znaczenia)
+        """
+        # Łańcuch Markowa lub tonacja: wysokość losowana jest bezpośrednio z modelu (w tonacji tylko ze stopni
+        # gamy), a pisownia odczytywana z tablicy tonacji
+        if self.markov_model is not None or self.key is not None:
+            return self.get_next_markov_note(context)
+
+        rng = context.rng
+
+        if last_note is None:
+            last_note = self.get_last_note(context)
+
+        # Losujemy do momentu, aż któraś z nut nie będzie się mieścić w naszym przedziale
+        while True:
+            # Wybieramy losowy interwał i tworzymy dwie nuty, jedną w górę drugą w dół o wylosowany interwał
+            interval_idx = rng.choice(len(Interval.names()), p=self.get_normalized_intervals_probability())
+            interval = Interval.names()[interval_idx]
+            next_note_up = last_note + Interval(interval)
+            next_note_down = last_note - Interval(interval)
+
+            # Sprawdzamy czy nuty się mieszczą się w zadanym przez użytkownika
+            up_in_ambitus = next_note_up.between(self.ambitus['lowest'], self.ambitus['highest'])
+            down_in_ambitus = next_note_down.between(self.ambitus['lowest'], self.ambitus['highest'])
+
+            if up_in_ambitus and down_in_ambitus:
+                # Jeśli obie z nut które zostały wygenerowane mieszczą się w ambitusie to korzystamy z
+                # prawdopodobieństw wystąpienia dźwięków w ramach oktawy
+                up_probability = self.notes_probability[next_note_up.get_id() % 12]
+                down_probability = self.notes_probability[next_note_down.get_id() % 12]
+
+                # Prawdopodobieństwa wyznaczone z korpusu mogą być zerowe dla obu nut - wtedy wybieramy losowo
+                total_probability = up_probability + down_probability
+                up_normalized_probability = up_probability / total_probability if total_probability > 0 else 0.5
+
+                return next_note_up if rng.random() < up_normalized_probability else next_note_down
+            elif up_in_ambitus:
+                return next_note_up
+            elif down_in_ambitus:
+                return next_note_down
+
+    def get_random_tuplet(self, longest_duration: int, context: Optional[GenerationContext] = None) \
+            -> Optional[Tuplet]:
+        """
+        Wygeneruj grupę niemiarową nut, która mieści się w dostępnym miejscu i nie przekracza granicy grupy głównej
+        taktu (zob. get_bar_parts), dzięki czemu przy podziale na takty i grupowaniu nie musi być dzielona
+
+        Args:
+            longest_duration:   Dostępne miejsce, podane w ilości shortest_note_duration
+            context:            Kontekst generowania. Jeśli nie podano, używany jest kontekst domyślny
+
+        Returns:
+            Grupa niemiarowa lub None, jeśli żadna z dozwolonych grup się nie mieści
+        """
+        context = self._get_context(context)
+        rng = context.rng
+
+        _, next_boundary = self.get_partition()
+        offset = context.position % len(next_boundary)
+        space = min(longest_duration, next_boundary[offset] - offset)
+
+        options = [
+            option for option in Generator.get_tuplet_options(self.shortest_note_duration, tuple(self.tuplets))
+            if option[3] <= space
+        ]
+
+        if len(options) == 0:
+            return None
+
+        # Wartość rytmiczną nut grupy wybieramy zgodnie z prawdopodobieństwami wartości rytmicznych
+        weights = [self.durations_probability[self.correct_note_lengths.index(option[2])] for option in options]
+        if sum(weights) == 0:
+            weights = [1] * len(options)
+
+        total = sum(weights)
+        numerator, denominator, base_duration, _ = options[rng.choice(len(options), p=[w / total for w in weights])]
+
+        notes: List[Writeable] = []
+        last_note = None
+
+        for _ in range(numerator):
+            pitch = self.get_next_pitch(context, last_note)
+            last_note = Note(pitch.note, pitch.octave, base_duration)
+            notes.append(last_note)
+
+        return Tuplet(numerator, denominator, notes)
+
+    def get_next_markov_note(self, context: GenerationContext) -> Note:
+        """
+        Wylosuj wysokość kolejnej nuty z łańcucha Markowa (zob. get_pitch_model). Stan łańcucha przechowywany jest
+        w kontekście, a przy pierwszym wywołaniu wyznaczany jest na podstawie ostatnich wygenerowanych nut
+
+        Args:
+            context:    Kontekst generowania
+
+        Returns:
+            Nuta o wylosowanej wysokości (pisownia zgodna z tonacją, a bez tonacji z krzyżykami)
+        """
+        model = self.get_pitch_model()
+
+        if context.markov_state is None:
+            history = [item.get_id() for item in self.get_notes(context.generated_data)]
+            if len(history) == 0:
+                raise NoNotesError
+
+            context.markov_state = model.get_state(history)
+
+        pitches, states = model.step([context.markov_state], context.rng)
+        context.markov_state = int(states[0])
+
+        return self.get_note_from_id(int(pitches[0]))
+
+    def get_note_from_id(self, note_id: int, base_duration: int = 4) -> Note:
+        """
+        Utwórz nutę o podanym identyfikatorze, zapisaną zgodnie z tonacją generatora (bez tonacji z krzyżykami)
+
+        Args:
+            note_id:        Identyfikator nuty
+            base_duration:  Bazowa wartość rytmiczna
+        """
+        if self.key is None:
+            return Note.from_id(note_id, base_duration)
+
+        return self.key.get_note(note_id, base_duration)
+
+    def get_pitch_model(self) -> 'MarkovModel':
+        """
+        Pobierz łańcuch Markowa wybierający wysokości nut: ustawiony przez set_markov_model lub równoważny losowaniu
+        interwałów (z tonacją ograniczony do dźwięków gamy). Drugi z nich jest wyznaczany ponownie tylko po zmianie
+        prawdopodobieństw, ambitusu lub tonacji
+        """
+        if self.markov_model is not None:
+            return self.markov_model
+
+        from lib.MarkovModel import MarkovModel
+
+        key = (
+            tuple(self.intervals_probability), tuple(self.notes_probability),
+            self.ambitus['lowest'].get_id(), self.ambitus['highest'].get_id(),
+            None if self.key is None else tuple(self.key.pitch_classes)
+        )
+        cached = self._pitch_model
+
+        if cached is None or cached[0] != key:
+            cached = (key, MarkovModel.from_generator(self, None if self.key is None else self.key.pitch_classes))
+            self._pitch_model = cached
+
+        return cached[1]
+
+    def approach_end_note(self, context: GenerationContext, end_note: Optional[Note] = None, fixed: int = 1,
+                          include_end: bool = True) -> bool:
+        """
+        Zaplanuj wysokości end_note_approach ostatnich nut tak, aby melodia doszła do nuty końcowej dozwolonymi
+        interwałami. Jeśli to niemożliwe, planowanych jest więcej nut. Nuta początkowa nie jest zmieniana
+
+        Args:
+            context:        Kontekst generowania
+            end_note:       Nuta, do której prowadzi melodia. Domyślnie nuta końcowa generatora
+            fixed:          Liczba początkowych nut context.generated_data, których wysokości nie mogą być zmienione
+            include_end:    Jeżeli True to ostatnia nuta staje się end_note. W przeciwnym razie end_note jest nutą
+                            następującą po melodii, a planowane są tylko prowadzące do niej nuty
+
+        Returns:
+            True jeśli udało się zaplanować dojście, False jeśli nie jest ono możliwe
+        """
+        if end_note is None:
+            end_note = self.end_note
+
+        notes = self.get_notes(context.generated_data)
+        count = min(self.end_note_approach, len(notes) - fixed)
+
+        if count <= 0:
+            return False
+
+        model = self.get_pitch_model()
+        end = end_note.get_id()
+
+        if not model.lowest <= end <= model.highest:
+            return False
+
+        ids = [note.get_id() for note in notes]
+        pitches = None
+
+        # Gdy end_note następuje po melodii, planujemy o jedną wysokość więcej i pomijamy ją (jest nią end_note)
+        extra = 0 if include_end else 1
+
+        while pitches is None and count <= len(notes) - fixed:
+            pitches = model.plan(model.get_state(ids[:len(notes) - count]), end, count + extra, context.rng)
+            count += 1
+
+        if pitches is None:
+            return False
+
+        pitches = pitches[:len(pitches) - extra]
+        count = len(pitches)
+
+        for note, pitch in zip(notes[len(notes) - count:], pitches):
+            planned = self.get_note_from_id(pitch)
+            note.note, note.octave = planned.note, planned.octave
+
+        # Ostatnia nuta zachowuje pisownię nuty końcowej
+        if include_end:
+            notes[-1].note, notes[-1].octave = end_note.note, end_note.octave
+
+        return True
+
+    def get_last_note_idx(self, context: Optional[GenerationContext] = None) -> int:
         """
         Pobierz indeks ostatniej nuty w liście wygenerowanych elementów
 
+        Args:
+            context:    Kontekst generowania. Jeśli nie podano, używany jest kontekst domyślny
+
         Returns:
             Indeks jeśli znaleziono nutę
 
         Raises:
             NoNotesError:   When there are no notes in the generated data
         """
-        for i, item in enumerate(reversed(self.generated_data)):
-            if isinstance(item, Note):
-                return len(self.generated_data) - i - 1
+        generated_data = self._get_context(context).generated_data
+
+        for i, item in enumerate(reversed(generated_data)):
+            if isinstance(item, Note) or isinstance(item, Tuplet) and len(self.get_notes(item.elements)) > 0:
+                return len(generated_data) - i - 1
 
         raise NoNotesError
 
+    def get_last_note(self, context: Optional[GenerationContext] = None) -> Note:
+        """
+        Pobierz ostatnią nutę wygenerowanych danych (również z wnętrza grupy niemiarowej)
+
+        Args:
+            context:    Kontekst generowania. Jeśli nie podano, używany jest kontekst domyślny
+
+        Raises:
+            NoNotesError:   When there are no notes in the generated data
+        """
+        item = self._get_context(context).generated_data[self.get_last_note_idx(context)]
+
+        return self.get_notes([item])[-1]
+
+    @staticmethod
+    def get_notes(data: List[Writeable]) -> List[Note]:
+        """
+        Pobierz wszystkie nuty, łącznie z nutami grup niemiarowych (zwracane są te same obiekty, nie kopie)
+
+        Args:
+            data:   Lista elementów
+        """
+        return [item for item in Tuplet.flatten(data) if isinstance(item, Note)]
+
     def get_all_bars_duration(self) -> int:
         """
         Pobierz ile nut o bazowej wartości rytmicznej równej self.shortest_note_duration zmieści musimy wygenerować
@@ -514,6 +1159,50 @@ class Generator:
 
     # region Grouping
 
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def get_division(shortest_note_duration: int, duration: int) -> Tuple[Tuple[int, int], ...]:
+        """
+        Wyznacz podział miejsca o podanej długości na wartości rytmiczne z kropkami. Wynik zależy tylko od argumentów,
+        więc każdy podział jest wyznaczany raz
+
+        Args:
+            shortest_note_duration:     Najkrótsza wartość rytmiczna
+            duration:                   Długość miejsca, podana w ilości shortest_note_duration
+
+        Returns:
+            Krotka par (bazowa wartość rytmiczna, liczba kropek)
+        """
+        base_duration = shortest_note_duration / duration
+
+        if base_duration.is_integer():
+            return (int(base_duration), 0),
+
+        division = []
+
+        while duration > 0:
+            # ile podstawowych długości zmieści się w takcie
+            closest_whole = max([val for val in Generator.correct_note_lengths if val <= duration])
+            # przeliczenie jaka to nuta
+            closest_whole_base = shortest_note_duration // closest_whole
+            length = shortest_note_duration // closest_whole_base
+
+            # zmieniamy wartość pozostałą do wypełnienia
+            duration -= length
+            dots = 0
+
+            # sprawdzamy czy należy dodać do elementu kropkę lub podwójną kropkę
+            if duration >= length * 0.75:
+                duration -= int(length * 0.75)
+                dots = 2
+            elif duration >= length * 0.5:
+                duration -= int(length * 0.5)
+                dots = 1
+
+            division.append((closest_whole_base, dots))
+
+        return tuple(division)
+
     def divide_element(self, elem: Writeable, duration: int) -> List[Writeable]:
         """
         Podział elementu i dodanie do niego kropek, jeśli jest to konieczne
@@ -524,65 +1213,33 @@ class Generator:
 
         Returns:
             Lista nut mieszcząca się w takcie o podanej długości
+
+        Raises:
+            ValueError:     Gdy element jest grupą niemiarową, której nie można dzielić
         """
-        elem = copy.deepcopy(elem)
+        if isinstance(elem, Tuplet):
+            raise ValueError('Tuplets cannot be divided')
 
-        base_duration = self.shortest_note_duration / duration
         divided: List[Writeable] = []
 
-        if base_duration.is_integer():
-            if isinstance(elem, Note):
-                elem.remove_modifier(NoteModifier.DOT)
-                elem.remove_modifier(NoteModifier.DOUBLE_DOT)
-            elif isinstance(elem, Rest):
-                elem.remove_modifier(RestModifier.DOT)
-                elem.remove_modifier(RestModifier.DOUBLE_DOT)
-
-            elem.base_duration = int(base_duration)
-            divided.append(elem)
-            duration -= self.shortest_note_duration / base_duration
-        else:
-            while duration > 0:
-                elem_2 = copy.deepcopy(elem)
-
-                if isinstance(elem_2, Note):
-                    elem_2.remove_modifier(NoteModifier.DOT)
-                    elem_2.remove_modifier(NoteModifier.DOUBLE_DOT)
-                elif isinstance(elem_2, Rest):
-                    elem_2.remove_modifier(RestModifier.DOT)
-                    elem_2.remove_modifier(RestModifier.DOUBLE_DOT)
-
-                # ile podstawowych długości zmieści się w takcie
-                closest_whole = max([val for val in Generator.correct_note_lengths if val <= duration])
-                # przeliczenie jaka to nuta
-                closest_whole_base = self.shortest_note_duration // closest_whole
-                elem_2.base_duration = int(closest_whole_base)
-                
-                # zmieniamy wartość pozostałą do wypełnienia
-                duration -= int(elem_2.get_duration(self.shortest_note_duration))
-                # sprawdzamy czy jakiś element został już wpisany do taktu i czy należy dodać do niego kropkę
-                # lub podwójną kropkę
-                if duration >= elem_2.get_duration(self.shortest_note_duration) * 0.75:
-                    modifier_duration = elem_2.get_duration(self.shortest_note_duration) * 0.75
-                    duration -= int(modifier_duration)
-                   
-                    if isinstance(elem_2, Note):
-                        elem_2.add_modifier(NoteModifier.DOUBLE_DOT)
-                    
-                    if isinstance(elem_2, Rest):
-                        elem_2.add_modifier(RestModifier.DOUBLE_DOT)
-                    
-                elif duration >= elem_2.get_duration(self.shortest_note_duration) * 0.5:
-                    modifier_duration = elem_2.get_duration(self.shortest_note_duration) * 0.5
-                    duration -= int(modifier_duration)
-
-                    if isinstance(elem_2, Note):
-                        elem_2.add_modifier(NoteModifier.DOT)
-                    
-                    if isinstance(elem_2, Rest):
-                        elem_2.add_modifier(RestModifier.DOT)    
-
-                divided.append(elem_2)    
+        for base_duration, dots in Generator.get_division(self.shortest_note_duration, duration):
+            part = copy.deepcopy(elem)
+
+            if isinstance(part, Note):
+                part.remove_modifier(NoteModifier.DOT)
+                part.remove_modifier(NoteModifier.DOUBLE_DOT)
+
+                if dots > 0:
+                    part.add_modifier(NoteModifier.DOT if dots == 1 else NoteModifier.DOUBLE_DOT)
+            elif isinstance(part, Rest):
+                part.remove_modifier(RestModifier.DOT)
+                part.remove_modifier(RestModifier.DOUBLE_DOT)
+
+                if dots > 0:
+                    part.add_modifier(RestModifier.DOT if dots == 1 else RestModifier.DOUBLE_DOT)
+
+            part.base_duration = base_duration
+            divided.append(part)
 
         return divided
 
@@ -599,6 +1256,9 @@ class Generator:
             Krotka dwuelementowa. Pierwszym elementem jest lista obiektów, która ma się pojawić w pierwszym takcie.
             Drugim elementem jest lista obiektów, która ma się pojawić w drugim takcie.
         """
+        if isinstance(elem, Tuplet):
+            raise ValueError('Tuplets cannot be split')
+
         elem = copy.deepcopy(elem)
         has_tie = isinstance(elem, Note) and NoteModifier.TIE in elem.modifiers
 
@@ -634,21 +1294,27 @@ class Generator:
 
         return bars
 
-    def split_to_bars(self, notes: List[Writeable]) -> List[List[Writeable]]:
+    def split_to_bars(self, notes: List[Writeable], bar_count: Optional[int] = None,
+                      bar_duration: Optional[int] = None) -> List[List[Writeable]]:
         """
         Dzieli listę elementów na takty. Elementy które nachodzą na dwa takty będą podzielone, a jeśli są nutami,
         to zostaną połączone łukiem
 
         Args:
-            notes:  Lista nut
+            notes:          Lista nut
+            bar_count:      Liczba taktów. Domyślnie liczba taktów generatora
+            bar_duration:   Długość taktu w ilości shortest_note_duration. Domyślnie get_bar_duration()
         """
         notes = copy.deepcopy(notes)
 
+        if bar_count is None:
+            bar_count = self.bar_count
+
         # Tworzymy listę pustych taktów do wypełnienia
-        notes_split: List[List[Writeable]] = [[] for _ in range(self.bar_count)]
+        notes_split: List[List[Writeable]] = [[] for _ in range(bar_count)]
 
         # Obliczamy jaką długość ma każdy takt (w ilości shortest_note_duration)
-        bar_length = self.get_all_bars_duration() // self.bar_count
+        bar_length = self.get_bar_duration() if bar_duration is None else bar_duration
         value_to_fill = bar_length
 
         # Numer aktualnie przetwarzanego taktu
@@ -686,15 +1352,58 @@ class Generator:
 
         return notes_split
 
-    def get_bar_parts(self) -> List[int]:
-        """Wyznacz grupy główne w takcie"""
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def get_tuplet_options(shortest_note_duration: int, ratios: Tuple[Tuple[int, int], ...]) \
+            -> Tuple[Tuple[int, int, int, int], ...]:
+        """
+        Wyznacz wszystkie grupy niemiarowe możliwe przy danej najkrótszej wartości rytmicznej. Grupa n/m nut o bazowej
+        wartości b trwa tyle co m nut o wartości b, więc zajmuje całkowitą liczbę shortest_note_duration tylko dla
+        niektórych b. Wynik zależy tylko od argumentów, więc jest wyznaczany raz
+
+        Args:
+            shortest_note_duration:     Najkrótsza wartość rytmiczna (nuty grupy nie mogą być krótsze)
+            ratios:                     Proporcje grup (numerator, denominator)
+
+        Returns:
+            Krotka (numerator, denominator, bazowa wartość rytmiczna nut, długość grupy w shortest_note_duration)
+        """
+        options = []
+
+        for numerator, denominator in ratios:
+            for base_duration in Generator.correct_note_lengths:
+                span = Fraction(denominator * shortest_note_duration, base_duration)
+
+                if base_duration <= shortest_note_duration and span.denominator == 1:
+                    options.append((numerator, denominator, base_duration, int(span)))
+
+        return tuple(options)
+
+    def get_part_ends(self) -> List[int]:
+        """
+        Pobierz pozycje końców grup głównych w takcie (zob. get_bar_parts), podane w ilości shortest_note_duration.
+        Jeśli takt nie jest grupowany, jedyną granicą jest koniec taktu
+        """
+        boundaries, _ = self.get_partition()
+
+        return [position for position in range(1, len(boundaries)) if boundaries[position]]
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def get_metre_parts(n: int) -> Tuple[int, ...]:
+        """
+        Wyznacz domyślny podział taktu o n miarach na grupy główne
+
+        Args:
+            n:  Liczba miar w takcie
+        """
         parts: List[int] = []
-        n = self.metre[0]
 
         if n % 3 == 0:
             parts = [3] * (n // 3)
-        elif math.log2(n).is_integer():
-            parts = [2] * int(math.log2(n))
+        elif n & (n - 1) == 0:
+            # Potęga dwójki: grupy po dwie miary (takt o jednej lub dwóch miarach to jedna grupa)
+            parts = [2] * (n // 2) if n > 1 else [1]
         else:
             while n > 0:
                 if n - 3 >= 2:
@@ -704,101 +1413,300 @@ class Generator:
                     parts.append(2)
                     n -= 2
 
-        return parts
+        return tuple(parts)
 
-    def group_bars(self, bars: List[List[Writeable]]) -> List[List[Writeable]]:
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def get_partition_table(parts: Tuple[int, ...], beat: int) -> Tuple[Tuple[bool, ...], Tuple[int, ...]]:
+        """
+        Wyznacz tablice granic grup głównych dla każdej pozycji w takcie
+
+        Args:
+            parts:  Podział taktu na grupy główne (liczby miar)
+            beat:   Długość miary, podana w ilości shortest_note_duration
+
+        Returns:
+            Krotka (mapa granic, następna granica). Mapa ma długość taktu + 1 i wartość True na pozycjach, na których
+            zaczyna się lub kończy grupa. Druga tablica dla każdej pozycji w takcie zawiera pozycję najbliższej granicy
+            za nią
+        """
+        bar_duration = sum(parts) * beat
+        boundaries = [False] * (bar_duration + 1)
+        boundaries[0] = True
+
+        position = 0
+        for part in parts:
+            position += part * beat
+            boundaries[position] = True
+
+        next_boundary = [bar_duration] * bar_duration
+        for position in range(bar_duration - 1, -1, -1):
+            next_boundary[position] = position + 1 if boundaries[position + 1] else next_boundary[position + 1]
+
+        return tuple(boundaries), tuple(next_boundary)
+
+    def get_partition(self) -> Tuple[Tuple[bool, ...], Tuple[int, ...]]:
+        """
+        Pobierz tablice granic grup głównych dla bieżącego metrum i podziału (zob. get_partition_table). Takt, który
+        nie jest grupowany, ma jedną grupę
+        """
+        parts = self.get_bar_parts()
+
+        if len(parts) <= 1 or self.metre[0] == 1:
+            parts = [self.metre[0]]
+
+        return Generator.get_partition_table(tuple(parts), self.shortest_note_duration // self.metre[1])
+
+    def get_bar_parts(self) -> List[int]:
+        """Wyznacz grupy główne w takcie: podział ustawiony przez set_grouping lub domyślny dla metrum"""
+        if self.grouping is not None:
+            return list(self.grouping)
+
+        return list(Generator.get_metre_parts(self.metre[0]))
+
+    def group_bars(self, bars: List[List[Writeable]],
+                   partition: Optional[Tuple[Tuple[bool, ...], Tuple[int, ...]]] = None) -> List[List[Writeable]]:
         """
         Pogrupuj nuty w taktach zgodnie z zasadami grupowania
 
         Args:
-            bars:   Lista taktów do grupowania
+            bars:       Lista taktów do grupowania
+            partition:  Tablice granic grup (wynik get_partition), np. wspólne dla kilku głosów. Domyślnie
+                        get_partition()
         """
         bars = copy.deepcopy(bars)
         bars_grouped: List[List[Writeable]] = []
 
-        parts = self.get_bar_parts()
-        part_durations = [part * (self.shortest_note_duration // self.metre[1]) for part in parts]
+        if partition is None:
+            partition = self.get_partition()
+
+        boundaries, next_boundary = partition
 
-        if len(parts) == 1 or self.metre[0] == 1:
+        # Takt z jedną grupą (granice tylko na początku i końcu) nie wymaga grupowania
+        if sum(boundaries) <= 2:
             return bars
 
+        bar_duration = len(next_boundary)
+
         for bar in bars:
-            current_part = 0
-            part_duration = part_durations[current_part]
+            grouped_bar: List[Writeable] = []
+            position = 0
+
+            # Elementy do umieszczenia w takcie. Element przekraczający granicę grupy jest dzielony, a jego dalsza
+            # część wraca na początek kolejki (może przekraczać kolejną granicę)
+            pending = list(reversed(bar))
+
+            while len(pending) > 0:
+                elem = pending.pop()
 
-            grouped_bar: List[List[Writeable]] = [[] for _ in range(len(parts))]
-            
-            for elem in bar:
                 # Obliczamy długość naszego elementu wyrażonego w ilości shortest_note_duration
                 note_duration = elem.get_duration(self.shortest_note_duration)
-
-                # Jeśli w grupie skończyło się miejsce, to przeskakujemy do następnej
-                if part_duration == 0:
-                    current_part += 1
-                    part_duration = part_durations[current_part]
+                boundary = next_boundary[position] if position < bar_duration else bar_duration
 
                 # Przypadek 1 - element mieści się w grupie
-                # Dodajemy go do naszej grupy, a następnie od pozostałej wartości odejmujemy jego długość
-                if note_duration <= part_duration:
-                    grouped_bar[current_part].append(elem)
-                    part_duration -= note_duration
+                if position + note_duration <= boundary:
+                    grouped_bar.append(elem)
+                    position += note_duration
 
                 # Przypadek 2 - element nie mieści się w grupie
-                # Przekazujemy go do metody split_note, wraz z pozostałym miejscem w pierwszej grupie, aby został
-                # odpowiednio podzielony. Następnie pierwszą część dodajemy do pierwszej grupy, drugą do drugiej
+                # Przekazujemy go do metody split_note, wraz z pozostałym miejscem w grupie, aby został odpowiednio
+                # podzielony. Pierwszą część dodajemy do grupy, a drugą przetwarzamy dalej
                 else:
-                    data = self.split_note(elem, part_duration)
-                    grouped_bar[current_part].extend(data[0])
+                    data = self.split_note(elem, boundary - position)
+                    grouped_bar.extend(data[0])
+                    position = boundary
 
-                    current_part += 1
-                    value_filled = sum([i.get_duration(self.shortest_note_duration) for i in data[1]])
-                    part_duration = part_durations[current_part] - value_filled
+                    pending.extend(reversed([item for part in data[1:] for item in part]))
 
-                    grouped_bar[current_part].extend(data[1])
+            bars_grouped.append(grouped_bar)
 
-            bars_grouped.append([y for x in grouped_bar for y in x])
-
-        return bars_grouped    
+        return bars_grouped
 
     # endregion
 
-    def generate(self, group: bool = False) -> Union[List[Writeable], List[List[Writeable]]]:
+    def generate(self, group: bool = False, seed: Optional[int] = None) \
+            -> Union[List[Writeable], List[List[Writeable]]]:
         """
         Wygeneruj listę nut bazując na ustalonych parametrach.
+        Cały stan generowania znajduje się w nowym kontekście, więc metodę można wywoływać jednocześnie z wielu wątków.
 
         Args:
             group:  Jeżeli True to zwrócona melodia będzie już pogrupowana zgodnie z zasadami muzyki i rozbita na takty
+            seed:   Ziarno generatora liczb losowych. Te same parametry i ziarno dają tę samą melodię
         """
-        # Resetujemy wygenerowane dane
-        self.generated_data = []
+        # Jeśli melodia narusza ograniczenia, generujemy ją od nowa, kontynuując ten sam ciąg liczb losowych
+        attempts = self.constraint_attempts if len(self.constraints) > 0 else 1
+        context = None
 
-        # Długość którą mamy wygenerować podaną w ilości najkrótszej wartości rytmicznej, która może wystąpić
-        length_to_fill = self.get_all_bars_duration()
+        for _ in range(attempts):
+            context = GenerationContext(seed, None if context is None else context.rng)
 
-        # Generujemy pierwszą nutę a następnie podmieniamy jej wysokość na tą, którą wybrał użytkownik wybierając
-        # nutę początkową
-        start_note = self.get_random_note(self.shortest_note_duration)
-        start_note.note = self.start_note.note
-        start_note.octave = self.start_note.octave
-        self.generated_data.append(start_note)
-        length_to_fill -= start_note.get_duration(self.shortest_note_duration)
+            if self.generate_melody(context):
+                break
+        else:
+            raise ConstraintsNotSatisfied(attempts)
 
-        # Generujemy elementy dopóki w takcie znajduje się miejsce
-        while length_to_fill > 0:
-            writeable = self.get_next_writeable(length_to_fill)
-            length_to_fill -= writeable.get_duration(self.shortest_note_duration)
-            self.generated_data.append(writeable)
-
-        # Znajdujemy ostatnią nutę i podmieniamy jej wysokość, tak aby zgadzało się to z wyborem użytkownika
-        try:
-            last_note_idx = self.get_last_note_idx()
-            self.generated_data[last_note_idx].note = self.end_note.note
-            self.generated_data[last_note_idx].octave = self.end_note.octave
-        except NoNotesError:
-            print(termcolor.colored('The are no notes in the generated file! Something went wrong?', 'red'))
+        # Udostępniamy wynik poprzez self.generated_data (przypisanie referencji jest atomowe)
+        self._context = context
 
         if group:
-            bars = self.split_to_bars(self.generated_data)
+            bars = self.split_to_bars(context.generated_data)
             return self.group_bars(bars)
         else:
-            return self.generated_data
+            return context.generated_data
+
+    def regenerate_bars(self, bars: List[List[Writeable]], start: int, end: int, seed: Optional[int] = None) \
+            -> List[List[Writeable]]:
+        """
+        Wygeneruj ponownie takty od start do end (bez end) melodii zwróconej przez generate(group=True). Pozostałe
+        takty nie są zmieniane ani ponownie grupowane, więc koszt zależy wyłącznie od liczby generowanych taktów.
+
+        Wysokości są losowane w kontekście ostatnich nut przed zakresem. Pierwszy takt zaczyna się nutą początkową,
+        a ostatni kończy nutą końcową. Nuta związana łukiem z zakresem zachowuje łuk: zakres zaczyna się nutą o tej
+        samej wysokości, a jeśli łuk prowadzi z zakresu, ostatnia nuta zakresu ma wysokość nuty za nim (łuk zostaje,
+        gdy zakres kończy się nutą). W pozostałych przypadkach ostatnie nuty prowadzą do nuty następującej po zakresie
+        zgodnie z end_note_approach. Ograniczenia sprawdzane są tylko dla nowych elementów
+
+        Args:
+            bars:   Takty melodii (nie są modyfikowane)
+            start:  Indeks pierwszego generowanego taktu, liczony od 0
+            end:    Indeks taktu za ostatnim generowanym taktem
+            seed:   Ziarno generatora liczb losowych
+
+        Returns:
+            Nowa lista taktów
+
+        Raises:
+            ValueError:     Gdy zakres taktów jest niepoprawny
+        """
+        if not 0 <= start < end <= len(bars):
+            raise ValueError(f'Invalid bar range {start}-{end} for {len(bars)} bars')
+
+        bar_duration = self.get_bar_duration()
+
+        # Historia wysokości: tyle ostatnich nut przed zakresem, ile wymaga łańcucha Markowa (przy interwałach jedna)
+        order = self.get_pitch_model().order if self.markov_model is not None or self.key is not None else 1
+        history: List[Writeable] = []
+
+        for item in (item for bar in reversed(bars[:start]) for item in reversed(Tuplet.flatten(bar))):
+            if len(history) == order:
+                break
+
+            if isinstance(item, Note):
+                history.insert(0, Note(item.note, item.octave, item.base_duration))
+
+        def tied(items: List[Writeable]) -> Optional[Note]:
+            return items[-1] if len(items) > 0 and isinstance(items[-1], Note) \
+                and NoteModifier.TIE in items[-1].modifiers else None
+
+        # Bez historii wysokości (zakres od początku lub same pauzy przed nim) zaczynamy od nuty początkowej
+        first_note = self.start_note if len(history) == 0 else tied(Tuplet.flatten(bars[start - 1]))
+        last_note = self.end_note if end == len(bars) else tied(Tuplet.flatten(bars[end - 1]))
+        following_note = next((item for bar in bars[end:] for item in self.get_notes(bar)), None)
+
+        attempts = self.constraint_attempts if len(self.constraints) > 0 else 1
+        context = None
+
+        for _ in range(attempts):
+            context = GenerationContext(seed, None if context is None else context.rng)
+            context.generated_data = list(history)
+            context.last_note = history[-1] if len(history) > 0 else None
+            context.position = context.start = start * bar_duration
+            context.length = end * bar_duration
+
+            if self.generate_fragment(context, first_note, last_note, following_note):
+                break
+        else:
+            raise ConstraintsNotSatisfied(attempts)
+
+        data = context.generated_data[len(history):]
+
+        # Łuk prowadzący do taktu end zostaje tylko wtedy, gdy zakres kończy się nutą o tej samej wysokości
+        if end < len(bars) and last_note is not None and isinstance(data[-1], Note) \
+                and data[-1].get_id() == last_note.get_id():
+            data[-1].add_modifier(NoteModifier.TIE)
+
+        return bars[:start] + self.group_bars(self.split_to_bars(data, end - start)) + bars[end:]
+
+    def generate_melody(self, context: GenerationContext) -> bool:
+        """
+        Wygeneruj jedną melodię w podanym kontekście
+
+        Args:
+            context:    Nowy kontekst generowania
+
+        Returns:
+            True jeśli melodia spełnia wszystkie ograniczenia, False jeśli została porzucona
+        """
+        # Długość którą mamy wygenerować podaną w ilości najkrótszej wartości rytmicznej, która może wystąpić
+        context.length = self.get_all_bars_duration()
+
+        return self.generate_fragment(context, self.start_note, self.end_note)
+
+    def generate_fragment(self, context: GenerationContext, first_note: Optional[Note], last_note: Optional[Note],
+                          following_note: Optional[Note] = None) -> bool:
+        """
+        Wygeneruj elementy od pozycji context.position do context.length. Nuty znajdujące się w kontekście przed
+        wywołaniem (context.generated_data) stanowią jedynie historię wysokości i nie są zmieniane
+
+        Args:
+            context:        Kontekst generowania
+            first_note:     Wysokość pierwszego elementu, który będzie wtedy nutą. None oznacza losowy element
+            last_note:      Wysokość ostatniej nuty (lub None, jeśli ma być losowa)
+            following_note: Nuta następująca po fragmencie. Jeśli podano (a last_note nie), ostatnie nuty fragmentu
+                            prowadzą do niej zgodnie z end_note_approach
+
+        Returns:
+            True jeśli fragment spełnia wszystkie ograniczenia, False jeśli został porzucony
+        """
+        context.generator = self
+        history = len(context.generated_data)
+        fixed = len(self.get_notes(context.generated_data))
+
+        # Generujemy pierwszą nutę a następnie podmieniamy jej wysokość na tą, którą wybrał użytkownik wybierając
+        # nutę początkową
+        if first_note is not None:
+            def draw_first_note() -> Note:
+                note = self.get_random_note(min(self.shortest_note_duration, context.length - context.position),
+                                            context)
+                note.note = first_note.note
+                note.octave = first_note.octave
+                return note
+
+            if self.draw_element(context, draw_first_note) is None:
+                self.count_constraint_stats('rejected')
+                return False
+
+            fixed += 1
+
+        # Generujemy elementy dopóki w takcie znajduje się miejsce
+        while context.position < context.length:
+            length_to_fill = context.length - context.position
+
+            if self.draw_element(context, lambda: self.get_next_writeable(length_to_fill, context)) is None:
+                self.count_constraint_stats('rejected')
+                return False
+
+        # Znajdujemy ostatnią nutę i podmieniamy jej wysokość, tak aby zgadzało się to z wyborem użytkownika.
+        # Jeśli włączono planowanie dojścia do nuty końcowej, zmieniamy wysokości kilku ostatnich nut
+        notes = self.get_notes(context.generated_data[history:])
+
+        if len(notes) == 0:
+            # Fragment złożony z samych pauz jest poprawny, ale cała melodia bez nut oznacza błąd
+            if history == 0:
+                import termcolor
+                print(termcolor.colored('The are no notes in the generated file! Something went wrong?', 'red'))
+        elif last_note is not None:
+            if self.end_note_approach == 0 or not self.approach_end_note(context, last_note, fixed):
+                notes[-1].note = last_note.note
+                notes[-1].octave = last_note.octave
+        elif following_note is not None and self.end_note_approach > 0:
+            self.approach_end_note(context, following_note, fixed, include_end=False)
+
+        if len(self.constraints) > 0:
+            violated = self.check_melody(context)
+            self.count_constraint_stats('accepted' if violated is None else 'rejected', violated)
+
+            return violated is None
+
+        return True
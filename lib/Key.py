@@ -0,0 +1,116 @@
+from typing import List
+
+from lib.KeyType import KeyType
+from lib.theory.Note import Note
+from lib.theory.OctaveType import OctaveType
+
+
+class Key:
+    """
+    Tonacja wraz z wyznaczonymi raz tablicami dźwięków gamy i ich pisowni.
+
+    Zamiana identyfikatora nuty na nutę zapisaną zgodnie z tonacją to odczyt z tablicy, więc nie wymaga dodawania
+    interwałów (Note.__add__) ani redukcji znaków chromatycznych.
+    """
+
+    # Odległości kolejnych stopni gamy od toniki, w półtonach
+    scale_steps = {
+        KeyType.MAJOR: [0, 2, 4, 5, 7, 9, 11],
+        KeyType.MINOR: [0, 2, 3, 5, 7, 8, 10]
+    }
+
+    # Pisownia dźwięków spoza gamy w tonacjach bemolowych
+    flat_spelling = ['c', 'des', 'd', 'ees', 'e', 'f', 'ges', 'g', 'aes', 'a', 'bes', 'b']
+
+    def __init__(self, tonic: str, key_type: KeyType = KeyType.MAJOR):
+        """
+        Args:
+            tonic:      Tonika w notacji lilypond bez oktawy (np. d, bes, fis). Skrócone nazwy (as, es) zamieniane są
+                        na pełne
+            key_type:   Rodzaj tonacji
+
+        Raises:
+            ValueError:     Gdy tonika nie jest poprawną nazwą dźwięku lub stopnie gamy wymagałyby potrójnych znaków
+        """
+        if Note.note_regex.match(tonic) is None or not tonic.isalpha():
+            raise ValueError(f'{tonic} is not a valid key')
+
+        tonic = Note.get_full_name(tonic)
+        tonic_note = Note(tonic)
+
+        self.tonic: str = tonic
+        self.key_type: KeyType = key_type
+
+        tonic_index = Note.base_notes_indexes[tonic_note.get_base_note()]
+        tonic_id = tonic_note.get_base_note_id() + tonic_note.get_accidentals_value()
+
+        # Klasy wysokości (0-11) kolejnych stopni gamy i ich pisownia
+        self.pitch_classes: List[int] = []
+        self.degree_names: List[str] = []
+
+        for degree, steps in enumerate(self.scale_steps[key_type]):
+            pitch_class = (tonic_id + steps) % 12
+            base_note = Note.base_notes[(tonic_index + degree) % len(Note.base_notes)]
+
+            # Znaki chromatyczne w przedziale [-6, 5]
+            accidentals = (pitch_class - Note.base_notes_ids[base_note] + 6) % 12 - 6
+            if abs(accidentals) > 2:
+                raise ValueError(f'{tonic} {key_type.value} is not a valid key')
+
+            self.pitch_classes.append(pitch_class)
+            self.degree_names.append(base_note + Note.create_accidentals_string(accidentals))
+
+        # Tonacje bemolowe zapisują dźwięki spoza gamy bemolami, pozostałe krzyżykami
+        self.flats: bool = any(name.endswith('es') for name in self.degree_names)
+
+        # Pisownia każdej z 12 klas wysokości oraz przesunięcie oktawy wynikające z pisowni (np. his to c oktawy wyżej,
+        # więc jego oktawa jest o jeden mniejsza niż wynikałoby z identyfikatora)
+        self.spelling: List[str] = []
+        self.octave_shift: List[int] = []
+
+        for pitch_class in range(12):
+            if pitch_class in self.pitch_classes:
+                name = self.degree_names[self.pitch_classes.index(pitch_class)]
+            else:
+                # Dźwięki spoza gamy zapisujemy bez znaków lub z krzyżykiem / bemolem, zależnie od tonacji
+                name = (self.flat_spelling if self.flats else Note.default_spelling)[pitch_class]
+
+            base_id = Note.base_notes_ids[name[0]]
+            value = name.count('is') - name.count('es')
+
+            self.spelling.append(name)
+            self.octave_shift.append((pitch_class - base_id - value) // 12)
+
+    def __str__(self):
+        return f'{self.tonic} {self.key_type.value}'
+
+    def __repr__(self):
+        return f'Key <{self.__str__()}>'
+
+    def __eq__(self, other):
+        return isinstance(other, Key) and self.tonic == other.tonic and self.key_type == other.key_type
+
+    def __hash__(self):
+        return hash((self.tonic, self.key_type))
+
+    def contains(self, note_id: int) -> bool:
+        """
+        Sprawdź, czy dźwięk należy do gamy
+
+        Args:
+            note_id:    Identyfikator nuty
+        """
+        return note_id % 12 in self.pitch_classes
+
+    def get_note(self, note_id: int, base_duration: int = 4) -> Note:
+        """
+        Utwórz nutę o podanym identyfikatorze zapisaną zgodnie z tonacją
+
+        Args:
+            note_id:        Identyfikator nuty (numer MIDI)
+            base_duration:  Bazowa wartość rytmiczna
+        """
+        pitch_class = note_id % 12
+
+        return Note(self.spelling[pitch_class], OctaveType.from_id(note_id // 12 + self.octave_shift[pitch_class]),
+                    base_duration)
@@ -0,0 +1,317 @@
+from typing import Dict, List, Optional, Tuple
+import itertools
+import os
+import queue
+import subprocess
+import threading
+import time
+
+from lib.CompileBackend import CompileBackend
+
+
+class LilypondWorker(CompileBackend):
+    """
+    Backend kompilacji utrzymujący działające procesy lilyponda między kompilacjami.
+
+    Przy krótkich utworach większość czasu kompilacji zajmuje start lilyponda (Guile, czcionki). Worker uruchamia
+    lilyponda z pętlą Scheme (opcja -e), która czyta zlecenia ze standardowego wejścia, kompiluje każdy plik przez
+    ly:parse-file i zgłasza zakończenie zlecenia na standardowym wyjściu błędów. Opcje kompilacji (formaty, backend,
+    folder docelowy) są ustalane przy starcie procesu, więc dla każdego zestawu opcji działają osobne procesy
+    (najwyżej max_processes). Proces, który zakończył się awarią, jest uruchamiany ponownie przy kolejnym zleceniu,
+    a po max_jobs zleceniach zastępowany nowym, aby ograniczyć zużycie pamięci.
+
+    Użycie:
+        with LilypondWorker() as worker:
+            writer.compile_backend = worker
+            writer.compile('png')
+    """
+
+    # Linia, którą pętla Scheme kończy komunikaty zlecenia: "{done_marker} {id} {status}"
+    done_marker: str = 'lilypond-worker-done'
+
+    # Pętla wykonywana przez lilyponda. Zlecenie to linia "{id} {ścieżka pliku}". Przerwanie kompilacji przez błąd
+    # (ly:parse-file zgłasza wtedy wyjątek) daje status 1. Koniec standardowego wejścia kończy proces
+    loop_code: str = (
+        '(begin (use-modules (ice-9 rdelim))'
+        ' (let loop ((line (read-line)))'
+        ' (if (not (eof-object? line))'
+        ' (let* ((space (string-index line #\\space))'
+        ' (status (catch #t (lambda () (ly:parse-file (substring line (1+ space))) 0) (lambda args 1))))'
+        f' (ly:message "{done_marker} ~a ~a" (substring line 0 space) status)'
+        ' (loop (read-line)))))'
+        ' (exit 0))'
+    )
+
+    def __init__(self, max_processes: int = os.cpu_count() or 1, max_jobs: int = 100):
+        """
+        Args:
+            max_processes:  Maksymalna liczba procesów lilyponda dla jednego zestawu opcji
+            max_jobs:       Liczba zleceń, po której proces lilyponda jest zastępowany nowym
+        """
+        self.max_processes: int = max_processes
+        self.max_jobs: int = max_jobs
+
+        self.condition: threading.Condition = threading.Condition()
+        self.job_ids = itertools.count()
+
+        # Wolne procesy i liczba wszystkich procesów dla każdego zestawu opcji
+        self.idle: Dict[Tuple[str, ...], List[subprocess.Popen]] = {}
+        self.counts: Dict[Tuple[str, ...], int] = {}
+
+        # Linie standardowego wyjścia błędów (None po zakończeniu procesu) i liczba zleceń każdego procesu
+        self.outputs: Dict[subprocess.Popen, 'queue.Queue[Optional[str]]'] = {}
+        self.job_counts: Dict[subprocess.Popen, int] = {}
+
+        # Liczba uruchomień lilyponda
+        self.starts: int = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Poczekaj na zakończenie trwających zleceń i zatrzymaj wszystkie procesy lilyponda"""
+        with self.condition:
+            self.condition.wait_for(lambda: all(
+                len(self.idle.get(options, [])) == count for options, count in self.counts.items()
+            ))
+
+            processes = [process for idle in self.idle.values() for process in idle]
+            self.idle.clear()
+            self.counts.clear()
+
+        for process in processes:
+            self.stop_process(process)
+
+    def run(self, command: List[str], timeout: Optional[float] = None) -> Tuple[int, str]:
+        """
+        Skompiluj plik w działającym procesie lilyponda (zob. CompileBackend.run). Po przekroczeniu czasu zlecenie
+        jest anulowane: zlecenie oczekujące na wolny proces nie zostaje wysłane, a proces kompilujący zlecenie jest
+        kończony (kolejne zlecenie uruchomi nowy)
+        """
+        return self.execute(command, timeout)
+
+    async def run_async(self, command: List[str], timeout: Optional[float] = None) -> Tuple[int, str]:
+        """
+        Skompiluj plik w działającym procesie lilyponda bez blokowania pętli zdarzeń (zob. CompileBackend.run_async).
+        Anulowanie zadania anuluje zlecenie tak jak przekroczenie czasu
+        """
+        import asyncio
+
+        cancel = threading.Event()
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(None, self.execute, command, timeout, cancel)
+        except subprocess.TimeoutExpired:
+            raise asyncio.TimeoutError
+        except asyncio.CancelledError:
+            cancel.set()
+            raise
+
+    # region Worker
+
+    def execute(self, command: List[str], timeout: Optional[float] = None,
+                cancel: Optional[threading.Event] = None) -> Tuple[int, str]:
+        """
+        Wyślij zlecenie do wolnego procesu lilyponda i poczekaj na jego wynik
+
+        Args:
+            command:    Polecenie z Writer.get_compile_command (ostatni argument to plik źródłowy)
+            timeout:    Maksymalny czas kompilacji w sekundach (wliczając oczekiwanie na wolny proces)
+            cancel:     Zdarzenie anulujące zlecenie (sprawdzane w trakcie oczekiwania na wynik)
+
+        Returns:
+            Kod wyjścia (status zlecenia lub kod wyjścia procesu, który zakończył się w trakcie zlecenia)
+            i komunikaty lilyponda dotyczące tego pliku
+
+        Raises:
+            subprocess.TimeoutExpired:  Gdy kompilacja trwała dłużej niż timeout lub została anulowana
+        """
+        options = tuple(command[:-1])
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        process = self.acquire(options, deadline, command, timeout)
+        job_id = str(next(self.job_ids))
+
+        try:
+            # Proces zmienia folder roboczy na folder docelowy (-o), więc ścieżka pliku musi być bezwzględna
+            process.stdin.write(f'{job_id} {os.path.abspath(command[-1])}\n')
+            process.stdin.flush()
+        except OSError:
+            # Proces zakończył się zanim przyjął zlecenie. Jego koniec zostanie odczytany poniżej jak awaria
+            pass
+
+        output = self.outputs[process]
+        lines: List[str] = []
+
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+
+            # Przy możliwym anulowaniu oczekiwanie jest dzielone na krótkie odcinki, aby szybko na nie zareagować
+            if cancel is not None:
+                remaining = 0.05 if remaining is None else min(remaining, 0.05)
+
+            try:
+                line = output.get(timeout=None if remaining is None else max(remaining, 0))
+            except queue.Empty:
+                if (deadline is None or time.monotonic() < deadline) and (cancel is None or not cancel.is_set()):
+                    continue
+
+                # Przerwanie kompilacji jednego pliku wymaga zakończenia procesu lilyponda
+                self.stop_process(process, True)
+                self.release(options, process, False)
+
+                raise subprocess.TimeoutExpired(command, timeout, stderr=''.join(lines))
+
+            if line is None:
+                # Proces zakończył się w trakcie zlecenia (np. awaria lilyponda). Kolejne zlecenie uruchomi nowy
+                self.release(options, process, False)
+
+                return process.returncode or 1, ''.join(lines)
+
+            if line.startswith(f'{self.done_marker} {job_id} '):
+                break
+
+            lines.append(line)
+
+        self.job_counts[process] += 1
+        self.release(options, process, True)
+
+        return int(line.split()[-1]), ''.join(lines)
+
+    def acquire(self, options: Tuple[str, ...], deadline: Optional[float], command: List[str],
+                timeout: Optional[float]) -> subprocess.Popen:
+        """
+        Pobierz wolny proces lilyponda dla opcji lub uruchom nowy, jeśli nie osiągnięto max_processes
+
+        Args:
+            options:    Polecenie bez pliku źródłowego
+            deadline:   Czas (time.monotonic()), do którego można czekać na wolny proces
+            command:    Polecenie zlecenia (do komunikatu o przekroczeniu czasu)
+            timeout:    Maksymalny czas kompilacji (do komunikatu o przekroczeniu czasu)
+
+        Raises:
+            subprocess.TimeoutExpired:  Gdy żaden proces nie zwolnił się przed deadline
+        """
+        with self.condition:
+            while True:
+                idle = self.idle.setdefault(options, [])
+
+                while len(idle) > 0:
+                    process = idle.pop()
+
+                    if process.poll() is None:
+                        return process
+
+                    # Proces zakończył się w czasie bezczynności, więc zostanie uruchomiony ponownie
+                    self.stop_process(process)
+                    self.forget_process(options, process)
+
+                if self.counts.get(options, 0) < self.max_processes:
+                    self.counts[options] = self.counts.get(options, 0) + 1
+                    break
+
+                remaining = None if deadline is None else deadline - time.monotonic()
+
+                if remaining is not None and remaining <= 0:
+                    raise subprocess.TimeoutExpired(command, timeout)
+
+                self.condition.wait(remaining)
+
+        try:
+            return self.start_process(list(options))
+        except Exception:
+            with self.condition:
+                self.counts[options] -= 1
+                self.condition.notify_all()
+            raise
+
+    def release(self, options: Tuple[str, ...], process: subprocess.Popen, reuse: bool):
+        """
+        Zwolnij proces po zleceniu
+
+        Args:
+            options:    Polecenie bez pliku źródłowego
+            process:    Proces lilyponda
+            reuse:      Jeśli True proces może przyjąć kolejne zlecenie (o ile nie osiągnął max_jobs)
+        """
+        if reuse and process.poll() is None and self.job_counts[process] < self.max_jobs:
+            with self.condition:
+                self.idle.setdefault(options, []).append(process)
+                self.condition.notify_all()
+            return
+
+        self.stop_process(process)
+
+        with self.condition:
+            self.forget_process(options, process)
+
+    def forget_process(self, options: Tuple[str, ...], process: subprocess.Popen):
+        """Usuń zakończony proces z liczników (wywoływane z zajętym self.condition)"""
+        self.counts[options] -= 1
+        self.outputs.pop(process, None)
+        self.job_counts.pop(process, None)
+        self.condition.notify_all()
+
+    def start_process(self, options: List[str]) -> subprocess.Popen:
+        """
+        Uruchom proces lilyponda z pętlą zleceń
+
+        Args:
+            options:    Polecenie bez pliku źródłowego
+        """
+        process = subprocess.Popen(options + ['-e', self.loop_code], stdin=subprocess.PIPE,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, errors='replace',
+                                   bufsize=1)
+
+        output: 'queue.Queue[Optional[str]]' = queue.Queue()
+        threading.Thread(target=self.read_output, args=(process, output), name='lilypond-worker-output',
+                         daemon=True).start()
+
+        with self.condition:
+            self.outputs[process] = output
+            self.job_counts[process] = 0
+            self.starts += 1
+
+        return process
+
+    @staticmethod
+    def read_output(process: subprocess.Popen, output: 'queue.Queue[Optional[str]]'):
+        """Przekazuj linie standardowego wyjścia błędów procesu do kolejki, a po zakończeniu procesu None"""
+        for line in process.stderr:
+            output.put(line)
+
+        process.wait()
+        output.put(None)
+
+    @staticmethod
+    def stop_process(process: subprocess.Popen, kill: bool = False):
+        """
+        Zakończ proces lilyponda. Zamknięcie wejścia kończy pętlę zleceń, a proces, który nie zakończył się w ciągu
+        sekundy, jest zabijany
+
+        Args:
+            process:    Proces lilyponda
+            kill:       Jeśli True proces jest zabijany od razu (np. aby przerwać trwające zlecenie)
+        """
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+
+        if process.poll() is not None:
+            return
+
+        if not kill:
+            try:
+                process.wait(1)
+                return
+            except subprocess.TimeoutExpired:
+                pass
+
+        process.kill()
+        process.wait()
+
+    # endregion
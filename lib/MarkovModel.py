@@ -0,0 +1,574 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, TYPE_CHECKING
+import numpy as np
+
+from lib.theory.Interval import Interval
+
+if TYPE_CHECKING:
+    from lib.Generator import Generator
+
+
+class MarkovModel:
+    """
+    Łańcuch Markowa rzędu N dla wysokości dźwięków.
+
+    Alfabet stanowią identyfikatory nut (numery MIDI) z przedziału [lowest, highest]. Stan to N ostatnich wysokości
+    zakodowanych jako liczba w systemie o podstawie K = highest - lowest + 1, więc przejście do kolejnego stanu to
+    state * K % K^N + next.
+
+    Przejścia przechowywane są w postaci rzadkiej (jak macierz CSR). Dla wiersza r skumulowane prawdopodobieństwa
+    zapisane są z przesunięciem r, czyli zajmują przedział (r, r + 1]. Dzięki temu losowanie kolejnych wysokości dla
+    dowolnej liczby melodii jednocześnie to jedno wywołanie np.searchsorted na wartościach row_of[state] + u.
+    Stany bez zaobserwowanych przejść korzystają z rozkładów niższego rzędu (zob. get_backoff).
+    """
+
+    def __init__(self, order: int, lowest: int, highest: int, states: Sequence[int], targets: Sequence[int],
+                 weights: Sequence[float]):
+        """
+        Args:
+            order:      Rząd łańcucha (liczba poprzednich wysokości, od których zależy kolejna)
+            lowest:     Identyfikator najniższej nuty alfabetu
+            highest:    Identyfikator najwyższej nuty alfabetu
+            states:     Stany, z których wychodzą przejścia
+            targets:    Wysokości (identyfikatory nut), do których prowadzą przejścia
+            weights:    Wagi przejść (nie muszą być znormalizowane). Powtórzone pary stan - wysokość są sumowane
+
+        Raises:
+            ValueError:     Gdy parametry są niepoprawne
+        """
+        if order < 1:
+            raise ValueError('Order has to be larger than 0')
+
+        if lowest > highest:
+            raise ValueError('Lowest note is higher than highest note')
+
+        self.order: int = order
+        self.lowest: int = lowest
+        self.highest: int = highest
+        self.size: int = highest - lowest + 1
+        self.state_count: int = self.size ** order
+
+        states = np.asarray(states, dtype=np.int64)
+        columns = np.asarray(targets, dtype=np.int64) - lowest
+        weights = np.asarray(weights, dtype=np.float64)
+
+        if np.any((states < 0) | (states >= self.state_count)) or np.any((columns < 0) | (columns >= self.size)):
+            raise ValueError('Transition is outside of the model range')
+
+        if np.any(weights < 0):
+            raise ValueError('Weights cannot be negative')
+
+        # Sumujemy powtórzone przejścia i pomijamy zerowe
+        keys, inverse = np.unique(states * self.size + columns, return_inverse=True)
+        summed = np.bincount(inverse, weights=weights, minlength=len(keys))
+        keys, summed = keys[summed > 0], summed[summed > 0]
+
+        # Wiersze 0..K^N - 1 to stany. Stany bez przejść korzystają z dodatkowych wierszy (zob. get_backoff),
+        # a row_of[s] to wiersz, z którego losowana jest wysokość następująca po stanie s
+        backoff_keys, backoff_weights, self.row_of = self.get_backoff(keys, summed)
+        keys = np.concatenate([keys, backoff_keys])
+        summed = np.concatenate([summed, backoff_weights])
+
+        order_idx = np.argsort(keys, kind='stable')
+        keys, summed = keys[order_idx], summed[order_idx]
+
+        rows = keys // self.size
+        self.row_count: int = int(rows[-1]) + 1 if len(rows) > 0 else self.state_count
+
+        # indptr[r]:indptr[r + 1] to zakres przejść wiersza r
+        self.indptr: np.ndarray = np.zeros(self.row_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=self.row_count), out=self.indptr[1:])
+
+        self.targets: np.ndarray = (keys % self.size + lowest).astype(np.int64)
+
+        # Wagi (do zapisu modelu, zob. save) i prawdopodobieństwa przejść w kolejności targets
+        self.weights: np.ndarray = summed
+
+        totals = np.bincount(rows, weights=summed, minlength=self.row_count)
+        self.probabilities: np.ndarray = summed / totals[rows]
+
+        within_row = np.cumsum(summed) - (np.cumsum(totals) - totals)[rows]
+        self.cumulative: np.ndarray = rows + within_row / totals[rows]
+
+        # Ostatnie przejście w wierszu musi kończyć się dokładnie na r + 1, niezależnie od błędów zaokrągleń
+        filled = np.nonzero(np.diff(self.indptr))[0]
+        self.cumulative[self.indptr[filled + 1] - 1] = filled + 1
+
+        # Tablice osiągalności dla kolejnych wysokości końcowych, wyznaczane przy pierwszym użyciu
+        self._reachability: Dict[int, np.ndarray] = {}
+
+    def get_backoff(self, keys: np.ndarray, weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Wyznacz przejścia dla stanów, z których nie wychodzi żadne przejście (back-off). Taki stan korzysta z rozkładu
+        dla najdłuższego zaobserwowanego sufiksu (ostatnich N - 1, N - 2, ..., 1 wysokości), a jeśli jego ostatnia
+        wysokość również nie ma przejść - z rozkładu interwałów wszystkich przejść przesuniętego do ostatniej
+        wysokości (tylko do wysokości, do których prowadzi jakieś przejście). Dopiero gdy i to nie jest możliwe,
+        stan przechodzi do najbliższej takiej wysokości.
+
+        Rozkłady niższych rzędów zapisywane są w dodatkowych wierszach (od K^N), tylko dla potrzebnych sufiksów,
+        więc pamięć zależy od liczby zaobserwowanych przejść, a nie od K^(N + 1)
+
+        Args:
+            keys:       Posortowane przejścia zakodowane jako stan * K + wysokość (względem lowest)
+            weights:    Wagi przejść
+
+        Returns:
+            Krotka (zakodowane przejścia dodatkowych wierszy, ich wagi, wiersz dla każdego stanu)
+        """
+        row_of = np.arange(self.state_count, dtype=np.int64)
+        rows, columns = keys // self.size, keys % self.size
+
+        missing = np.ones(self.state_count, dtype=bool)
+        missing[rows] = False
+        missing = np.nonzero(missing)[0]
+
+        new_keys, new_weights = [np.zeros(0, dtype=np.int64)], [np.zeros(0)]
+        next_row = self.state_count
+
+        for order in range(self.order - 1, 0, -1):
+            if len(missing) == 0:
+                break
+
+            modulus = self.size ** order
+            suffix_keys, inverse = np.unique(rows % modulus * self.size + columns, return_inverse=True)
+            suffix_weights = np.bincount(inverse, weights=weights, minlength=len(suffix_keys))
+
+            suffixes = missing % modulus
+            found = np.isin(suffixes, suffix_keys // self.size)
+            used = np.unique(suffixes[found])
+
+            selected = np.isin(suffix_keys // self.size, used)
+            new_rows = next_row + np.searchsorted(used, suffix_keys[selected] // self.size)
+            new_keys.append(new_rows * self.size + suffix_keys[selected] % self.size)
+            new_weights.append(suffix_weights[selected])
+
+            row_of[missing[found]] = next_row + np.searchsorted(used, suffixes[found])
+            next_row += len(used)
+            missing = missing[~found]
+
+        if len(missing) > 0:
+            last = np.unique(missing % self.size)
+
+            intervals, inverse = np.unique(columns - rows % self.size, return_inverse=True)
+            interval_weights = np.bincount(inverse, weights=weights, minlength=len(intervals))
+
+            # Pary (ostatnia wysokość, interwał) prowadzące do wysokości, do których prowadzi jakieś przejście
+            pair_last = np.repeat(last, len(intervals))
+            pair_targets = pair_last + np.tile(intervals, len(last))
+            pair_weights = np.tile(interval_weights, len(last))
+            valid = np.isin(pair_targets, columns)
+
+            pair_last, pair_targets, pair_weights = pair_last[valid], pair_targets[valid], pair_weights[valid]
+
+            # Z wysokości bez żadnego dozwolonego interwału przechodzimy do najbliższych wysokości, do których
+            # prowadzi jakieś przejście (lub pozostajemy na miejscu, jeśli model nie ma żadnych przejść)
+            stuck = np.setdiff1d(last, pair_last)
+            alphabet = np.unique(columns) if len(columns) > 0 else np.zeros(0, dtype=np.int64)
+
+            if len(stuck) > 0 and len(alphabet) > 0:
+                distances = np.abs(alphabet[None, :] - stuck[:, None])
+                nearest_last, nearest = np.nonzero(distances == distances.min(axis=1, keepdims=True))
+                stuck_last, stuck_targets = stuck[nearest_last], alphabet[nearest]
+            else:
+                stuck_last, stuck_targets = stuck, stuck
+
+            pair_last = np.concatenate([pair_last, stuck_last])
+            pair_targets = np.concatenate([pair_targets, stuck_targets])
+            pair_weights = np.concatenate([pair_weights, np.ones(len(stuck_last))])
+
+            order_idx = np.argsort(pair_last, kind='stable')
+            pair_last, pair_targets = pair_last[order_idx], pair_targets[order_idx]
+            pair_weights = pair_weights[order_idx]
+
+            new_keys.append((next_row + np.searchsorted(last, pair_last)) * self.size + pair_targets)
+            new_weights.append(pair_weights)
+
+            row_of[missing] = next_row + np.searchsorted(last, missing % self.size)
+
+        return np.concatenate(new_keys), np.concatenate(new_weights), row_of
+
+    # region Constructors
+
+    @staticmethod
+    def from_dense(order: int, lowest: int, counts: np.ndarray) -> 'MarkovModel':
+        """
+        Utwórz model na podstawie gęstej macierzy przejść o wymiarach (K^N, K)
+
+        Args:
+            order:      Rząd łańcucha
+            lowest:     Identyfikator najniższej nuty alfabetu
+            counts:     Macierz wag przejść
+        """
+        counts = np.asarray(counts, dtype=np.float64)
+        size = counts.shape[1]
+
+        if counts.shape[0] != size ** order:
+            raise ValueError(f'Dense matrix has to have {size ** order} rows')
+
+        states, columns = np.nonzero(counts)
+        return MarkovModel(order, lowest, lowest + size - 1, states, columns + lowest, counts[states, columns])
+
+    @staticmethod
+    def from_sequences(sequences: Iterable[Sequence[int]], order: int, lowest: int, highest: int) -> 'MarkovModel':
+        """
+        Wyznacz model na podstawie zliczeń przejść w podanych ciągach wysokości
+
+        Args:
+            sequences:  Ciągi identyfikatorów nut
+            order:      Rząd łańcucha
+            lowest:     Identyfikator najniższej nuty alfabetu
+            highest:    Identyfikator najwyższej nuty alfabetu
+        """
+        size = highest - lowest + 1
+        pairs = [np.zeros(0, dtype=np.int64)]
+
+        for sequence in sequences:
+            columns = np.asarray(sequence, dtype=np.int64) - lowest
+            if len(columns) <= order:
+                continue
+
+            # Kodowanie stanów dla wszystkich pozycji naraz
+            states = np.zeros(len(columns) - order, dtype=np.int64)
+            for i in range(order):
+                states = states * size + columns[i:len(columns) - order + i]
+
+            pairs.append(states * size + columns[order:])
+
+        # Zliczamy tylko zaobserwowane pary stan - wysokość, bez gęstej tablicy o K^(N + 1) elementach
+        keys, counts = np.unique(np.concatenate(pairs), return_counts=True)
+        return MarkovModel(order, lowest, highest, keys // size, keys % size + lowest, counts)
+
+    @staticmethod
+    def from_generator(generator: 'Generator', allowed: Optional[Sequence[int]] = None) -> 'MarkovModel':
+        """
+        Utwórz model rzędu 1 równoważny algorytmowi Generator.get_next_writeable: interwał losowany jest zgodnie
+        z intervals_probability, kierunek zgodnie z notes_probability, a wysokości spoza ambitusu są odrzucane
+
+        Args:
+            generator:  Skonfigurowany generator
+            allowed:    Opcjonalna lista dozwolonych klas wysokości (0-11). Pozostałe wysokości są odrzucane tak jak
+                        wysokości spoza ambitusu
+        """
+        lowest = generator.ambitus['lowest'].get_id()
+        highest = generator.ambitus['highest'].get_id()
+        size = highest - lowest + 1
+
+        pitches = np.arange(lowest, highest + 1)
+        notes_probability = np.asarray(generator.notes_probability, dtype=np.float64)
+
+        counts = np.zeros((size, size), dtype=np.float64)
+        rows = np.arange(size)
+
+        for probability, name in zip(generator.intervals_probability, Interval.names()):
+            if probability == 0:
+                continue
+
+            semitones = Interval.interval_semitones[name]
+            up, down = pitches + semitones, pitches - semitones
+            up_ok = up <= highest
+            down_ok = down >= lowest
+
+            if allowed is not None:
+                up_ok &= np.isin(up % 12, allowed)
+                down_ok &= np.isin(down % 12, allowed)
+
+            up_weight = notes_probability[up % 12]
+            down_weight = notes_probability[down % 12]
+            total = up_weight + down_weight
+            up_share = np.divide(up_weight, total, out=np.full(size, 0.5), where=total > 0)
+
+            share_up = np.where(up_ok & down_ok, up_share, up_ok.astype(np.float64))
+            share_down = np.where(up_ok & down_ok, 1 - up_share, down_ok.astype(np.float64))
+
+            np.add.at(counts, (rows[up_ok], up[up_ok] - lowest), probability * share_up[up_ok])
+            np.add.at(counts, (rows[down_ok], down[down_ok] - lowest), probability * share_down[down_ok])
+
+        return MarkovModel.from_dense(1, lowest, counts)
+
+    # endregion
+
+    # region States
+
+    def get_state(self, history: Sequence[int]) -> int:
+        """
+        Zakoduj ostatnie wysokości jako stan. Jeśli historia jest krótsza niż rząd modelu, uzupełniana jest
+        pierwszą wysokością
+
+        Args:
+            history:    Identyfikatory nut, od najstarszej
+        """
+        history = list(history)[-self.order:]
+        history = [history[0]] * (self.order - len(history)) + history
+
+        state = 0
+        for pitch in history:
+            if not self.lowest <= pitch <= self.highest:
+                raise ValueError(f'Note {pitch} is outside of the model range')
+
+            state = state * self.size + pitch - self.lowest
+
+        return state
+
+    def get_states(self, pitches: np.ndarray) -> np.ndarray:
+        """
+        Zakoduj stany początkowe dla wielu melodii, z których każda zaczyna się od jednej wysokości
+
+        Args:
+            pitches:    Identyfikatory nut początkowych
+        """
+        columns = np.asarray(pitches, dtype=np.int64) - self.lowest
+        states = np.zeros_like(columns)
+
+        for _ in range(self.order):
+            states = states * self.size + columns
+
+        return states
+
+    def get_last_pitches(self, states: np.ndarray) -> np.ndarray:
+        """Pobierz ostatnie wysokości zakodowane w stanach"""
+        return np.asarray(states) % self.size + self.lowest
+
+    def advance(self, states: np.ndarray, pitches: np.ndarray) -> np.ndarray:
+        """Przesuń stany o jedną wysokość"""
+        return np.asarray(states) * self.size % self.state_count + (np.asarray(pitches) - self.lowest)
+
+    # endregion
+
+    # region Sampling
+
+    def sample(self, states: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """
+        Wylosuj kolejne wysokości dla wielu stanów jednocześnie
+
+        Args:
+            states:     Tablica stanów
+            rng:        Generator liczb losowych
+
+        Returns:
+            Tablica identyfikatorów nut
+        """
+        rows = self.row_of[np.asarray(states)]
+        positions = np.searchsorted(self.cumulative, rows + rng.random(rows.shape), side='right')
+
+        return self.targets[positions]
+
+    def step(self, states: np.ndarray, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Wykonaj jeden krok łańcucha dla wielu stanów jednocześnie
+
+        Returns:
+            Krotka (wylosowane identyfikatory nut, nowe stany)
+        """
+        pitches = self.sample(states, rng)
+        return pitches, self.advance(states, pitches)
+
+    def generate(self, count: int, length: int, start: int, rng: np.random.Generator) -> np.ndarray:
+        """
+        Wygeneruj wiele ciągów wysokości naraz, krok po kroku dla wszystkich ciągów jednocześnie
+
+        Args:
+            count:  Liczba ciągów
+            length: Długość każdego ciągu (wliczając wysokość początkową)
+            start:  Identyfikator nuty początkowej
+            rng:    Generator liczb losowych
+
+        Returns:
+            Tablica o wymiarach (count, length)
+        """
+        result = np.empty((count, length), dtype=np.int64)
+        result[:, 0] = start
+
+        states = self.get_states(np.full(count, start))
+        for i in range(1, length):
+            result[:, i], states = self.step(states, rng)
+
+        return result
+
+    # endregion
+
+    # region Planning
+
+    def get_reachability(self, end: int, steps: int) -> np.ndarray:
+        """
+        Wyznacz tablicę osiągalności R o wymiarach (steps + 1, K^N). R[k, s] jest proporcjonalne do prawdopodobieństwa,
+        że łańcuch startujący ze stanu s po dokładnie k krokach znajdzie się na wysokości end (zero oznacza, że nie
+        jest to możliwe). Każdy wiersz jest przeskalowany tak, aby jego maksimum wynosiło 1.
+
+        Tablica dla danej wysokości końcowej jest zapamiętywana i przedłużana tylko wtedy, gdy potrzeba więcej kroków
+
+        Args:
+            end:    Identyfikator nuty końcowej
+            steps:  Maksymalna liczba kroków
+
+        Raises:
+            ValueError:     Gdy nuta końcowa jest poza zakresem modelu
+        """
+        if not self.lowest <= end <= self.highest:
+            raise ValueError(f'Note {end} is outside of the model range')
+
+        table = self._reachability.get(end)
+
+        if table is None or len(table) <= steps:
+            states, targets, probabilities = self.get_transitions()
+            next_states = self.advance(states, targets)
+
+            if table is None:
+                table = (self.get_last_pitches(np.arange(self.state_count)) == end).astype(np.float64)[None, :]
+
+            rows = list(table)
+            while len(rows) <= steps:
+                # R[k, s] = suma po przejściach s -> t wartości P(s -> t) * R[k - 1, t]
+                row = np.bincount(states, weights=probabilities * rows[-1][next_states], minlength=self.state_count)
+                peak = row.max()
+                rows.append(row / peak if peak > 0 else row)
+
+            table = np.array(rows)
+            self._reachability[end] = table
+
+        return table[:steps + 1]
+
+    def plan(self, state: int, end: int, steps: int, rng: np.random.Generator) -> Optional[List[int]]:
+        """
+        Wylosuj ciąg wysokości o podanej długości, który kończy się na wysokości end. Losowanie odbywa się zgodnie
+        z prawdopodobieństwami łańcucha warunkowanymi tym, że ostatnia wysokość to end
+
+        Args:
+            state:  Stan, z którego rozpoczyna się ciąg
+            end:    Identyfikator nuty końcowej
+            steps:  Długość ciągu
+            rng:    Generator liczb losowych
+
+        Returns:
+            Lista identyfikatorów nut lub None, jeśli nie da się dojść do end w dokładnie tylu krokach
+        """
+        reachability = self.get_reachability(end, steps)
+
+        if reachability[steps, state] == 0:
+            return None
+
+        pitches = []
+
+        for remaining in range(steps - 1, -1, -1):
+            row = self.row_of[state]
+            start, stop = self.indptr[row], self.indptr[row + 1]
+            targets = self.targets[start:stop]
+
+            probabilities = np.diff(self.cumulative[start:stop], prepend=row)
+            weights = probabilities * reachability[remaining, self.advance(state, targets)]
+
+            pitch = int(targets[rng.choice(len(targets), p=weights / weights.sum())])
+            state = int(self.advance(state, pitch))
+            pitches.append(pitch)
+
+        return pitches
+
+    def plan_batch(self, states: np.ndarray, end: int, steps: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """
+        Wylosuj naraz ciągi wysokości kończące się na wysokości end dla wielu stanów początkowych (zob. plan)
+
+        Args:
+            states:     Stany początkowe
+            end:        Identyfikator nuty końcowej
+            steps:      Długości ciągów (różne dla każdego stanu)
+            rng:        Generator liczb losowych
+
+        Returns:
+            Tablica o wymiarach (liczba stanów, max(steps)). Wiersz ciągu krótszego niż max(steps) jest uzupełniony
+            wartościami -1, a wiersz, dla którego dojście do end nie jest możliwe, składa się z samych -1
+        """
+        states = np.array(states, dtype=np.int64)
+        steps = np.asarray(steps, dtype=np.int64)
+        longest = int(steps.max()) if len(steps) > 0 else 0
+
+        reachability = self.get_reachability(end, longest)
+        result = np.full((len(states), longest), -1, dtype=np.int64)
+
+        valid = reachability[steps, states] > 0
+        for step in range(longest):
+            active = np.nonzero(valid & (steps > step))[0]
+            if len(active) == 0:
+                break
+
+            # Przejścia wierszy wszystkich aktywnych stanów ułożone jedno za drugim (jak w get_transitions)
+            rows = self.row_of[states[active]]
+            lengths = self.indptr[rows + 1] - self.indptr[rows]
+            offsets = np.cumsum(lengths) - lengths
+            positions = np.repeat(self.indptr[rows] - offsets, lengths) + np.arange(lengths.sum())
+
+            targets = self.targets[positions]
+            next_states = self.advance(np.repeat(states[active], lengths), targets)
+            remaining = np.repeat(steps[active] - step - 1, lengths)
+            weights = self.probabilities[positions] * reachability[remaining, next_states]
+
+            # Losowanie w obrębie każdego wiersza: u * suma wag wiersza przesunięte o sumę wag poprzednich wierszy
+            cumulative = np.cumsum(weights)
+            before = np.concatenate([[0.0], cumulative])[offsets]
+            totals = cumulative[offsets + lengths - 1] - before
+
+            choice = np.searchsorted(cumulative, before + rng.random(len(active)) * totals, side='right')
+            choice = np.minimum(choice, offsets + lengths - 1)
+
+            result[active, step] = targets[choice]
+            states[active] = next_states[choice]
+
+        return result
+
+    # endregion
+
+    # region Transitions
+
+    def get_transitions(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Zwróć wszystkie przejścia modelu (dla stanów bez zaobserwowanych przejść - przejścia z back-off)
+
+        Returns:
+            Krotka (stany, identyfikatory nut, prawdopodobieństwa)
+        """
+        states = np.arange(self.state_count)
+
+        # Przejścia stanu s to przejścia wiersza row_of[s]
+        rows = self.row_of[states]
+        lengths = self.indptr[rows + 1] - self.indptr[rows]
+        offsets = np.cumsum(lengths) - lengths
+        positions = np.repeat(self.indptr[rows] - offsets, lengths) + np.arange(lengths.sum())
+
+        return np.repeat(states, lengths), self.targets[positions], self.probabilities[positions]
+
+    def dense(self) -> np.ndarray:
+        """Zwróć gęstą macierz prawdopodobieństw przejść o wymiarach (K^N, K). Przy dużych modelach zajmuje dużo pamięci"""
+        states, targets, probabilities = self.get_transitions()
+
+        matrix = np.zeros((self.state_count, self.size), dtype=np.float64)
+        matrix[states, targets - self.lowest] = probabilities
+
+        return matrix
+
+    def save(self, filename: str):
+        """
+        Zapisz model do pliku .npz. Zapisywane są tylko zaobserwowane przejścia z wagami, więc rozmiar pliku zależy
+        od danych, a nie od liczby stanów. Przejścia z back-off są wyznaczane ponownie przy wczytywaniu
+
+        Args:
+            filename:   Ścieżka do pliku
+        """
+        rows = np.repeat(np.arange(self.row_count), np.diff(self.indptr))
+        observed = rows < self.state_count
+
+        with open(filename, 'wb') as f:
+            np.savez_compressed(f, order=self.order, lowest=self.lowest, highest=self.highest, states=rows[observed],
+                                targets=self.targets[observed], weights=self.weights[observed])
+
+    @staticmethod
+    def load(filename: str) -> 'MarkovModel':
+        """
+        Wczytaj model zapisany metodą save (również w starszym formacie z prawdopodobieństwami wszystkich przejść)
+
+        Args:
+            filename:   Ścieżka do pliku
+        """
+        with np.load(filename) as data:
+            weights = data['weights'] if 'weights' in data.files else data['probabilities']
+
+            return MarkovModel(int(data['order']), int(data['lowest']), int(data['highest']), data['states'],
+                               data['targets'], weights)
+
+    # endregion
@@ -0,0 +1,156 @@
+from typing import List, Tuple
+import struct
+
+
+class MidiReader:
+    """
+    Odczyt nut z plików Standard MIDI File (format 0 i 1).
+    Każda ścieżka zamieniana jest na listę nut (czas rozpoczęcia, długość, wysokość) posortowaną po czasie rozpoczęcia.
+    """
+
+    # Liczba bajtów danych dla zdarzeń kanałowych (klucz to starsza połowa bajtu statusu)
+    channel_event_lengths = {0x80: 2, 0x90: 2, 0xA0: 2, 0xB0: 2, 0xC0: 1, 0xD0: 1, 0xE0: 2}
+
+    def __init__(self, filename: str):
+        """
+        Args:
+            filename:   Ścieżka do pliku MIDI
+        """
+        self.filename: str = filename
+
+        # Liczba tyknięć na ćwierćnutę
+        self.ticks_per_quarter: int = 480
+
+        # Nuty każdej ścieżki w postaci (czas rozpoczęcia, długość w tyknięciach, wysokość)
+        self.tracks: List[List[Tuple[int, int, int]]] = []
+
+    @staticmethod
+    def read_variable_length(data: bytes, pos: int) -> Tuple[int, int]:
+        """
+        Odczytaj liczbę zapisaną w formacie zmiennej długości
+
+        Args:
+            data:   Dane
+            pos:    Pozycja pierwszego bajtu liczby
+
+        Returns:
+            Krotka (liczba, pozycja pierwszego bajtu za liczbą)
+        """
+        value = 0
+
+        while True:
+            byte = data[pos]
+            pos += 1
+            value = (value << 7) | (byte & 0x7F)
+
+            if byte & 0x80 == 0:
+                return value, pos
+
+    def read(self):
+        """
+        Odczytaj plik
+
+        Raises:
+            ValueError:     Gdy plik nie jest poprawnym plikiem MIDI lub korzysta z podziału czasu SMPTE
+        """
+        with open(self.filename, 'rb') as f:
+            data = f.read()
+
+        return self.parse(data)
+
+    def parse(self, data: bytes):
+        """
+        Przetwórz zawartość pliku MIDI
+
+        Args:
+            data:   Zawartość pliku
+
+        Raises:
+            ValueError:     Gdy dane nie są poprawnym plikiem MIDI lub korzystają z podziału czasu SMPTE
+        """
+        if data[:4] != b'MThd':
+            raise ValueError('Not a MIDI file')
+
+        length, _, track_count, division = struct.unpack('>IHHH', data[4:14])
+
+        if division & 0x8000:
+            raise ValueError('SMPTE time division is not supported')
+
+        self.ticks_per_quarter = division
+        self.tracks = []
+
+        pos = 8 + length
+        while pos + 8 <= len(data) and len(self.tracks) < track_count:
+            chunk_type = data[pos:pos + 4]
+            chunk_length = struct.unpack('>I', data[pos + 4:pos + 8])[0]
+            pos += 8
+
+            # Nieznane fragmenty należy pominąć
+            if chunk_type == b'MTrk':
+                self.tracks.append(self.parse_track(data[pos:pos + chunk_length]))
+
+            pos += chunk_length
+
+        return self
+
+    def parse_track(self, data: bytes) -> List[Tuple[int, int, int]]:
+        """
+        Przetwórz zawartość jednej ścieżki
+
+        Args:
+            data:   Zawartość fragmentu MTrk
+
+        Returns:
+            Lista nut (czas rozpoczęcia, długość, wysokość) posortowana po czasie rozpoczęcia
+        """
+        notes = []
+
+        # Rozpoczęte nuty: (kanał, wysokość) -> czas rozpoczęcia
+        pending = {}
+
+        time = 0
+        pos = 0
+        status = 0
+
+        while pos < len(data):
+            delta, pos = self.read_variable_length(data, pos)
+            time += delta
+
+            # Meta zdarzenia i SysEx pomijamy
+            if data[pos] == 0xFF:
+                length, pos = self.read_variable_length(data, pos + 2)
+                pos += length
+                continue
+
+            if data[pos] in [0xF0, 0xF7]:
+                length, pos = self.read_variable_length(data, pos + 1)
+                pos += length
+                continue
+
+            # Bajt statusu może zostać pominięty, jeśli jest taki sam jak w poprzednim zdarzeniu (running status)
+            if data[pos] & 0x80:
+                status = data[pos]
+                pos += 1
+
+            event_type, channel = status & 0xF0, status & 0x0F
+            if event_type not in self.channel_event_lengths:
+                raise ValueError('Invalid MIDI event')
+
+            params = data[pos:pos + self.channel_event_lengths[event_type]]
+            pos += len(params)
+
+            if event_type == 0x90 and params[1] > 0:
+                # Ponowne rozpoczęcie tej samej nuty kończy poprzednią
+                if (channel, params[0]) in pending:
+                    start = pending[(channel, params[0])]
+                    notes.append((start, time - start, params[0]))
+
+                pending[(channel, params[0])] = time
+            elif event_type == 0x80 or event_type == 0x90:
+                start = pending.pop((channel, params[0]), None)
+                if start is not None:
+                    notes.append((start, time - start, params[0]))
+
+        notes.sort()
+
+        return notes
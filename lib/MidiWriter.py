@@ -0,0 +1,219 @@
+from typing import List, Optional, Tuple, Union
+import os
+import struct
+
+from lib.Generator import Generator
+from lib.theory.Note import Note
+from lib.theory.NoteModifier import NoteModifier
+from lib.theory.Tuplet import Tuplet
+from lib.theory.Writeable import Writeable
+
+
+class MidiWriter:
+    """Zapis melodii do pliku Standard MIDI File (format 0, jedna ścieżka) bez korzystania z lilyponda"""
+
+    # Liczba tyknięć na ćwierćnutę
+    ticks_per_quarter: int = 480
+
+    def __init__(self, filename: str, tempo: int = 120, velocity: int = 90):
+        """
+        Args:
+            filename:   Nazwa pliku (bez rozszerzenia)
+            tempo:      Tempo w ćwierćnutach na minutę
+            velocity:   Głośność nut (0-127)
+        """
+        self.filename: str = filename
+        self.tempo: int = tempo
+        self.velocity: int = velocity
+        self.metre: Tuple[int, int] = (4, 4)
+
+        # Zdarzenia ścieżki w postaci (czas bezwzględny w tyknięciach, bajty zdarzenia)
+        self.events: List[Tuple[int, bytes]] = []
+
+        self.output_dir = 'output/compiled'
+
+    # region Utils
+
+    @staticmethod
+    def get_variable_length(value: int) -> bytes:
+        """
+        Zakoduj liczbę w formacie zmiennej długości używanym w plikach MIDI
+
+        Args:
+            value:  Liczba nieujemna
+        """
+        data = [value & 0x7F]
+        value >>= 7
+
+        while value > 0:
+            data.append((value & 0x7F) | 0x80)
+            value >>= 7
+
+        return bytes(reversed(data))
+
+    @staticmethod
+    def get_ticks(elem: Writeable, ticks_per_quarter: Optional[int] = None) -> int:
+        """
+        Pobierz długość elementu wyrażoną w tyknięciach
+
+        Args:
+            elem:               Nuta, pauza lub grupa niemiarowa
+            ticks_per_quarter:  Liczba tyknięć na ćwierćnutę. Domyślnie MidiWriter.ticks_per_quarter
+        """
+        if ticks_per_quarter is None:
+            ticks_per_quarter = MidiWriter.ticks_per_quarter
+
+        return elem.get_duration(64) * ticks_per_quarter // 16
+
+    def set_resolution(self, tuplets: List[Tuplet]):
+        """
+        Zwiększ liczbę tyknięć na ćwierćnutę do najmniejszej wielokrotności, przy której nuty wszystkich grup
+        niemiarowych mają całkowite długości. Czasy dodanych już zdarzeń są przeliczane
+
+        Args:
+            tuplets:    Grupy niemiarowe
+
+        Raises:
+            ValueError:     Gdy wymagana rozdzielczość przekracza zakres pliku MIDI
+        """
+        resolution = Tuplet.get_resolution(self.ticks_per_quarter * 4, tuplets) // 4
+
+        if resolution > 0x7FFF:
+            raise ValueError('Tuplets require too high MIDI resolution')
+
+        if resolution != self.ticks_per_quarter:
+            factor = resolution // self.ticks_per_quarter
+            self.events = [(time * factor, event) for time, event in self.events]
+            self.ticks_per_quarter = resolution
+
+    # endregion
+
+    def set_output_dir(self, output_dir: str):
+        """
+        Ustaw folder na pliki MIDI
+
+        Args:
+            output_dir:     Ścieżka do folderu
+        """
+        self.output_dir = output_dir.rstrip('/')
+
+    def parse(self, data: Union[List[Writeable], List[List[Writeable]]], channel: int = 0):
+        """
+        Przetwórz melodię (listę elementów lub listę taktów) na zdarzenia MIDI.
+        Nuty połączone łukiem są zamieniane na jedną, dłuższą nutę. Jeśli melodia zawiera grupy niemiarowe, liczba
+        tyknięć na ćwierćnutę jest zwiększana (zob. set_resolution).
+
+        Args:
+            data:       Melodia
+            channel:    Kanał MIDI (0-15)
+        """
+        elements: List[Writeable] = [elem for bar in data for elem in bar] \
+            if len(data) > 0 and isinstance(data[0], list) else list(data)
+
+        tuplets = [elem for elem in elements if isinstance(elem, Tuplet)]
+        if len(tuplets) > 0:
+            self.set_resolution(tuplets)
+
+        # Elementy grup niemiarowych są rozwijane wraz z ich długościami w tyknięciach
+        timed: List[Tuple[Writeable, int]] = []
+        for elem in elements:
+            if isinstance(elem, Tuplet):
+                timed.extend(zip(elem.elements, elem.get_ticks(self.ticks_per_quarter * 4)))
+            else:
+                timed.append((elem, self.get_ticks(elem, self.ticks_per_quarter)))
+
+        time = 0
+        pending: Optional[Tuple[int, int]] = None   # (wysokość, czas rozpoczęcia)
+        tied = False
+
+        for elem, duration in timed:
+            if isinstance(elem, Note):
+                pitch = elem.get_id()
+
+                # Kontynuacja nuty połączonej łukiem
+                if not (tied and pending is not None and pending[0] == pitch):
+                    if pending is not None:
+                        self.note_off(pending[0], time, channel)
+
+                    self.note_on(pitch, time, channel)
+                    pending = (pitch, time)
+
+                tied = NoteModifier.TIE in elem.modifiers
+            else:
+                if pending is not None:
+                    self.note_off(pending[0], time, channel)
+                    pending = None
+
+                tied = False
+
+            time += duration
+
+        if pending is not None:
+            self.note_off(pending[0], time, channel)
+
+        return self
+
+    def from_generator(self, generator: Generator, seed: Optional[int] = None):
+        """
+        Przetwórz dane z generatora
+
+        Args:
+            generator:  Skonfigurowany generator
+            seed:       Ziarno generatora liczb losowych
+        """
+        self.events = []
+        self.ticks_per_quarter = MidiWriter.ticks_per_quarter
+        self.metre = generator.metre
+
+        return self.parse(generator.generate(seed=seed))
+
+    def from_voices(self, voices: List[List[List[Writeable]]], metre: Tuple[int, int]):
+        """
+        Przetwórz kilka głosów granych jednocześnie. Każdy głos trafia na osobny kanał MIDI
+
+        Args:
+            voices: Lista głosów (np. wynik PolyphonicGenerator.generate)
+            metre:  Metrum
+        """
+        self.events = []
+        self.ticks_per_quarter = MidiWriter.ticks_per_quarter
+        self.metre = metre
+
+        for channel, voice in enumerate(voices):
+            self.parse(voice, channel)
+
+        return self
+
+    def note_on(self, pitch: int, time: int, channel: int = 0):
+        """Dodaj zdarzenie rozpoczęcia nuty"""
+        self.events.append((time, bytes([0x90 | channel, pitch, self.velocity])))
+
+    def note_off(self, pitch: int, time: int, channel: int = 0):
+        """Dodaj zdarzenie zakończenia nuty"""
+        self.events.append((time, bytes([0x80 | channel, pitch, 0])))
+
+    def to_bytes(self) -> bytes:
+        """Zwróć zawartość pliku MIDI"""
+        # Meta zdarzenia: tempo (mikrosekundy na ćwierćnutę) i metrum
+        microseconds = 60_000_000 // self.tempo
+        track = b'\x00\xFF\x51\x03' + microseconds.to_bytes(3, 'big')
+        track += b'\x00\xFF\x58\x04' + bytes([self.metre[0], self.metre[1].bit_length() - 1, 24, 8])
+
+        # Sortowanie jest stabilne, więc zakończenia nut zostają przed rozpoczęciami w tym samym czasie
+        previous_time = 0
+        for time, event in sorted(self.events, key=lambda item: item[0]):
+            track += self.get_variable_length(time - previous_time) + event
+            previous_time = time
+
+        track += b'\x00\xFF\x2F\x00'
+
+        header = b'MThd' + struct.pack('>IHHH', 6, 0, 1, self.ticks_per_quarter)
+        return header + b'MTrk' + struct.pack('>I', len(track)) + track
+
+    def export(self):
+        """Wyeksportuj dane do pliku MIDI"""
+        if not os.path.isdir(self.output_dir):
+            os.makedirs(self.output_dir, exist_ok=True)
+
+        with open(f'{self.output_dir}/{self.filename}.mid', 'wb') as f:
+            f.write(self.to_bytes())
@@ -0,0 +1,354 @@
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, TextIO, Tuple
+from xml.sax.saxutils import XMLGenerator
+import math
+import os
+
+from lib.Writer import Writer
+from lib.theory.Note import Note
+from lib.theory.NoteModifier import NoteModifier
+from lib.theory.OctaveType import OctaveType
+from lib.theory.Tuplet import Tuplet
+from lib.theory.Writeable import Writeable
+
+if TYPE_CHECKING:
+    from lib.Generator import Generator
+    from lib.Key import Key
+    from lib.PolyphonicGenerator import PolyphonicGenerator
+
+
+class MusicXmlWriter:
+    """
+    Zapis pogrupowanych taktów (np. wyniku Generator.generate(group=True)) do pliku MusicXML (score-partwise).
+
+    Dokument zapisywany jest na bieżąco przez XMLGenerator, takt po takcie, bez budowania drzewa DOM. Takty mogą być
+    podane jako dowolny iterator, więc zużycie pamięci nie zależy od długości partytury. Klucze zmieniane są tak samo
+    jak w Writer (zob. Writer.get_bar_clef), a każdy głos zapisywany jest jako osobna partia.
+    """
+
+    doctype: str = '<!DOCTYPE score-partwise PUBLIC "-//Recordare//DTD MusicXML 3.1 Partwise//EN" ' \
+                   '"http://www.musicxml.org/dtds/partwise.dtd">'
+
+    # Nazwy wartości rytmicznych
+    note_types: Dict[int, str] = {1: 'whole', 2: 'half', 4: 'quarter', 8: 'eighth', 16: '16th', 32: '32nd', 64: '64th'}
+
+    # Klucze lilypond -> (znak, linia)
+    clef_signs: Dict[str, Tuple[str, int]] = {'G': ('G', 2), 'F': ('F', 4)}
+
+    # Liczba tyknięć na całą nutę bez grup niemiarowych (długości liczone są w sześćdziesięcioczwórkach, jak w
+    # MidiWriter.get_ticks)
+    ticks_per_whole: int = 64
+
+    def __init__(self, filename: str):
+        """
+        Args:
+            filename:   Nazwa pliku (bez rozszerzenia)
+        """
+        self.filename: str = filename
+        self.output_dir = 'output/compiled'
+
+        # Zakresy dla kluczy (zob. Writer.default_clef_ranges)
+        self.clef_ranges: Dict[str, Tuple[Note, Note]] = dict(Writer.default_clef_ranges)
+
+        self.generator: Optional[XMLGenerator] = None
+        self.depth: int = 0
+
+    def set_output_dir(self, output_dir: str):
+        """
+        Ustaw folder na pliki wynikowe
+
+        Args:
+            output_dir:     Ścieżka do folderu
+        """
+        self.output_dir = output_dir.rstrip('/')
+
+    def get_path(self) -> str:
+        """Pobierz ścieżkę do pliku wynikowego"""
+        return f'{self.output_dir}/{self.filename}.musicxml'
+
+    # region XML utils
+
+    def start(self, name: str, attrs: Optional[Dict[str, str]] = None):
+        """Otwórz element w nowej linii"""
+        self.generator.ignorableWhitespace('\n' + '  ' * self.depth)
+        self.generator.startElement(name, attrs or {})
+        self.depth += 1
+
+    def end(self, name: str):
+        """Zamknij element otwarty przez start"""
+        self.depth -= 1
+        self.generator.ignorableWhitespace('\n' + '  ' * self.depth)
+        self.generator.endElement(name)
+
+    def leaf(self, name: str, text: Optional[str] = None, attrs: Optional[Dict[str, str]] = None):
+        """Dodaj element bez elementów potomnych"""
+        self.generator.ignorableWhitespace('\n' + '  ' * self.depth)
+        self.generator.startElement(name, attrs or {})
+
+        if text is not None:
+            self.generator.characters(text)
+
+        self.generator.endElement(name)
+
+    # endregion
+
+    # region Conversion utils
+
+    @staticmethod
+    def get_fifths(key: 'Key') -> int:
+        """Pobierz liczbę znaków przykluczowych tonacji (dodatnia dla krzyżyków, ujemna dla bemoli)"""
+        return sum(name.count('is') - name.count('es') for name in key.degree_names)
+
+    @classmethod
+    def get_resolution(cls, bar: List[Writeable]) -> int:
+        """Wyznacz liczbę tyknięć na całą nutę, przy której wszystkie elementy taktu mają całkowite długości"""
+        return Tuplet.get_resolution(cls.ticks_per_whole, [elem for elem in bar if isinstance(elem, Tuplet)])
+
+    # endregion
+
+    def write(self, stream: TextIO, voices: List[Iterable[List[Writeable]]], metre: Tuple[int, int],
+              key: Optional['Key'] = None):
+        """
+        Zapisz kompletny dokument MusicXML
+
+        Args:
+            stream:     Strumień tekstowy, do którego zapisywany jest dokument
+            voices:     Głosy, od najwyższego. Każdy głos to lista lub iterator taktów
+            metre:      Metrum
+            key:        Opcjonalna tonacja
+        """
+        self.generator = XMLGenerator(stream, 'utf-8', short_empty_elements=True)
+        self.depth = 0
+
+        self.generator.startDocument()
+        stream.write(self.doctype)
+
+        self.start('score-partwise', {'version': '3.1'})
+        self.start('part-list')
+
+        for i in range(len(voices)):
+            self.start('score-part', {'id': f'P{i + 1}'})
+            self.leaf('part-name', 'Melody' if len(voices) == 1 else f'Voice {i + 1}')
+            self.end('score-part')
+
+        self.end('part-list')
+
+        for i, bars in enumerate(voices):
+            self.start('part', {'id': f'P{i + 1}'})
+            self.write_part(bars, metre, key)
+            self.end('part')
+
+        self.end('score-partwise')
+        self.generator.endDocument()
+        stream.write('\n')
+
+    def write_part(self, bars: Iterable[List[Writeable]], metre: Tuple[int, int], key: Optional['Key'] = None):
+        """
+        Zapisz takty jednej partii. Takty są pobierane z iteratora na bieżąco, a zapisywany jest zawsze takt
+        poprzedni, aby ostatni takt mógł zostać zakończony podwójną kreską taktową
+
+        Args:
+            bars:   Takty
+            metre:  Metrum
+            key:    Opcjonalna tonacja
+        """
+        ticks_per_whole = self.ticks_per_whole
+        previous_clef = None
+        tied = False
+        bar_iterator = iter(bars)
+        bar = next(bar_iterator, None)
+        number = 1
+
+        while bar is not None:
+            next_bar = next(bar_iterator, None)
+
+            # Liczbę tyknięć zwiększamy tylko wtedy, gdy grupa niemiarowa tego wymaga
+            resolution = self.get_resolution(bar)
+            divisions_changed = ticks_per_whole % resolution != 0
+            if divisions_changed:
+                ticks_per_whole = ticks_per_whole * resolution // math.gcd(ticks_per_whole, resolution)
+
+            clef = self.get_clef(bar, previous_clef, number == 1)
+
+            self.start('measure', {'number': str(number)})
+
+            if number == 1 or divisions_changed or clef is not None:
+                self.start('attributes')
+
+                if number == 1 or divisions_changed:
+                    self.leaf('divisions', str(ticks_per_whole // 4))
+
+                if number == 1:
+                    if key is not None:
+                        self.start('key')
+                        self.leaf('fifths', str(self.get_fifths(key)))
+                        self.leaf('mode', key.key_type.value)
+                        self.end('key')
+
+                    self.start('time')
+                    self.leaf('beats', str(metre[0]))
+                    self.leaf('beat-type', str(metre[1]))
+                    self.end('time')
+
+                if clef is not None:
+                    sign, line = self.clef_signs[clef]
+                    self.start('clef')
+                    self.leaf('sign', sign)
+                    self.leaf('line', str(line))
+                    self.end('clef')
+
+                    previous_clef = clef
+
+                self.end('attributes')
+
+            for elem in bar:
+                if isinstance(elem, Tuplet):
+                    ticks = elem.get_ticks(ticks_per_whole)
+
+                    for i, (inner, inner_ticks) in enumerate(zip(elem.elements, ticks)):
+                        position = 'start' if i == 0 else 'stop' if i == len(ticks) - 1 else None
+                        tied = self.write_element(inner, inner_ticks, tied, elem, position)
+                else:
+                    tied = self.write_element(elem, elem.get_duration(64) * ticks_per_whole // 64, tied)
+
+            if next_bar is None:
+                self.start('barline', {'location': 'right'})
+                self.leaf('bar-style', 'light-heavy')
+                self.end('barline')
+
+            self.end('measure')
+
+            bar = next_bar
+            number += 1
+
+    def get_clef(self, bar: List[Writeable], previous_clef: Optional[str], first: bool) -> Optional[str]:
+        """
+        Wybierz klucz na początek taktu tak jak Writer.parse. Pierwszy takt zawsze ma klucz (bez nut - wiolinowy)
+
+        Returns:
+            Nowy klucz lub None, jeśli klucz się nie zmienia
+        """
+        clef = Writer.get_bar_clef(bar, self.clef_ranges, previous_clef)
+
+        if clef is None and first:
+            return 'G'
+
+        return clef
+
+    def write_element(self, elem: Writeable, ticks: int, tied: bool, tuplet: Optional[Tuplet] = None,
+                      tuplet_position: Optional[str] = None) -> bool:
+        """
+        Zapisz nutę lub pauzę
+
+        Args:
+            elem:               Nuta lub pauza
+            ticks:              Długość elementu w tyknięciach
+            tied:               Czy poprzednia nuta jest połączona łukiem z tym elementem
+            tuplet:             Grupa niemiarowa, do której należy element
+            tuplet_position:    'start' lub 'stop' dla pierwszego i ostatniego elementu grupy
+
+        Returns:
+            Czy element jest połączony łukiem z następnym
+        """
+        is_note = isinstance(elem, Note)
+        tie_start = is_note and NoteModifier.TIE in elem.modifiers
+        tie_stop = is_note and tied
+        ties = (['stop'] if tie_stop else []) + (['start'] if tie_start else [])
+
+        self.start('note')
+
+        if is_note:
+            self.start('pitch')
+            self.leaf('step', elem.get_base_note().upper())
+
+            if elem.get_accidentals_value() != 0:
+                self.leaf('alter', str(elem.get_accidentals_value()))
+
+            self.leaf('octave', str(OctaveType.get_id(elem.octave) - 1))
+            self.end('pitch')
+        else:
+            self.leaf('rest')
+
+        self.leaf('duration', str(ticks))
+
+        for tie in ties:
+            self.leaf('tie', attrs={'type': tie})
+
+        self.leaf('voice', '1')
+        self.leaf('type', self.note_types[elem.base_duration])
+
+        # Nuty i pauzy mają osobne typy modyfikatorów, więc porównujemy nazwy
+        modifier_names = [mod.name for mod in elem.modifiers]
+        for _ in range(2 if 'DOUBLE_DOT' in modifier_names else 1 if 'DOT' in modifier_names else 0):
+            self.leaf('dot')
+
+        if tuplet is not None:
+            self.start('time-modification')
+            self.leaf('actual-notes', str(tuplet.numerator))
+            self.leaf('normal-notes', str(tuplet.denominator))
+            self.end('time-modification')
+
+        if len(ties) > 0 or tuplet_position is not None:
+            self.start('notations')
+
+            for tie in ties:
+                self.leaf('tied', attrs={'type': tie})
+
+            if tuplet_position is not None:
+                self.leaf('tuplet', attrs={'type': tuplet_position})
+
+            self.end('notations')
+
+        self.end('note')
+
+        return tie_start
+
+    # region Export
+
+    def export(self, bars: Iterable[List[Writeable]], metre: Tuple[int, int], key: Optional['Key'] = None):
+        """
+        Zapisz jednogłosową melodię do pliku
+
+        Args:
+            bars:   Takty (lista lub iterator)
+            metre:  Metrum
+            key:    Opcjonalna tonacja
+        """
+        self.export_voices([bars], metre, key)
+
+    def export_voices(self, voices: List[Iterable[List[Writeable]]], metre: Tuple[int, int],
+                      key: Optional['Key'] = None):
+        """
+        Zapisz kilka głosów do pliku, każdy jako osobną partię
+
+        Args:
+            voices:     Głosy, od najwyższego
+            metre:      Metrum
+            key:        Opcjonalna tonacja
+        """
+        if not os.path.isdir(self.output_dir):
+            os.makedirs(self.output_dir, exist_ok=True)
+
+        with open(self.get_path(), 'w', encoding='utf-8') as f:
+            self.write(f, voices, metre, key)
+
+    def from_generator(self, generator: 'Generator', seed: Optional[int] = None):
+        """
+        Wygeneruj melodię i zapisz ją do pliku
+
+        Args:
+            generator:  Skonfigurowany generator
+            seed:       Ziarno generatora liczb losowych
+        """
+        self.export(generator.generate(group=True, seed=seed), generator.metre, generator.key)
+
+    def from_polyphonic_generator(self, generator: 'PolyphonicGenerator', seed: Optional[int] = None):
+        """
+        Wygeneruj głosy generatora wielogłosowego i zapisz je do pliku
+
+        Args:
+            generator:  Skonfigurowany generator wielogłosowy
+            seed:       Ziarno generatora liczb losowych
+        """
+        self.export_voices(generator.generate(group=True, seed=seed), generator.metre, generator.voices[0].key)
+
+    # endregion
@@ -0,0 +1,173 @@
+from typing import Any, Dict, List, Optional, TextIO, Union
+import json
+
+from lib.theory.Note import Note
+from lib.theory.NoteModifier import NoteModifier
+from lib.theory.Rest import Rest
+from lib.theory.RestModifier import RestModifier
+from lib.theory.Tuplet import Tuplet
+from lib.theory.Writeable import Writeable
+
+
+class NdjsonWriter:
+    """
+    Zapis wielu melodii w formacie NDJSON (jeden obiekt JSON w linii), przeznaczony do przekazywania melodii innym
+    programom przez potok.
+
+    Pierwsza linia to nagłówek: {"format": "melodies", "version": 1, "settings": {...}, "seed": ...}, a każda kolejna
+    to jedna melodia: {"seed": ..., "bars": [[element, ...], ...]}. Elementy zapisywane są jako krótkie tablice:
+        nuta:               [wysokość w notacji lilypond (np. "cis'"), wartość rytmiczna, liczba kropek, łuk (0/1)]
+        pauza:              ["r", wartość rytmiczna, liczba kropek]
+        grupa niemiarowa:   [numerator, denominator, [element, ...]]
+
+    Linie są gromadzone w buforze i zapisywane do strumienia dopiero po przekroczeniu buffer_size znaków, więc liczba
+    wywołań write nie zależy od liczby melodii.
+    """
+
+    format: str = 'melodies'
+    version: int = 1
+
+    # Liczba znaków gromadzonych przed zapisem do strumienia
+    buffer_size: int = 1 << 16
+
+    # Kodowanie bez zbędnych spacji
+    encoder: json.JSONEncoder = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False)
+
+    dots: Dict[Any, int] = {
+        NoteModifier.DOT: 1,
+        NoteModifier.DOUBLE_DOT: 2,
+        RestModifier.DOT: 1,
+        RestModifier.DOUBLE_DOT: 2
+    }
+
+    def __init__(self, output: Union[str, TextIO], settings: Optional[Dict[str, Any]] = None,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            output:     Ścieżka do pliku wynikowego lub otwarty strumień tekstowy (np. sys.stdout)
+            settings:   Ustawienia generatora (format Generator.to_dict()) zapisywane w nagłówku
+            seed:       Ziarno bazowe zapisywane w nagłówku
+        """
+        self.output: Union[str, TextIO] = output
+        self.settings: Optional[Dict[str, Any]] = settings
+        self.seed: Optional[int] = seed
+
+        self.stream: Optional[TextIO] = None
+        self.buffer: List[str] = []
+        self.buffered: int = 0
+        self.count: int = 0
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def open(self):
+        """Otwórz plik (jeśli podano ścieżkę) i zapisz nagłówek"""
+        self.stream = open(self.output, 'w', encoding='utf-8') if isinstance(self.output, str) else self.output
+        self.buffer = []
+        self.buffered = 0
+        self.count = 0
+
+        self.write_line(self.encoder.encode({
+            'format': self.format, 'version': self.version, 'settings': self.settings, 'seed': self.seed
+        }))
+
+        return self
+
+    def close(self):
+        """Zapisz zawartość bufora i zamknij plik. Strumień przekazany z zewnątrz jest jedynie opróżniany"""
+        if self.stream is None:
+            return
+
+        self.flush()
+
+        if isinstance(self.output, str):
+            self.stream.close()
+        else:
+            self.stream.flush()
+
+        self.stream = None
+
+    def flush(self):
+        """Zapisz zawartość bufora do strumienia"""
+        if len(self.buffer) > 0:
+            self.stream.write(''.join(self.buffer))
+            self.buffer = []
+            self.buffered = 0
+
+    def write_line(self, line: str):
+        """Dodaj do bufora gotową linię (bez znaku nowej linii), np. wynik encode"""
+        self.buffer.append(line + '\n')
+        self.buffered += len(line) + 1
+
+        if self.buffered >= self.buffer_size:
+            self.flush()
+
+    def add(self, bars: List[List[Writeable]], seed: Optional[int] = None):
+        """
+        Dodaj melodię
+
+        Args:
+            bars:   Takty melodii
+            seed:   Ziarno, z którym wygenerowano melodię
+        """
+        return self.add_lines([self.encode(bars, seed)])
+
+    def add_lines(self, lines: List[str]):
+        """Dodaj melodie zamienione wcześniej na linie przez encode (np. w procesie roboczym)"""
+        for line in lines:
+            self.write_line(line)
+
+        self.count += len(lines)
+
+        return self
+
+    # region Encoding
+
+    @classmethod
+    def get_element(cls, elem: Writeable) -> list:
+        """Zamień nutę, pauzę lub grupę niemiarową na tablicę (zob. opis klasy)"""
+        if isinstance(elem, Tuplet):
+            return [elem.numerator, elem.denominator, [cls.get_element(inner) for inner in elem.elements]]
+
+        dots = sum(cls.dots.get(mod, 0) for mod in elem.modifiers)
+
+        if isinstance(elem, Note):
+            return [elem.note + elem.octave.value, elem.base_duration, dots, int(NoteModifier.TIE in elem.modifiers)]
+
+        return ['r', elem.base_duration, dots]
+
+    @classmethod
+    def encode(cls, bars: List[List[Writeable]], seed: Optional[int] = None) -> str:
+        """Zamień melodię na linię NDJSON (bez znaku nowej linii)"""
+        return cls.encoder.encode({'seed': seed, 'bars': [[cls.get_element(elem) for elem in bar] for bar in bars]})
+
+    @classmethod
+    def get_writeable(cls, data: list) -> Writeable:
+        """Odtwórz nutę, pauzę lub grupę niemiarową z tablicy zapisanej przez get_element"""
+        if isinstance(data[0], int):
+            return Tuplet(data[0], data[1], [cls.get_writeable(inner) for inner in data[2]])
+
+        if data[0] == 'r':
+            return Rest(data[1], [RestModifier('.' * data[2])] if data[2] > 0 else None)
+
+        return Note.parse(f'{data[0]}{data[1]}{"." * data[2]}{"~" if data[3] else ""}')
+
+    @classmethod
+    def to_bars(cls, line: Union[str, Dict[str, Any]]) -> List[List[Writeable]]:
+        """
+        Odtwórz takty z linii melodii (lub z już zdekodowanego obiektu)
+
+        Raises:
+            ValueError:     Gdy linia nie jest melodią (np. jest nagłówkiem)
+        """
+        data = json.loads(line) if isinstance(line, str) else line
+
+        if 'bars' not in data:
+            raise ValueError('Line does not contain a melody')
+
+        return [[cls.get_writeable(elem) for elem in bar] for bar in data['bars']]
+
+    # endregion
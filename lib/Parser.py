@@ -0,0 +1,292 @@
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+import re
+
+from lib.Key import Key
+from lib.KeyType import KeyType
+from lib.theory.Note import Note
+from lib.theory.NoteModifier import NoteModifier
+from lib.theory.OctaveType import OctaveType
+from lib.theory.Rest import Rest
+from lib.theory.RestModifier import RestModifier
+from lib.theory.Tuplet import Tuplet
+from lib.theory.Writeable import Writeable
+
+
+class Parser:
+    """
+    Odczyt plików lilypond zapisanych przez Writer (zapis bezwzględny wysokości).
+
+    Obsługiwany jest podzbiór notacji, którego używa Writer: \\time, \\key, \\clef, nuty i pauzy z oktawami,
+    wartościami rytmicznymi, kropkami i łukami, grupy niemiarowe (\\tuplet), kreski taktowe oraz kilka głosów
+    (\\new Staff, \\new Voice). Bloki \\paper, \\layout, \\midi i \\header są pomijane. Pominięta wartość rytmiczna
+    oznacza wartość poprzedniego elementu.
+
+    Plik czytany jest linia po linii jednym wyrażeniem regularnym, a takty zwracane są na bieżąco (iter_bars), więc
+    zużycie pamięci nie zależy od długości pliku.
+    """
+
+    # Wszystkie rodzaje tokenów w jednym wyrażeniu. Nuta lub pauza nie może być częścią dłuższego słowa ani komendy
+    token_regex = re.compile(r'''
+        (?P<comment>%.*$)
+        | (?P<string>"(?:[^"\\]|\\.)*")
+        | (?P<command>\\[A-Za-z]+)
+        | (?P<fraction>\d+/\d+)
+        | (?P<element>(?<![\w\\#-])(r|as(?:es)?|es(?:es)?|[a-g](?:is|es)*)([',]*)(\d+)?(\.{0,2})(~?)(?![\w\\]))
+        | (?P<bar>\|)
+        | (?P<open>\{|<<)
+        | (?P<close>\}|>>)
+        | (?P<word>[A-Za-z]+)
+        | (?P<other>\S)
+    ''', re.VERBOSE)
+
+    # Bloki, które nie zawierają nut
+    skipped_blocks = {'\\paper', '\\layout', '\\midi', '\\header'}
+
+    # Komendy, po których następuje argument (odczytywany przez parser lub pomijany)
+    commands_with_argument = {'\\time', '\\clef', '\\key', '\\bar', '\\tuplet', '\\version', '\\new'}
+
+    octaves = {octave.value: octave for octave in OctaveType}
+    note_dots = {'.': [NoteModifier.DOT], '..': [NoteModifier.DOUBLE_DOT], '': []}
+    rest_dots = {'.': [RestModifier.DOT], '..': [RestModifier.DOUBLE_DOT], '': []}
+
+    def __init__(self, filename: str):
+        """
+        Args:
+            filename:   Ścieżka do pliku lilypond
+        """
+        self.filename: str = filename
+
+        # Metrum, tonacja (ostatnie odczytane) i takty kolejnych głosów
+        self.metre: Optional[Tuple[int, int]] = None
+        self.key: Optional[Key] = None
+        self.voices: List[List[List[Writeable]]] = []
+
+        # Zmiany klucza w postaci (głos, numer taktu, klucz)
+        self.clefs: List[Tuple[int, int, str]] = []
+
+    @property
+    def bars(self) -> List[List[Writeable]]:
+        """Takty pierwszego głosu"""
+        return self.voices[0] if len(self.voices) > 0 else []
+
+    def read(self):
+        """
+        Odczytaj cały plik
+
+        Raises:
+            ValueError:     Gdy plik zawiera niepoprawne nuty lub niezamknięte bloki
+        """
+        with open(self.filename) as f:
+            return self.parse(f)
+
+    def parse(self, lines: Iterable[str]):
+        """
+        Przetwórz treść pliku lilypond i zapisz takty w self.voices
+
+        Args:
+            lines:  Kolejne linie pliku
+
+        Raises:
+            ValueError:     Gdy dane zawierają niepoprawne nuty lub niezamknięte bloki
+        """
+        self.voices = []
+        self.clefs = []
+
+        for voice, bar in self.iter_bars(lines):
+            while len(self.voices) <= voice:
+                self.voices.append([])
+
+            self.voices[voice].append(bar)
+
+        return self
+
+    def iter_bars(self, lines: Iterable[str]) -> Iterator[Tuple[int, List[Writeable]]]:
+        """
+        Przetwarzaj treść pliku lilypond, zwracając każdy takt zaraz po jego odczytaniu
+
+        Args:
+            lines:  Kolejne linie pliku
+
+        Returns:
+            Krotki (numer głosu, takt)
+
+        Raises:
+            ValueError:     Gdy dane zawierają niepoprawne nuty lub niezamknięte bloki
+        """
+        # Stos otwartych bloków: 'tuplet' lub numer głosu (None, dopóki blok nie zawiera nut)
+        blocks: List[Union[None, int, str]] = []
+        voice_count = 0
+
+        # Komenda oczekująca na argument, np. \time przed 3/4
+        pending: Optional[str] = None
+        key_tonic = ''
+
+        bar: List[Writeable] = []
+        bar_count = 0
+        tuplet: List[Writeable] = []
+        tuplet_ratio = (0, 0)
+        duration = 4
+
+        for kind, match in self.tokenize(lines):
+            text = match.group(kind)
+
+            if pending is not None:
+                argument, pending = pending, None
+
+                if argument == '\\time' and kind == 'fraction':
+                    n, m = text.split('/')
+                    self.metre = (int(n), int(m))
+                    continue
+
+                if argument == '\\clef' and kind in ('word', 'string', 'element'):
+                    # Klucz przed pierwszą nutą bloku dotyczy głosu, który dopiero się zaczyna
+                    if blocks and isinstance(blocks[-1], int):
+                        self.clefs.append((blocks[-1], bar_count, text.strip('"')))
+                    else:
+                        self.clefs.append((voice_count, 0, text.strip('"')))
+                    continue
+
+                if argument == '\\key' and kind == 'element':
+                    pending, key_tonic = '\\key-type', Note.get_full_name(match.group(6))
+                    continue
+
+                if argument == '\\key-type' and kind == 'command':
+                    self.key = Key(key_tonic, KeyType(text[1:]))
+                    continue
+
+                if argument == '\\tuplet' and kind == 'fraction':
+                    numerator, denominator = text.split('/')
+                    tuplet_ratio = (int(numerator), int(denominator))
+                    pending = '\\tuplet-block'
+                    continue
+
+                if argument == '\\tuplet-block' and kind == 'open':
+                    blocks.append('tuplet')
+                    tuplet = []
+                    continue
+
+                # \bar "|." kończy takt, a argumenty pozostałych komend (\version, \new) są pomijane
+                if argument in ('\\bar', '\\version', '\\new') and kind in ('string', 'word'):
+                    if argument == '\\bar' and len(bar) > 0:
+                        yield self.get_voice(blocks), bar
+                        bar, bar_count = [], bar_count + 1
+                    continue
+
+                raise ValueError(f'Invalid argument {text} of {argument}')
+
+            if kind == 'element':
+                if blocks and blocks[-1] is None:
+                    blocks[-1] = voice_count
+                    voice_count += 1
+                    bar_count = 0
+
+                name, octave, length, dots, tie = match.group(6, 7, 8, 9, 10)
+                if length is not None:
+                    duration = int(length)
+
+                elem = self.get_element(name, octave, duration, dots, tie)
+
+                if blocks and blocks[-1] == 'tuplet':
+                    tuplet.append(elem)
+                else:
+                    bar.append(elem)
+            elif kind == 'bar':
+                if len(bar) > 0:
+                    yield self.get_voice(blocks), bar
+                    bar, bar_count = [], bar_count + 1
+            elif kind == 'command':
+                if text in self.commands_with_argument:
+                    pending = text
+            elif kind == 'open':
+                blocks.append(None)
+            elif kind == 'close':
+                if len(blocks) == 0:
+                    raise ValueError('Unexpected end of block')
+
+                block = blocks.pop()
+
+                if block == 'tuplet':
+                    if len(tuplet) == 0:
+                        raise ValueError('Empty tuplet')
+
+                    bar.append(Tuplet(tuplet_ratio[0], tuplet_ratio[1], tuplet))
+                    tuplet = []
+                elif isinstance(block, int) and len(bar) > 0:
+                    # Koniec głosu kończy również niezamknięty kreską takt
+                    yield block, bar
+                    bar = []
+
+        if len(blocks) > 0:
+            raise ValueError('Unclosed block')
+
+    @classmethod
+    def tokenize(cls, lines: Iterable[str], strict: bool = True) -> Iterator[Tuple[str, 're.Match']]:
+        """
+        Podziel treść pliku lilypond na tokeny, pomijając komentarze oraz bloki bez nut (skipped_blocks)
+
+        Args:
+            lines:  Kolejne linie pliku
+            strict: Jeśli False niezamknięty pomijany blok nie jest błędem
+
+        Returns:
+            Krotki (rodzaj tokenu - nazwa grupy token_regex, dopasowanie)
+
+        Raises:
+            ValueError:     Gdy pomijany blok nie jest zamknięty
+        """
+        skip_depth = 0
+        pending_block = False
+
+        for line in lines:
+            for match in cls.token_regex.finditer(line):
+                kind = match.lastgroup
+
+                if kind == 'comment':
+                    continue
+
+                # Bloki bez nut pomijamy w całości, licząc jedynie nawiasy
+                if skip_depth > 0:
+                    if kind == 'open':
+                        skip_depth += 1
+                    elif kind == 'close':
+                        skip_depth -= 1
+                    continue
+
+                if pending_block and kind == 'open':
+                    skip_depth, pending_block = 1, False
+                    continue
+
+                pending_block = kind == 'command' and match.group(kind) in cls.skipped_blocks
+
+                if not pending_block:
+                    yield kind, match
+
+        if strict and skip_depth > 0:
+            raise ValueError('Unclosed block')
+
+    @staticmethod
+    def get_voice(blocks: List[Union[None, int, str]]) -> int:
+        """Pobierz numer głosu najbardziej zagnieżdżonego bloku z nutami"""
+        for block in reversed(blocks):
+            if isinstance(block, int):
+                return block
+
+        return 0
+
+    @classmethod
+    def get_element(cls, name: str, octave: str, duration: int, dots: str, tie: str) -> Writeable:
+        """
+        Utwórz nutę lub pauzę na podstawie części tokenu
+
+        Raises:
+            ValueError:     Gdy wartość rytmiczna lub oktawa są niepoprawne
+        """
+        if octave not in cls.octaves:
+            raise ValueError(f'Octave {octave} is not supported')
+
+        if name == 'r':
+            return Rest(duration, cls.rest_dots[dots])
+
+        modifiers = cls.note_dots[dots] + ([NoteModifier.TIE] if tie else [])
+
+        return Note(Note.get_full_name(name), cls.octaves[octave], duration, modifiers)
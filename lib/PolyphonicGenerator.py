@@ -0,0 +1,162 @@
+from concurrent.futures import Executor
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from lib.Generator import Generator
+
+# Tablice granic grup głównych w takcie (wynik Generator.get_partition)
+Partition = Tuple[Tuple[bool, ...], Tuple[int, ...]]
+
+
+def _generate_voice(generator: Generator, seed: Optional[int], partition: Optional[Tuple[int, Partition]] = None) \
+        -> List:
+    """
+    Wygeneruj jeden głos. Funkcja modułu, aby mogła zostać wykonana w procesie roboczym
+
+    Args:
+        generator:  Generator głosu
+        seed:       Ziarno generatora liczb losowych
+        partition:  Wspólna długość taktu i tablice granic grup (zob. Generator.get_partition). Jeśli podano, głos
+                    jest dzielony na takty i grupowany według nich
+    """
+    data = generator.generate(seed=seed)
+
+    if partition is None:
+        return data
+
+    bar_duration, boundaries = partition
+
+    return generator.group_bars(generator.split_to_bars(data, bar_duration=bar_duration), boundaries)
+
+
+class PolyphonicGenerator:
+    """
+    Generowanie kilku głosów (np. melodii i basu) o wspólnym metrum i liczbie taktów.
+
+    Każdy głos ma własny generator (ambitus, prawdopodobieństwa, ograniczenia), a podział na takty i grupowanie
+    odbywa się na wspólnej siatce rytmicznej, więc takty wszystkich głosów mają tę samą długość i podział na grupy.
+    Głosy są od siebie niezależne, dlatego mogą być generowane równolegle w osobnych procesach.
+    """
+
+    # Dozwolona liczba głosów
+    min_voices: int = 1
+    max_voices: int = 4
+
+    def __init__(self, voices: List[Generator]):
+        """
+        Args:
+            voices:     Generatory kolejnych głosów, od najwyższego
+
+        Raises:
+            ValueError:     Gdy liczba głosów jest niepoprawna lub głosy nie mają wspólnej siatki rytmicznej
+                            (zob. check_voices)
+        """
+        if not self.min_voices <= len(voices) <= self.max_voices:
+            raise ValueError(f'Number of voices has to be between {self.min_voices} and {self.max_voices}')
+
+        self.voices: List[Generator] = voices
+
+        self.check_voices()
+
+    def check_voices(self):
+        """
+        Sprawdź czy głosy mają wspólną siatkę rytmiczną: metrum, liczbę taktów, podział taktu na grupy i najkrótszą
+        wartość rytmiczną
+
+        Raises:
+            ValueError:     Gdy głosy różnią się którymś z tych ustawień
+        """
+        first = self.voices[0]
+
+        for voice in self.voices[1:]:
+            if voice.metre != first.metre or voice.bar_count != first.bar_count:
+                raise ValueError('All voices have to share metre and bar count')
+
+            if voice.get_bar_parts() != first.get_bar_parts():
+                raise ValueError('All voices have to share grouping')
+
+            if voice.shortest_note_duration != first.shortest_note_duration:
+                raise ValueError('All voices have to share shortest note duration')
+
+    def get_partition(self) -> Tuple[int, Partition]:
+        """Wyznacz wspólną dla wszystkich głosów długość taktu i tablice granic grup (zob. Generator.get_partition)"""
+        return self.voices[0].get_bar_duration(), self.voices[0].get_partition()
+
+    @property
+    def metre(self) -> Tuple[int, int]:
+        """Wspólne metrum głosów"""
+        return self.voices[0].metre
+
+    def set_metre(self, n: int, m: int):
+        """
+        Ustaw metrum wszystkich głosów
+
+        Args:
+            n:  Liczba nut
+            m:  Wartość rytmiczna nut
+        """
+        for voice in self.voices:
+            voice.set_metre(n, m)
+
+        return self
+
+    def set_bar_count(self, bar_count: int):
+        """
+        Ustaw liczbę taktów wszystkich głosów
+
+        Args:
+            bar_count:  Liczba taktów
+        """
+        for voice in self.voices:
+            voice.set_bar_count(bar_count)
+
+        return self
+
+    def get_seeds(self, seed: Optional[int]) -> List[Optional[int]]:
+        """
+        Wyznacz niezależne ziarna dla każdego głosu
+
+        Args:
+            seed:   Ziarno bazowe. Jeśli nie podano, każdy głos jest losowy
+        """
+        if seed is None:
+            return [None] * len(self.voices)
+
+        return [int(child.generate_state(1)[0]) for child in np.random.SeedSequence(seed).spawn(len(self.voices))]
+
+    def generate(self, group: bool = True, seed: Optional[int] = None, executor: Optional[Executor] = None) \
+            -> List[List]:
+        """
+        Wygeneruj wszystkie głosy
+
+        Args:
+            group:      Jeżeli True to każdy głos będzie pogrupowany i rozbity na takty
+            seed:       Ziarno generatora liczb losowych. Wynik nie zależy od tego, czy głosy są generowane równolegle
+            executor:   Opcjonalna pula (np. ProcessPoolExecutor), w której głosy są generowane równolegle. Pulę warto
+                        utworzyć raz i używać jej dla wielu wywołań
+
+        Returns:
+            Lista głosów. Każdy głos to lista taktów (lub lista elementów, jeśli group jest False)
+
+        Raises:
+            ValueError:     Gdy głosy zostały zmienione tak, że nie mają wspólnej siatki rytmicznej
+        """
+        self.check_voices()
+
+        seeds = self.get_seeds(seed)
+
+        # Podział na takty i grupy wyznaczany jest raz i przekazywany wszystkim głosom
+        partition = self.get_partition() if group else None
+
+        if executor is None:
+            return [
+                _generate_voice(voice, voice_seed, partition) for voice, voice_seed in zip(self.voices, seeds)
+            ]
+
+        futures = [
+            executor.submit(_generate_voice, voice, voice_seed, partition)
+            for voice, voice_seed in zip(self.voices, seeds)
+        ]
+
+        return [future.result() for future in futures]
@@ -0,0 +1,259 @@
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Set, Tuple
+import json
+import multiprocessing
+import threading
+
+from lib.Generator import Generator
+from lib.MidiWriter import MidiWriter
+from lib.Writer import Writer
+
+
+# region Worker
+
+# Obsługiwane formaty odpowiedzi wraz z nagłówkiem Content-Type
+output_formats: Dict[str, str] = {
+    'lilypond': 'text/x-lilypond; charset=utf-8',
+    'midi': 'audio/midi',
+    'json': 'application/json'
+}
+
+
+@lru_cache(maxsize=64)
+def _get_generator(settings: str) -> Generator:
+    """
+    Pobierz skonfigurowany generator dla podanych ustawień. Generatory są przechowywane w procesie roboczym, więc
+    kolejne zapytania o tych samych ustawieniach pomijają walidację i tworzenie obiektów
+
+    Args:
+        settings:   Ustawienia w postaci JSON z posortowanymi kluczami
+    """
+    return Generator.from_dict(json.loads(settings))
+
+
+def _init_worker():
+    """Rozgrzej proces roboczy: zaimportuj numpy i wygeneruj krótką melodię z domyślnymi ustawieniami"""
+    _get_generator(json.dumps({}, sort_keys=True)).generate(group=True, seed=0)
+
+
+def _render(settings: str, seed: Optional[int], output_format: str) -> bytes:
+    """
+    Wygeneruj melodię w procesie roboczym i zwróć ją w wybranym formacie
+
+    Args:
+        settings:       Ustawienia generatora w postaci JSON z posortowanymi kluczami
+        seed:           Ziarno generatora liczb losowych
+        output_format:  Jeden z kluczy output_formats
+    """
+    generator = _get_generator(settings)
+
+    if output_format == 'midi':
+        return MidiWriter('generated').from_generator(generator, seed=seed).to_bytes()
+
+    if output_format == 'json':
+        bars = generator.generate(group=True, seed=seed)
+        return json.dumps({'bars': [[str(elem) for elem in bar] for bar in bars]}).encode()
+
+    writer = Writer('generated')
+    writer.from_generator(generator, seed=seed)
+    return '\n'.join(writer.lines).encode()
+
+# endregion
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    server: 'GeneratorServer'
+
+    def log_message(self, format: str, *args: Any):
+        if not self.server.quiet:
+            super().log_message(format, *args)  # pragma: no cover
+
+    def send(self, status: int, body: bytes, content_type: str = 'application/json'):
+        """Wyślij odpowiedź HTTP"""
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_error_json(self, status: int, message: str):
+        """Wyślij odpowiedź z błędem w formacie JSON"""
+        self.send(status, json.dumps({'error': message}).encode())
+
+    def do_GET(self):
+        if self.path == '/health':
+            self.send(200, b'{"status": "ok"}')
+        else:
+            self.send_error_json(404, 'Not found')
+
+    def do_POST(self):
+        if self.path != '/generate':
+            self.send_error_json(404, 'Not found')
+            return
+
+        length = int(self.headers.get('Content-Length', 0))
+        if length > self.server.max_body_size:
+            self.send_error_json(413, 'Request body is too large')
+            return
+
+        try:
+            settings, seed, output_format = self.server.parse_request_body(self.rfile.read(length))
+        except Exception as e:
+            self.send_error_json(400, getattr(e, 'message', str(e)))
+            return
+
+        status, body = self.server.render(settings, seed, output_format)
+
+        if status == 200:
+            self.send(status, body, output_formats[output_format])
+        else:
+            self.send(status, body)
+
+
+class GeneratorServer(ThreadingHTTPServer):
+    """
+    Lekki serwer HTTP generujący melodie.
+
+    Zapytanie POST /generate przyjmuje JSON {"settings": {...}, "seed": 1, "format": "lilypond" | "midi" | "json"},
+    gdzie settings ma format Generator.to_dict(). Generowanie odbywa się w puli rozgrzanych procesów roboczych.
+    """
+
+    daemon_threads = True
+
+    # Limity rozmiaru generowanej melodii: liczba taktów i liczba miar w takcie
+    max_bar_count: int = 512
+    max_beats: int = 32
+
+    # Maksymalny rozmiar treści zapytania w bajtach
+    max_body_size: int = 1 << 16
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8000, workers: int = 2, max_pending: int = 16,
+                 timeout: float = 30.0, quiet: bool = False):
+        """
+        Args:
+            host:           Adres, na którym nasłuchuje serwer
+            port:           Port (0 oznacza dowolny wolny port)
+            workers:        Liczba procesów roboczych
+            max_pending:    Maksymalna liczba jednocześnie obsługiwanych zapytań. Kolejne dostają odpowiedź 503
+            timeout:        Maksymalny czas generowania w sekundach. Po jego przekroczeniu zwracana jest odpowiedź 504
+            quiet:          Jeśli True, zapytania nie są logowane
+        """
+        super().__init__((host, port), _RequestHandler)
+
+        self.timeout_seconds: float = timeout
+        self.quiet: bool = quiet
+        self.slots = threading.BoundedSemaphore(max_pending)
+
+        # Zadania zajmujące miejsce w limicie max_pending
+        self.pending: Set[Future] = set()
+
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker
+        )
+
+        # Procesy robocze są uruchamiane leniwie, więc wymuszamy ich start zanim pojawi się pierwsze zapytanie
+        for future in [self.executor.submit(_render, '{}', 0, 'json') for _ in range(workers)]:
+            future.result()
+
+    @classmethod
+    def parse_request_body(cls, body: bytes) -> Tuple[str, Optional[int], str]:
+        """
+        Odczytaj i zwaliduj treść zapytania. Walidacja tworzy osobny generator, więc nie wpływa na inne zapytania
+
+        Returns:
+            Krotka (ustawienia jako JSON z posortowanymi kluczami, ziarno, format)
+
+        Raises:
+            ValueError:     Gdy zapytanie jest niepoprawne lub opisuje zbyt długą melodię
+        """
+        request = json.loads(body or b'{}')
+        if not isinstance(request, dict):
+            raise ValueError('Request body has to be a JSON object')
+
+        output_format = request.get('format', 'lilypond')
+        if output_format not in output_formats:
+            raise ValueError(f'Format is not supported. Choose from {", ".join(output_formats.keys())}')
+
+        seed = request.get('seed')
+        if seed is not None and not isinstance(seed, int):
+            raise ValueError('Seed has to be an integer')
+
+        settings = request.get('settings', {})
+        if not isinstance(settings, dict):
+            raise ValueError('Settings have to be a JSON object')
+
+        cls.validate_settings(settings)
+
+        return json.dumps(settings, sort_keys=True), seed, output_format
+
+    @staticmethod
+    def is_integer(value: Any) -> bool:
+        """Sprawdź czy wartość z JSON-a jest liczbą całkowitą (true i false nie są)"""
+        return isinstance(value, int) and not isinstance(value, bool)
+
+    @classmethod
+    def validate_settings(cls, settings: Dict[str, Any]):
+        """
+        Zwaliduj ustawienia generatora przed wysłaniem ich do procesu roboczego
+
+        Args:
+            settings:   Ustawienia w formacie Generator.to_dict()
+
+        Raises:
+            ValueError:                 Gdy liczba taktów lub metrum są niepoprawne albo melodia byłaby dłuższa niż
+                                        pozwalają limity serwera
+            InvalidBaseNoteDuration:    Gdy shortest_note_duration jest niepoprawne
+        """
+        # bool jest podklasą int, więc true/false z JSON-a trzeba odrzucić osobno
+        bar_count = settings.get('bar_count', 1)
+        if not cls.is_integer(bar_count) or not 1 <= bar_count <= cls.max_bar_count:
+            raise ValueError(f'Bar count has to be an integer between 1 and {cls.max_bar_count}')
+
+        metre = settings.get('metre', [4, 4])
+        if not isinstance(metre, list) or len(metre) != 2 or not all(cls.is_integer(item) for item in metre) \
+                or not 1 <= metre[0] <= cls.max_beats:
+            raise ValueError(f'Metre has to be a pair of integers with 1 to {cls.max_beats} beats')
+
+        Generator.from_dict(settings)
+
+    def render(self, settings: str, seed: Optional[int], output_format: str) -> Tuple[int, bytes]:
+        """
+        Zleć wygenerowanie melodii procesowi roboczemu.
+        Miejsce w limicie max_pending jest zwalniane dopiero po zakończeniu zadania, również gdy odpowiedź 504
+        została już wysłana, bo zadania działającego w procesie roboczym nie da się anulować
+
+        Returns:
+            Krotka (kod odpowiedzi HTTP, treść odpowiedzi)
+        """
+        if not self.slots.acquire(blocking=False):
+            return 503, json.dumps({'error': 'Too many requests'}).encode()
+
+        try:
+            future = self.executor.submit(_render, settings, seed, output_format)
+        except Exception:
+            self.slots.release()
+            raise
+
+        self.pending.add(future)
+        future.add_done_callback(self.finish)
+
+        try:
+            return 200, future.result(timeout=self.timeout_seconds)
+        except FutureTimeoutError:
+            future.cancel()
+            return 504, json.dumps({'error': 'Generation timed out'}).encode()
+        except Exception as e:
+            return 500, json.dumps({'error': getattr(e, 'message', str(e))}).encode()
+
+    def finish(self, future: Future):
+        """Zwolnij miejsce zajmowane przez zakończone (lub anulowane) zadanie"""
+        self.pending.discard(future)
+        self.slots.release()
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=False, cancel_futures=True)
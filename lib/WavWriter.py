@@ -0,0 +1,204 @@
+from typing import BinaryIO, List, Optional, Tuple, Union
+import os
+import wave
+
+import numpy as np
+
+from lib.Generator import Generator
+from lib.MidiWriter import MidiWriter
+from lib.theory.Writeable import Writeable
+
+
+class WavWriter:
+    """
+    Synteza melodii do pliku WAV (PCM 16 bit, mono) bez zewnętrznych programów.
+
+    Czasy nut wyznaczane są tak jak w MidiWriter (tyknięcia, łuki łączą nuty, grupy niemiarowe zwiększają
+    rozdzielczość), a wysokości na podstawie Note.get_id(). Każda nuta to suma kilku harmonicznych z obwiednią ADSR.
+    Cała melodia syntetyzowana jest jednym przebiegiem operacji na tablicach numpy: próbki wszystkich nut liczone są
+    naraz, a następnie sumowane w buforze wyjściowym przez np.bincount.
+    """
+
+    # Amplitudy kolejnych harmonicznych
+    harmonics: List[float] = [1.0, 0.5, 0.25, 0.125]
+
+    # Obwiednia: narastanie, opadanie i wybrzmiewanie w sekundach oraz poziom podtrzymania
+    attack: float = 0.01
+    decay: float = 0.1
+    sustain: float = 0.6
+    release: float = 0.05
+
+    def __init__(self, filename: str, tempo: int = 120, sample_rate: int = 44100, volume: float = 0.8):
+        """
+        Args:
+            filename:       Nazwa pliku (bez rozszerzenia)
+            tempo:          Tempo w ćwierćnutach na minutę
+            sample_rate:    Częstotliwość próbkowania w Hz
+            volume:         Maksymalna amplituda sygnału (0-1)
+        """
+        self.filename: str = filename
+        self.tempo: int = tempo
+        self.sample_rate: int = sample_rate
+        self.volume: float = volume
+
+        # Zdarzenia nut zbierane są przez MidiWriter, więc oba formaty mają identyczne czasy
+        self.midi: MidiWriter = MidiWriter(filename, tempo)
+
+        self.output_dir = 'output/compiled'
+
+    def set_output_dir(self, output_dir: str):
+        """
+        Ustaw folder na pliki WAV
+
+        Args:
+            output_dir:     Ścieżka do folderu
+        """
+        self.output_dir = output_dir.rstrip('/')
+
+    # region Parsing
+
+    def parse(self, data: Union[List[Writeable], List[List[Writeable]]], channel: int = 0):
+        """
+        Przetwórz melodię (listę elementów lub listę taktów). Kolejne wywołania z innymi kanałami dodają głosy
+        grane jednocześnie
+
+        Args:
+            data:       Melodia
+            channel:    Numer głosu (0-15)
+        """
+        self.midi.parse(data, channel)
+
+        return self
+
+    def from_generator(self, generator: Generator, seed: Optional[int] = None):
+        """
+        Przetwórz dane z generatora
+
+        Args:
+            generator:  Skonfigurowany generator
+            seed:       Ziarno generatora liczb losowych
+        """
+        self.midi.from_generator(generator, seed)
+
+        return self
+
+    def from_voices(self, voices: List[List[List[Writeable]]], metre: Tuple[int, int]):
+        """
+        Przetwórz kilka głosów granych jednocześnie
+
+        Args:
+            voices: Lista głosów (np. wynik PolyphonicGenerator.generate)
+            metre:  Metrum
+        """
+        self.midi.from_voices(voices, metre)
+
+        return self
+
+    def get_notes(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Pobierz nuty w postaci tablic: identyfikatory nut (numery MIDI), początki i końce w tyknięciach
+        """
+        pitches, starts, ends = [], [], []
+        started = {}
+
+        # Zdarzenia głosu są dodawane w kolejności czasu, a zakończenie nuty zawsze poprzedza kolejne rozpoczęcie
+        for time, event in self.midi.events:
+            key = (event[0] & 0x0F, event[1])
+
+            if event[0] & 0xF0 == 0x90:
+                started[key] = time
+            else:
+                pitches.append(event[1])
+                starts.append(started.pop(key))
+                ends.append(time)
+
+        return np.array(pitches, dtype=np.int64), np.array(starts, dtype=np.int64), np.array(ends, dtype=np.int64)
+
+    # endregion
+
+    # region Synthesis
+
+    def get_samples_per_tick(self) -> float:
+        """Pobierz liczbę próbek przypadającą na jedno tyknięcie"""
+        return self.sample_rate * 60 / (self.tempo * self.midi.ticks_per_quarter)
+
+    def synthesize(self) -> np.ndarray:
+        """
+        Wygeneruj sygnał całej melodii
+
+        Returns:
+            Próbki w zakresie [-volume, volume] (float64)
+        """
+        pitches, starts, ends = self.get_notes()
+
+        if len(pitches) == 0:
+            return np.zeros(0)
+
+        samples_per_tick = self.get_samples_per_tick()
+        start_samples = np.round(starts * samples_per_tick).astype(np.int64)
+        lengths = np.round(ends * samples_per_tick).astype(np.int64) - start_samples
+
+        # Dla każdej próbki wszystkich nut: numer nuty i czas od początku nuty (w próbkach)
+        note_idx = np.repeat(np.arange(len(pitches)), lengths)
+        offsets = np.cumsum(lengths) - lengths
+        t = np.arange(note_idx.size) - offsets[note_idx]
+
+        frequencies = 440.0 * 2.0 ** ((pitches - 69) / 12)
+        phase = 2 * np.pi * frequencies[note_idx] * t / self.sample_rate
+
+        signal = np.zeros(note_idx.size)
+        for number, amplitude in enumerate(self.harmonics, 1):
+            signal += amplitude * np.sin(number * phase)
+
+        signal *= self.get_envelope(t, lengths[note_idx]) / sum(self.harmonics)
+
+        output = np.bincount(start_samples[note_idx] + t, weights=signal,
+                             minlength=int(np.round(ends.max() * samples_per_tick)))
+
+        peak = np.abs(output).max()
+
+        return output * (self.volume / peak) if peak > 1 else output * self.volume
+
+    def get_envelope(self, t: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+        """
+        Wyznacz obwiednię ADSR dla próbek
+
+        Args:
+            t:          Czas od początku nuty w próbkach
+            lengths:    Długość nuty w próbkach (dla każdej próbki)
+        """
+        attack = max(self.attack * self.sample_rate, 1)
+        decay = max(self.decay * self.sample_rate, 1)
+
+        # Wybrzmiewanie mieści się w nucie i nie zajmuje więcej niż połowy krótkich nut
+        release = np.maximum(np.minimum(self.release * self.sample_rate, lengths / 2), 1)
+
+        envelope = np.minimum(t / attack, 1.0)
+        envelope *= self.sustain + (1 - self.sustain) * np.exp(-np.maximum(t - attack, 0) / decay)
+        envelope *= np.clip((lengths - t) / release, 0.0, 1.0)
+
+        return envelope
+
+    # endregion
+
+    def write(self, file: Union[str, BinaryIO]):
+        """
+        Zapisz sygnał jako plik WAV
+
+        Args:
+            file:   Ścieżka lub plik otwarty w trybie binarnym
+        """
+        pcm = np.round(self.synthesize() * 32767).astype('<i2')
+
+        with wave.open(file, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(pcm.tobytes())
+
+    def export(self):
+        """Wyeksportuj dane do pliku WAV"""
+        if not os.path.isdir(self.output_dir):
+            os.makedirs(self.output_dir, exist_ok=True)
+
+        self.write(f'{self.output_dir}/{self.filename}.wav')
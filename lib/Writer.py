@@ -1,14 +1,51 @@
-from typing import List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
+from weakref import WeakKeyDictionary
 import os
+import threading
+import time
 
-from lib import Generator
 from lib.theory import Note, OctaveType
 from lib.BarType import BarType
+from lib.CompileBackend import CompileBackend
+from lib.CompileResult import CompileResult
 from lib.KeyType import KeyType
 from lib.theory.Writeable import Writeable
 
+# Generator (a wraz z nim numpy) oraz asyncio są potrzebne tylko w niektórych metodach, więc nie importujemy ich
+# przy imporcie modułu
+if TYPE_CHECKING:
+    import asyncio
+    from concurrent.futures import Executor
+    from lib.Generator import Generator
+    from lib.Key import Key
+    from lib.PolyphonicGenerator import PolyphonicGenerator
+
 
 class Writer:
+    # Maksymalna liczba procesów lilyponda uruchomionych jednocześnie przez compile_async
+    max_concurrent_compilations: int = os.cpu_count() or 1
+    _compile_semaphores: 'WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]' = WeakKeyDictionary()
+
+    # Łączne metryki kompilacji wszystkich obiektów Writer w procesie (zob. get_compile_metrics)
+    _compile_metrics: Dict[str, float] = {
+        'count': 0, 'failures': 0, 'warnings': 0, 'total_duration': 0.0, 'max_duration': 0.0
+    }
+    _compile_metrics_lock: threading.Lock = threading.Lock()
+
+    # Domyślny sposób uruchamiania lilyponda przez compile dla nowych obiektów (zob. compile_backend)
+    default_compile_backend: CompileBackend = CompileBackend()
+
+    # Formaty plików, które może utworzyć compile
+    compile_formats: List[str] = ['pdf', 'png', 'ps', 'svg']
+
+    # Zakresy dla kluczy.
+    # Cały zakres nutowy [Note('c', OctaveType.DOUBLE_CONTRA), Note('b', OctaveType.LINE_6)] powinien być
+    # Obsłużony
+    default_clef_ranges: Dict[str, Tuple[Note, Note]] = {
+        'F': (Note('c', OctaveType.DOUBLE_CONTRA), Note('f', OctaveType.SMALL)),
+        'G': (Note('fis', OctaveType.SMALL), Note('b', OctaveType.LINE_6))
+    }
+
     def __init__(self, filename: str):
         self.filename: str = filename
         self.lines: List[str] = []
@@ -16,13 +53,20 @@ class Writer:
         self.source_dir = 'output/source'
         self.compiled_dir = 'output/compiled'
 
-        # Zakresy dla kluczy.
-        # Cały zakres nutowy [Note('c', OctaveType.DOUBLE_CONTRA), Note('b', OctaveType.LINE_6)] powinien być
-        # Obsłużony
-        self.clef_ranges = {
-            'F': (Note('c', OctaveType.DOUBLE_CONTRA), Note('f', OctaveType.SMALL)),
-            'G': (Note('fis', OctaveType.SMALL), Note('b', OctaveType.LINE_6))
-        }
+        # Ścieżka do programu lilypond
+        self.lilypond: str = 'lilypond'
+
+        # Sposób uruchamiania lilyponda przez compile (np. LilypondWorker)
+        self.compile_backend: CompileBackend = self.default_compile_backend
+
+        # Backend lilyponda (np. 'cairo'). None oznacza wybór na podstawie formatów (zob. get_backend)
+        self.backend: Optional[str] = None
+
+        # Zakresy dla kluczy (zob. default_clef_ranges)
+        self.clef_ranges: Dict[str, Tuple[Note, Note]] = dict(self.default_clef_ranges)
+
+        # Przyrostki nazw plików wynikowych dla from_book ze split=True (zob. get_output_paths)
+        self.book_suffixes: List[str] = []
 
     # region Data appending utils
 
@@ -192,10 +236,80 @@ class Writer:
         f.write(content)
         f.close()
 
-    def compile(self, ext: str = 'pdf'):
-        """Kompiluj plik źródłowy do wybranego rodzaju pliku"""
-        if ext not in ['pdf', 'png', 'ps']:
-            raise AttributeError('Extension is not supported. Choose from pdf, png or ps')
+    @staticmethod
+    def get_formats(ext: Union[str, List[str]]) -> List[str]:
+        """Zamień rozszerzenie lub listę rozszerzeń (również rozdzielonych przecinkami) na listę formatów"""
+        formats = ext.split(',') if isinstance(ext, str) else list(ext)
+
+        return list(dict.fromkeys(formats))
+
+    def get_backend(self, formats: List[str]) -> Optional[str]:
+        """
+        Wybierz backend lilyponda dla formatów. Domyślny backend (ps) tworzy pdf, png i ps, backend svg tylko svg,
+        a cairo (lilypond 2.25+) wszystkie formaty naraz
+
+        Returns:
+            Nazwa backendu lub None dla domyślnego
+        """
+        if self.backend is not None:
+            return self.backend
+
+        if 'svg' not in formats:
+            return None
+
+        return 'svg' if formats == ['svg'] else 'cairo'
+
+    def get_compile_command(self, ext: Union[str, List[str]] = 'pdf', crop: bool = False, preview: bool = False,
+                            pages: bool = True, resolution: Optional[int] = None) -> List[str]:
+        """
+        Pobierz polecenie uruchamiające lilyponda w postaci listy argumentów. Wszystkie formaty tworzone są jednym
+        uruchomieniem lilyponda
+
+        Args:
+            ext:        Rozszerzenie pliku wynikowego lub lista rozszerzeń (np. ['pdf', 'png', 'svg'])
+            crop:       Jeśli True lilypond utworzy również pliki przycięte do nut ({filename}.cropped.{ext})
+            preview:    Jeśli True lilypond utworzy również podgląd pierwszego systemu ({filename}.preview.{ext})
+            pages:      Jeśli False pełne strony nie są tworzone (np. gdy potrzebne są tylko miniatury)
+            resolution: Rozdzielczość plików png w dpi
+        """
+        formats = self.get_formats(ext)
+        backend = self.get_backend(formats)
+
+        command = [self.lilypond]
+
+        if backend is not None:
+            command.append(f'-dbackend={backend}')
+
+        command.append(f'--format={",".join(formats)}')
+
+        if crop:
+            command.append('-dcrop')
+
+        if preview:
+            command.append('-dpreview')
+
+        if not pages:
+            command.append('-dno-print-pages')
+
+        if resolution is not None:
+            command.append(f'-dresolution={resolution}')
+
+        return command + ['-o', self.compiled_dir, f'{self.source_dir}/{self.filename}.ly']
+
+    def prepare_compile(self, ext: Union[str, List[str]]):
+        """
+        Sprawdź czy plik może zostać skompilowany i utwórz folder na pliki docelowe
+
+        Args:
+            ext:    Rozszerzenie pliku wynikowego lub lista rozszerzeń
+        """
+        formats = self.get_formats(ext)
+
+        if len(formats) == 0 or any(item not in self.compile_formats for item in formats):
+            raise AttributeError(f'Extension is not supported. Choose from {", ".join(self.compile_formats)}')
+
+        if self.get_backend(formats) == 'svg' and formats != ['svg']:
+            raise AttributeError('The svg backend can only produce svg files')
 
         if not os.path.isdir(self.source_dir):
             raise NotADirectoryError
@@ -206,67 +320,499 @@ class Writer:
         if not os.path.isdir(self.compiled_dir):
             os.makedirs(self.compiled_dir, exist_ok=True)
 
-        os.system(f'lilypond --format={ext} -o {self.compiled_dir} {self.source_dir}/{self.filename}.ly')
+    def compile(self, ext: Union[str, List[str]] = 'pdf', *, crop: bool = False, preview: bool = False,
+                pages: bool = True, resolution: Optional[int] = None, timeout: Optional[float] = None) -> CompileResult:
+        """
+        Kompiluj plik źródłowy do wybranych rodzajów plików jednym uruchomieniem lilyponda przez compile_backend.
+        Lilypond uruchamiany jest bez powłoki, więc ścieżki mogą zawierać spacje i znaki specjalne
+
+        Args:
+            ext:        Rozszerzenie pliku wynikowego lub lista rozszerzeń
+            crop:       Jeśli True lilypond utworzy również pliki przycięte do nut
+            preview:    Jeśli True lilypond utworzy również podgląd pierwszego systemu
+            pages:      Jeśli False pełne strony nie są tworzone
+            resolution: Rozdzielczość plików png w dpi
+            timeout:    Maksymalny czas kompilacji w sekundach
+
+        Returns:
+            Wynik kompilacji (kod wyjścia, czas, ostrzeżenia i utworzone pliki). Błąd lilyponda nie zgłasza wyjątku,
+            do tego służy CompileResult.check()
+
+        Raises:
+            subprocess.TimeoutExpired:  Gdy kompilacja trwała dłużej niż timeout
+        """
+        self.prepare_compile(ext)
+
+        command = self.get_compile_command(ext, crop, preview, pages, resolution)
+
+        # Pliki zmodyfikowane przed rozpoczęciem kompilacji nie są jej wynikiem. Czas zaokrąglamy w dół do pełnej
+        # sekundy, bo niektóre systemy plików zapisują czas modyfikacji z taką dokładnością
+        started = int(time.time())
+        start = time.perf_counter()
+
+        return_code, output = self.compile_backend.run(command, timeout)
+
+        return self.get_compile_result(command, return_code, output, time.perf_counter() - start, started, ext, crop,
+                                       preview, pages)
+
+    def get_compile_result(self, command: List[str], return_code: int, output: str, duration: float, started: int,
+                           ext: Union[str, List[str]] = 'pdf', crop: bool = False, preview: bool = False,
+                           pages: bool = True) -> CompileResult:
+        """
+        Utwórz wynik kompilacji i dodaj go do metryk
+
+        Args:
+            command:        Polecenie lilyponda
+            return_code:    Kod wyjścia lilyponda
+            output:         Komunikaty lilyponda
+            duration:       Czas kompilacji w sekundach
+            started:        Czas rozpoczęcia kompilacji (time.time() zaokrąglony w dół). Pliki zmodyfikowane wcześniej
+                            nie są jej wynikiem
+            ext:            Rozszerzenie pliku wynikowego lub lista rozszerzeń
+            crop:           Jeśli True uwzględniane są pliki przycięte do nut
+            preview:        Jeśli True uwzględniane są podglądy pierwszego systemu
+            pages:          Jeśli False pomijane są pełne strony
+        """
+        result = CompileResult(command, return_code, duration, output, [
+            path for path in self.get_compiled_paths(ext, crop, preview, pages)
+            if os.path.exists(path) and os.path.getmtime(path) >= started
+        ])
+
+        self.record_compile(result)
+
+        return result
+
+    def get_compiled_paths(self, ext: Union[str, List[str]] = 'pdf', crop: bool = False, preview: bool = False,
+                           pages: bool = True) -> List[str]:
+        """
+        Pobierz ścieżki plików, które może utworzyć kompilacja z podanymi opcjami (wraz z plikami MIDI)
+
+        Args:
+            ext:        Rozszerzenie pliku wynikowego lub lista rozszerzeń
+            crop:       Jeśli True uwzględniane są pliki przycięte do nut
+            preview:    Jeśli True uwzględniane są podglądy pierwszego systemu
+            pages:      Jeśli False pomijane są pełne strony
+        """
+        variants = ([''] if pages else []) + (['.cropped'] if crop else []) + (['.preview'] if preview else [])
+
+        paths = [
+            f'{base}{variant}.{item}'
+            for item in self.get_formats(ext)
+            for base in [os.path.splitext(path)[0] for path in self.get_output_paths(item)]
+            for variant in variants
+        ]
+
+        # Nazwa pliku MIDI zależy od wersji lilyponda
+        return paths + [path for item in ['midi', 'mid'] for path in self.get_output_paths(item)]
+
+    @staticmethod
+    def record_compile(result: CompileResult):
+        """Dodaj wynik kompilacji do metryk (zob. get_compile_metrics)"""
+        with Writer._compile_metrics_lock:
+            metrics = Writer._compile_metrics
+            metrics['count'] += 1
+            metrics['failures'] += 0 if result.success else 1
+            metrics['warnings'] += len(result.warnings)
+            metrics['total_duration'] += result.duration
+            metrics['max_duration'] = max(metrics['max_duration'], result.duration)
+
+    @staticmethod
+    def get_compile_metrics() -> Dict[str, float]:
+        """
+        Pobierz łączne metryki kompilacji w bieżącym procesie: liczbę kompilacji, nieudanych kompilacji i ostrzeżeń
+        oraz łączny, średni i najdłuższy czas kompilacji w sekundach
+        """
+        with Writer._compile_metrics_lock:
+            metrics = dict(Writer._compile_metrics)
+
+        metrics['average_duration'] = metrics['total_duration'] / metrics['count'] if metrics['count'] > 0 else 0.0
+
+        return metrics
+
+    @staticmethod
+    def reset_compile_metrics():
+        """Wyzeruj metryki kompilacji"""
+        with Writer._compile_metrics_lock:
+            Writer._compile_metrics.update(count=0, failures=0, warnings=0, total_duration=0.0, max_duration=0.0)
+
+    @staticmethod
+    def get_compile_semaphore() -> 'asyncio.Semaphore':
+        """Pobierz semafor ograniczający liczbę równoległych kompilacji w bieżącej pętli zdarzeń"""
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+
+        if loop not in Writer._compile_semaphores:
+            Writer._compile_semaphores[loop] = asyncio.Semaphore(Writer.max_concurrent_compilations)
+
+        return Writer._compile_semaphores[loop]
+
+    async def compile_async(self, ext: Union[str, List[str]] = 'pdf', *, crop: bool = False, preview: bool = False,
+                            pages: bool = True, resolution: Optional[int] = None,
+                            timeout: Optional[float] = None) -> CompileResult:
+        """
+        Kompiluj plik źródłowy przez compile_backend bez blokowania pętli zdarzeń.
+        Liczba jednocześnie działających kompilacji jest ograniczona przez max_concurrent_compilations.
+        Anulowanie zadania lub przekroczenie czasu przerywa kompilację.
+
+        Args:
+            ext:        Rozszerzenie pliku wynikowego lub lista rozszerzeń
+            crop:       Jeśli True lilypond utworzy również pliki przycięte do nut
+            preview:    Jeśli True lilypond utworzy również podgląd pierwszego systemu
+            pages:      Jeśli False pełne strony nie są tworzone
+            resolution: Rozdzielczość plików png w dpi
+            timeout:    Maksymalny czas kompilacji w sekundach (wliczając oczekiwanie na semafor)
+
+        Returns:
+            Wynik kompilacji, jak w compile
+
+        Raises:
+            asyncio.TimeoutError:   Gdy kompilacja trwała dłużej niż timeout
+        """
+        import asyncio
+
+        self.prepare_compile(ext)
+
+        async def run() -> CompileResult:
+            async with self.get_compile_semaphore():
+                command = self.get_compile_command(ext, crop, preview, pages, resolution)
+                started = int(time.time())
+                start = time.perf_counter()
+
+                return_code, output = await self.compile_backend.run_async(command)
+
+                return self.get_compile_result(command, return_code, output, time.perf_counter() - start, started,
+                                               ext, crop, preview, pages)
+
+        return await asyncio.wait_for(run(), timeout)
 
     # endregion
 
-    def parse(self, bars: List[List[Writeable]], indent: int = 1):
+    def parse(self, bars: List[List[Writeable]], indent: int = 1, clefs: bool = True):
         """
         Przetwórz takty i dodaj je do danych wyjściowych
 
         Args:
             bars:   Lista taktów
             indent:     Rozmiar wcięcia
+            clefs:  Jeśli True klucz jest zmieniany automatycznie na podstawie pierwszej nuty taktu
         """
         previous_clef = None
 
         for i, bar in enumerate(bars):
-            elements = list(map(lambda elem: isinstance(elem, Note), bar))
-
-            # Jeśli takt zawiera jakąś nutę, to sprawdzamy, czy ta nuta się mieści w przedziałach dla kluczy
-            # i ustawiamy klucz na taki, który najbardziej pasuje
-            try:
-                first_note_idx = elements.index(True)
-                first_note = bar[first_note_idx]
+            clef = self.get_bar_clef(bar, self.clef_ranges, previous_clef) if clefs else None
 
-                assert isinstance(first_note, Note)
-
-                for clef, clef_range in self.clef_ranges.items():
-                    if first_note.between(clef_range[0], clef_range[1]) and previous_clef != clef:
-                        self.clef(clef, indent=indent)
-
-                        previous_clef = clef
-                        break
-            except ValueError:
-                pass
+            if clef is not None:
+                self.clef(clef, indent=indent)
+                previous_clef = clef
 
             notes = ' '.join([str(item) for item in bar])
             notes += ' |' if i != len(bars) - 1 else f' {self.get_bar(BarType.DOUBLE_NARROW_WIDE)}'
             self.line(notes, indent=indent)
 
-    def from_generator(self, generator: Generator, show_bar_numbers: bool = True, midi: bool = False):
-        """Przetwórz dane z generatora"""
+    def from_bars(self, bars: List[List[Writeable]], metre: Tuple[int, int], show_bar_numbers: bool = True,
+                  midi: bool = False, key: Optional['Key'] = None):
+        """
+        Przetwórz pogrupowane takty (np. wynik generate(group=True)) na kompletny plik lilypond
+
+        Args:
+            bars:               Lista taktów
+            metre:              Metrum
+            show_bar_numbers:   Jeśli True na wygenerowanych nutach będzie widoczna numeracja taktów
+            midi:               Jeśli True lilypond wygeneruje również plik MIDI
+            key:                Opcjonalna tonacja, dla której dodawane jest oznaczenie tonacji
+        """
         self.lines = []
+        self.book_suffixes = []
 
         self.header(show_bar_numbers=show_bar_numbers)
-        self.block_start('score')
+        self.score(bars, metre, midi, key)
+
+    def score(self, bars: List[List[Writeable]], metre: Tuple[int, int], midi: bool = False,
+              key: Optional['Key'] = None, piece: Optional[str] = None, indent: int = 0):
+        """
+        Dodaj blok score z jedną melodią
+
+        Args:
+            bars:       Lista taktów
+            metre:      Metrum
+            midi:       Jeśli True lilypond wygeneruje również plik MIDI
+            key:        Opcjonalna tonacja, dla której dodawane jest oznaczenie tonacji
+            piece:      Opcjonalny tytuł wyświetlany nad melodią
+            indent:     Rozmiar wcięcia
+        """
+        self.block_start('score', indent)
+
+        if piece is not None:
+            self.header_block({'piece': piece}, indent + 1)
 
-        self.block_start(indent=1)
-        self.time_signature(generator.metre[0], generator.metre[1], indent=2)
-        self.parse(generator.generate(group=True), indent=2)
-        self.block_end(indent=1)
+        self.block_start(indent=indent + 1)
+        self.time_signature(metre[0], metre[1], indent=indent + 2)
 
-        self.block_start('layout', indent=1)
-        self.block_end(indent=1)
+        if key is not None:
+            self.key_signature(key.tonic, key.key_type, indent=indent + 2)
+
+        self.parse(bars, indent=indent + 2)
+        self.block_end(indent=indent + 1)
+
+        self.score_end(midi, indent)
+
+    def header_block(self, fields: Dict[str, str], indent: int = 0):
+        """
+        Dodaj blok header (np. tytuł zbioru lub pojedynczej melodii)
+
+        Args:
+            fields:     Pola bloku, np. {'title': 'Ćwiczenia'}
+            indent:     Rozmiar wcięcia
+        """
+        self.block_start('header', indent)
+
+        for name, value in fields.items():
+            escaped = value.replace('\\', '\\\\').replace('"', '\\"')
+            self.line(f'{name} = "{escaped}"', indent + 1)
+
+        self.block_end(indent)
+
+    def from_book(self, melodies: List[List[List[Writeable]]], metre: Tuple[int, int], key: Optional['Key'] = None,
+                  pieces: Optional[List[str]] = None, title: Optional[str] = None, show_bar_numbers: bool = True,
+                  midi: bool = False, split: bool = False):
+        """
+        Przetwórz wiele melodii na jeden plik lilypond (blok book z osobnym blokiem score dla każdej melodii), który
+        kompilowany jest jednym uruchomieniem lilyponda.
+
+        Przy split=True każda melodia trafia do osobnego bloku book z \\bookOutputSuffix, więc ta sama kompilacja
+        tworzy osobny plik dla każdej melodii: {filename}-001.pdf, {filename}-002.pdf, ... (zob. get_output_paths)
+
+        Args:
+            melodies:           Lista melodii, każda jako lista taktów
+            metre:              Metrum
+            key:                Opcjonalna tonacja, dla której dodawane jest oznaczenie tonacji
+            pieces:             Opcjonalne tytuły kolejnych melodii
+            title:              Opcjonalny tytuł zbioru (przy split=True powtarzany w każdym pliku)
+            show_bar_numbers:   Jeśli True na wygenerowanych nutach będzie widoczna numeracja taktów
+            midi:               Jeśli True lilypond wygeneruje również pliki MIDI
+            split:              Jeśli True każda melodia zapisywana jest do osobnego pliku wynikowego
+
+        Raises:
+            ValueError:     Gdy liczba tytułów nie zgadza się z liczbą melodii
+        """
+        if pieces is not None and len(pieces) != len(melodies):
+            raise ValueError('Each melody has to have a title')
+
+        self.lines = []
+        self.book_suffixes = []
+
+        self.header(show_bar_numbers=show_bar_numbers)
+
+        for i, bars in enumerate(melodies):
+            if i == 0 or split:
+                self.block_start('book')
+
+                if split:
+                    suffix = f'{i + 1:03d}'
+                    self.command(f'bookOutputSuffix "{suffix}"', indent=1)
+                    self.book_suffixes.append(suffix)
+
+                if title is not None:
+                    self.header_block({'title': title}, indent=1)
+
+            self.score(bars, metre, midi, key, pieces[i] if pieces is not None else None, indent=1)
+
+            if i == len(melodies) - 1 or split:
+                self.block_end()
+
+    def from_generator_book(self, generator: 'Generator', count: int, seed: Optional[int] = None,
+                            title: Optional[str] = None, show_bar_numbers: bool = True, midi: bool = False,
+                            split: bool = False):
+        """
+        Wygeneruj zbiór melodii (np. ćwiczeń) i przetwórz je na jeden plik lilypond (zob. from_book).
+        Melodia o numerze i jest generowana z ziarnem seed + i, tak jak w Batch
+
+        Args:
+            generator:          Skonfigurowany generator
+            count:              Liczba melodii
+            seed:               Ziarno bazowe
+            title:              Opcjonalny tytuł zbioru
+            show_bar_numbers:   Jeśli True na wygenerowanych nutach będzie widoczna numeracja taktów
+            midi:               Jeśli True lilypond wygeneruje również pliki MIDI
+            split:              Jeśli True każda melodia zapisywana jest do osobnego pliku wynikowego
+        """
+        melodies = [generator.generate(group=True, seed=seed + i if seed is not None else None) for i in range(count)]
+        pieces = [f'Exercise {i + 1}' for i in range(count)]
+
+        self.from_book(melodies, generator.metre, generator.key, pieces, title, show_bar_numbers, midi, split)
+
+    def get_output_paths(self, ext: str = 'pdf') -> List[str]:
+        """
+        Pobierz ścieżki plików, które powstaną po kompilacji (osobny plik dla każdej melodii przy from_book ze
+        split=True)
+
+        Args:
+            ext:    Rozszerzenie pliku wynikowego
+        """
+        if len(self.book_suffixes) == 0:
+            return [f'{self.compiled_dir}/{self.filename}.{ext}']
+
+        return [f'{self.compiled_dir}/{self.filename}-{suffix}.{ext}' for suffix in self.book_suffixes]
+
+    def score_end(self, midi: bool = False, indent: int = 0):
+        """
+        Zakończ blok score blokami layout i opcjonalnie midi
+
+        Args:
+            midi:   Jeśli True lilypond wygeneruje również plik MIDI
+            indent: Rozmiar wcięcia bloku score
+        """
+        self.block_start('layout', indent=indent + 1)
+        self.block_end(indent=indent + 1)
 
         if midi:
-            self.block_start('midi', indent=1)
+            self.block_start('midi', indent=indent + 1)
 
-            self.block_start('context', indent=2)
-            self.command('Voice', indent=3)
-            self.command('remove "Dynamic_performer"', indent=3)
-            self.block_end(indent=2)
+            self.block_start('context', indent=indent + 2)
+            self.command('Voice', indent=indent + 3)
+            self.command('remove "Dynamic_performer"', indent=indent + 3)
+            self.block_end(indent=indent + 2)
 
-            self.block_end(indent=1)
+            self.block_end(indent=indent + 1)
 
-        self.block_end()
+        self.block_end(indent)
+
+    def from_generator(self, generator: 'Generator', show_bar_numbers: bool = True, midi: bool = False,
+                       seed: Optional[int] = None):
+        """
+        Przetwórz dane z generatora
+
+        Args:
+            generator:          Skonfigurowany generator
+            show_bar_numbers:   Jeśli True na wygenerowanych nutach będzie widoczna numeracja taktów
+            midi:               Jeśli True lilypond wygeneruje również plik MIDI
+            seed:               Ziarno generatora liczb losowych
+        """
+        self.from_bars(generator.generate(group=True, seed=seed), generator.metre, show_bar_numbers, midi,
+                       generator.key)
+
+    @staticmethod
+    def get_bar_clef(bar: List[Writeable], clef_ranges: Dict[str, Tuple[Note, Note]],
+                     previous_clef: Optional[str]) -> Optional[str]:
+        """
+        Sprawdź, czy przed taktem trzeba zmienić klucz. Jeśli takt zawiera jakąś nutę, to sprawdzamy, czy ta nuta się
+        mieści w przedziałach dla kluczy i wybieramy klucz, który najbardziej pasuje
+
+        Args:
+            bar:            Takt
+            clef_ranges:    Zakresy dla kluczy (zob. default_clef_ranges)
+            previous_clef:  Aktualny klucz
+
+        Returns:
+            Nowy klucz lub None, jeśli klucz się nie zmienia
+        """
+        first_note = next((elem for elem in bar if isinstance(elem, Note)), None)
+
+        if first_note is None:
+            return None
+
+        for clef, clef_range in clef_ranges.items():
+            if first_note.between(clef_range[0], clef_range[1]) and previous_clef != clef:
+                return clef
+
+        return None
+
+    def get_voice_clef(self, bars: List[List[Writeable]]) -> str:
+        """
+        Wybierz jeden klucz dla całego głosu na podstawie średniej wysokości jego nut
+
+        Args:
+            bars:   Lista taktów
+        """
+        ids = [elem.get_id() for bar in bars for elem in bar if isinstance(elem, Note)]
+        if len(ids) == 0:
+            return 'G'
+
+        average = sum(ids) / len(ids)
+
+        for clef, clef_range in self.clef_ranges.items():
+            if average <= clef_range[1].get_id():
+                return clef
+
+        return 'G'
+
+    def from_voices(self, voices: List[List[List[Writeable]]], metre: Tuple[int, int], show_bar_numbers: bool = True,
+                    midi: bool = False, staves: bool = True, key: Optional['Key'] = None):
+        """
+        Przetwórz pogrupowane takty kilku głosów (np. wynik PolyphonicGenerator.generate) na kompletny plik lilypond
+
+        Args:
+            voices:             Lista głosów, od najwyższego. Każdy głos to lista taktów
+            metre:              Metrum
+            show_bar_numbers:   Jeśli True na wygenerowanych nutach będzie widoczna numeracja taktów
+            midi:               Jeśli True lilypond wygeneruje również plik MIDI
+            staves:             Jeśli True każdy głos zapisywany jest na osobnej pięciolinii, w przeciwnym razie
+                                wszystkie głosy dzielą jedną pięciolinię (\\voiceOne, \\voiceTwo, ...)
+            key:                Opcjonalna tonacja, dla której dodawane jest oznaczenie tonacji
+
+        Raises:
+            ValueError:     Gdy liczba głosów jest większa niż 4 przy zapisie na jednej pięciolinii
+        """
+        voice_commands = ['voiceOne', 'voiceTwo', 'voiceThree', 'voiceFour']
+
+        if not staves and len(voices) > len(voice_commands):
+            raise ValueError(f'At most {len(voice_commands)} voices can share one staff')
+
+        self.lines = []
+        self.book_suffixes = []
+
+        self.header(show_bar_numbers=show_bar_numbers)
+        self.block_start('score')
+
+        if staves:
+            # Każda pięciolinia ma własny, automatycznie zmieniany klucz
+            self.line('<<', indent=1)
+
+            for bars in voices:
+                self.command('new Staff {', indent=2)
+                self.time_signature(metre[0], metre[1], indent=3)
+
+                if key is not None:
+                    self.key_signature(key.tonic, key.key_type, indent=3)
+
+                self.parse(bars, indent=3)
+                self.block_end(indent=2)
+
+            self.line('>>', indent=1)
+        else:
+            # Głosy jednej pięciolinii muszą mieć wspólny klucz, więc wybieramy go raz, na podstawie wszystkich nut
+            self.command('new Staff <<', indent=1)
+            self.time_signature(metre[0], metre[1], indent=2)
+
+            if key is not None:
+                self.key_signature(key.tonic, key.key_type, indent=2)
+
+            self.clef(self.get_voice_clef([bar for bars in voices for bar in bars]), indent=2)
+
+            for bars, voice_command in zip(voices, voice_commands):
+                self.command('new Voice {', indent=2)
+                self.command(voice_command, indent=3)
+                self.parse(bars, indent=3, clefs=False)
+                self.block_end(indent=2)
+
+            self.line('>>', indent=1)
+
+        self.score_end(midi)
+
+    def from_polyphonic_generator(self, generator: 'PolyphonicGenerator', show_bar_numbers: bool = True,
+                                  midi: bool = False, staves: bool = True, seed: Optional[int] = None,
+                                  executor: Optional['Executor'] = None):
+        """
+        Przetwórz dane z generatora wielogłosowego
+
+        Args:
+            generator:          Skonfigurowany generator wielogłosowy
+            show_bar_numbers:   Jeśli True na wygenerowanych nutach będzie widoczna numeracja taktów
+            midi:               Jeśli True lilypond wygeneruje również plik MIDI
+            staves:             Jeśli True każdy głos zapisywany jest na osobnej pięciolinii
+            seed:               Ziarno generatora liczb losowych
+            executor:           Opcjonalna pula, w której głosy są generowane równolegle
+        """
+        self.from_voices(generator.generate(group=True, seed=seed, executor=executor), generator.metre,
+                         show_bar_numbers, midi, staves, generator.voices[0].key)
@@ -1,5 +1,56 @@
-from lib.BarType import BarType
-from lib.Generator import Generator
-from lib.KeyType import KeyType
-from lib.Writer import Writer
+import importlib
+import sys
+import types
 
+# Klasy udostępniane bezpośrednio przez pakiet (from lib import Generator).
+# Moduły są importowane dopiero przy pierwszym odwołaniu, więc np. import lib.theory nie ładuje numpy
+_exports = {
+    'AbcWriter': 'lib.AbcWriter',
+    'BarType': 'lib.BarType',
+    'BatchGenerator': 'lib.BatchGenerator',
+    'BinaryReader': 'lib.BinaryReader',
+    'BinaryWriter': 'lib.BinaryWriter',
+    'CompileBackend': 'lib.CompileBackend',
+    'CompileResult': 'lib.CompileResult',
+    'Corpus': 'lib.Corpus',
+    'GenerationContext': 'lib.GenerationContext',
+    'Generator': 'lib.Generator',
+    'Key': 'lib.Key',
+    'KeyType': 'lib.KeyType',
+    'LilypondWorker': 'lib.LilypondWorker',
+    'MarkovModel': 'lib.MarkovModel',
+    'MidiReader': 'lib.MidiReader',
+    'MidiWriter': 'lib.MidiWriter',
+    'MusicXmlWriter': 'lib.MusicXmlWriter',
+    'NdjsonWriter': 'lib.NdjsonWriter',
+    'Parser': 'lib.Parser',
+    'PolyphonicGenerator': 'lib.PolyphonicGenerator',
+    'WavWriter': 'lib.WavWriter',
+    'Writer': 'lib.Writer',
+}
+
+__all__ = list(_exports.keys())
+
+
+class _LazyPackage(types.ModuleType):
+    def __getattr__(self, name: str):
+        if name not in _exports:
+            raise AttributeError(f'module {self.__name__!r} has no attribute {name!r}')
+
+        value = getattr(importlib.import_module(_exports[name]), name)
+        super().__setattr__(name, value)
+        return value
+
+    def __setattr__(self, name: str, value):
+        # Import podmodułu (np. lib.Generator) przypisuje go jako atrybut pakietu, co przesłoniłoby klasę o tej samej
+        # nazwie. Pomijamy takie przypisanie - klasa zostanie pobrana przez __getattr__
+        if name in _exports and isinstance(value, types.ModuleType):
+            return
+
+        super().__setattr__(name, value)
+
+    def __dir__(self):
+        return sorted(set(super().__dir__()) | set(_exports.keys()))
+
+
+sys.modules[__name__].__class__ = _LazyPackage
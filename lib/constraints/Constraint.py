@@ -0,0 +1,51 @@
+from typing import TYPE_CHECKING
+
+from lib.theory.Writeable import Writeable
+
+if TYPE_CHECKING:
+    from lib.GenerationContext import GenerationContext
+
+
+class Constraint:
+    """
+    Ograniczenie sprawdzane w trakcie generowania melodii (Generator.add_constraint).
+
+    Metoda check jest wywoływana dla każdego kolejnego elementu przed dodaniem go do melodii, więc powinna odrzucać
+    tylko te elementy, po których melodia na pewno nie spełni ograniczenia. Metoda check_melody sprawdza gotową melodię
+    (po ustawieniu nuty końcowej) i może weryfikować własności, których nie da się ocenić w trakcie generowania.
+    """
+
+    @property
+    def name(self) -> str:
+        """Nazwa ograniczenia używana w statystykach"""
+        return type(self).__name__
+
+    def check(self, context: 'GenerationContext', element: Writeable) -> bool:
+        """
+        Sprawdź, czy element może zostać dodany do melodii
+
+        Args:
+            context:    Kontekst generowania (context.generated_data nie zawiera jeszcze elementu)
+            element:    Kolejny element melodii
+        """
+        return True
+
+    def update(self, context: 'GenerationContext', element: Writeable):
+        """
+        Zaktualizuj stan ograniczenia po dodaniu elementu do melodii. Stan dotyczący jednego przebiegu generowania
+        należy przechowywać w context.constraint_state[self]
+
+        Args:
+            context:    Kontekst generowania (przed dodaniem elementu)
+            element:    Dodany element
+        """
+        pass
+
+    def check_melody(self, context: 'GenerationContext') -> bool:
+        """
+        Sprawdź gotową melodię
+
+        Args:
+            context:    Kontekst generowania
+        """
+        return True
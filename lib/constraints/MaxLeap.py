@@ -0,0 +1,36 @@
+from typing import TYPE_CHECKING
+
+from lib.constraints.Constraint import Constraint
+from lib.theory.Note import Note
+from lib.theory.Tuplet import Tuplet
+from lib.theory.Writeable import Writeable
+
+if TYPE_CHECKING:
+    from lib.GenerationContext import GenerationContext
+
+
+class MaxLeap(Constraint):
+    """Największy dozwolony skok pomiędzy kolejnymi nutami (pauzy są pomijane)"""
+
+    def __init__(self, semitones: int):
+        """
+        Args:
+            semitones:  Największy skok w półtonach
+        """
+        if semitones < 0:
+            raise ValueError('Leap cannot be negative')
+
+        self.semitones: int = semitones
+
+    def check(self, context: 'GenerationContext', element: Writeable) -> bool:
+        # Nuty grupy niemiarowej sprawdzamy po kolei, zaczynając od ostatniej nuty melodii
+        notes = [item for item in Tuplet.flatten([element]) if isinstance(item, Note)]
+        ids = ([] if context.last_note is None else [context.last_note.get_id()]) + [note.get_id() for note in notes]
+
+        return all(abs(current - previous) <= self.semitones for previous, current in zip(ids, ids[1:]))
+
+    def check_melody(self, context: 'GenerationContext') -> bool:
+        # Nuta końcowa mogła zostać podmieniona, więc sprawdzamy całą melodię
+        ids = [item.get_id() for item in Tuplet.flatten(context.generated_data) if isinstance(item, Note)]
+
+        return all(abs(current - previous) <= self.semitones for previous, current in zip(ids, ids[1:]))
@@ -0,0 +1,42 @@
+from typing import TYPE_CHECKING, Optional
+
+from lib.constraints.Constraint import Constraint
+from lib.theory.Note import Note
+from lib.theory.Tuplet import Tuplet
+from lib.theory.Writeable import Writeable
+
+if TYPE_CHECKING:
+    from lib.GenerationContext import GenerationContext
+
+
+class PitchRange(Constraint):
+    """Ograniczenie rozpiętości melodii (odległości w półtonach pomiędzy najniższą i najwyższą nutą)"""
+
+    def __init__(self, max_span: Optional[int] = None, min_span: Optional[int] = None):
+        """
+        Args:
+            max_span:   Największa dozwolona rozpiętość w półtonach
+            min_span:   Najmniejsza wymagana rozpiętość w półtonach
+        """
+        if max_span is not None and min_span is not None and min_span > max_span:
+            raise ValueError('Minimal span is larger than maximal span')
+
+        self.max_span: Optional[int] = max_span
+        self.min_span: Optional[int] = min_span
+
+    def check(self, context: 'GenerationContext', element: Writeable) -> bool:
+        ids = [item.get_id() for item in Tuplet.flatten([element]) if isinstance(item, Note)]
+
+        if self.max_span is None or len(ids) == 0 or context.lowest_note is None:
+            return True
+
+        return max(context.highest_note, *ids) - min(context.lowest_note, *ids) <= self.max_span
+
+    def check_melody(self, context: 'GenerationContext') -> bool:
+        ids = [item.get_id() for item in Tuplet.flatten(context.generated_data) if isinstance(item, Note)]
+        if len(ids) == 0:
+            return self.min_span is None or self.min_span <= 0
+
+        span = max(ids) - min(ids)
+
+        return (self.max_span is None or span <= self.max_span) and (self.min_span is None or span >= self.min_span)
@@ -0,0 +1,36 @@
+from typing import TYPE_CHECKING, Optional
+
+from lib.constraints.Constraint import Constraint
+from lib.theory.Rest import Rest
+from lib.theory.Writeable import Writeable
+
+if TYPE_CHECKING:
+    from lib.GenerationContext import GenerationContext
+
+
+class RestRatio(Constraint):
+    """Ograniczenie udziału pauz w czasie trwania melodii"""
+
+    def __init__(self, max_ratio: Optional[float] = None, min_ratio: Optional[float] = None):
+        """
+        Args:
+            max_ratio:  Największy dozwolony udział pauz (0 - 1)
+            min_ratio:  Najmniejszy wymagany udział pauz (0 - 1)
+        """
+        if max_ratio is not None and min_ratio is not None and min_ratio > max_ratio:
+            raise ValueError('Minimal ratio is larger than maximal ratio')
+
+        self.max_ratio: Optional[float] = max_ratio
+        self.min_ratio: Optional[float] = min_ratio
+
+    def check(self, context: 'GenerationContext', element: Writeable) -> bool:
+        if self.max_ratio is None or not isinstance(element, Rest):
+            return True
+
+        # Długość fragmentu jest znana z góry, więc przekroczenie limitu można wykryć od razu. Licznik pauz obejmuje
+        # tylko generowany fragment, więc przy ponownym generowaniu taktów udział liczony jest względem jego długości
+        duration = element.get_duration(context.shortest_note_duration)
+        return context.rest_duration + duration <= self.max_ratio * context.fragment_length
+
+    def check_melody(self, context: 'GenerationContext') -> bool:
+        return self.min_ratio is None or context.rest_duration >= self.min_ratio * context.fragment_length
@@ -0,0 +1,46 @@
+from typing import TYPE_CHECKING
+
+from lib.constraints.Constraint import Constraint
+from lib.theory.Note import Note
+from lib.theory.Writeable import Writeable
+
+if TYPE_CHECKING:
+    from lib.GenerationContext import GenerationContext
+
+
+class Syncopation(Constraint):
+    """
+    Ograniczenie liczby synkop, czyli nut rozpoczynających się poza początkiem miary i trwających dłużej niż do
+    początku kolejnej miary
+    """
+
+    def __init__(self, max_count: int = 0):
+        """
+        Args:
+            max_count:  Największa dozwolona liczba synkop
+        """
+        if max_count < 0:
+            raise ValueError('Count cannot be negative')
+
+        self.max_count: int = max_count
+
+    @staticmethod
+    def is_syncopated(context: 'GenerationContext', element: Writeable) -> bool:
+        """Sprawdź, czy element rozpoczynający się na pozycji context.position jest synkopą"""
+        if not isinstance(element, Note):
+            return False
+
+        beat = context.shortest_note_duration // context.generator.metre[1]
+        offset = context.position % beat
+
+        return offset != 0 and offset + element.get_duration(context.shortest_note_duration) > beat
+
+    def check(self, context: 'GenerationContext', element: Writeable) -> bool:
+        if not self.is_syncopated(context, element):
+            return True
+
+        return context.constraint_state.get(self, 0) < self.max_count
+
+    def update(self, context: 'GenerationContext', element: Writeable):
+        if self.is_syncopated(context, element):
+            context.constraint_state[self] = context.constraint_state.get(self, 0) + 1
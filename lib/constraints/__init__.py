@@ -0,0 +1,5 @@
+from lib.constraints.Constraint import Constraint
+from lib.constraints.MaxLeap import MaxLeap
+from lib.constraints.PitchRange import PitchRange
+from lib.constraints.RestRatio import RestRatio
+from lib.constraints.Syncopation import Syncopation
@@ -0,0 +1,11 @@
+from typing import List
+
+
+class CompilationFailed(Exception):
+    """Zgłaszany, gdy lilypond zakończył się błędem"""
+
+    def __init__(self, return_code: int, errors: List[str]):
+        super().__init__()
+        self.return_code: int = return_code
+        self.errors: List[str] = errors
+        self.message = f'Lilypond exited with code {return_code}' + (f': {errors[0]}' if len(errors) > 0 else '')
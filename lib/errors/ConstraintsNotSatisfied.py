@@ -0,0 +1,6 @@
+class ConstraintsNotSatisfied(Exception):
+    """Zgłaszany, gdy nie udało się wygenerować melodii spełniającej wszystkie ograniczenia"""
+
+    def __init__(self, attempts: int):
+        super().__init__()
+        self.message = f'Could not generate a melody satisfying the constraints in {attempts} attempts'
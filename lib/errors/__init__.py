@@ -1,4 +1,6 @@
 from lib.errors.BaseDurationTooLarge import BaseDurationTooLarge
+from lib.errors.CompilationFailed import CompilationFailed
+from lib.errors.ConstraintsNotSatisfied import ConstraintsNotSatisfied
 from lib.errors.IntervalNotSupported import IntervalNotSupported
 from lib.errors.InvalidBaseNoteDuration import InvalidBaseNoteDuration
 from lib.errors.InvalidMetre import InvalidMetre
@@ -1,8 +1,8 @@
 from __future__ import annotations
 from typing import List, Optional
 import copy
+import re
 
-import lib
 from lib.theory.Interval import Interval
 from lib.theory.NoteModifier import NoteModifier
 from lib.theory.OctaveType import OctaveType
@@ -16,6 +16,16 @@ class Note(Writeable):
     base_notes_indexes = {x: i for i, x in enumerate(base_notes)}
     base_notes_ids = {'c': 0, 'd': 2, 'e': 4, 'f': 5, 'g': 7, 'a': 9, 'b': 11}
 
+    # Domyślna pisownia dźwięków w obrębie oktawy (z krzyżykami), używana gdy znany jest tylko identyfikator nuty
+    default_spelling = ['c', 'cis', 'd', 'dis', 'e', 'f', 'fis', 'g', 'gis', 'a', 'ais', 'b']
+
+    # Skrócone nazwy dźwięków z bemolami dopuszczane przez lilyponda i odpowiadające im pełne nazwy
+    contracted_names = {'as': 'aes', 'ases': 'aeses', 'es': 'ees', 'eses': 'eeses'}
+
+    # Zapis nuty w notacji lilypond, np. cis''8.~ Skrócone nazwy sprawdzane są przed pełnymi, bo [a-g] dopasowałoby
+    # samo "a" z "as"
+    note_regex = re.compile(r"^(as(?:es)?|es(?:es)?|[a-g](?:is|es)*)([',]*)(\d+)?(\.{0,2})(~?)$")
+
     def __init__(self, note: str, octave: OctaveType = OctaveType.SMALL, base_duration: int = 4,
                  modifiers: Optional[List[NoteModifier]] = None):
         super().__init__(base_duration)
@@ -68,6 +78,54 @@ class Note(Writeable):
 
     # region Utility
 
+    @staticmethod
+    def parse(text: str) -> Note:
+        """
+        Utwórz nutę na podstawie jej zapisu w notacji lilypond (np. c', fis,,8. lub bes''2~).
+        Skrócone nazwy (as, es) zamieniane są na pełne (aes, ees)
+
+        Args:
+            text:   Zapis nuty
+
+        Raises:
+            ValueError:     Jeśli zapis nie jest poprawną nutą
+        """
+        match = Note.note_regex.match(text.strip())
+        if match is None:
+            raise ValueError(f'{text} is not a valid note')
+
+        note, octave, duration, dots, tie = match.groups()
+        modifiers: List[NoteModifier] = []
+
+        if dots:
+            modifiers.append(NoteModifier(dots))
+
+        if tie:
+            modifiers.append(NoteModifier.TIE)
+
+        return Note(Note.get_full_name(note), OctaveType(octave), int(duration) if duration else 4, modifiers)
+
+    @staticmethod
+    def get_full_name(name: str) -> str:
+        """
+        Pobierz pełną nazwę dźwięku (np. aes dla as). Pozostałe nazwy zwracane są bez zmian
+
+        Args:
+            name:   Nazwa dźwięku w notacji lilypond bez oktawy
+        """
+        return Note.contracted_names.get(name, name)
+
+    @staticmethod
+    def from_id(note_id: int, base_duration: int = 4) -> Note:
+        """
+        Utwórz nutę na podstawie identyfikatora (numeru MIDI). Dźwięki alterowane zapisywane są z krzyżykami
+
+        Args:
+            note_id:        Identyfikator nuty
+            base_duration:  Bazowa wartość rytmiczna
+        """
+        return Note(Note.default_spelling[note_id % 12], OctaveType.from_id(note_id // 12), base_duration)
+
     @staticmethod
     def create_accidentals_string(value: int) -> str:
         """
@@ -213,7 +271,7 @@ class Note(Writeable):
             InvalidBaseNoteDuration:        Jeśli base_duration nie jest poprawną bazową wartością rytmiczną
             BaseDurationTooLarge:           Jeśli base_duration jest dłuższą wartością rytmiczną niż self.base_duration
         """
-        if base_duration not in lib.Generator.correct_note_lengths:
+        if base_duration not in self.correct_note_lengths:
             raise InvalidBaseNoteDuration(base_duration)
 
         if self.base_duration > base_duration:
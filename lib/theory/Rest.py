@@ -1,7 +1,6 @@
 from __future__ import annotations
 from typing import List, Optional
 
-import lib
 from lib.theory.RestModifier import RestModifier
 from lib.theory.Writeable import Writeable
 from lib.errors import InvalidBaseNoteDuration
@@ -39,7 +38,7 @@ class Rest(Writeable):
             InvalidBaseNoteDuration:        Jeśli base_duration nie jest poprawną bazową wartością rytmiczną
             BaseDurationTooLarge:           Jeśli base_duration jest dłuższą wartością rytmiczną niż self.base_duration
         """
-        if base_duration not in lib.Generator.correct_note_lengths:
+        if base_duration not in self.correct_note_lengths:
             raise InvalidBaseNoteDuration(base_duration)
 
         if self.base_duration > base_duration:
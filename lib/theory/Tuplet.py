@@ -0,0 +1,121 @@
+from __future__ import annotations
+from fractions import Fraction
+from typing import List
+
+from lib.theory.Writeable import Writeable
+from lib.errors import InvalidBaseNoteDuration
+
+
+class Tuplet(Writeable):
+    """
+    Grupa niemiarowa (np. triola): numerator elementów granych w czasie denominator elementów o tej samej wartości.
+    Zapisywana jako \\tuplet numerator/denominator { ... }.
+
+    Długość grupy wyrażana jest w całkowitej liczbie sześćdziesięcioczwórek, więc grupa zajmuje w takcie zwykłą,
+    binarną wartość (np. triola ósemek trwa ćwierćnutę) i jest traktowana przy grupowaniu jako niepodzielna całość.
+    Długości elementów wewnątrz grupy wyrażane są w tyknięciach (zob. get_ticks).
+    """
+
+    def __init__(self, numerator: int, denominator: int, elements: List[Writeable]):
+        """
+        Args:
+            numerator:      Liczba elementów w grupie (np. 3 dla trioli)
+            denominator:    Liczba elementów, w czasie których grana jest grupa (np. 2 dla trioli)
+            elements:       Nuty i pauzy grupy
+
+        Raises:
+            ValueError:     Gdy grupa jest pusta, zawiera inną grupę lub jej długość nie jest całkowitą liczbą
+                            sześćdziesięcioczwórek
+        """
+        if numerator < 1 or denominator < 1 or len(elements) == 0:
+            raise ValueError('Tuplet has to have elements and a positive ratio')
+
+        if any(isinstance(elem, Tuplet) for elem in elements):
+            raise ValueError('Nested tuplets are not supported')
+
+        super().__init__(elements[0].base_duration)
+
+        self.numerator: int = numerator
+        self.denominator: int = denominator
+        self.elements: List[Writeable] = elements
+
+        if self.get_span().denominator != 1:
+            raise ValueError('Tuplet has to last a whole number of 64th notes')
+
+    def __str__(self):
+        elements = ' '.join(str(elem) for elem in self.elements)
+        return f'\\tuplet {self.numerator}/{self.denominator} {{ {elements} }}'
+
+    def __repr__(self):
+        return f'Tuplet <{self.__str__()}>'
+
+    def __eq__(self, other):
+        return self.__class__ == other.__class__ and str(self) == str(other)
+
+    def get_span(self) -> Fraction:
+        """Pobierz długość grupy wyrażoną w sześćdziesięcioczwórkach"""
+        inner = sum(elem.get_duration(64) for elem in self.elements)
+
+        return Fraction(inner * self.denominator, self.numerator)
+
+    def get_duration(self, base_duration: int = 16) -> int:
+        """
+        Pobierz długość grupy wyrażoną w ilości base_duration
+
+        Args:
+            base_duration:    Bazowa wartość rytmiczna, na podstawie której będą wykonywane obliczenia
+
+        Raises:
+            InvalidBaseNoteDuration:        Jeśli base_duration nie jest poprawną bazową wartością rytmiczną
+        """
+        if base_duration not in self.correct_note_lengths:
+            raise InvalidBaseNoteDuration(base_duration)
+
+        return int(self.get_span() * base_duration / 64)
+
+    def get_ticks(self, ticks_per_whole: int) -> List[int]:
+        """
+        Pobierz długości kolejnych elementów grupy wyrażone w tyknięciach
+
+        Args:
+            ticks_per_whole:    Liczba tyknięć na całą nutę, np. wyznaczona przez Tuplet.get_resolution
+
+        Raises:
+            ValueError:     Gdy długości elementów nie są całkowitą liczbą tyknięć
+        """
+        ticks = [Fraction(elem.get_duration(64) * ticks_per_whole * self.denominator, 64 * self.numerator)
+                 for elem in self.elements]
+
+        if any(tick.denominator != 1 for tick in ticks):
+            raise ValueError(f'{ticks_per_whole} ticks per whole note are not enough for {self}')
+
+        return [int(tick) for tick in ticks]
+
+    @staticmethod
+    def flatten(data: List[Writeable]) -> List[Writeable]:
+        """
+        Zamień grupy niemiarowe na ich elementy (zwracane są te same obiekty, nie kopie)
+
+        Args:
+            data:   Lista elementów
+        """
+        return [inner for elem in data for inner in (elem.elements if isinstance(elem, Tuplet) else [elem])]
+
+    @staticmethod
+    def get_resolution(ticks_per_whole: int, tuplets: List[Tuplet]) -> int:
+        """
+        Wyznacz najmniejszą wielokrotność ticks_per_whole, przy której elementy wszystkich grup mają całkowite długości
+
+        Args:
+            ticks_per_whole:    Bazowa liczba tyknięć na całą nutę
+            tuplets:            Grupy niemiarowe
+        """
+        resolution = ticks_per_whole
+
+        for tuplet in tuplets:
+            for elem in tuplet.elements:
+                # Długość elementu w tyknięciach to elem64 * resolution * denominator / (64 * numerator)
+                tick = Fraction(elem.get_duration(64) * resolution * tuplet.denominator, 64 * tuplet.numerator)
+                resolution *= tick.denominator
+
+        return resolution
@@ -1,10 +1,13 @@
+from typing import List
 import abc
-import lib
 
 
 class Writeable(abc.ABC):
+    # Dozwolone bazowe wartości rytmiczne (od całej nuty do sześćdziesięcioczwórki)
+    correct_note_lengths: List[int] = [2 ** i for i in range(7)]
+
     def __init__(self, base_duration: int = 4):
-        if base_duration not in lib.Generator.correct_note_lengths:
+        if base_duration not in self.correct_note_lengths:
             raise ValueError
 
         self.base_duration: int = base_duration
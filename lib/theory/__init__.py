@@ -5,3 +5,4 @@ from lib.theory.OctaveType import OctaveType
 from lib.theory import Rest
 from lib.theory import RestModifier
 from lib.theory import Writeable
+from lib.theory import Tuplet
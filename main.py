@@ -1,68 +1,159 @@
+from typing import Any, Dict, List, Optional
+import argparse
+import json
+import random
+import sys
+
+from lib.Batch import Batch
 from lib.Generator import Generator
-from lib.Writer import Writer
-from lib.theory.Note import Note
-from lib.theory.OctaveType import OctaveType
-
-
-def main():
-    generator = Generator()
-
-    # set_metre przyjmuje każde metrum, którego wartością rytmiczną jest półnuta, ćwierćnuta, ósemka lub szesnastka
-    # ilość nut w metrum jest dowolna jeśli tylko większa od 1
-
-    # set_bar_count przyjmuje liczbę taktów, którą chcemy wygenerować
-
-    # set_start_note oraz set_end_note ustalają nuty początkowe i końcowe i przyjmują tylko nuty które znajdują się w
-    # ambitusie, który można ustawić za pomocą metody set_ambitus
-
-    # set_rest_probability ustawia prawdopodobieństwa wystąpienia pauzy. Podawana wartość musi być znormalizowana do 1
-    # prawdopodobieństwo wystąpienia nuty będzie wynosiło 1 - p, gdzie p to podana wartość
-
-    # set_max_consecutive_rests ustala ile maksymalnie pauz może nastąpić po sobie (UWAGA! W nutach niepogrupowanych)
-    # po dzieleniu na takty i grupowaniu, może pojawić się większa liczba pauz
-
-    # set_intervals_probability, set_notes_probability, set_durations_probability to metody, które umożliwiają
-    # ustawienie prawdopodobieństw wystąpienia odpowiednio:
-    # 1. Konkretnych interwałów - lista interwałów to: [1cz, 2m, 2w, 3m, 3w, 4cz, 4zw, 5zm, 5cz, 6m, 6w, 7m, 7w, 8cz]
-    # 2. Konkretnych nut w obrębie oktawy (12 dźwięków począwszy od c do b) - wykorzystywane w algorytmie generującym
-    #    gdy nuty wygenerowane po wylosowaniu interwału obie mieszczą się w zadanym ambitusie. Wtedy wykorzystywane jest
-    #    prawdopodobieństwo ich wystąpienia podczas losowania, która z nich trafi do końcowej melodii
-    # 3. Konkretnych wartości rytmicznych - kolejno: [cała nuta, półnuta, ... aż do 64]
-    # Prawdopodobieństwa podawane do tych funkcji muszą być znormalizowane do 100, a każda pojedyncza wartość musi być
-    # liczbą całkowitą.
-
-    # set_shortest_note_duration - ustala jaką najkrótszą wartość rytmiczną chcemy zobaczyć w nutach.
-    # Skrypt obsługuje aktualnie aż do 64, ale wystarczy zmienić zakres w pliku Generator.py zmiennej
-    # correct_note_lengths, aby skrypt pozwolił na wykorzystanie 128, lub innych nut, ponieważ obliczenia są pisane
-    # uniwersalnie.
-
-    generator\
-        .set_metre(4, 4) \
-        .set_bar_count(100) \
-        .set_start_note(Note('c', OctaveType.SMALL)) \
-        .set_end_note(Note('c', OctaveType.SMALL)) \
-        .set_ambitus(lowest=Note('c', OctaveType.SMALL), highest=Note('c', OctaveType.LINE_2)) \
-        .set_rest_probability(0.1) \
-        .set_max_consecutive_rests(1) \
-        .set_intervals_probability([8, 8, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7]) \
-        .set_notes_probability([9, 9, 9, 9, 8, 8, 8, 8, 8, 8, 8, 8]) \
-        .set_durations_probability([14, 14, 14, 14, 14, 15, 15]) \
-        .set_shortest_note_duration(16)
-
-    # w konstruktorze należy podać nazwę pliku, pod którą będą generowane pliki lilyponda oraz pliki wynikowe
-    # można zmienić wiele innych parametrów, wtedy odsyłam do pliku Writer.py
-    writer = Writer('generated')
-
-    # from_generator - na podstawie obiektu generatora z określonymi parametrami przetwarza dane, które później mogą
-    # zostać wyeksportowane do pliku lilyponda
-    writer.from_generator(generator, midi=True)
-
-    # export - eksportuje plik lilyponda
-    writer.export()
-
-    # compile - uruchamia lilyponda z odpowiednimi parametrami, tak aby powstał plik wynikowy, dozwolone rozszerzenia
-    # to pdf, png oraz ps (tak jak zezwala lilypond)
-    writer.compile(ext='png')
+from lib.KeyType import KeyType
+from lib.NdjsonWriter import NdjsonWriter
+
+
+def int_list(value: str) -> List[int]:
+    """Zamień listę liczb rozdzielonych przecinkami na listę"""
+    return [int(item) for item in value.split(',')]
+
+
+def ratio_list(value: str) -> List[List[int]]:
+    """Zamień listę proporcji rozdzielonych przecinkami (np. 3/2,5/4) na listę par"""
+    return [[int(number) for number in item.split('/')] for item in value.split(',')]
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description='Generator melodii. Każdy parametr odpowiada jednej z metod Generator.set_*. '
+                    'Pominięte parametry przyjmują wartości domyślne generatora lub wartości z pliku --settings.'
+    )
+
+    group = parser.add_argument_group('Ustawienia generatora')
+    group.add_argument('--settings', metavar='FILE',
+                       help='Plik JSON z ustawieniami w formacie Generator.to_dict(). '
+                            'Parametry podane w linii poleceń mają pierwszeństwo')
+    group.add_argument('--metre', metavar='N/M',
+                       help='Metrum, np. 4/4. Wartością rytmiczną może być półnuta, ćwierćnuta, ósemka lub '
+                            'szesnastka, a ilość nut w metrum jest dowolna')
+    group.add_argument('--grouping', metavar='N+M+...',
+                       help='Podział taktu na grupy główne, np. 2+2+3 dla metrum 7/8. Domyślnie zależy od metrum')
+    group.add_argument('--bar-count', type=int, help='Liczba taktów, którą chcemy wygenerować')
+    group.add_argument('--start-note', metavar='NOTE', help="Nuta początkowa w notacji lilypond, np. c'")
+    group.add_argument('--end-note', metavar='NOTE', help="Nuta końcowa w notacji lilypond, np. c'")
+    group.add_argument('--end-note-approach', type=int, metavar='COUNT',
+                       help='Liczba ostatnich nut planowanych tak, aby melodia doszła do nuty końcowej dozwolonymi '
+                            'interwałami. Domyślnie 0 (wysokość ostatniej nuty jest zastępowana nutą końcową)')
+    group.add_argument('--key', metavar='TONIC', help='Tonacja, np. d lub bes. Wysokości losowane są ze stopni gamy')
+    group.add_argument('--key-type', choices=[key_type.value for key_type in KeyType], default=KeyType.MAJOR.value,
+                       help='Rodzaj tonacji podanej w --key. Domyślnie major')
+    group.add_argument('--lowest', metavar='NOTE', help='Najniższa nuta ambitusu')
+    group.add_argument('--highest', metavar='NOTE', help='Najwyższa nuta ambitusu')
+    group.add_argument('--rest-probability', type=float,
+                       help='Prawdopodobieństwo wystąpienia pauzy, znormalizowane do 1')
+    group.add_argument('--max-consecutive-rests', metavar='COUNT',
+                       help='Ile maksymalnie pauz może nastąpić po sobie (w nutach niepogrupowanych) lub "none"')
+    group.add_argument('--intervals-probability', type=int_list, metavar='P,...',
+                       help='Prawdopodobieństwa interwałów [1cz, 2m, 2w, 3m, 3w, 4cz, 4zw, 5zmn, 5cz, 6m, 6w, 7m, '
+                            '7w, 8cz], liczby całkowite sumujące się do 100')
+    group.add_argument('--interval-probability', nargs=2, action='append', metavar=('INTERVAL', 'P'), default=[],
+                       help='Prawdopodobieństwo pojedynczego interwału, np. 2w 20. Można podać wielokrotnie')
+    group.add_argument('--notes-probability', type=int_list, metavar='P,...',
+                       help='Prawdopodobieństwa 12 dźwięków w obrębie oktawy (od c do b), sumujące się do 100')
+    group.add_argument('--durations-probability', type=int_list, metavar='P,...',
+                       help='Prawdopodobieństwa wartości rytmicznych [cała nuta, półnuta, ... aż do 64], '
+                            'sumujące się do 100')
+    group.add_argument('--tuplet-probability', type=float,
+                       help='Prawdopodobieństwo wystąpienia grupy niemiarowej zamiast nuty, znormalizowane do 1')
+    group.add_argument('--tuplets', type=ratio_list, metavar='N/M,...',
+                       help='Dozwolone grupy niemiarowe, np. 3/2,5/4 (triola, kwintola). Domyślnie 3/2')
+    group.add_argument('--shortest-note-duration', type=int,
+                       help='Najkrótsza wartość rytmiczna, która może pojawić się w nutach')
+
+    group = parser.add_argument_group('Generowanie')
+    group.add_argument('--seed', type=int, help='Ziarno bazowe. Melodia o numerze i używa ziarna seed + i')
+    group.add_argument('--count', type=int, default=1, help='Liczba melodii do wygenerowania')
+    group.add_argument('--formats', default='ly',
+                       help='Formaty wyjściowe rozdzielone przecinkami: ly, midi, json, wav (bez lilyponda) oraz '
+                            'pdf, png, ps, svg (kompilacja lilypondem). Domyślnie ly')
+    group.add_argument('--output-dir', default='output/generated', help='Folder na pliki wynikowe')
+    group.add_argument('--ndjson', metavar='FILE',
+                       help='Zapisz wszystkie melodie jako NDJSON do jednego pliku (- oznacza standardowe wyjście) '
+                            'zamiast tworzyć pliki w --output-dir')
+    group.add_argument('--name', default='generated', help='Przedrostek nazw plików')
+    group.add_argument('--workers', type=int, default=1, help='Liczba procesów generujących melodie')
+    group.add_argument('--quiet', action='store_true', help='Nie wyświetlaj postępu')
+
+    return parser
+
+
+def get_settings(args: argparse.Namespace) -> Dict[str, Any]:
+    """Zbuduj słownik ustawień generatora na podstawie argumentów"""
+    settings: Dict[str, Any] = {}
+
+    if args.settings is not None:
+        with open(args.settings) as f:
+            settings = json.load(f)
+
+    if args.metre is not None:
+        settings['metre'] = [int(item) for item in args.metre.split('/')]
+
+    if args.lowest is not None or args.highest is not None:
+        ambitus = settings.get('ambitus', Generator().to_dict()['ambitus'])
+        settings['ambitus'] = {
+            'lowest': args.lowest if args.lowest is not None else ambitus['lowest'],
+            'highest': args.highest if args.highest is not None else ambitus['highest']
+        }
+
+    if args.grouping is not None:
+        settings['grouping'] = [int(item) for item in args.grouping.split('+')]
+
+    if args.key is not None:
+        settings['key'] = {'tonic': args.key, 'type': args.key_type}
+
+    if args.max_consecutive_rests is not None:
+        value = args.max_consecutive_rests
+        settings['max_consecutive_rests'] = None if value.lower() == 'none' else int(value)
+
+    for key in ['bar_count', 'start_note', 'end_note', 'rest_probability', 'intervals_probability',
+                'notes_probability', 'durations_probability', 'shortest_note_duration', 'end_note_approach',
+                'tuplet_probability', 'tuplets']:
+        if getattr(args, key) is not None:
+            settings[key] = getattr(args, key)
+
+    if len(args.interval_probability) > 0:
+        # Korzystamy z set_interval_probability, aby nazwy interwałów były walidowane tak samo jak w generatorze
+        generator = Generator.from_dict(settings)
+        for interval, probability in args.interval_probability:
+            generator.set_interval_probability(interval, int(probability))
+
+        settings['intervals_probability'] = generator.intervals_probability
+
+    return settings
+
+
+def main(argv: Optional[List[str]] = None):
+    args = get_parser().parse_args(argv)
+
+    try:
+        settings = get_settings(args)
+        batch = Batch(settings, args.output_dir, args.formats.split(','), args.name)
+    except Exception as e:
+        print(f'Invalid settings: {getattr(e, "message", e)}', file=sys.stderr)
+        sys.exit(2)
+
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+
+    def progress(done: int, count: int, seconds: float):
+        print(f'\r{done}/{count} melodies, {done / max(seconds, 1e-9):.1f} melodies/s', end='', file=sys.stderr)
+
+    if args.ndjson is not None:
+        output = sys.stdout if args.ndjson == '-' else args.ndjson
+
+        with NdjsonWriter(output, Generator.from_dict(settings).to_dict(), seed) as writer:
+            batch.stream(args.count, seed, writer, args.workers, None if args.quiet else progress)
+    else:
+        batch.run(args.count, seed, args.workers, None if args.quiet else progress)
+
+    if not args.quiet:
+        print(f'\nSeed: {seed}', file=sys.stderr)
 
 
 if __name__ == '__main__':
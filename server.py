@@ -0,0 +1,29 @@
+import argparse
+
+from lib.Server import GeneratorServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serwer HTTP generujący melodie')
+    parser.add_argument('--host', default='127.0.0.1', help='Adres, na którym nasłuchuje serwer')
+    parser.add_argument('--port', type=int, default=8000, help='Port serwera')
+    parser.add_argument('--workers', type=int, default=2, help='Liczba procesów roboczych')
+    parser.add_argument('--max-pending', type=int, default=16, help='Maksymalna liczba jednoczesnych zapytań')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Maksymalny czas generowania w sekundach')
+    args = parser.parse_args()
+
+    # Przykładowe zapytanie:
+    # curl -X POST localhost:8000/generate -d '{"settings": {"bar_count": 8}, "seed": 1, "format": "lilypond"}'
+    server = GeneratorServer(args.host, args.port, args.workers, args.max_pending, args.timeout)
+    print(f'Listening on http://{args.host}:{server.server_address[1]}')
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
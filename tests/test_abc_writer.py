@@ -0,0 +1,117 @@
+import os
+import tempfile
+import unittest
+
+from lib.AbcWriter import AbcWriter
+from lib.Generator import Generator
+from lib.Key import Key
+from lib.KeyType import KeyType
+from lib.Writer import Writer
+from lib.theory.Note import Note
+from lib.theory.NoteModifier import NoteModifier
+from lib.theory.OctaveType import OctaveType
+from lib.theory.Rest import Rest
+from lib.theory.RestModifier import RestModifier
+from lib.theory.Tuplet import Tuplet
+
+
+class AbcWriterTests(unittest.TestCase):
+    def test_get_pitch(self):
+        self.assertEqual('C', AbcWriter.get_pitch('c', OctaveType.LINE_1, False))
+        self.assertEqual('c', AbcWriter.get_pitch('c', OctaveType.LINE_2, False))
+        self.assertEqual("^f''", AbcWriter.get_pitch('fis', OctaveType.LINE_4, True))
+        self.assertEqual('_B,,', AbcWriter.get_pitch('bes', OctaveType.GREAT, True))
+        self.assertEqual('__E,', AbcWriter.get_pitch('eeses', OctaveType.SMALL, True))
+        self.assertEqual('=G', AbcWriter.get_pitch('g', OctaveType.LINE_1, True))
+
+    def test_get_length(self):
+        self.assertEqual(['8', '4', '2', '', '/', '/4'], [AbcWriter.get_length(64 // d) for d in [1, 2, 4, 8, 16, 32]])
+        self.assertEqual('3', AbcWriter.get_length(AbcWriter.get_duration(4, '.')))
+        self.assertEqual('7/2', AbcWriter.get_length(AbcWriter.get_duration(4, '..')))
+        self.assertEqual('3/4', AbcWriter.get_length(AbcWriter.get_duration(16, '.')))
+
+    def test_get_key_field(self):
+        self.assertEqual('C', AbcWriter.get_key_field(None))
+        self.assertEqual('Bbm', AbcWriter.get_key_field(Key('bes', KeyType.MINOR)))
+        self.assertEqual('F#', AbcWriter.get_key_field(Key('fis')))
+
+        # Tonacje z podwójnymi znakami zapisywane są bez znaków przykluczowych
+        self.assertEqual('C', AbcWriter.get_key_field(Key('gis')))
+        self.assertEqual('f', AbcWriter.get_key_signature(Key('gis'))['f'])
+
+    def test_get_bar(self):
+        signature = AbcWriter.get_key_signature(Key('f'))
+        writer = AbcWriter('test')
+
+        self.assertEqual('F3-F B=B _B2', writer.get_bar([
+            Note('f', OctaveType.LINE_1, 4, [NoteModifier.DOT, NoteModifier.TIE]), Note('f', OctaveType.LINE_1, 8),
+            Note('bes', OctaveType.LINE_1, 8), Note('b', OctaveType.LINE_1, 8), Note('bes', OctaveType.LINE_1, 4)
+        ], signature, 16))
+
+        self.assertEqual('z3/2z/ (3:2:3c^cd z4', writer.get_bar([
+            Rest(8, [RestModifier.DOT]), Rest(16), Tuplet(3, 2, [Note('c', OctaveType.LINE_2, 8),
+                                                             Note('cis', OctaveType.LINE_2, 8),
+                                                             Note('d', OctaveType.LINE_2, 8)]), Rest(2)
+        ], signature, 16))
+
+        self.assertEqual('C/D/E/F/ G/A/B/c/ C4', writer.get_bar([
+            Note(name, OctaveType.LINE_1, 16) for name in 'cdefgab'
+        ] + [Note('c', OctaveType.LINE_2, 16), Note('c', OctaveType.LINE_1, 2)], AbcWriter.get_key_signature(None), 16))
+
+    def test_from_bars(self):
+        writer = AbcWriter('test')
+        writer.bars_per_line = 2
+        writer.from_bars([
+            [Note('c', OctaveType.LINE_1, 1)],
+            [Note('c', OctaveType.GREAT, 2, [NoteModifier.TIE]), Note('c', OctaveType.GREAT, 2)],
+            [Note('d', OctaveType.GREAT, 1)],
+            [Note('g', OctaveType.LINE_1, 1)]
+        ], (4, 4), Key('d', KeyType.MINOR), title='Melody')
+
+        self.assertEqual([
+            'X:1',
+            'T:Melody',
+            'M:4/4',
+            'L:1/8',
+            'K:Dm clef=treble',
+            'C8 | [K:Dm clef=bass] C,,4- C,,4 |',
+            'D,,8 | [K:Dm clef=treble] G8 |]'
+        ], writer.lines)
+
+    def test_clefs_match_writer(self):
+        generator = Generator().set_bar_count(16).set_tuplets(0.2, [(3, 2)])
+        generator.set_ambitus(Note('c', OctaveType.GREAT), Note('c', OctaveType.LINE_3))
+
+        for seed in range(5):
+            bars = generator.generate(group=True, seed=seed)
+
+            writer = Writer('test')
+            writer.parse(bars)
+            abc_writer = AbcWriter('test')
+            abc_writer.bars_per_line = 1
+            abc_writer.from_bars(bars, generator.metre)
+
+            # Plik ABC zaczyna się kluczem wiolinowym, więc zmiana na niego w pierwszym takcie nie jest zapisywana
+            lilypond_clefs = [line.split()[1] for line in writer.lines if line.strip().startswith('\\clef')]
+            lilypond_clefs = lilypond_clefs[1:] if lilypond_clefs[:1] == ['G'] else lilypond_clefs
+            abc_clefs = ['F' if 'clef=bass' in line else 'G' for line in abc_writer.lines if line.startswith('[K:')]
+
+            self.assertEqual(lilypond_clefs, abc_clefs)
+            self.assertEqual(len(bars), len(abc_writer.lines) - 5)
+
+    def test_export(self):
+        with tempfile.TemporaryDirectory() as source_dir:
+            writer = AbcWriter('test')
+            writer.set_source_dir(source_dir)
+            writer.from_generator(Generator().set_metre(6, 8).set_key('a'), seed=2)
+            writer.export()
+
+            with open(os.path.join(source_dir, 'test.abc')) as f:
+                content = f.read()
+
+        self.assertTrue(content.startswith('X:1\nT:test\nM:6/8\nL:1/8\nK:A clef=treble\n'))
+        self.assertTrue(content.endswith('|]\n'))
+
+
+if __name__ == "__main__":
+    unittest.main()
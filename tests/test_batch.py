@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+
+from lib.Batch import Batch
+
+
+class BatchTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+        self.settings = {'metre': [3, 4], 'bar_count': 4}
+
+    def read_all(self, directory: str) -> dict:
+        result = {}
+        for filename in sorted(os.listdir(directory)):
+            with open(os.path.join(directory, filename), 'rb') as f:
+                result[filename] = f.read()
+
+        return result
+
+    def test_run(self):
+        batch = Batch(self.settings, self.tmp.name, ['ly', 'midi', 'json'], name='melody')
+        done = batch.run(3, seed=10)
+
+        self.assertEqual(3, done)
+        self.assertEqual(
+            ['melody-000000.json', 'melody-000000.ly', 'melody-000000.mid', 'melody-000001.json'],
+            sorted(os.listdir(self.tmp.name))[:4]
+        )
+        self.assertEqual(9, len(os.listdir(self.tmp.name)))
+
+    def test_run_wav(self):
+        Batch(self.settings, self.tmp.name, ['wav'], name='melody').run(2, seed=10)
+        self.assertEqual(['melody-000000.wav', 'melody-000001.wav'], sorted(os.listdir(self.tmp.name)))
+
+    def test_run_parallel_matches_serial(self):
+        Batch.chunk_size = 4
+        self.addCleanup(setattr, Batch, 'chunk_size', 64)
+
+        serial = os.path.join(self.tmp.name, 'serial')
+        parallel = os.path.join(self.tmp.name, 'parallel')
+        reports = []
+
+        Batch(self.settings, serial, ['ly', 'json']).run(10, seed=3)
+        Batch(self.settings, parallel, ['ly', 'json']).run(
+            10, seed=3, workers=2, progress=lambda done, count, seconds: reports.append((done, count))
+        )
+
+        self.assertEqual(self.read_all(serial), self.read_all(parallel))
+        self.assertEqual((10, 10), reports[-1])
+        self.assertEqual(3, len(reports))
+
+    def test_invalid_format(self):
+        with self.assertRaises(ValueError):
+            Batch(self.settings, self.tmp.name, ['ly', 'mp3'])
+
+    def test_invalid_settings(self):
+        with self.assertRaises(ValueError):
+            Batch({'bar_count': 0}, self.tmp.name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import unittest
+
+import numpy as np
+
+from lib.BatchGenerator import BatchGenerator
+from lib.Generator import Generator
+from lib.MarkovModel import MarkovModel
+from lib.theory.Note import Note
+from lib.theory.NoteModifier import NoteModifier
+from lib.theory.OctaveType import OctaveType
+from lib.theory.Rest import Rest
+
+
+class BatchGeneratorTests(unittest.TestCase):
+    def setUp(self):
+        self.generator = Generator()
+        self.generator.set_bar_count(6)
+
+    def test_get_durations_cumulative(self):
+        self.generator.set_durations_probability([0, 0, 50, 50, 0, 0, 0])
+        cumulative = BatchGenerator(self.generator).durations_cumulative
+
+        self.assertEqual((17, 7), cumulative.shape)
+
+        # Przy 16 dostępnych szesnastkach dozwolone są wszystkie wartości
+        np.testing.assert_allclose([0, 0, 0.5, 1, 1, 1, 1], cumulative[16])
+
+        # Przy 3 szesnastkach ćwierćnuta się nie mieści
+        np.testing.assert_allclose([0, 0, 0, 1, 1, 1, 1], cumulative[3])
+
+        # Jeśli żadna z dostępnych wartości nie ma prawdopodobieństwa, losujemy je jednostajnie
+        np.testing.assert_allclose([0, 0, 0, 0, 1, 1, 1], cumulative[1])
+
+    def test_generate_arrays(self):
+        batch = BatchGenerator(self.generator)
+        pitches, durations, dots, sizes = batch.generate_arrays(500, seed=1)
+
+        bar_duration = self.generator.get_all_bars_duration()
+        lengths = np.where(durations > 0, 16 // np.maximum(durations, 1) * np.where(dots, 3, 2) // 2, 0)
+
+        np.testing.assert_array_equal(bar_duration, lengths.sum(axis=1))
+        np.testing.assert_array_equal(sizes, np.count_nonzero(durations, axis=1))
+        self.assertTrue(np.all(pitches[:, 0] == 60))
+
+        notes = pitches[pitches >= 0]
+        self.assertTrue(np.all((notes >= 48) & (notes <= 96)))
+
+    def test_generate(self):
+        self.generator.set_end_note(Note('g', OctaveType.LINE_1))
+        melodies = BatchGenerator(self.generator).generate(50, seed=2)
+
+        self.assertEqual(50, len(melodies))
+
+        for melody in melodies:
+            self.assertEqual(self.generator.get_all_bars_duration(), sum(elem.get_duration(16) for elem in melody))
+            self.assertEqual(Note('c', OctaveType.LINE_1).get_id(), melody[0].get_id())
+
+            last_note = [elem for elem in melody if isinstance(elem, Note)][-1]
+            self.assertEqual(('g', OctaveType.LINE_1), (last_note.note, last_note.octave))
+
+            for elem in melody:
+                self.assertNotIn(NoteModifier.DOUBLE_DOT, elem.modifiers)
+
+    def test_generate_group(self):
+        bars = BatchGenerator(self.generator).generate(3, group=True, seed=3)
+
+        for melody in bars:
+            self.assertEqual(6, len(melody))
+            for bar in melody:
+                self.assertEqual(16, sum(elem.get_duration(16) for elem in bar))
+
+    def test_generate_short_melody(self):
+        for metre in [(2, 4), (3, 8)]:
+            self.generator.set_metre(*metre).set_bar_count(1)
+            bar_duration = self.generator.get_bar_duration()
+
+            for melody in BatchGenerator(self.generator).generate(200, group=True, seed=5):
+                self.assertEqual(1, len(melody))
+                self.assertEqual(bar_duration, sum(elem.get_duration(16) for elem in melody[0]))
+
+    def test_generate_with_seed(self):
+        batch = BatchGenerator(self.generator)
+
+        first = [[str(elem) for elem in melody] for melody in batch.generate(20, seed=4)]
+        second = [[str(elem) for elem in melody] for melody in batch.generate(20, seed=4)]
+
+        self.assertEqual(first, second)
+
+    def test_max_consecutive_rests(self):
+        self.generator.set_rest_probability(1)
+        self.generator.set_max_consecutive_rests(0)
+        pitches, _, _, sizes = BatchGenerator(self.generator).generate_arrays(100, seed=5)
+
+        for row, size in zip(pitches, sizes):
+            self.assertTrue(np.all(row[:size] >= 0))
+
+    def test_distribution(self):
+        # Rozkład pauz i wartości rytmicznych powinien być taki sam jak w Generator.generate
+        reference = [elem for i in range(300) for elem in self.generator.generate(seed=i)]
+        batch = [elem for melody in BatchGenerator(self.generator).generate(300, seed=6) for elem in melody]
+
+        def rests(data):
+            return np.mean([isinstance(elem, Rest) for elem in data])
+
+        def durations(data):
+            return np.mean([elem.base_duration for elem in data])
+
+        self.assertAlmostEqual(rests(reference), rests(batch), delta=0.03)
+        self.assertAlmostEqual(durations(reference), durations(batch), delta=0.5)
+
+    def test_end_note_approach(self):
+        self.generator.set_intervals_probability([0, 0, 50, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 50])
+        self.generator.set_end_note(Note('e', OctaveType.LINE_2)).set_bar_count(8).set_rest_probability(0.2)
+        self.generator.set_end_note_approach(3)
+
+        pitches, _, _, _ = BatchGenerator(self.generator).generate_arrays(300, seed=8)
+
+        for row in pitches:
+            ids = row[row >= 0]
+            self.assertEqual(76, ids[-1])
+
+            if len(ids) > 8:
+                self.assertTrue(np.all(np.isin(np.abs(np.diff(ids)), [2, 12])))
+
+    def test_markov_model(self):
+        self.generator.set_rest_probability(0)
+        self.generator.set_markov_model(MarkovModel.from_sequences([[60, 64, 67, 64, 60]], 1, 48, 96))
+        pitches, _, _, sizes = BatchGenerator(self.generator).generate_arrays(100, seed=7)
+
+        for row, size in zip(pitches, sizes):
+            self.assertTrue(set(row[:size - 1]) <= {60, 64, 67})
+
+    def test_start_note_outside_model(self):
+        self.generator.set_markov_model(MarkovModel(1, 48, 96, [], [], []))
+        self.generator.markov_model = MarkovModel(1, 62, 96, [], [], [])
+
+        with self.assertRaises(ValueError):
+            BatchGenerator(self.generator).generate_arrays(1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from lib.BinaryReader import BinaryReader
+from lib.BinaryWriter import BinaryWriter
+from lib.Generator import Generator
+from lib.theory.Note import Note
+from lib.theory.NoteModifier import NoteModifier
+from lib.theory.OctaveType import OctaveType
+from lib.theory.Rest import Rest
+from lib.theory.RestModifier import RestModifier
+from lib.theory.Tuplet import Tuplet
+
+
+class BinaryReaderTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.dir.name, 'melodies.mgb')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_get_records(self):
+        records = BinaryWriter.get_records([
+            [Note('fis', OctaveType.LINE_1, 4, [NoteModifier.DOT, NoteModifier.TIE]), Rest(8, [RestModifier.DOT])],
+            [Tuplet(3, 2, [Note('bes', OctaveType.SMALL, 8), Rest(8), Note('c', OctaveType.LINE_2, 8)])]
+        ])
+
+        self.assertEqual(12, BinaryWriter.record_dtype.itemsize)
+        self.assertEqual([66, -1, 58, -1, 72], records['pitch'].tolist())
+        self.assertEqual([3, 0, 6, 0, 0], records['step'].tolist())
+        self.assertEqual([1, 0, -1, 0, 0], records['alter'].tolist())
+        self.assertEqual([BinaryWriter.DOT | BinaryWriter.TIE, BinaryWriter.DOT, BinaryWriter.TUPLET_START, 0, 0],
+                         records['modifiers'].tolist())
+        self.assertEqual([0, 0, 3, 3, 3], records['tuplet_numerator'].tolist())
+        self.assertEqual([0, 0, 1, 1, 1], records['bar'].tolist())
+
+    def test_round_trip(self):
+        generator = Generator().set_bar_count(6).set_key('bes').set_tuplets(0.3, [(3, 2), (5, 4)])
+        melodies = [generator.generate(group=True, seed=seed) for seed in range(20)]
+
+        with BinaryWriter(self.filename, generator.to_dict(), 100) as writer:
+            for seed, bars in enumerate(melodies):
+                writer.add(bars, 100 + seed)
+
+        reader = BinaryReader(self.filename).read()
+
+        self.assertEqual(20, len(reader))
+        self.assertEqual(100, reader.seed)
+        self.assertEqual(105, reader.get_seed(5))
+        self.assertEqual(generator.to_dict(), Generator.from_dict(reader.settings).to_dict())
+
+        for idx, bars in enumerate(melodies):
+            self.assertEqual(bars, reader.get_bars(idx))
+
+    def test_memory_mapped_views(self):
+        bars = [[Note('c', OctaveType.LINE_1, 2), Note('d', OctaveType.LINE_1, 2)]]
+
+        with BinaryWriter(self.filename) as writer:
+            writer.add(bars).add(bars + [[Rest(1)]])
+
+        reader = BinaryReader(self.filename).read()
+        melodies = list(reader)
+
+        self.assertIsInstance(reader.records, np.memmap)
+        self.assertTrue(np.shares_memory(melodies[1], reader.records))
+        self.assertEqual([2, 3], [len(melody) for melody in melodies])
+        self.assertEqual([60, 62, -1], melodies[1]['pitch'].tolist())
+        self.assertIsNone(reader.get_seed(0))
+        self.assertEqual(bars + [[Rest(1)]], reader.get_bars(1))
+
+    def test_empty_file(self):
+        with BinaryWriter(self.filename, seed=3):
+            pass
+
+        reader = BinaryReader(self.filename).read()
+
+        self.assertEqual(0, len(reader))
+        self.assertEqual(3, reader.seed)
+
+    def test_read_invalid(self):
+        with open(self.filename, 'wb') as f:
+            f.write(b'\\version "2.24.0"\n' * 4)
+
+        with self.assertRaises(ValueError):
+            BinaryReader(self.filename).read()
+
+    def test_read_incomplete(self):
+        writer = BinaryWriter(self.filename).open()
+        writer.add([[Note('c', base_duration=1)]])
+        writer.file.flush()
+
+        with self.assertRaises(ValueError):
+            BinaryReader(self.filename).read()
+
+        writer.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
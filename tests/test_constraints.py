@@ -0,0 +1,164 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from lib.GenerationContext import GenerationContext
+from lib.Generator import Generator
+from lib.constraints import Constraint, MaxLeap, PitchRange, RestRatio, Syncopation
+from lib.errors import ConstraintsNotSatisfied
+from lib.theory.Note import Note
+from lib.theory.OctaveType import OctaveType
+from lib.theory.Rest import Rest
+
+
+class ConstraintsTests(unittest.TestCase):
+    def setUp(self):
+        self.generator = Generator()
+        self.generator.set_bar_count(4)
+
+    @staticmethod
+    def get_ids(data):
+        return [item.get_id() for item in data if isinstance(item, Note)]
+
+    def test_max_leap(self):
+        self.generator.add_constraint(MaxLeap(4)).set_end_note_approach(4)
+
+        for seed in range(20):
+            ids = self.get_ids(self.generator.generate(seed=seed))
+            self.assertTrue(all(abs(a - b) <= 4 for a, b in zip(ids, ids[1:])))
+
+        stats = self.generator.get_constraint_stats()
+        self.assertEqual(20, stats['accepted'])
+        self.assertGreater(stats['retries'], 0)
+        self.assertGreater(stats['violations']['MaxLeap'], 0)
+
+    def test_pitch_range(self):
+        self.generator.add_constraint(PitchRange(max_span=12, min_span=5))
+
+        for seed in range(20):
+            ids = self.get_ids(self.generator.generate(seed=seed))
+            self.assertLessEqual(max(ids) - min(ids), 12)
+            self.assertGreaterEqual(max(ids) - min(ids), 5)
+
+    def test_rest_ratio(self):
+        self.generator.set_rest_probability(0.5).add_constraint(RestRatio(max_ratio=0.25, min_ratio=0.1))
+
+        for seed in range(20):
+            data = self.generator.generate(seed=seed)
+            rests = sum(item.get_duration(16) for item in data if isinstance(item, Rest))
+
+            self.assertLessEqual(rests, 16)
+            self.assertGreaterEqual(rests, 6.4)
+
+    def test_rest_ratio_regenerate_bars(self):
+        self.generator.set_bar_count(8).set_rest_probability(0.5)
+        bars = self.generator.generate(group=True, seed=1)
+        self.generator.add_constraint(RestRatio(max_ratio=0.25, min_ratio=0.1))
+
+        for seed in range(20):
+            regenerated = self.generator.regenerate_bars(bars, 5, 7, seed=seed)
+            rests = sum(item.get_duration(16) for bar in regenerated[5:7] for item in bar if isinstance(item, Rest))
+
+            self.assertEqual(bars[:5] + bars[7:], regenerated[:5] + regenerated[7:])
+            self.assertLessEqual(rests, 8)
+            self.assertGreaterEqual(rests, 3.2)
+
+    def test_syncopation(self):
+        self.generator.add_constraint(Syncopation())
+
+        for seed in range(20):
+            position = 0
+
+            for item in self.generator.generate(seed=seed):
+                duration = item.get_duration(16)
+                if isinstance(item, Note) and position % 4 != 0:
+                    self.assertLessEqual(position % 4 + duration, 4)
+
+                position += duration
+
+    def test_is_syncopated(self):
+        context = GenerationContext(0)
+        context.generator = self.generator
+        context.position = 2
+
+        self.assertTrue(Syncopation.is_syncopated(context, Note('c', base_duration=4)))
+        self.assertFalse(Syncopation.is_syncopated(context, Note('c', base_duration=8)))
+        self.assertFalse(Syncopation.is_syncopated(context, Rest(4)))
+
+        context.position = 4
+        self.assertFalse(Syncopation.is_syncopated(context, Note('c', base_duration=2)))
+
+    def test_callable_constraint(self):
+        def no_rests(context: GenerationContext, element) -> bool:
+            return not isinstance(element, Rest)
+
+        self.generator.add_constraint(no_rests)
+        data = self.generator.generate(seed=1)
+
+        self.assertFalse(any(isinstance(item, Rest) for item in data))
+        self.assertIn('no_rests', self.generator.get_constraint_stats()['violations'])
+
+    def test_add_constraint_invalid(self):
+        with self.assertRaises(TypeError):
+            self.generator.add_constraint(4)
+
+    def test_not_satisfied(self):
+        self.generator.add_constraint(PitchRange(min_span=100)).set_constraint_retries(0, 3)
+
+        with self.assertRaises(ConstraintsNotSatisfied):
+            self.generator.generate(seed=1)
+
+        self.assertEqual({'accepted': 0, 'rejected': 3, 'retries': 0, 'violations': {'PitchRange': 3}},
+                         self.generator.get_constraint_stats())
+
+    def test_abandon_early(self):
+        class Counter(Constraint):
+            def __init__(self):
+                self.checked = 0
+
+            def check(self, context, element):
+                self.checked += 1
+                return not isinstance(element, Rest)
+
+        counter = Counter()
+        self.generator.set_rest_probability(1).add_constraint(counter).set_constraint_retries(2, 5)
+
+        with self.assertRaises(ConstraintsNotSatisfied):
+            self.generator.generate(seed=1)
+
+        # Każda próba kończy się na drugim elemencie, po 3 losowaniach
+        self.assertEqual(5 * (1 + 3), counter.checked)
+
+    def test_generate_with_seed(self):
+        self.generator.add_constraint(MaxLeap(5)).add_constraint(Syncopation(2))
+
+        first = [str(item) for item in self.generator.generate(seed=3)]
+        second = [str(item) for item in self.generator.generate(seed=3)]
+        self.assertEqual(first, second)
+
+    def test_stats_concurrently(self):
+        self.generator.add_constraint(MaxLeap(7))
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda seed: self.generator.generate(seed=seed), range(100)))
+
+        self.assertEqual(100, self.generator.get_constraint_stats()['accepted'])
+
+        self.generator.reset_constraint_stats()
+        self.assertEqual(0, self.generator.get_constraint_stats()['accepted'])
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            MaxLeap(-1)
+
+        with self.assertRaises(ValueError):
+            PitchRange(max_span=3, min_span=5)
+
+        with self.assertRaises(ValueError):
+            RestRatio(max_ratio=0.1, min_ratio=0.2)
+
+        with self.assertRaises(ValueError):
+            self.generator.set_constraint_retries(0, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,205 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+import numpy as np
+
+import train
+from lib.Corpus import Corpus
+from lib.Generator import Generator
+from lib.MarkovModel import MarkovModel
+from lib.MidiWriter import MidiWriter
+from lib.theory.Note import Note
+from lib.theory.NoteModifier import NoteModifier
+from lib.theory.OctaveType import OctaveType
+from lib.theory.Rest import Rest
+from lib.Writer import Writer
+
+
+class CorpusTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+        self.bars = [
+            [Note('c', OctaveType.LINE_1, 4), Note('e', OctaveType.LINE_1, 4, [NoteModifier.DOT]),
+             Note('g', OctaveType.LINE_1, 8), Rest(4)],
+            [Note('c', OctaveType.LINE_2, 2, [NoteModifier.TIE]), Note('c', OctaveType.LINE_2, 2)]
+        ]
+
+    def write_ly(self, filename: str):
+        writer = Writer(filename)
+        writer.set_source_dir(self.tmp.name)
+        writer.from_bars(self.bars, (4, 4))
+        writer.export()
+
+        return os.path.join(self.tmp.name, f'{filename}.ly')
+
+    def write_midi(self, filename: str):
+        writer = MidiWriter(filename)
+        writer.set_output_dir(self.tmp.name)
+        writer.parse(self.bars).export()
+
+        return os.path.join(self.tmp.name, f'{filename}.mid')
+
+    def assert_counts(self, corpus: Corpus):
+        self.assertEqual(4, corpus.note_count)
+        self.assertEqual(1, corpus.rest_count)
+        np.testing.assert_array_equal([2, 0, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0], corpus.notes)
+        np.testing.assert_array_equal([0, 0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0], corpus.intervals)
+
+        # Nuty połączone łukiem zliczane są jako jedna cała nuta, a ćwierćnuta z kropką jako ćwierćnuta
+        np.testing.assert_array_equal([1, 0, 3, 1, 0, 0, 0], corpus.durations)
+        self.assertEqual(1, corpus.transitions[60, 64])
+
+    def test_add_ly_file(self):
+        corpus = Corpus()
+        self.assertTrue(corpus.add_file(self.write_ly('test')))
+        self.assert_counts(corpus)
+
+    def test_add_ly_file_default_duration(self):
+        filename = os.path.join(self.tmp.name, 'test.ly')
+        with open(filename, 'w') as f:
+            f.write("\\version \"2.18.2\"\n\\paper {\n\t#(set-paper-size \"a4\")\n}\n{ c'8 d' ees' % f' \n r }")
+
+        corpus = Corpus()
+        corpus.add_file(filename)
+
+        self.assertEqual(3, corpus.note_count)
+        self.assertEqual(1, corpus.rest_count)
+        np.testing.assert_array_equal([0, 0, 0, 4, 0, 0, 0], corpus.durations)
+
+    def test_add_ly_file_command_arguments(self):
+        filename = os.path.join(self.tmp.name, 'test.ly')
+        with open(filename, 'w') as f:
+            f.write("{\n\\key bes \\major\n\\clef \"treble\"\n\\time 3/4\n"
+                    "c'4 d'4 \\tuplet 3/2 { e'8 f'8 g'8 } | a'2.\n}")
+
+        corpus = Corpus()
+        corpus.add_file(filename)
+
+        self.assertEqual(6, corpus.note_count)
+        self.assertEqual(0, corpus.notes[10])
+        self.assertEqual(0, corpus.transitions[58].sum())
+
+    def test_add_ly_file_contracted_names(self):
+        filename = os.path.join(self.tmp.name, 'test.ly')
+        with open(filename, 'w') as f:
+            f.write("{ as'4 es'4 ases'4 }")
+
+        corpus = Corpus()
+        corpus.add_file(filename)
+
+        self.assertEqual(3, corpus.note_count)
+        np.testing.assert_array_equal([0, 0, 0, 1, 0, 0, 0, 1, 1, 0, 0, 0], corpus.notes)
+        self.assertEqual(1, corpus.transitions[68, 63])
+        self.assertEqual(1, corpus.transitions[63, 67])
+
+    def test_add_ly_file_flush(self):
+        writer = Writer('long')
+        writer.set_source_dir(self.tmp.name)
+        writer.from_generator(Generator().set_bar_count(64).set_key('ees'), seed=4)
+        writer.export()
+        filename = os.path.join(self.tmp.name, 'long.ly')
+
+        expected = Corpus()
+        expected.add_file(filename)
+
+        corpus = Corpus()
+        corpus.flush_size = 5
+        corpus.add_file(filename)
+
+        self.assertEqual(expected.note_count, corpus.note_count)
+        np.testing.assert_array_equal(expected.durations, corpus.durations)
+        np.testing.assert_array_equal(expected.intervals, corpus.intervals)
+        np.testing.assert_array_equal(expected.transitions, corpus.transitions)
+
+    def test_add_midi_file(self):
+        corpus = Corpus()
+        self.assertTrue(corpus.add_file(self.write_midi('test')))
+        self.assert_counts(corpus)
+
+    def test_add_file_invalid(self):
+        filename = os.path.join(self.tmp.name, 'test.mid')
+        with open(filename, 'wb') as f:
+            f.write(b'not a midi file')
+
+        corpus = Corpus()
+        self.assertFalse(corpus.add_file(filename))
+        self.assertFalse(corpus.add_file(os.path.join(self.tmp.name, 'missing.ly')))
+        self.assertEqual(2, corpus.skipped)
+        self.assertEqual(0, corpus.files)
+
+    def test_to_percentages(self):
+        self.assertEqual([34, 33, 33], Corpus.to_percentages([1, 1, 1]))
+        self.assertEqual([0, 100], Corpus.to_percentages([0, 5]))
+        self.assertEqual(100, sum(Corpus.to_percentages(np.arange(14) ** 2)))
+
+    def test_to_settings(self):
+        corpus = Corpus()
+        corpus.add_file(self.write_ly('test'))
+        settings = corpus.to_settings({'bar_count': 8})
+
+        self.assertEqual(8, settings['bar_count'])
+        self.assertEqual(0.2, settings['rest_probability'])
+        self.assertEqual([0, 0, 0, 34, 33, 33, 0, 0, 0, 0, 0, 0, 0, 0], settings['intervals_probability'])
+        self.assertEqual([50, 0, 0, 0, 25, 0, 0, 25, 0, 0, 0, 0], settings['notes_probability'])
+        self.assertEqual([20, 0, 60, 20, 0, 0, 0], settings['durations_probability'])
+
+        Generator.from_dict(settings).generate()
+
+    def test_to_settings_empty(self):
+        self.assertEqual({}, Corpus().to_settings())
+
+    def test_get_markov_model(self):
+        corpus = Corpus()
+        corpus.add_file(self.write_ly('test'))
+        model = corpus.get_markov_model()
+
+        self.assertEqual(60, model.lowest)
+        self.assertEqual(72, model.highest)
+        self.assertEqual(1, model.dense()[64 - 60, 67 - 60])
+
+    def test_from_paths(self):
+        for i in range(5):
+            self.write_ly(f'test-{i}')
+            self.write_midi(f'test-{i}')
+
+        with open(os.path.join(self.tmp.name, 'readme.txt'), 'w') as f:
+            f.write('ignored')
+
+        Corpus.chunk_size = 3
+        self.addCleanup(setattr, Corpus, 'chunk_size', 32)
+
+        corpus = Corpus.from_paths([self.tmp.name])
+        parallel = Corpus.from_paths([self.tmp.name], workers=2)
+
+        self.assertEqual(10, corpus.files)
+        self.assertEqual(40, corpus.note_count)
+        np.testing.assert_array_equal(corpus.transitions, parallel.transitions)
+        self.assertEqual(corpus.to_settings(), parallel.to_settings())
+
+    def test_train(self):
+        self.write_ly('test')
+        output = os.path.join(self.tmp.name, 'settings.json')
+        markov = os.path.join(self.tmp.name, 'model.npz')
+
+        train.main([self.tmp.name, '--output', output, '--markov', markov, '--quiet'])
+
+        with open(output) as f:
+            self.assertEqual([50, 0, 0, 0, 25, 0, 0, 25, 0, 0, 0, 0], json.load(f)['notes_probability'])
+
+        self.assertEqual(60, MarkovModel.load(markov).lowest)
+
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            train.main([self.tmp.name, '--quiet'])
+
+        self.assertEqual(0.2, json.loads(stdout.getvalue())['rest_probability'])
+
+
+if __name__ == '__main__':
+    unittest.main()
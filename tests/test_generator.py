@@ -1,14 +1,18 @@
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 import unittest
 import math
 
 from lib.Generator import Generator
+from lib.Key import Key
+from lib.KeyType import KeyType
 from lib.theory.Interval import Interval
 from lib.theory.Note import Note
 from lib.theory.NoteModifier import NoteModifier
 from lib.theory.OctaveType import OctaveType
 from lib.theory.Rest import Rest
 from lib.theory.RestModifier import RestModifier
+from lib.theory.Tuplet import Tuplet
 from lib.theory.Writeable import Writeable
 import lib.errors as errors
 
@@ -31,218 +35,62 @@ class GeneratorTests(unittest.TestCase):
     # region get_available_note_lengths
 
     def test_get_available_note_lengths(self):
-        actual = Generator.get_available_note_lengths()
-        expected = [
-            i for i in Generator.correct_note_lengths
-            if Generator.shortest_note_duration / i <= Generator.shortest_note_duration and i <= Generator.shortest_note_duration
-        ]
+        actual = self.generator.get_available_note_lengths()
+        shortest = self.generator.shortest_note_duration
+        expected = [i for i in Generator.correct_note_lengths if i <= shortest]
 
         self.assertEqual(expected, actual)
 
     def test_get_available_note_lengths_with_param(self):
-        Generator.set_shortest_note_duration(16)
-        actual = Generator.get_available_note_lengths(2)
+        actual = self.generator.get_available_note_lengths(2)
         expected = [8, 16]
 
         self.assertEqual(expected, actual)
 
-    # endregion
-
-    # region Setters
-
-    # region set_metre
-
-    def test_set_metre(self):
-        self.generator.set_metre(4, 4)
-        self.assertEqual((4, 4), self.generator.metre)
-
-    def test_invalid_metre(self):
-        with self.assertRaises(errors.InvalidMetre):
-            self.generator.set_metre(1, 3)
-
-    # endregion
-
-    # region set_bar_count
-
-    def test_set_bar_count(self):
-        self.generator.set_bar_count(16)
-        self.assertEqual(16, self.generator.bar_count)
-
-    def test_invalid_bar_count(self):
-        with self.assertRaises(ValueError):
-            self.generator.set_bar_count(-5)
-
-    # endregion
-
-    # region set_shortest_note_duration
-
-    def test_set_shortest_note_duration(self):
+    def test_get_available_note_lengths_shortest_duration(self):
         self.generator.set_shortest_note_duration(8)
-        self.assertEqual(8, self.generator.shortest_note_duration)
-
-    def test_set_invalid_note_duration(self):
-        with self.assertRaises(errors.InvalidBaseNoteDuration):
-            self.generator.set_shortest_note_duration(3)
-
-    # endregion
-
-    # region set_start_note
-
-    def test_set_start_note(self):
-        note = Note('c')
-        self.generator.set_start_note(note)
-        self.assertEqual(note, self.generator.start_note)
 
-    def test_set_start_note_raises_note_outside_ambitus(self):
-        note = Note('c', OctaveType.SUB_CONTRA)
-        with self.assertRaises(errors.NoteOutsideAmbitus):
-            self.generator.set_start_note(note)
+        self.assertEqual([1, 2, 4, 8], self.generator.get_available_note_lengths())
+        self.assertEqual([1, 2, 4, 8, 16], Generator().get_available_note_lengths())
 
     # endregion
 
-    # region set_end_note
-
-    def test_set_end_note(self):
-        note = Note('c', OctaveType.LINE_2)
-        self.generator.set_end_note(note)
-        self.assertEqual(note, self.generator.end_note)
-
-    def test_set_end_note_raises_note_outside_ambitus(self):
-        note = Note('c', OctaveType.LINE_6)
-        with self.assertRaises(errors.NoteOutsideAmbitus):
-            self.generator.set_end_note(note)
-
-    # endregion
-
-    # region set_ambitus
-
-    def test_set_ambitus_no_params(self):
-        self.generator.set_ambitus()
-        self.assertEqual(Note('c', OctaveType.SMALL), self.generator.ambitus['lowest'])
-        self.assertEqual(Note('c', OctaveType.LINE_4), self.generator.ambitus['highest'])
+    # region to_dict / from_dict
 
-    def test_set_ambitus_lowest(self):
-        note = Note('c')
-        self.generator.set_ambitus(lowest=note)
-        self.assertEqual(note, self.generator.ambitus['lowest'])
-        self.assertEqual(Note('c', OctaveType.LINE_4), self.generator.ambitus['highest'])
+    def test_to_dict_from_dict(self):
+        self.generator.set_metre(3, 4).set_bar_count(8).set_max_consecutive_rests(2)
+        self.generator.set_ambitus(lowest=Note('g', OctaveType.SMALL), highest=Note('g', OctaveType.LINE_2))
+        self.generator.set_start_note(Note('a')).set_end_note(Note('bes', OctaveType.LINE_1))
 
-    def test_set_ambitus_highest(self):
-        note = Note('c')
-        self.generator.set_ambitus(highest=note)
-        self.assertEqual(Note('c', OctaveType.SMALL), self.generator.ambitus['lowest'])
-        self.assertEqual(note, self.generator.ambitus['highest'])
+        settings = self.generator.to_dict()
+        self.assertEqual([3, 4], settings['metre'])
+        self.assertEqual('g', settings['ambitus']['lowest'])
+        self.assertEqual("bes'", settings['end_note'])
 
-    def test_set_ambitus(self):
-        lowest = Note('d')
-        highest = Note('e')
-        self.generator.set_ambitus(lowest=lowest, highest=highest)
-        self.assertEqual(lowest, self.generator.ambitus['lowest'])
-        self.assertEqual(highest, self.generator.ambitus['highest'])
+        generator = Generator.from_dict(settings)
+        self.assertEqual(settings, generator.to_dict())
+        self.assertEqual(Note('g', OctaveType.LINE_2), generator.ambitus['highest'])
 
-    def test_set_ambitus_raises_value_error(self):
-        with self.assertRaises(ValueError):
-            self.generator.set_ambitus(lowest=Note('c', OctaveType.LINE_6))
+    def test_to_dict_from_dict_shortest_note_duration(self):
+        self.generator.set_shortest_note_duration(32)
 
-        with self.assertRaises(ValueError):
-            self.generator.set_ambitus(highest=Note('c', OctaveType.SUB_CONTRA))
+        generator = Generator.from_dict(self.generator.to_dict())
+        self.assertEqual(32, generator.shortest_note_duration)
+        self.assertEqual(16, Generator.from_dict({}).shortest_note_duration)
+        self.assertEqual(16, Generator().shortest_note_duration)
 
-    # endregion
-
-    # region set_rest_probability
+    def test_from_dict_defaults(self):
+        self.assertEqual(Generator().to_dict(), Generator.from_dict({}).to_dict())
 
-    def test_set_rest_probability(self):
-        self.generator.set_rest_probability(0.7)
-        self.assertEqual(0.7, self.generator.rest_probability)
+    def test_from_dict_raises(self):
+        with self.assertRaises(KeyError):
+            Generator.from_dict({'bars': 4})
 
-    def test_set_rest_probability_raises_value_error(self):
-        with self.assertRaises(ValueError):
-            self.generator.set_rest_probability(1.5)
-
-    # endregion
-
-    # region set_max_consecutive_rests
-
-    def test_set_max_consecutive_rests(self):
-        self.generator.set_max_consecutive_rests(5)
-        self.assertEqual(5, self.generator.max_consecutive_rests)
-
-        self.generator.set_max_consecutive_rests(None)
-        self.assertEqual(math.inf, self.generator.max_consecutive_rests)
-
-        self.generator.set_max_consecutive_rests(3)
-        self.assertEqual(3, self.generator.max_consecutive_rests)
-
-    # endregion
-
-    # region set_interval_probability
-
-    def test_set_interval_probability(self):
-        self.generator.set_interval_probability('1cz', 10)
-        idx = Interval.names().index('1cz')
-        self.assertEqual(10, self.generator.intervals_probability[idx])
-
-    def test_set_invalid_interval_name(self):
-        with self.assertRaises(errors.IntervalNotSupported):
-            self.generator.set_interval_probability('1czz', 10)
-
-    # endregion
-
-    # region set_intervals_probability
-
-    def test_set_intervals_probability(self):
-        probabilities = [10, 5, 5, 10, 5, 5, 10, 10, 5, 5, 10, 10, 5, 5]
-
-        self.generator.set_intervals_probability(probabilities)
-        self.assertEqual(probabilities, self.generator.intervals_probability)
-
-    def test_set_intervals_probability_invalid_length(self):
-        probabilities = [0, 1, 2]
-
-        with self.assertRaises(ValueError):
-            self.generator.set_intervals_probability(probabilities)
-
-    def test_set_intervals_probability_more_than_one_hundred(self):
-        probabilities = [5 for _ in Interval.names()]
-
-        with self.assertRaises(ValueError):
-            self.generator.set_intervals_probability(probabilities)
-
-    # endregion
-
-    # region set_notes_probability
-
-    def test_set_notes_probability(self):
-        probabilities = [1, 1, 9, 9, 16, 8, 16, 8, 8, 8, 8, 8]
-
-        self.generator.set_notes_probability(probabilities)
-        self.assertEqual(probabilities, self.generator.notes_probability)
-
-    def test_set_notes_probability_raises_value_error(self):
-        with self.assertRaises(ValueError):
-            self.generator.set_notes_probability([100])
-
-        with self.assertRaises(ValueError):
-            self.generator.set_notes_probability([1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1])
-
-    # endregion
-
-    # region set_durations_probability
-
-    def test_set_durations_probability(self):
-        probabilities = [13, 13, 13, 20, 11, 10, 20]
-
-        self.generator.set_durations_probability(probabilities)
-        self.assertEqual(probabilities, self.generator.durations_probability)
-
-    def test_set_durations_probability_raises_value_error(self):
-        with self.assertRaises(ValueError):
-            self.generator.set_durations_probability([100])
-
-        with self.assertRaises(ValueError):
-            self.generator.set_durations_probability([1, 1, 1, 1, 1, 1, 1])
+        with self.assertRaises(errors.InvalidMetre):
+            Generator.from_dict({'metre': [4, 3]})
 
-    # endregion
+        with self.assertRaises(errors.NoteOutsideAmbitus):
+            Generator.from_dict({'start_note': "c''''''"})
 
     # endregion
 
@@ -305,7 +153,6 @@ class GeneratorTests(unittest.TestCase):
     # region split_note
 
     def test_split_note(self):
-        Generator.set_shortest_note_duration(16)
         note = Note('c', base_duration=4)
 
         actual = self.generator.split_note(note, 2)
@@ -329,7 +176,6 @@ class GeneratorTests(unittest.TestCase):
         self.assertEqual(expected, actual)
 
     def test_split_note_expects_dot(self):
-        Generator.set_shortest_note_duration(16)
         note = Note('c', base_duration=4)
 
         actual = self.generator.split_note(note, 3)
@@ -341,7 +187,6 @@ class GeneratorTests(unittest.TestCase):
         self.assertEqual(expected, actual)
 
     def test_split_note_expects_double_dot(self):
-        Generator.set_shortest_note_duration(16)
         note = Note('c', base_duration=2)
 
         actual = self.generator.split_note(note, 7)
@@ -353,7 +198,6 @@ class GeneratorTests(unittest.TestCase):
         self.assertEqual(expected, actual)
 
     def test_split_note_multiple_notes_on_left_side(self):
-        Generator.set_shortest_note_duration(16)
         note = Note('c', base_duration=2)
 
         actual = self.generator.split_note(note, 5)
@@ -368,7 +212,6 @@ class GeneratorTests(unittest.TestCase):
         self.assertEqual(expected, actual)
 
     def test_split_note_multiple_notes_on_right_side(self):
-        Generator.set_shortest_note_duration(16)
         note = Note('c', base_duration=2)
 
         actual = self.generator.split_note(note, 3)
@@ -383,7 +226,6 @@ class GeneratorTests(unittest.TestCase):
         self.assertEqual(expected, actual)
 
     def test_split_note_expects_double_dot_and_note(self):
-        Generator.set_shortest_note_duration(16)
         note = Note('c', base_duration=1)
 
         actual = self.generator.split_note(note, 15)
@@ -397,7 +239,6 @@ class GeneratorTests(unittest.TestCase):
         self.assertEqual(expected, actual)
 
     def test_split_note_rests(self):
-        Generator.set_shortest_note_duration(16)
         note = Rest(base_duration=2)
 
         actual = self.generator.split_note(note, 3)
@@ -408,6 +249,17 @@ class GeneratorTests(unittest.TestCase):
 
         self.assertEqual(expected, actual)
 
+    def test_split_note_tuplet(self):
+        tuplet = Tuplet(3, 2, [Note('c', base_duration=8)] * 3)
+
+        with self.assertRaises(ValueError):
+            self.generator.split_note(tuplet, 2)
+
+    def test_get_division(self):
+        self.assertEqual(((4, 0),), Generator.get_division(16, 4))
+        self.assertEqual(((4, 2),), Generator.get_division(16, 7))
+        self.assertEqual(((2, 1), (16, 0)), Generator.get_division(16, 13))
+
     # endregion
 
     # region split_to_bars
@@ -715,6 +567,57 @@ class GeneratorTests(unittest.TestCase):
         grouped_bars = self.generator.group_bars(bars)
         self.assertEqual(expected, grouped_bars)
 
+    def test_group_bars_custom_grouping(self):
+        self.generator.set_metre(7, 8).set_grouping([2, 2, 3])
+        self.generator.set_shortest_note_duration(16)
+
+        bars: List[List[Writeable]] = [
+            [Note('c', modifiers=[NoteModifier.DOT]), Note('c', base_duration=2)]
+        ]
+
+        expected: List[List[Writeable]] = [
+            [
+                Note('c', modifiers=[NoteModifier.TIE]), Note('c', base_duration=8),
+                Note('c', base_duration=8, modifiers=[NoteModifier.TIE]), Note('c', modifiers=[NoteModifier.DOT])
+            ]
+        ]
+
+        self.assertEqual([4, 8, 14], self.generator.get_part_ends())
+        self.assertEqual(expected, self.generator.group_bars(bars))
+
+    def test_set_grouping(self):
+        self.generator.set_metre(7, 8)
+
+        self.assertEqual([3, 2, 2], self.generator.get_bar_parts())
+        self.assertEqual([2, 2, 3], self.generator.set_grouping([2, 2, 3]).get_bar_parts())
+        self.assertEqual([2, 2, 3], Generator.from_dict(self.generator.to_dict()).grouping)
+
+        for parts in [[3, 3], [], [7, 0]]:
+            with self.assertRaises(ValueError):
+                self.generator.set_grouping(parts)
+
+        # Zmiana liczby miar usuwa podział, który przestał do niej pasować
+        self.assertIsNone(self.generator.set_metre(6, 8).grouping)
+        self.assertEqual([3, 3], self.generator.get_bar_parts())
+
+    def test_get_metre_parts(self):
+        self.assertEqual((2, 2), Generator.get_metre_parts(4))
+        self.assertEqual((2, 2, 2, 2), Generator.get_metre_parts(8))
+        self.assertEqual((3, 3), Generator.get_metre_parts(6))
+        self.assertEqual((3, 2), Generator.get_metre_parts(5))
+
+    def test_get_partition_table(self):
+        boundaries, next_boundary = Generator.get_partition_table((3, 2), 2)
+
+        self.assertEqual((True, False, False, False, False, False, True, False, False, False, True), boundaries)
+        self.assertEqual((6, 6, 6, 6, 6, 6, 10, 10, 10, 10), next_boundary)
+
+    def test_generate_group_8_8(self):
+        self.generator.set_metre(8, 8)
+
+        for bar in self.generator.generate(group=True, seed=1):
+            self.assertEqual(16, sum(elem.get_duration(16) for elem in bar))
+
     # endregion
 
     # region generate
@@ -755,6 +658,198 @@ class GeneratorTests(unittest.TestCase):
             actual_length = sum([item.get_duration(self.generator.shortest_note_duration) for item in bar])
             self.assertEqual(expected_bar_length, actual_length)
 
+    def test_generate_with_seed(self):
+        first = self.generator.generate(group=True, seed=1234)
+        second = self.generator.generate(group=True, seed=1234)
+
+        self.assertEqual(first, second)
+        self.assertEqual(second, self.generator.group_bars(self.generator.split_to_bars(self.generator.generated_data)))
+
+    def test_generate_end_note_approach(self):
+        # Dozwolone są tylko sekundy wielkie i oktawy, więc dojście do e'' z wysokości o nieparzystej odległości
+        # jest niemożliwe, a z pozostałych - możliwe w kilku krokach
+        self.generator.set_intervals_probability([0, 0, 50, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 50])
+        self.generator.set_end_note(Note('e', OctaveType.LINE_2)).set_bar_count(8).set_rest_probability(0)
+        self.generator.set_end_note_approach(3)
+
+        for seed in range(50):
+            ids = [item.get_id() for item in self.generator.generate(seed=seed)]
+
+            self.assertEqual(Note('e', OctaveType.LINE_2).get_id(), ids[-1])
+            self.assertEqual(ids[0], Note('c', OctaveType.LINE_1).get_id())
+
+            if len(ids) > 8:
+                self.assertTrue(all(abs(a - b) in [2, 12] for a, b in zip(ids, ids[1:])))
+
+    def test_set_end_note_approach(self):
+        self.assertEqual(2, self.generator.set_end_note_approach(2).end_note_approach)
+        self.assertEqual(2, Generator.from_dict(self.generator.to_dict()).end_note_approach)
+
+        with self.assertRaises(ValueError):
+            self.generator.set_end_note_approach(-1)
+
+    def test_set_tuplets(self):
+        self.generator.set_tuplets(0.3, [(3, 2), (5, 4)])
+        self.assertEqual(0.3, self.generator.tuplet_probability)
+        self.assertEqual([(3, 2), (5, 4)], self.generator.tuplets)
+
+        generator = Generator.from_dict(self.generator.to_dict())
+        self.assertEqual(0.3, generator.tuplet_probability)
+        self.assertEqual([(3, 2), (5, 4)], generator.tuplets)
+
+        with self.assertRaises(ValueError):
+            self.generator.set_tuplets(2)
+
+        with self.assertRaises(ValueError):
+            self.generator.set_tuplets(0.5, [(2, 2)])
+
+    def test_get_tuplet_options(self):
+        options = Generator.get_tuplet_options(16, ((3, 2), (2, 3)))
+
+        self.assertIn((3, 2, 8, 4), options)
+        self.assertIn((2, 3, 8, 6), options)
+        self.assertNotIn((3, 2, 32, 1), options)
+
+    def test_get_part_ends(self):
+        self.assertEqual([8, 16], self.generator.get_part_ends())
+        self.assertEqual([6, 10], self.generator.set_metre(5, 8).get_part_ends())
+        self.assertEqual([3], self.generator.set_metre(3, 16).get_part_ends())
+
+    def test_generate_tuplets(self):
+        self.generator.set_tuplets(0.5, [(3, 2), (5, 4), (2, 3)]).set_metre(6, 8).set_bar_count(8)
+        bar_duration = self.generator.get_bar_duration()
+        tuplets = 0
+
+        for seed in range(20):
+            for bar in self.generator.generate(group=True, seed=seed):
+                self.assertEqual(bar_duration, sum(elem.get_duration(16) for elem in bar))
+
+                position = 0
+                for elem in bar:
+                    duration = elem.get_duration(16)
+
+                    # Grupa nie przekracza granicy grup głównych taktu (dwóch ćwierćnut z kropką)
+                    if isinstance(elem, Tuplet):
+                        tuplets += 1
+                        self.assertEqual(position // 6, (position + duration - 1) // 6)
+
+                    position += duration
+
+        self.assertGreater(tuplets, 0)
+
+    def test_generate_without_tuplets_ignores_tuplet_ratios(self):
+        first = [str(bar) for bar in self.generator.generate(group=True, seed=3)]
+        second = [str(bar) for bar in self.generator.set_tuplets(0, [(5, 4)]).generate(group=True, seed=3)]
+
+        self.assertEqual(first, second)
+
+    def test_set_key(self):
+        self.generator.set_key('d', KeyType.MINOR)
+        self.assertEqual(Key('d', KeyType.MINOR), self.generator.key)
+        self.assertEqual({'tonic': 'd', 'type': 'minor'}, self.generator.to_dict()['key'])
+        self.assertEqual(self.generator.key, Generator.from_dict(self.generator.to_dict()).key)
+
+        self.assertIsNone(self.generator.set_key(None).key)
+
+        with self.assertRaises(ValueError):
+            self.generator.set_key('h')
+
+    def test_generate_in_key(self):
+        key = Key('bes')
+        self.generator.set_key('bes').set_bar_count(16)
+        self.generator.set_start_note(Note('bes')).set_end_note(Note('f', OctaveType.LINE_1))
+
+        for seed in range(10):
+            notes = [item for item in self.generator.generate(seed=seed) if isinstance(item, Note)]
+
+            self.assertTrue(all(key.contains(note.get_id()) for note in notes))
+            self.assertTrue(all(note.note in key.degree_names for note in notes))
+            self.assertEqual(Note('f', OctaveType.LINE_1).get_id(), notes[-1].get_id())
+
+    # endregion
+
+    # region regenerate_bars
+
+    def test_regenerate_bars(self):
+        self.generator.set_bar_count(12).set_rest_probability(0.3)
+
+        bars = self.generator.generate(group=True, seed=1)
+        original = [str(bar) for bar in bars]
+
+        regenerated = self.generator.regenerate_bars(bars, 4, 8, seed=2)
+
+        self.assertEqual(original, [str(bar) for bar in bars])
+        self.assertEqual(12, len(regenerated))
+        self.assertTrue(all(regenerated[i] is bars[i] for i in [0, 1, 2, 3, 8, 9, 10, 11]))
+        self.assertNotEqual(original[4:8], [str(bar) for bar in regenerated[4:8]])
+
+        for bar in regenerated:
+            self.assertEqual(16, sum(elem.get_duration(16) for elem in bar))
+
+        self.assertEqual(regenerated, self.generator.regenerate_bars(bars, 4, 8, seed=2))
+
+    def test_regenerate_bars_whole_melody(self):
+        bars = self.generator.generate(group=True, seed=1)
+
+        regenerated = self.generator.regenerate_bars(bars, 0, 4, seed=5)
+        notes = Generator.get_notes([elem for bar in regenerated for elem in bar])
+
+        self.assertEqual(self.generator.start_note.get_id(), notes[0].get_id())
+        self.assertEqual(self.generator.end_note.get_id(), notes[-1].get_id())
+
+    def test_regenerate_bars_ties(self):
+        self.generator.set_bar_count(3).set_rest_probability(0)
+
+        bars: List[List[Writeable]] = [
+            [Note('d', OctaveType.LINE_1, 1, [NoteModifier.TIE])],
+            [Note('d', OctaveType.LINE_1, 1, [NoteModifier.TIE])],
+            [Note('d', OctaveType.LINE_1, 1)]
+        ]
+
+        for seed in range(10):
+            regenerated = self.generator.regenerate_bars(bars, 1, 2, seed=seed)
+
+            # Nuta związana łukiem z poprzedniego taktu jest kontynuowana, a łuk do kolejnego taktu zostaje
+            self.assertEqual(bars[0], regenerated[0])
+            self.assertEqual(Note('d', OctaveType.LINE_1).get_id(), regenerated[1][0].get_id())
+            self.assertEqual(Note('d', OctaveType.LINE_1).get_id(), regenerated[1][-1].get_id())
+            self.assertIn(NoteModifier.TIE, regenerated[1][-1].modifiers)
+
+    def test_regenerate_bars_in_key(self):
+        key = Key('g')
+        self.generator.set_key('g').set_bar_count(8).set_start_note(Note('g'))
+        bars = self.generator.generate(group=True, seed=3)
+
+        regenerated = self.generator.regenerate_bars(bars, 2, 5, seed=4)
+        notes = Generator.get_notes([elem for bar in regenerated[2:5] for elem in bar])
+
+        self.assertTrue(all(key.contains(note.get_id()) for note in notes))
+
+    def test_regenerate_bars_invalid_range(self):
+        bars = self.generator.generate(group=True, seed=1)
+
+        for start, end in [(-1, 2), (2, 2), (3, 1), (0, 5)]:
+            with self.assertRaises(ValueError):
+                self.generator.regenerate_bars(bars, start, end)
+
+    # endregion
+
+    # region Concurrency
+
+    def test_generate_concurrently(self):
+        self.generator.set_bar_count(8).set_rest_probability(0.2).set_max_consecutive_rests(1)
+        seeds = list(range(200))
+
+        def run(seed: int) -> List[str]:
+            return [str(bar) for bar in self.generator.generate(group=True, seed=seed)]
+
+        expected = [run(seed) for seed in seeds]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            actual = list(executor.map(run, seeds))
+
+        self.assertEqual(expected, actual)
+
     # endregion
 
 
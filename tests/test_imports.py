@@ -0,0 +1,47 @@
+import os
+import subprocess
+import sys
+import unittest
+
+
+class ImportTests(unittest.TestCase):
+    def get_loaded_modules(self, code: str) -> set:
+        """Wykonaj kod w nowym interpreterze i zwróć nazwy załadowanych modułów"""
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.run(
+            [sys.executable, '-c', f'{code}\nimport sys\nprint("\\n".join(sys.modules))'],
+            cwd=root, capture_output=True, text=True, check=True
+        ).stdout
+
+        return set(output.split())
+
+    def test_theory_does_not_import_heavy_modules(self):
+        modules = self.get_loaded_modules('from lib.theory import Note, OctaveType')
+
+        self.assertNotIn('numpy', modules)
+        self.assertNotIn('termcolor', modules)
+        self.assertNotIn('lib.Generator', modules)
+
+    def test_package_is_lazy(self):
+        modules = self.get_loaded_modules('import lib\nfrom lib import Writer')
+
+        self.assertIn('lib.Writer', modules)
+        self.assertNotIn('lib.Generator', modules)
+        self.assertNotIn('numpy', modules)
+        self.assertNotIn('asyncio', modules)
+
+    def test_package_exports(self):
+        import lib
+        from lib.Generator import Generator
+        from lib.Writer import Writer
+
+        self.assertIs(Generator, lib.Generator)
+        self.assertIs(Writer, lib.Writer)
+        self.assertIn('Generator', dir(lib))
+
+        with self.assertRaises(AttributeError):
+            getattr(lib, 'Missing')
+
+
+if __name__ == '__main__':
+    unittest.main()
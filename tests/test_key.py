@@ -0,0 +1,64 @@
+import unittest
+
+from lib.Key import Key
+from lib.KeyType import KeyType
+from lib.theory.Note import Note
+from lib.theory.OctaveType import OctaveType
+
+
+class KeyTests(unittest.TestCase):
+    def test_init(self):
+        key = Key('d')
+
+        self.assertEqual(['d', 'e', 'fis', 'g', 'a', 'b', 'cis'], key.degree_names)
+        self.assertEqual([2, 4, 6, 7, 9, 11, 1], key.pitch_classes)
+        self.assertFalse(key.flats)
+
+    def test_init_minor(self):
+        key = Key('c', KeyType.MINOR)
+
+        self.assertEqual(['c', 'd', 'ees', 'f', 'g', 'aes', 'bes'], key.degree_names)
+        self.assertTrue(key.flats)
+
+    def test_init_contracted_name(self):
+        key = Key('es')
+
+        self.assertEqual('ees', key.tonic)
+        self.assertEqual(['ees', 'f', 'g', 'aes', 'bes', 'c', 'd'], key.degree_names)
+
+    def test_init_invalid(self):
+        for tonic in ['h', "c'", 'c4', 'cisisis']:
+            with self.assertRaises(ValueError):
+                Key(tonic)
+
+    def test_spelling(self):
+        # Dźwięki spoza gamy zapisywane są krzyżykami lub bemolami, zależnie od tonacji
+        self.assertEqual('dis', Key('e').spelling[3])
+        self.assertEqual('ees', Key('f').spelling[3])
+        self.assertEqual('b', Key('f').spelling[11])
+
+    def test_contains(self):
+        key = Key('g')
+
+        self.assertTrue(key.contains(Note('fis', OctaveType.LINE_2).get_id()))
+        self.assertFalse(key.contains(Note('f', OctaveType.LINE_2).get_id()))
+
+    def test_get_note(self):
+        self.assertEqual(Note('bes', OctaveType.LINE_1, 8), Key('f').get_note(70, 8))
+        self.assertEqual(Note('ais', OctaveType.LINE_1), Key('b').get_note(70))
+
+        # his należy do oktawy niższej niż c o tym samym identyfikatorze, a ces do wyższej niż b
+        self.assertEqual(Note('bis', OctaveType.SMALL), Key('cis').get_note(60))
+        self.assertEqual(Note('ces', OctaveType.LINE_2), Key('ges').get_note(71))
+
+        for key in [Key('cis'), Key('ges'), Key('a', KeyType.MINOR)]:
+            for note_id in range(48, 84):
+                self.assertEqual(note_id, key.get_note(note_id).get_id())
+
+    def test_eq(self):
+        self.assertEqual(Key('a', KeyType.MINOR), Key('a', KeyType.MINOR))
+        self.assertNotEqual(Key('a'), Key('a', KeyType.MINOR))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,205 @@
+import asyncio
+import os
+import subprocess
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from lib.LilypondWorker import LilypondWorker
+from lib.Writer import Writer
+from tests.test_writer import FAKE_LILYPOND
+
+
+class LilypondWorkerTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+
+        self.lilypond = os.path.join(self.tmp, 'lilypond')
+        with open(self.lilypond, 'w') as f:
+            f.write(FAKE_LILYPOND)
+        os.chmod(self.lilypond, 0o755)
+
+        self.log = os.path.join(self.tmp, 'jobs.log')
+        os.environ['FAKE_LILYPOND_LOG'] = self.log
+        self.addCleanup(os.environ.pop, 'FAKE_LILYPOND_LOG')
+
+    def get_writer(self, filename: str, worker: LilypondWorker) -> Writer:
+        writer = Writer(filename)
+        writer.lilypond = self.lilypond
+        writer.compile_backend = worker
+        writer.set_source_dir(os.path.join(self.tmp, 'source'))
+        writer.set_compiled_dir(os.path.join(self.tmp, 'compiled'))
+        writer.header()
+        writer.export()
+
+        return writer
+
+    def get_jobs(self) -> List[List[str]]:
+        """Pobierz skompilowane pliki jako pary [pid procesu, plik]"""
+        if not os.path.exists(self.log):
+            return []
+
+        with open(self.log) as f:
+            return [line.rstrip('\n').split(' ', 1) for line in f]
+
+    def test_reuses_process(self):
+        with LilypondWorker() as worker:
+            first = self.get_writer('test-0', worker).compile(['pdf', 'png'])
+            second = self.get_writer('test-1', worker).compile(['pdf', 'png'])
+
+        self.assertEqual(1, worker.starts)
+
+        jobs = self.get_jobs()
+        self.assertEqual([f'{self.tmp}/source/test-0.ly', f'{self.tmp}/source/test-1.ly'], [job[1] for job in jobs])
+        self.assertEqual(jobs[0][0], jobs[1][0])
+
+        for i, result in enumerate([first, second]):
+            self.assertTrue(result.success)
+            self.assertEqual([f'{self.tmp}/compiled/test-{i}.pdf', f'{self.tmp}/compiled/test-{i}.png'],
+                             result.output_paths)
+            self.assertEqual([f'{self.tmp}/source/test-{i}.ly:3:5: warning: barcheck failed at: 1/4'],
+                             result.warnings)
+
+    def test_processes_by_options(self):
+        with LilypondWorker() as worker:
+            for i, ext in enumerate(['pdf', 'png', 'pdf']):
+                self.assertTrue(self.get_writer(f'test-{i}', worker).compile(ext).success)
+
+        self.assertEqual(2, worker.starts)
+        self.assertEqual(['test-0.pdf', 'test-1.png', 'test-2.pdf'], sorted(os.listdir(f'{self.tmp}/compiled')))
+
+    def test_max_processes(self):
+        os.environ['FAKE_LILYPOND_SLEEP'] = '0.2'
+        self.addCleanup(os.environ.pop, 'FAKE_LILYPOND_SLEEP')
+
+        with LilypondWorker(max_processes=2) as worker:
+            writers = [self.get_writer(f'test-{i}', worker) for i in range(6)]
+
+            with ThreadPoolExecutor(6) as executor:
+                results = list(executor.map(lambda writer: writer.compile(), writers))
+
+        self.assertTrue(all(result.success for result in results))
+        self.assertEqual(2, worker.starts)
+        self.assertEqual(2, len({job[0] for job in self.get_jobs()}))
+
+    def test_max_jobs(self):
+        with LilypondWorker(max_jobs=2) as worker:
+            for i in range(3):
+                self.get_writer(f'test-{i}', worker).compile()
+
+        self.assertEqual(2, worker.starts)
+
+    def test_failure(self):
+        os.environ['FAKE_LILYPOND_EXIT'] = '1'
+        self.addCleanup(os.environ.pop, 'FAKE_LILYPOND_EXIT')
+
+        with LilypondWorker() as worker:
+            results = [self.get_writer(f'test-{i}', worker).compile() for i in range(2)]
+
+        self.assertEqual(1, worker.starts)
+
+        for result in results:
+            self.assertFalse(result.success)
+            self.assertEqual(1, len(result.errors))
+
+    def test_restart_after_crash(self):
+        with LilypondWorker() as worker:
+            crashed = self.get_writer('crash', worker).compile()
+            result = self.get_writer('test', worker).compile()
+
+        self.assertEqual(3, crashed.return_code)
+        self.assertTrue(result.success)
+        self.assertEqual(2, worker.starts)
+
+    def test_timeout(self):
+        os.environ['FAKE_LILYPOND_SLEEP'] = '5'
+        self.addCleanup(os.environ.pop, 'FAKE_LILYPOND_SLEEP', None)
+
+        with LilypondWorker() as worker:
+            writer = self.get_writer('test', worker)
+
+            start = time.perf_counter()
+            with self.assertRaises(subprocess.TimeoutExpired):
+                writer.compile(timeout=0.2)
+
+            self.assertLess(time.perf_counter() - start, 2)
+
+            # Proces kompilujący anulowane zlecenie został zakończony, więc kolejne zlecenie uruchamia nowy
+            os.environ.pop('FAKE_LILYPOND_SLEEP')
+            self.assertTrue(writer.compile().success)
+
+        self.assertEqual(2, worker.starts)
+        self.assertEqual(1, len(self.get_jobs()))
+
+    def test_timeout_waiting(self):
+        os.environ['FAKE_LILYPOND_SLEEP'] = '0.5'
+        self.addCleanup(os.environ.pop, 'FAKE_LILYPOND_SLEEP')
+
+        with LilypondWorker(max_processes=1) as worker:
+            writers = [self.get_writer(f'test-{i}', worker) for i in range(2)]
+            writers[0].prepare_compile('pdf')
+
+            thread = threading.Thread(target=worker.run, args=(writers[0].get_compile_command(),))
+            thread.start()
+            time.sleep(0.1)
+
+            # Zlecenie oczekujące na wolny proces jest anulowane bez wysyłania go do lilyponda
+            with self.assertRaises(subprocess.TimeoutExpired):
+                worker.run(writers[1].get_compile_command(), timeout=0.1)
+
+            thread.join()
+
+        self.assertEqual(1, worker.starts)
+        self.assertEqual([f'{self.tmp}/source/test-0.ly'], [job[1] for job in self.get_jobs()])
+
+    def test_compile_async(self):
+        async def compile_all(writers):
+            return await asyncio.gather(*[writer.compile_async('pdf') for writer in writers])
+
+        self.addCleanup(setattr, Writer, 'max_concurrent_compilations', Writer.max_concurrent_compilations)
+        Writer.max_concurrent_compilations = 3
+
+        with LilypondWorker(max_processes=1) as worker:
+            results = asyncio.run(compile_all([self.get_writer(f'test-{i}', worker) for i in range(3)]))
+
+        self.assertEqual(1, worker.starts)
+        self.assertEqual([[f'{self.tmp}/compiled/test-{i}.pdf'] for i in range(3)],
+                         [result.output_paths for result in results])
+        self.assertTrue(all(len(result.warnings) == 1 for result in results))
+
+    def test_compile_async_timeout(self):
+        os.environ['FAKE_LILYPOND_SLEEP'] = '5'
+        self.addCleanup(os.environ.pop, 'FAKE_LILYPOND_SLEEP')
+
+        with LilypondWorker() as worker:
+            start = time.perf_counter()
+            with self.assertRaises(asyncio.TimeoutError):
+                asyncio.run(self.get_writer('test', worker).compile_async(timeout=0.2))
+
+            self.assertLess(time.perf_counter() - start, 2)
+
+        self.assertEqual([], self.get_jobs())
+
+    def test_missing_lilypond(self):
+        with LilypondWorker() as worker:
+            writer = self.get_writer('test', worker)
+            writer.lilypond = os.path.join(self.tmp, 'missing')
+
+            with self.assertRaises(FileNotFoundError):
+                writer.compile()
+
+            self.assertEqual({}, worker.outputs)
+
+    def test_loop_code(self):
+        self.assertTrue(LilypondWorker.loop_code.startswith('(begin '))
+        self.assertEqual(LilypondWorker.loop_code.count('('), LilypondWorker.loop_code.count(')'))
+        self.assertIn(f'"{LilypondWorker.done_marker} ~a ~a"', LilypondWorker.loop_code)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import json
+import os
+import tempfile
+import unittest
+
+import main
+
+
+class MainTests(unittest.TestCase):
+    def get_settings(self, *argv: str) -> dict:
+        return main.get_settings(main.get_parser().parse_args(list(argv)))
+
+    def test_get_settings(self):
+        settings = self.get_settings(
+            '--metre', '6/8', '--bar-count', '12', '--lowest', 'g', '--end-note', "g'",
+            '--max-consecutive-rests', 'none', '--durations-probability', '0,10,20,30,40,0,0'
+        )
+
+        self.assertEqual({
+            'metre': [6, 8],
+            'bar_count': 12,
+            'ambitus': {'lowest': 'g', 'highest': "c''''"},
+            'end_note': "g'",
+            'max_consecutive_rests': None,
+            'durations_probability': [0, 10, 20, 30, 40, 0, 0]
+        }, settings)
+
+    def test_get_settings_single_interval(self):
+        settings = self.get_settings('--interval-probability', '1cz', '7', '--interval-probability', '2m', '9')
+        self.assertEqual([7, 9], settings['intervals_probability'][:2])
+
+    def test_get_settings_key(self):
+        settings = self.get_settings('--key', 'fis', '--key-type', 'minor')
+        self.assertEqual({'tonic': 'fis', 'type': 'minor'}, settings['key'])
+        self.assertEqual({'tonic': 'd', 'type': 'major'}, self.get_settings('--key', 'd')['key'])
+
+    def test_get_settings_tuplets(self):
+        settings = self.get_settings('--tuplet-probability', '0.2', '--tuplets', '3/2,5/4')
+
+        self.assertEqual(0.2, settings['tuplet_probability'])
+        self.assertEqual([[3, 2], [5, 4]], settings['tuplets'])
+
+    def test_get_settings_grouping(self):
+        settings = self.get_settings('--metre', '7/8', '--grouping', '2+2+3')
+        self.assertEqual([2, 2, 3], settings['grouping'])
+
+    def test_get_settings_from_file(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            json.dump({'bar_count': 3, 'rest_probability': 0.2}, f)
+        self.addCleanup(os.remove, f.name)
+
+        settings = self.get_settings('--settings', f.name, '--bar-count', '5')
+        self.assertEqual({'bar_count': 5, 'rest_probability': 0.2}, settings)
+
+    def test_main(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            main.main(['--count', '2', '--seed', '1', '--formats', 'ly,midi', '--output-dir', tmp, '--quiet'])
+            self.assertEqual(4, len(os.listdir(tmp)))
+
+    def test_main_ndjson(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, 'melodies.ndjson')
+            main.main(['--count', '3', '--seed', '5', '--bar-count', '2', '--ndjson', filename, '--output-dir', tmp,
+                       '--quiet'])
+
+            with open(filename) as f:
+                lines = [json.loads(line) for line in f]
+
+            self.assertEqual(['melodies.ndjson'], os.listdir(tmp))
+
+        self.assertEqual(5, lines[0]['seed'])
+        self.assertEqual(2, lines[0]['settings']['bar_count'])
+        self.assertEqual([5, 6, 7], [line['seed'] for line in lines[1:]])
+
+    def test_main_invalid_settings(self):
+        with self.assertRaises(SystemExit):
+            main.main(['--metre', '4/3', '--quiet'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,255 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from lib.GenerationContext import GenerationContext
+from lib.Generator import Generator
+from lib.MarkovModel import MarkovModel
+from lib.theory.Note import Note
+from lib.theory.OctaveType import OctaveType
+
+
+class MarkovModelTests(unittest.TestCase):
+    def test_init_invalid(self):
+        with self.assertRaises(ValueError):
+            MarkovModel(0, 60, 62, [], [], [])
+
+        with self.assertRaises(ValueError):
+            MarkovModel(1, 62, 60, [], [], [])
+
+        with self.assertRaises(ValueError):
+            MarkovModel(1, 60, 62, [0], [63], [1])
+
+        with self.assertRaises(ValueError):
+            MarkovModel(1, 60, 62, [0], [61], [-1])
+
+    def test_from_dense(self):
+        counts = np.array([
+            [0, 1, 3],
+            [2, 0, 2],
+            [0, 0, 0]
+        ])
+        model = MarkovModel.from_dense(1, 60, counts)
+
+        # Stan bez przejść korzysta z rozkładu interwałów: jedyny mieszczący się w zakresie to sekunda w dół
+        np.testing.assert_allclose([
+            [0, 0.25, 0.75],
+            [0.5, 0, 0.5],
+            [0, 1, 0]
+        ], model.dense())
+
+    def test_from_dense_invalid_shape(self):
+        with self.assertRaises(ValueError):
+            MarkovModel.from_dense(2, 60, np.ones((3, 3)))
+
+    def test_states(self):
+        model = MarkovModel(2, 60, 64, [], [], [])
+
+        self.assertEqual(1 * 5 + 2, model.get_state([60, 61, 62]))
+        self.assertEqual(2 * 5 + 2, model.get_state([62]))
+        np.testing.assert_array_equal([0, 24], model.get_states([60, 64]))
+        np.testing.assert_array_equal([60, 64], model.get_last_pitches([0, 24]))
+        np.testing.assert_array_equal([4 * 5 + 1], model.advance([24], [61]))
+
+        with self.assertRaises(ValueError):
+            model.get_state([59])
+
+    def test_from_sequences(self):
+        model = MarkovModel.from_sequences([[60, 62, 64, 62, 60, 62, 64]], 2, 60, 64)
+        dense = model.dense()
+
+        np.testing.assert_allclose([0, 0, 0, 0, 1], dense[model.get_state([60, 62])])
+        np.testing.assert_allclose([1, 0, 0, 0, 0], dense[model.get_state([64, 62])])
+        np.testing.assert_allclose([0, 0, 1, 0, 0], dense[model.get_state([62, 60])])
+
+    def test_backoff(self):
+        model = MarkovModel.from_sequences([[60, 62, 64, 62, 60, 62, 64]], 2, 60, 64)
+        dense = model.dense()
+
+        # Stan (61, 62) nie wystąpił, więc używany jest rozkład rzędu 1 dla wysokości 62
+        np.testing.assert_allclose([1 / 3, 0, 0, 0, 2 / 3], dense[model.get_state([61, 62])])
+
+        # Wysokość 61 nie wystąpiła wcale, więc używany jest rozkład interwałów (sekundy wielkie w górę i w dół),
+        # a gdy żaden interwał nie prowadzi do wysokości z korpusu - najbliższe takie wysokości
+        np.testing.assert_allclose([0, 0, 1, 0, 0], dense[model.get_state([62, 60])])
+        np.testing.assert_allclose([0.5, 0, 0.5, 0, 0], dense[model.get_state([60, 61])])
+        np.testing.assert_allclose(1, dense.sum(axis=1))
+
+    def test_from_sequences_high_order(self):
+        # Pełny zakres wysokości: gęsta tablica zliczeń miałaby 128^4 elementów
+        model = MarkovModel.from_sequences([[60, 62, 64, 65, 67, 65, 64, 62, 60]], 3, 0, 127)
+
+        self.assertEqual(128 ** 3, model.state_count)
+        np.testing.assert_array_equal([67], model.sample([model.get_state([62, 64, 65])], np.random.default_rng(0)))
+
+    def test_generation_does_not_collapse(self):
+        corpus = [[60, 62, 64, 65, 67, 65, 64, 62, 60], [67, 69, 71, 72, 71, 69, 67]]
+        model = MarkovModel.from_sequences(corpus, 2, 55, 79)
+
+        melodies = model.generate(50, 64, 60, np.random.default_rng(2))
+
+        # Bez back-off stany spoza korpusu powtarzały ostatnią wysokość do końca melodii
+        repeated = np.mean(melodies[:, 1:] == melodies[:, :-1])
+        self.assertLess(repeated, 0.1)
+        self.assertTrue(all(len(set(melody[-16:])) > 1 for melody in melodies))
+
+    def test_sample_distribution(self):
+        model = MarkovModel.from_dense(1, 60, [[1, 3], [1, 0]])
+        rng = np.random.default_rng(0)
+
+        pitches = model.sample(np.zeros(100000, dtype=np.int64), rng)
+        self.assertAlmostEqual(0.75, np.mean(pitches == 61), delta=0.01)
+
+        pitches = model.sample(np.ones(1000, dtype=np.int64), rng)
+        self.assertTrue(np.all(pitches == 60))
+
+    def test_generate(self):
+        model = MarkovModel.from_sequences([[60, 62, 64, 65, 64, 62]], 1, 60, 65)
+
+        result = model.generate(100, 16, 60, np.random.default_rng(1))
+        self.assertEqual((100, 16), result.shape)
+        self.assertTrue(np.all(result[:, 0] == 60))
+
+        # Każde przejście musi mieć niezerowe prawdopodobieństwo
+        dense = model.dense()
+        self.assertTrue(np.all(dense[result[:, :-1] - 60, result[:, 1:] - 60] > 0))
+
+        np.testing.assert_array_equal(result, model.generate(100, 16, 60, np.random.default_rng(1)))
+
+    def test_from_generator(self):
+        generator = Generator()
+        generator.set_ambitus(Note('c', OctaveType.LINE_1), Note('c', OctaveType.LINE_2))
+        generator.set_intervals_probability([0, 0, 50, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 50])
+        model = MarkovModel.from_generator(generator)
+        dense = model.dense()
+
+        np.testing.assert_allclose(1, dense.sum(axis=1))
+
+        # Z najniższej nuty można pójść tylko w górę: o sekundę wielką lub oktawę
+        np.testing.assert_allclose([0.5, 0.5], dense[0, [2, 12]])
+
+        # Z d' sekunda wielka w dół lub w górę, z prawdopodobieństwem zależnym od notes_probability
+        up, down = generator.notes_probability[4], generator.notes_probability[0]
+        self.assertAlmostEqual(1, dense[2, [0, 4]].sum())
+        self.assertAlmostEqual(up / (up + down), dense[2, 4] / dense[2, [0, 4]].sum())
+
+    def test_from_generator_allowed(self):
+        generator = Generator()
+        generator.set_ambitus(Note('c', OctaveType.LINE_1), Note('c', OctaveType.LINE_2))
+        model = MarkovModel.from_generator(generator, allowed=[0, 2, 4, 5, 7, 9, 11])
+        dense = model.dense()
+
+        self.assertTrue(np.all(dense[:, [1, 3, 6, 8, 10]] == 0))
+
+    def test_get_reachability(self):
+        # Łańcuch na 4 wysokościach, w którym można iść tylko o jeden w górę lub w dół
+        model = MarkovModel.from_dense(1, 60, [[0, 1, 0, 0], [1, 0, 1, 0], [0, 1, 0, 1], [0, 0, 1, 0]])
+        reachability = model.get_reachability(63, 4)
+
+        self.assertEqual((5, 4), reachability.shape)
+        np.testing.assert_array_equal([0, 0, 0, 1], reachability[0] > 0)
+        np.testing.assert_array_equal([0, 0, 1, 0], reachability[1] > 0)
+        np.testing.assert_array_equal([1, 0, 1, 0], reachability[3] > 0)
+        self.assertIs(model.get_reachability(63, 2).base, reachability.base)
+
+        with self.assertRaises(ValueError):
+            model.get_reachability(64, 1)
+
+    def test_plan(self):
+        model = MarkovModel.from_dense(1, 60, [[0, 1, 0, 0], [1, 0, 1, 0], [0, 1, 0, 1], [0, 0, 1, 0]])
+        rng = np.random.default_rng(0)
+
+        self.assertIsNone(model.plan(model.get_state([60]), 63, 2, rng))
+        self.assertEqual([61, 62, 63], model.plan(model.get_state([60]), 63, 3, rng))
+
+        for _ in range(20):
+            pitches = model.plan(model.get_state([61]), 63, 4, rng)
+            self.assertEqual(63, pitches[-1])
+            self.assertTrue(all(abs(a - b) == 1 for a, b in zip([61] + pitches, pitches)))
+
+    def test_plan_batch(self):
+        model = MarkovModel.from_dense(1, 60, [[0, 1, 0, 0], [1, 0, 1, 0], [0, 1, 0, 1], [0, 0, 1, 0]])
+        planned = model.plan_batch(model.get_states([60, 60, 61, 62]), 63, [3, 2, 2, 1], np.random.default_rng(0))
+
+        np.testing.assert_array_equal([
+            [61, 62, 63],
+            [-1, -1, -1],
+            [62, 63, -1],
+            [63, -1, -1]
+        ], planned)
+
+    def test_plan_batch_high_order(self):
+        rng = np.random.default_rng(1)
+        walk = np.clip(60 + np.cumsum(rng.integers(-2, 3, 5000)), 48, 96)
+        model = MarkovModel.from_sequences([walk], 3, 48, 96)
+
+        states = model.get_states(np.full(200, 60))
+        planned = model.plan_batch(states, 66, np.full(200, 8), rng)
+        found = planned[:, 0] >= 0
+
+        self.assertGreater(np.count_nonzero(found), 0)
+        np.testing.assert_array_equal(66, planned[found, -1])
+
+        # Każdy krok planu jest przejściem modelu
+        for row, state in zip(planned[found], states[found]):
+            for pitch in row:
+                start, stop = model.indptr[model.row_of[state]], model.indptr[model.row_of[state] + 1]
+                self.assertIn(pitch, model.targets[start:stop])
+                state = model.advance(state, pitch)
+
+    def test_save_load(self):
+        model = MarkovModel.from_sequences([[60, 62, 64, 62, 60, 62, 64]], 2, 60, 64)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, 'model.npz')
+            model.save(filename)
+            loaded = MarkovModel.load(filename)
+
+        self.assertEqual((2, 60, 64), (loaded.order, loaded.lowest, loaded.highest))
+        np.testing.assert_allclose(model.dense(), loaded.dense())
+        np.testing.assert_array_equal(model.row_of, loaded.row_of)
+
+    def test_save_observed_only(self):
+        model = MarkovModel.from_sequences([[60, 62, 64, 62, 60, 62, 64]], 3, 48, 96)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, 'model.npz')
+            model.save(filename)
+
+            with np.load(filename) as data:
+                self.assertEqual(4, len(data['states']))
+
+            loaded = MarkovModel.load(filename)
+
+        np.testing.assert_allclose(model.cumulative, loaded.cumulative)
+        np.testing.assert_array_equal(model.row_of, loaded.row_of)
+
+    def test_generator_integration(self):
+        generator = Generator()
+        generator.set_ambitus(Note('c', OctaveType.LINE_1), Note('c', OctaveType.LINE_2))
+        generator.set_rest_probability(0)
+        generator.set_bar_count(8)
+        generator.set_markov_model(MarkovModel.from_sequences([[60, 64, 67, 64, 60]], 1, 60, 72))
+
+        data = generator.generate(seed=3)
+        ids = [item.get_id() for item in data]
+
+        self.assertEqual(60, ids[0])
+        self.assertTrue(set(ids[:-1]) <= {60, 64, 67})
+        self.assertEqual([str(item) for item in data], [str(item) for item in generator.generate(seed=3)])
+
+        context = GenerationContext(0)
+        context.generated_data.append(Note('e', OctaveType.LINE_1))
+        self.assertIn(generator.get_next_markov_note(context).get_id(), [60, 67])
+
+    def test_generator_model_range(self):
+        generator = Generator()
+
+        with self.assertRaises(ValueError):
+            generator.set_markov_model(MarkovModel(1, 60, 72, [], [], []))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+
+from lib.MidiReader import MidiReader
+from lib.MidiWriter import MidiWriter
+from lib.theory.Note import Note
+from lib.theory.NoteModifier import NoteModifier
+from lib.theory.OctaveType import OctaveType
+from lib.theory.Rest import Rest
+
+
+class MidiReaderTests(unittest.TestCase):
+    def test_read_variable_length(self):
+        for value in [0, 127, 128, 2097151]:
+            data = MidiWriter.get_variable_length(value)
+            self.assertEqual((value, len(data)), MidiReader.read_variable_length(data + b'\x00', 0))
+
+    def test_parse_midi_writer_output(self):
+        writer = MidiWriter('test')
+        writer.parse([
+            Note('c', OctaveType.LINE_1, 4),
+            Rest(8),
+            Note('e', OctaveType.LINE_1, 8, [NoteModifier.TIE]),
+            Note('e', OctaveType.LINE_1, 2)
+        ])
+
+        reader = MidiReader('test').parse(writer.to_bytes())
+
+        self.assertEqual(480, reader.ticks_per_quarter)
+        self.assertEqual([[(0, 480, 60), (720, 1200, 64)]], reader.tracks)
+
+    def test_parse_running_status(self):
+        track = b'\x00\x90\x3C\x40\x60\x3C\x00\x00\x3E\x40\x60\x80\x3E\x00\x00\xFF\x2F\x00'
+        data = b'MThd\x00\x00\x00\x06\x00\x00\x00\x01\x00\x60MTrk' + len(track).to_bytes(4, 'big') + track
+
+        self.assertEqual([[(0, 96, 60), (96, 96, 62)]], MidiReader('test').parse(data).tracks)
+
+    def test_parse_invalid(self):
+        with self.assertRaises(ValueError):
+            MidiReader('test').parse(b'RIFF\x00\x00\x00\x06')
+
+        with self.assertRaises(ValueError):
+            MidiReader('test').parse(b'MThd\x00\x00\x00\x06\x00\x00\x00\x01\xE2\x50')
+
+    def test_read(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = MidiWriter('test')
+            writer.set_output_dir(tmp)
+            writer.parse([Note('g', OctaveType.SMALL, 1)]).export()
+
+            reader = MidiReader(os.path.join(tmp, 'test.mid')).read()
+            self.assertEqual([[(0, 1920, 55)]], reader.tracks)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import unittest
+
+from lib.Generator import Generator
+from lib.MidiWriter import MidiWriter
+from lib.theory.Note import Note
+from lib.theory.NoteModifier import NoteModifier
+from lib.theory.OctaveType import OctaveType
+from lib.theory.Rest import Rest
+from lib.theory.Tuplet import Tuplet
+
+
+class MidiWriterTests(unittest.TestCase):
+    def setUp(self):
+        self.writer = MidiWriter('test')
+
+    def test_get_variable_length(self):
+        self.assertEqual(b'\x00', MidiWriter.get_variable_length(0))
+        self.assertEqual(b'\x7F', MidiWriter.get_variable_length(127))
+        self.assertEqual(b'\x81\x00', MidiWriter.get_variable_length(128))
+        self.assertEqual(b'\xFF\xFF\x7F', MidiWriter.get_variable_length(2097151))
+
+    def test_get_ticks(self):
+        self.assertEqual(480, MidiWriter.get_ticks(Note('c')))
+        self.assertEqual(720, MidiWriter.get_ticks(Note('c', modifiers=[NoteModifier.DOT])))
+        self.assertEqual(30, MidiWriter.get_ticks(Rest(64)))
+
+    def test_parse(self):
+        self.writer.parse([Note('c', OctaveType.LINE_1), Rest(), Note('d', OctaveType.LINE_1, 2)])
+
+        expected = [
+            (0, bytes([0x90, 60, 90])), (480, bytes([0x80, 60, 0])),
+            (960, bytes([0x90, 62, 90])), (1920, bytes([0x80, 62, 0]))
+        ]
+        self.assertEqual(expected, self.writer.events)
+
+    def test_parse_ties(self):
+        self.writer.parse([
+            [Note('c', OctaveType.LINE_1, 2), Note('e', OctaveType.LINE_1, 2, [NoteModifier.TIE])],
+            [Note('e', OctaveType.LINE_1, 1)]
+        ])
+
+        expected = [
+            (0, bytes([0x90, 60, 90])), (960, bytes([0x80, 60, 0])),
+            (960, bytes([0x90, 64, 90])), (3840, bytes([0x80, 64, 0]))
+        ]
+        self.assertEqual(expected, self.writer.events)
+
+    def test_parse_tuplets(self):
+        septuplet = Tuplet(7, 4, [Note('c', OctaveType.LINE_1, 16)] * 7)
+        self.writer.parse([Note('d', OctaveType.LINE_1), septuplet])
+
+        # 480 tyknięć na ćwierćnutę nie wystarcza dla septoli, więc rozdzielczość rośnie siedmiokrotnie
+        self.assertEqual(480 * 7, self.writer.ticks_per_quarter)
+        self.assertEqual((480 * 7, bytes([0x80, 62, 0])), self.writer.events[1])
+        self.assertEqual((480 * 7 + 480, bytes([0x90, 60, 90])), self.writer.events[4])
+
+        self.assertEqual(b'\x0D\x20', self.writer.to_bytes()[12:14])
+
+    def test_to_bytes(self):
+        data = self.writer.parse([Note('c', OctaveType.LINE_1)]).to_bytes()
+
+        self.assertEqual(b'MThd\x00\x00\x00\x06\x00\x00\x00\x01\x01\xE0MTrk', data[:18])
+        self.assertTrue(data.endswith(b'\x83\x60\x80\x3C\x00\x00\xFF\x2F\x00'))
+
+    def test_from_generator(self):
+        generator = Generator()
+
+        first = MidiWriter('first').from_generator(generator, seed=5).to_bytes()
+        second = MidiWriter('second').from_generator(generator, seed=5).to_bytes()
+        self.assertEqual(first, second)
+
+    def test_from_voices(self):
+        voices = [[[Note('e', OctaveType.LINE_1, base_duration=2)]], [[Note('c', OctaveType.SMALL, base_duration=2)]]]
+        self.writer.from_voices(voices, (2, 4))
+
+        expected = [
+            (0, bytes([0x90, 64, 90])), (960, bytes([0x80, 64, 0])),
+            (0, bytes([0x91, 48, 90])), (960, bytes([0x81, 48, 0]))
+        ]
+        self.assertEqual(expected, self.writer.events)
+        self.assertEqual((2, 4), self.writer.metre)
+
+    def test_export(self):
+        self.writer.parse([Note('c')])
+        self.writer.export()
+
+        path = f'{self.writer.output_dir}/{self.writer.filename}.mid'
+        self.assertTrue(os.path.exists(path))
+
+        # Cleanup
+        os.remove(path)
+        os.removedirs(self.writer.output_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
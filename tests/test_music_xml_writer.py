@@ -0,0 +1,143 @@
+import io
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ElementTree
+
+from lib.Generator import Generator
+from lib.Key import Key
+from lib.KeyType import KeyType
+from lib.MusicXmlWriter import MusicXmlWriter
+from lib.PolyphonicGenerator import PolyphonicGenerator
+from lib.theory.Note import Note
+from lib.theory.NoteModifier import NoteModifier
+from lib.theory.OctaveType import OctaveType
+from lib.theory.Rest import Rest
+from lib.theory.RestModifier import RestModifier
+from lib.theory.Tuplet import Tuplet
+
+
+class MusicXmlWriterTests(unittest.TestCase):
+    @staticmethod
+    def write(bars, metre=(4, 4), key=None) -> ElementTree.Element:
+        stream = io.StringIO()
+        MusicXmlWriter('test').write(stream, [bars], metre, key)
+
+        return ElementTree.fromstring(stream.getvalue())
+
+    def test_write(self):
+        root = self.write([
+            [Note('fis', OctaveType.LINE_1, 4, [NoteModifier.DOT]), Note('c', OctaveType.LINE_2, 8), Rest(2)],
+            [Note('bes', OctaveType.SMALL, 2, [NoteModifier.TIE]), Rest(4, [RestModifier.DOT]), Rest(8)]
+        ], key=Key('d', KeyType.MINOR))
+
+        measures = root.findall('./part/measure')
+        self.assertEqual(['1', '2'], [measure.get('number') for measure in measures])
+        self.assertEqual('16', measures[0].findtext('attributes/divisions'))
+        self.assertEqual('-1', measures[0].findtext('attributes/key/fifths'))
+        self.assertEqual('minor', measures[0].findtext('attributes/key/mode'))
+        self.assertEqual(['4', '4'], [measures[0].findtext('attributes/time/beats'),
+                                      measures[0].findtext('attributes/time/beat-type')])
+
+        first = measures[0].find('note')
+        self.assertEqual(['F', '1', '4'], [first.findtext('pitch/step'), first.findtext('pitch/alter'),
+                                           first.findtext('pitch/octave')])
+        self.assertEqual('24', first.findtext('duration'))
+        self.assertEqual('quarter', first.findtext('type'))
+        self.assertEqual(1, len(first.findall('dot')))
+
+        rest = measures[1].findall('note')[1]
+        self.assertIsNotNone(rest.find('rest'))
+        self.assertEqual('24', rest.findtext('duration'))
+        self.assertEqual('light-heavy', measures[1].findtext('barline/bar-style'))
+        self.assertIsNone(measures[0].find('barline'))
+
+    def test_ties_across_bars(self):
+        bars = Generator().set_metre(3, 4).set_bar_count(2).split_to_bars([
+            Note('c', OctaveType.LINE_1, 2), Note('d', OctaveType.LINE_1, 2), Note('e', OctaveType.LINE_1, 2)
+        ])
+
+        notes = self.write(bars, (3, 4)).findall('./part/measure/note')
+
+        self.assertEqual([['start'], ['stop']], [[tie.get('type') for tie in note.findall('tie')]
+                                                 for note in notes[1:3]])
+        self.assertEqual(['start'], [tied.get('type') for tied in notes[1].findall('notations/tied')])
+        self.assertEqual([[], []], [note.findall('tie') for note in [notes[0], notes[3]]])
+
+    def test_clef_changes(self):
+        root = self.write([
+            [Note('c', OctaveType.LINE_1, 1)],
+            [Note('c', OctaveType.GREAT, 1)],
+            [Note('d', OctaveType.GREAT, 1)],
+            [Note('g', OctaveType.LINE_1, 1)]
+        ])
+
+        clefs = [(measure.get('number'), measure.findtext('attributes/clef/sign'))
+                 for measure in root.findall('./part/measure') if measure.find('attributes/clef') is not None]
+
+        self.assertEqual([('1', 'G'), ('2', 'F'), ('4', 'G')], clefs)
+
+    def test_tuplets(self):
+        root = self.write([
+            [Tuplet(3, 2, [Note('c', OctaveType.LINE_1, 8), Rest(8), Note('e', OctaveType.LINE_1, 8)]),
+             Note('f', OctaveType.LINE_1, 4, [NoteModifier.DOUBLE_DOT]), Note('g', OctaveType.LINE_1, 16), Rest(4)],
+            [Tuplet(5, 4, [Note('c', OctaveType.LINE_1, 16) for _ in range(5)]), Rest(2, [RestModifier.DOT])]
+        ])
+
+        measures = root.findall('./part/measure')
+        self.assertEqual('48', measures[0].findtext('attributes/divisions'))
+        self.assertEqual('240', measures[1].findtext('attributes/divisions'))
+
+        notes = measures[0].findall('note')
+        self.assertEqual(['16', '16', '16', '84', '12', '48'], [note.findtext('duration') for note in notes])
+        self.assertEqual(['start', None, 'stop'], [note.find('notations/tuplet').get('type')
+                                                   if note.find('notations/tuplet') is not None else None
+                                                   for note in notes[:3]])
+        self.assertEqual(['3', '2'], [notes[0].findtext('time-modification/actual-notes'),
+                                      notes[0].findtext('time-modification/normal-notes')])
+        self.assertEqual(2, len(notes[3].findall('dot')))
+
+        # Długości w każdym takcie sumują się do pełnego taktu w bieżącej liczbie tyknięć
+        self.assertEqual(4 * 240, sum(int(note.findtext('duration')) for note in measures[1].findall('note')))
+
+    def test_generated_bars(self):
+        generator = Generator().set_metre(6, 8).set_bar_count(16).set_key('a').set_tuplets(0.3, [(3, 2)])
+        bars = generator.generate(group=True, seed=5)
+
+        measures = self.write(iter(bars), generator.metre, generator.key).findall('./part/measure')
+        divisions = 16
+
+        self.assertEqual(16, len(measures))
+        self.assertEqual('3', measures[0].findtext('attributes/key/fifths'))
+
+        for measure in measures:
+            divisions = int(measure.findtext('attributes/divisions') or divisions)
+            self.assertEqual(6 * divisions // 2, sum(int(note.findtext('duration')) for note in measure.iter('note')))
+
+    def test_export(self):
+        voices = PolyphonicGenerator([Generator(), Generator()])
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            writer = MusicXmlWriter('test')
+            writer.set_output_dir(output_dir)
+            writer.from_polyphonic_generator(voices, seed=1)
+
+            root = ElementTree.parse(os.path.join(output_dir, 'test.musicxml')).getroot()
+
+        self.assertEqual('3.1', root.get('version'))
+        self.assertEqual(['P1', 'P2'], [part.get('id') for part in root.findall('part')])
+        self.assertEqual(['Voice 1', 'Voice 2'], [name.text for name in root.iter('part-name')])
+
+    def test_export_creates_output_dir(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output_dir = os.path.join(tmp, 'new', 'musicxml')
+
+            writer = MusicXmlWriter('test')
+            writer.set_output_dir(output_dir)
+            writer.from_generator(Generator(), seed=2)
+
+            self.assertTrue(os.path.exists(os.path.join(output_dir, 'test.musicxml')))
+
+
+if __name__ == "__main__":
+    unittest.main()
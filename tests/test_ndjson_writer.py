@@ -0,0 +1,105 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from lib.Batch import Batch
+from lib.Generator import Generator
+from lib.NdjsonWriter import NdjsonWriter
+from lib.theory.Note import Note
+from lib.theory.NoteModifier import NoteModifier
+from lib.theory.OctaveType import OctaveType
+from lib.theory.Rest import Rest
+from lib.theory.RestModifier import RestModifier
+from lib.theory.Tuplet import Tuplet
+
+
+class NdjsonWriterTests(unittest.TestCase):
+    def test_encode(self):
+        bars = [
+            [Note('cis', OctaveType.LINE_2, 4, [NoteModifier.DOT, NoteModifier.TIE]), Rest(8, [RestModifier.DOT]),
+             Rest(16)],
+            [Tuplet(3, 2, [Note('bes', OctaveType.GREAT, 8), Rest(8), Note('c', OctaveType.SMALL, 8)]), Rest(4)]
+        ]
+
+        line = NdjsonWriter.encode(bars, 7)
+
+        self.assertEqual(
+            '{"seed":7,"bars":[[["cis\'\'",4,1,1],["r",8,1],["r",16,0]],'
+            '[[3,2,[["bes,",8,0,0],["r",8,0],["c",8,0,0]]],["r",4,0]]]}',
+            line
+        )
+        self.assertEqual(bars, NdjsonWriter.to_bars(line))
+
+    def test_round_trip(self):
+        generator = Generator().set_metre(6, 8).set_key('bes').set_tuplets(0.3, [(3, 2), (5, 4)])
+        stream = io.StringIO()
+
+        with NdjsonWriter(stream, generator.to_dict(), 10) as writer:
+            melodies = [generator.generate(group=True, seed=seed) for seed in range(10, 20)]
+            for seed, bars in enumerate(melodies, 10):
+                writer.add(bars, seed)
+
+        lines = stream.getvalue().splitlines()
+        header = json.loads(lines[0])
+
+        self.assertEqual(11, len(lines))
+        self.assertEqual(10, writer.count)
+        self.assertEqual(('melodies', 1, 10), (header['format'], header['version'], header['seed']))
+        self.assertEqual(generator.to_dict(), Generator.from_dict(header['settings']).to_dict())
+        self.assertEqual(list(range(10, 20)), [json.loads(line)['seed'] for line in lines[1:]])
+        self.assertEqual(melodies, [NdjsonWriter.to_bars(line) for line in lines[1:]])
+
+        with self.assertRaises(ValueError):
+            NdjsonWriter.to_bars(lines[0])
+
+    def test_buffering(self):
+        stream = io.StringIO()
+        writer = NdjsonWriter(stream)
+        writer.buffer_size = 200
+        writer.open()
+
+        writer.add([[Note('c', base_duration=1)]])
+        self.assertEqual('', stream.getvalue())
+
+        for _ in range(10):
+            writer.add([[Note('c', base_duration=1)]])
+
+        self.assertGreater(len(stream.getvalue()), 200)
+        writer.close()
+
+        self.assertEqual(12, len(stream.getvalue().splitlines()))
+        self.assertFalse(stream.closed)
+
+    def test_batch_stream(self):
+        Batch.chunk_size = 4
+        self.addCleanup(setattr, Batch, 'chunk_size', 64)
+
+        settings = {'metre': [3, 4], 'bar_count': 4}
+        outputs = []
+        reports = []
+
+        for workers in [1, 2]:
+            with tempfile.TemporaryDirectory() as tmp:
+                filename = os.path.join(tmp, 'melodies.ndjson')
+
+                with NdjsonWriter(filename, settings, 3) as writer:
+                    Batch(settings, tmp).stream(10, 3, writer, workers,
+                                                lambda done, count, seconds: reports.append(done))
+
+                with open(filename) as f:
+                    outputs.append(f.read())
+
+                self.assertEqual(['melodies.ndjson'], os.listdir(tmp))
+
+        lines = outputs[0].splitlines()
+        generator = Generator.from_dict(settings)
+
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertEqual([4, 8, 10, 4, 8, 10], reports)
+        self.assertEqual(generator.generate(group=True, seed=8), NdjsonWriter.to_bars(lines[6]))
+
+
+if __name__ == "__main__":
+    unittest.main()
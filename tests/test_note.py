@@ -190,6 +190,38 @@ class NoteTests(unittest.TestCase):
 
     # endregion
 
+    # region parse
+
+    def test_parse(self):
+        self.assertEqual(Note('c'), Note.parse('c'))
+        self.assertEqual(Note('fis', OctaveType.LINE_2, 8), Note.parse("fis''8"))
+        self.assertEqual(
+            Note('bes', OctaveType.CONTRA, 2, [NoteModifier.DOUBLE_DOT, NoteModifier.TIE]),
+            Note.parse('bes,,2..~')
+        )
+
+    def test_parse_contracted_names(self):
+        self.assertEqual(Note('aes', OctaveType.LINE_1), Note.parse("as'"))
+        self.assertEqual(Note('eeses', OctaveType.SMALL, 8), Note.parse('eses8'))
+        self.assertEqual(68, Note.parse("as'").get_id())
+        self.assertEqual(62, Note.parse("eses'").get_id())
+
+    def test_parse_invalid(self):
+        with self.assertRaises(ValueError):
+            Note.parse('h4')
+
+        with self.assertRaises(ValueError):
+            Note.parse("c',")
+
+    def test_from_id(self):
+        self.assertEqual(Note('c', OctaveType.LINE_1), Note.from_id(60))
+        self.assertEqual(Note('fis', OctaveType.SMALL, 8), Note.from_id(54, 8))
+
+        for note_id in range(128):
+            self.assertEqual(note_id, Note.from_id(note_id).get_id())
+
+    # endregion
+
     # region create_accidentals_string
 
     def test_create_accidentals_string(self):
@@ -0,0 +1,95 @@
+import unittest
+
+from lib.Generator import Generator
+from lib.Key import Key
+from lib.KeyType import KeyType
+from lib.Parser import Parser
+from lib.PolyphonicGenerator import PolyphonicGenerator
+from lib.Writer import Writer
+from lib.theory.Note import Note
+from lib.theory.NoteModifier import NoteModifier
+from lib.theory.OctaveType import OctaveType
+from lib.theory.Rest import Rest
+from lib.theory.RestModifier import RestModifier
+from lib.theory.Tuplet import Tuplet
+
+
+class ParserTests(unittest.TestCase):
+    def test_read(self):
+        parser = Parser('expected/test_parse.ly').read()
+
+        self.assertEqual([(0, 0, 'F')], parser.clefs)
+        self.assertEqual(6, len(parser.bars))
+        self.assertEqual([Note('c', base_duration=2), Note('d', base_duration=4, modifiers=[NoteModifier.DOT]),
+                          Note('e', base_duration=8)], parser.bars[1])
+        self.assertEqual([Rest(4), Rest(2), Rest(8, [RestModifier.DOT]), Rest(16)], parser.bars[2])
+        self.assertEqual(Note('d', base_duration=2, modifiers=[NoteModifier.TIE]), parser.bars[4][-1])
+
+    def test_parse_writer_output(self):
+        generator = Generator().set_metre(6, 8).set_bar_count(8).set_key('bes', KeyType.MINOR)
+        generator.set_tuplets(0.3, [(3, 2), (5, 4)])
+
+        for seed in range(10):
+            bars = generator.generate(group=True, seed=seed)
+
+            writer = Writer('test')
+            writer.from_bars(bars, generator.metre, show_bar_numbers=seed % 2 == 0, midi=True, key=generator.key)
+            parser = Parser('test').parse(writer.lines)
+
+            self.assertEqual(bars, parser.bars)
+            self.assertEqual((6, 8), parser.metre)
+            self.assertEqual(Key('bes', KeyType.MINOR), parser.key)
+
+    def test_parse_voices(self):
+        voices = PolyphonicGenerator([Generator(), Generator()]).generate(seed=1)
+
+        for staves in [True, False]:
+            writer = Writer('test')
+            writer.from_voices(voices, (4, 4), staves=staves)
+
+            self.assertEqual(voices, Parser('test').parse(writer.lines).voices)
+
+    def test_parse_tokens(self):
+        lines = [
+            '% komentarz c4 d4',
+            '{ \\time 3/4 \\clef "treble" cis\'\'8.~ cis\'\'16 r | \\tuplet 3/2 { d,8 e, f, } bes2 | }'
+        ]
+
+        parser = Parser('test').parse(lines)
+
+        self.assertEqual((3, 4), parser.metre)
+        self.assertEqual([(0, 0, 'treble')], parser.clefs)
+        self.assertEqual([
+            [
+                Note('cis', OctaveType.LINE_2, 8, [NoteModifier.DOT, NoteModifier.TIE]),
+                Note('cis', OctaveType.LINE_2, 16), Rest(16)
+            ],
+            [
+                Tuplet(3, 2, [Note(name, OctaveType.GREAT, 8) for name in ['d', 'e', 'f']]),
+                Note('bes', OctaveType.SMALL, 2)
+            ]
+        ], parser.bars)
+
+    def test_parse_contracted_names(self):
+        parser = Parser('test').parse(["{ \\key as \\major as'4 es'4 ases'4 eses'4 | aes'4 ees'4 a'4 e'4 | }"])
+
+        self.assertEqual(Key('aes'), parser.key)
+        self.assertEqual([
+            [Note(name, OctaveType.LINE_1) for name in ['aes', 'ees', 'aeses', 'eeses']],
+            [Note(name, OctaveType.LINE_1) for name in ['aes', 'ees', 'a', 'e']]
+        ], parser.bars)
+
+    def test_iter_bars(self):
+        bars = iter(Parser('test').iter_bars(['{ c4 d4 e4 f4 |', 'g1 |', 'r1 }']))
+
+        self.assertEqual((0, [Note('c'), Note('d'), Note('e'), Note('f')]), next(bars))
+        self.assertEqual((0, [Note('g', base_duration=1)]), next(bars))
+
+    def test_parse_invalid(self):
+        for lines in [['{ c4 d4'], ['c4 }'], ['{ \\time c4 }'], ['{ c3 }']]:
+            with self.assertRaises(ValueError):
+                Parser('test').parse(lines)
+
+
+if __name__ == "__main__":
+    unittest.main()
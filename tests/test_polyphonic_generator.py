@@ -0,0 +1,100 @@
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from lib.Generator import Generator
+from lib.PolyphonicGenerator import PolyphonicGenerator
+from lib.theory.Note import Note
+from lib.theory.OctaveType import OctaveType
+
+
+class PolyphonicGeneratorTests(unittest.TestCase):
+    def setUp(self):
+        melody = Generator().set_bar_count(4)
+
+        bass = Generator().set_bar_count(4)
+        bass.set_ambitus(Note('c', OctaveType.GREAT), Note('c', OctaveType.LINE_1))
+        bass.set_start_note(Note('c', OctaveType.SMALL))
+        bass.set_end_note(Note('c', OctaveType.SMALL))
+
+        self.generator = PolyphonicGenerator([melody, bass])
+
+    def test_init_invalid_voice_count(self):
+        with self.assertRaises(ValueError):
+            PolyphonicGenerator([])
+
+        with self.assertRaises(ValueError):
+            PolyphonicGenerator([Generator() for _ in range(5)])
+
+    def test_init_different_metre(self):
+        with self.assertRaises(ValueError):
+            PolyphonicGenerator([Generator(), Generator().set_metre(3, 4)])
+
+        with self.assertRaises(ValueError):
+            PolyphonicGenerator([Generator(), Generator().set_bar_count(3)])
+
+    def test_init_different_grouping(self):
+        with self.assertRaises(ValueError):
+            PolyphonicGenerator([Generator().set_metre(6, 8), Generator().set_metre(6, 8).set_grouping([2, 2, 2])])
+
+        PolyphonicGenerator([Generator().set_metre(6, 8).set_grouping([3, 3]), Generator().set_metre(6, 8)])
+
+    def test_generate_changed_grouping(self):
+        self.generator.set_metre(6, 8)
+        self.generator.voices[1].set_grouping([2, 2, 2])
+
+        with self.assertRaises(ValueError):
+            self.generator.generate(seed=3)
+
+    def test_set_metre(self):
+        self.generator.set_metre(3, 4)
+        self.generator.set_bar_count(5)
+
+        self.assertEqual((3, 4), self.generator.metre)
+        self.assertTrue(all(voice.metre == (3, 4) and voice.bar_count == 5 for voice in self.generator.voices))
+
+    def test_get_seeds(self):
+        self.assertEqual([None, None], self.generator.get_seeds(None))
+
+        seeds = self.generator.get_seeds(10)
+        self.assertEqual(seeds, self.generator.get_seeds(10))
+        self.assertNotEqual(seeds[0], seeds[1])
+
+    def test_generate(self):
+        voices = self.generator.generate(seed=3)
+
+        self.assertEqual(2, len(voices))
+
+        for voice, generator in zip(voices, self.generator.voices):
+            self.assertEqual(4, len(voice))
+
+            for bar in voice:
+                self.assertEqual(generator.get_bar_duration(), sum(elem.get_duration(16) for elem in bar))
+
+        bass_notes = [elem for bar in voices[1] for elem in bar if isinstance(elem, Note)]
+        self.assertTrue(all(elem.get_id() <= Note('c', OctaveType.LINE_1).get_id() for elem in bass_notes))
+
+    def test_generate_matches_voices(self):
+        self.generator.set_metre(7, 8)
+
+        for voice in self.generator.voices:
+            voice.set_grouping([2, 2, 3])
+
+        voices = self.generator.generate(seed=5)
+        seeds = self.generator.get_seeds(5)
+
+        for voice, generator, voice_seed in zip(voices, self.generator.voices, seeds):
+            self.assertEqual([list(map(str, bar)) for bar in generator.generate(group=True, seed=voice_seed)],
+                             [list(map(str, bar)) for bar in voice])
+
+    def test_generate_parallel(self):
+        sequential = self.generator.generate(seed=4)
+
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            parallel = self.generator.generate(seed=4, executor=executor)
+
+        self.assertEqual([[list(map(str, bar)) for bar in voice] for voice in sequential],
+                         [[list(map(str, bar)) for bar in voice] for voice in parallel])
+
+
+if __name__ == '__main__':
+    unittest.main()
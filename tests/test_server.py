@@ -0,0 +1,112 @@
+import json
+import threading
+import time
+import unittest
+import urllib.error
+import urllib.request
+
+from lib.Generator import Generator
+from lib.Server import GeneratorServer
+
+
+class GeneratorServerTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = GeneratorServer(port=0, workers=1, max_pending=4, timeout=10, quiet=True)
+        cls.url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def post(self, body: dict):
+        request = urllib.request.Request(f'{self.url}/generate', data=json.dumps(body).encode(), method='POST')
+        with urllib.request.urlopen(request) as response:
+            return response.headers['Content-Type'], response.read()
+
+    def test_health(self):
+        with urllib.request.urlopen(f'{self.url}/health') as response:
+            self.assertEqual(200, response.status)
+
+    def test_generate_lilypond(self):
+        content_type, body = self.post({'settings': {'metre': [3, 4]}, 'seed': 3})
+
+        self.assertTrue(content_type.startswith('text/x-lilypond'))
+        self.assertIn('\\time 3/4', body.decode())
+
+    def test_generate_midi(self):
+        content_type, body = self.post({'seed': 3, 'format': 'midi'})
+
+        self.assertEqual('audio/midi', content_type)
+        self.assertTrue(body.startswith(b'MThd'))
+
+    def test_generate_json_is_reproducible(self):
+        request = {'settings': {'bar_count': 6}, 'seed': 11, 'format': 'json'}
+        _, first = self.post(request)
+        _, second = self.post(request)
+
+        self.assertEqual(first, second)
+        self.assertEqual(6, len(json.loads(first)['bars']))
+
+    def test_invalid_request(self):
+        for body in [{'format': 'mp3'}, {'settings': {'metre': [4, 3]}}, {'seed': 'a'}]:
+            with self.assertRaises(urllib.error.HTTPError) as cm:
+                self.post(body)
+
+            self.assertEqual(400, cm.exception.code)
+
+    def test_too_large_request(self):
+        for settings in [{'bar_count': 513}, {'metre': [33, 4]}, {'bar_count': 'a'}, {'shortest_note_duration': 3}]:
+            with self.assertRaises(urllib.error.HTTPError) as cm:
+                self.post({'settings': settings})
+
+            self.assertEqual(400, cm.exception.code)
+
+        with self.assertRaises(urllib.error.HTTPError) as cm:
+            self.post({'settings': {'grouping': [1] * 100000}})
+
+        self.assertEqual(413, cm.exception.code)
+
+    def test_invalid_numbers(self):
+        settings = [
+            {'metre': [0, 4]}, {'metre': [-1, 4]}, {'metre': [True, 4]}, {'metre': [4, False]},
+            {'bar_count': True}, {'bar_count': 0}, {'bar_count': -3}
+        ]
+
+        for item in settings:
+            with self.assertRaises(urllib.error.HTTPError) as cm:
+                self.post({'settings': item})
+
+            self.assertEqual(400, cm.exception.code)
+
+    def test_validation_does_not_change_generator(self):
+        _, body = self.post({'settings': {'shortest_note_duration': 32, 'bar_count': 2}, 'format': 'json'})
+
+        self.assertEqual(16, Generator().shortest_note_duration)
+        self.assertEqual(2, len(json.loads(body)['bars']))
+
+    def test_timeout(self):
+        self.server.timeout_seconds = 0.001
+
+        try:
+            with self.assertRaises(urllib.error.HTTPError) as cm:
+                self.post({'settings': {'bar_count': 512, 'metre': [32, 4]}})
+
+            self.assertEqual(504, cm.exception.code)
+
+            # Zadanie nadal działa w procesie roboczym, więc zajmuje miejsce do swojego zakończenia
+            self.assertEqual(1, len(self.server.pending))
+        finally:
+            self.server.timeout_seconds = 10
+
+        deadline = time.monotonic() + 30
+        while len(self.server.pending) > 0 and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        self.assertEqual(0, len(self.server.pending))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from fractions import Fraction
+
+from lib.theory.Note import Note
+from lib.theory.NoteModifier import NoteModifier
+from lib.theory.OctaveType import OctaveType
+from lib.theory.Rest import Rest
+from lib.theory.Tuplet import Tuplet
+import lib.errors as errors
+
+
+class TupletTests(unittest.TestCase):
+    def setUp(self):
+        self.triplet = Tuplet(3, 2, [Note('c', OctaveType.LINE_1, 8), Note('d', OctaveType.LINE_1, 8), Rest(8)])
+
+    def test_init_invalid(self):
+        with self.assertRaises(ValueError):
+            Tuplet(3, 2, [])
+
+        with self.assertRaises(ValueError):
+            Tuplet(3, 2, [self.triplet])
+
+        # Dwie trzydziestodwójki w czasie trzech nie trwają całkowitej liczby sześćdziesięcioczwórek
+        with self.assertRaises(ValueError):
+            Tuplet(3, 2, [Note('c', base_duration=32)])
+
+    def test_str(self):
+        self.assertEqual("\\tuplet 3/2 { c'8 d'8 r8 }", str(self.triplet))
+
+    def test_get_span(self):
+        self.assertEqual(Fraction(16), self.triplet.get_span())
+        self.assertEqual(Fraction(24), Tuplet(2, 3, [Note('c', base_duration=8)] * 2).get_span())
+
+    def test_get_duration(self):
+        self.assertEqual(4, self.triplet.get_duration(16))
+        self.assertEqual(1, self.triplet.get_duration(4))
+
+        with self.assertRaises(errors.InvalidBaseNoteDuration):
+            self.triplet.get_duration(3)
+
+    def test_get_ticks(self):
+        # 1920 tyknięć na całą nutę, czyli 240 na ósemkę
+        self.assertEqual([160, 160, 160], self.triplet.get_ticks(1920))
+
+        quintuplet = Tuplet(5, 4, [Note('c', base_duration=16)] * 5)
+        self.assertEqual([96] * 5, quintuplet.get_ticks(1920))
+
+        with self.assertRaises(ValueError):
+            Tuplet(7, 4, [Note('c', base_duration=16)] * 7).get_ticks(1920)
+
+    def test_get_resolution(self):
+        septuplet = Tuplet(7, 4, [Note('c', base_duration=16)] * 7)
+
+        self.assertEqual(1920, Tuplet.get_resolution(1920, [self.triplet]))
+        self.assertEqual(1920 * 7, Tuplet.get_resolution(1920, [self.triplet, septuplet]))
+        self.assertEqual([480] * 7, septuplet.get_ticks(Tuplet.get_resolution(1920, [septuplet])))
+
+    def test_flatten(self):
+        note = Note('e', modifiers=[NoteModifier.TIE])
+        flat = Tuplet.flatten([note, self.triplet, Rest()])
+
+        self.assertEqual(5, len(flat))
+        self.assertIs(note, flat[0])
+        self.assertIs(self.triplet.elements[0], flat[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
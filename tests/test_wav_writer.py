@@ -0,0 +1,89 @@
+import io
+import os
+import tempfile
+import unittest
+import wave
+
+import numpy as np
+
+from lib.Generator import Generator
+from lib.WavWriter import WavWriter
+from lib.theory.Note import Note
+from lib.theory.NoteModifier import NoteModifier
+from lib.theory.OctaveType import OctaveType
+from lib.theory.Rest import Rest
+from lib.theory.Tuplet import Tuplet
+
+
+class WavWriterTests(unittest.TestCase):
+    def setUp(self):
+        self.writer = WavWriter('test', tempo=120, sample_rate=8000)
+
+    def test_get_notes(self):
+        self.writer.parse([
+            [Note('a', OctaveType.LINE_1, 4), Rest(4), Note('c', OctaveType.LINE_2, 4, [NoteModifier.TIE])],
+            [Note('c', OctaveType.LINE_2, 4), Tuplet(3, 2, [Note('d', OctaveType.LINE_1, 8) for _ in range(3)])]
+        ])
+
+        pitches, starts, ends = self.writer.get_notes()
+        ticks = self.writer.midi.ticks_per_quarter
+
+        self.assertEqual([69, 72, 62, 62, 62], pitches.tolist())
+        self.assertEqual([0, 2 * ticks, 4 * ticks, 4 * ticks + ticks // 3, 4 * ticks + 2 * ticks // 3],
+                         starts.tolist())
+        self.assertEqual([ticks, 4 * ticks], ends[:2].tolist())
+
+    def test_synthesize(self):
+        self.writer.parse([Note('a', OctaveType.LINE_1, 2), Rest(2), Note('a', OctaveType.LINE_2, 2)])
+        samples = self.writer.synthesize()
+
+        # Półnuta w tempie 120 trwa sekundę
+        self.assertEqual(3 * 8000, len(samples))
+        self.assertLessEqual(np.abs(samples).max(), self.writer.volume)
+        self.assertEqual(0, np.abs(samples[8000:16000]).max())
+
+        for start, frequency in [(0, 440), (16000, 880)]:
+            spectrum = np.abs(np.fft.rfft(samples[start:start + 8000]))
+            self.assertEqual(frequency, int(np.argmax(spectrum)))
+
+        # Obwiednia wycisza koniec nuty, więc sąsiednie nuty nie dają trzasków
+        self.assertAlmostEqual(0, samples[7999], places=2)
+
+    def test_voices(self):
+        voices = [[[Note('a', OctaveType.LINE_1, 1)]], [[Note('e', OctaveType.LINE_1, 1)]]]
+        samples = self.writer.from_voices(voices, (4, 4)).synthesize()
+        spectrum = np.abs(np.fft.rfft(samples[:8000]))
+
+        self.assertEqual(2 * 8000, len(samples))
+        self.assertEqual({330, 440}, set(np.argsort(spectrum)[-2:].tolist()))
+
+    def test_write(self):
+        generator = Generator().set_bar_count(4).set_tuplets(0.3, [(3, 2)])
+        buffer = io.BytesIO()
+
+        self.writer.from_generator(generator, seed=2).write(buffer)
+        buffer.seek(0)
+
+        with wave.open(buffer) as wav:
+            self.assertEqual((1, 2, 8000), (wav.getnchannels(), wav.getsampwidth(), wav.getframerate()))
+            frames = np.frombuffer(wav.readframes(wav.getnframes()), dtype='<i2')
+
+        self.assertEqual(len(self.writer.synthesize()), len(frames))
+        self.assertGreater(np.abs(frames).max(), 0)
+
+    def test_export(self):
+        self.writer.parse([Note('c', OctaveType.LINE_1, 4)])
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            self.writer.set_output_dir(output_dir)
+            self.writer.export()
+
+            with wave.open(os.path.join(output_dir, 'test.wav')) as wav:
+                self.assertEqual(4000, wav.getnframes())
+
+    def test_empty(self):
+        self.assertEqual(0, len(self.writer.parse([Rest(1)]).synthesize()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,21 +1,91 @@
+import asyncio
+import inspect
 import os
+import sys
+import tempfile
+import time
 import unittest
 from typing import List
 
 from lib.BarType import BarType
+from lib.Generator import Generator
+from lib.Key import Key
 from lib.KeyType import KeyType
 from lib.theory.Note import Note
 from lib.theory.NoteModifier import NoteModifier
+from lib.theory.OctaveType import OctaveType
 from lib.theory.Rest import Rest
 from lib.theory.RestModifier import RestModifier
 from lib.theory.Writeable import Writeable
+from lib.Parser import Parser
+from lib.CompileBackend import CompileBackend
 from lib.Writer import Writer
+from lib.errors import CompilationFailed
+
+
+# Zastępuje lilyponda w testach: zapisuje puste pliki wynikowe dla każdego pliku źródłowego (również przycięte
+# i podglądy przy -dcrop i -dpreview), a przy zmiennej FAKE_LILYPOND_SLEEP czeka przed każdym plikiem. Przy
+# FAKE_LILYPOND_EXIT wypisuje błąd i kończy kompilację podanym kodem, plik o nazwie zawierającej "crash" kończy proces
+# kodem 3, a przy FAKE_LILYPOND_LOG dopisuje do pliku linię "{pid} {plik}" dla każdego pliku. Z opcją -e (zob.
+# LilypondWorker) czyta zlecenia "{id} {plik}" ze standardowego wejścia i zgłasza ich zakończenie jak pętla Scheme
+FAKE_LILYPOND = f'''#!{sys.executable}
+import os, sys, time
+args = sys.argv[1:]
+formats = [arg for arg in args if arg.startswith('--format=')][0].split('=')[1].split(',')
+out_dir = args[args.index('-o') + 1]
+def compile(source):
+    time.sleep(float(os.environ.get('FAKE_LILYPOND_SLEEP', 0)))
+    if 'FAKE_LILYPOND_LOG' in os.environ:
+        with open(os.environ['FAKE_LILYPOND_LOG'], 'a') as log:
+            log.write(str(os.getpid()) + ' ' + source + chr(10))
+    print('Processing `' + source + "'", file=sys.stderr)
+    print(source + ':3:5: warning: barcheck failed at: 1/4', file=sys.stderr)
+    if 'FAKE_LILYPOND_EXIT' in os.environ:
+        print(source + ':4:1: error: syntax error, unexpected end of input', file=sys.stderr)
+        return int(os.environ['FAKE_LILYPOND_EXIT'])
+    name = os.path.splitext(os.path.basename(source))[0]
+    if 'crash' in name:
+        sys.exit(3)
+    variants = [''] if '-dno-print-pages' not in args else []
+    variants += ['.cropped'] if '-dcrop' in args else []
+    variants += ['.preview'] if '-dpreview' in args else []
+    for ext in formats:
+        for variant in variants:
+            open(os.path.join(out_dir, name + variant + '.' + ext), 'w').close()
+    return 0
+if '-e' in args:
+    for line in sys.stdin:
+        job_id, source = line.rstrip(chr(10)).split(' ', 1)
+        print('lilypond-worker-done', job_id, compile(source), file=sys.stderr, flush=True)
+else:
+    for source in args[args.index('-o') + 2:]:
+        status = compile(source)
+        if status != 0:
+            sys.exit(status)
+'''
 
 
 class WriterTests(unittest.TestCase):
     def setUp(self):
         self.writer = Writer('test')
 
+    def use_fake_lilypond(self) -> str:
+        """Skieruj writer do tymczasowego folderu i podmień lilyponda na skrypt testowy"""
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+
+        self.writer.lilypond = os.path.join(tmp.name, 'lilypond')
+        with open(self.writer.lilypond, 'w') as f:
+            f.write(FAKE_LILYPOND)
+        os.chmod(self.writer.lilypond, 0o755)
+
+        self.writer.set_source_dir(os.path.join(tmp.name, 'source'))
+        self.writer.set_compiled_dir(os.path.join(tmp.name, 'compiled with spaces'))
+        self.writer.header()
+        self.writer.export()
+
+        return tmp.name
+
     # region Data appending utils
 
     def test_init(self):
@@ -169,8 +239,294 @@ class WriterTests(unittest.TestCase):
         os.remove('{}/{}.ly'.format(self.writer.source_dir, self.writer.filename))
         os.removedirs(self.writer.source_dir)
 
+    def test_get_compile_command(self):
+        self.writer.set_source_dir('source dir')
+        self.assertEqual(
+            ['lilypond', '--format=png', '-o', 'output/compiled', 'source dir/test.ly'],
+            self.writer.get_compile_command('png')
+        )
+
+    def test_get_compile_command_formats(self):
+        self.assertEqual(
+            ['lilypond', '--format=pdf,png', '-dcrop', '-dpreview', '-dresolution=150', '-o', 'output/compiled',
+             'output/source/test.ly'],
+            self.writer.get_compile_command(['pdf', 'png', 'pdf'], crop=True, preview=True, resolution=150)
+        )
+
+        self.assertEqual(['lilypond', '-dbackend=svg', '--format=svg', '-dpreview', '-dno-print-pages'],
+                         self.writer.get_compile_command('svg', preview=True, pages=False)[:5])
+        self.assertEqual(['lilypond', '-dbackend=cairo', '--format=pdf,png,svg'],
+                         self.writer.get_compile_command('pdf,png,svg')[:3])
+
+        self.writer.backend = 'cairo'
+        self.assertEqual(['lilypond', '-dbackend=cairo', '--format=png'], self.writer.get_compile_command('png')[:3])
+
+    def test_compile_formats(self):
+        self.use_fake_lilypond()
+
+        self.writer.compile(['pdf', 'png', 'svg'], crop=True)
+
+        self.assertEqual(['test.cropped.pdf', 'test.cropped.png', 'test.cropped.svg', 'test.pdf', 'test.png',
+                          'test.svg'], sorted(os.listdir(self.writer.compiled_dir)))
+
+    def test_compile_result(self):
+        self.use_fake_lilypond()
+        Writer.reset_compile_metrics()
+        self.addCleanup(Writer.reset_compile_metrics)
+
+        result = self.writer.compile(['pdf', 'png'])
+
+        self.assertTrue(result.success)
+        self.assertEqual(0, result.return_code)
+        self.assertEqual(self.writer.get_compile_command(['pdf', 'png']), result.command)
+        self.assertGreater(result.duration, 0)
+        self.assertEqual([f'{self.writer.source_dir}/test.ly:3:5: warning: barcheck failed at: 1/4'], result.warnings)
+        self.assertEqual([], result.errors)
+        self.assertEqual([f'{self.writer.compiled_dir}/test.pdf', f'{self.writer.compiled_dir}/test.png'],
+                         result.output_paths)
+        self.assertIs(result, result.check())
+
+        metrics = Writer.get_compile_metrics()
+        self.assertEqual((1, 0, 1), (metrics['count'], metrics['failures'], metrics['warnings']))
+        self.assertEqual(result.duration, metrics['average_duration'])
+
+    def test_compile_failed(self):
+        self.use_fake_lilypond()
+        os.environ['FAKE_LILYPOND_EXIT'] = '1'
+        self.addCleanup(os.environ.pop, 'FAKE_LILYPOND_EXIT')
+        Writer.reset_compile_metrics()
+        self.addCleanup(Writer.reset_compile_metrics)
+
+        result = self.writer.compile()
+
+        self.assertFalse(result.success)
+        self.assertEqual([], result.output_paths)
+        self.assertEqual(1, len(result.errors))
+
+        with self.assertRaises(CompilationFailed) as context:
+            result.check()
+
+        self.assertEqual(1, context.exception.return_code)
+        self.assertEqual(1, Writer.get_compile_metrics()['failures'])
+
+    def test_compile_backend(self):
+        self.use_fake_lilypond()
+        commands = []
+
+        class FakeBackend(CompileBackend):
+            def run(self, command, timeout=None):
+                commands.append(command)
+                open(os.path.join(command[-2], 'test.svg'), 'w').close()
+                return 0, ''
+
+        self.writer.compile_backend = FakeBackend()
+        result = self.writer.compile('svg')
+
+        self.assertEqual([self.writer.get_compile_command('svg')], commands)
+        self.assertEqual([f'{self.writer.compiled_dir}/test.svg'], result.output_paths)
+
+    def test_compile_thumbnails(self):
+        self.use_fake_lilypond()
+
+        result = asyncio.run(self.writer.compile_async('png', crop=True, preview=True, pages=False))
+
+        self.assertTrue(result.success)
+        self.assertEqual(['test.cropped.png', 'test.preview.png'], sorted(os.listdir(self.writer.compiled_dir)))
+
+    def test_compile_keyword_arguments(self):
+        self.use_fake_lilypond()
+
+        with self.assertRaises(TypeError):
+            self.writer.compile('png', True)
+
+        with self.assertRaises(TypeError):
+            asyncio.run(self.writer.compile_async('png', 10))
+
+        self.assertEqual(list(inspect.signature(Writer.compile).parameters),
+                         list(inspect.signature(Writer.compile_async).parameters))
+
+    def test_compile_invalid_formats(self):
+        self.use_fake_lilypond()
+
+        with self.assertRaises(AttributeError):
+            self.writer.compile(['pdf', 'jpg'])
+
+        with self.assertRaises(AttributeError):
+            self.writer.compile([])
+
+        # Backend svg nie tworzy plików pdf
+        self.writer.backend = 'svg'
+        with self.assertRaises(AttributeError):
+            self.writer.compile(['pdf', 'svg'])
+
+    def test_compile_async(self):
+        self.use_fake_lilypond()
+
+        Writer.reset_compile_metrics()
+        result = asyncio.run(self.writer.compile_async('png'))
+
+        self.assertEqual(0, result.return_code)
+        self.assertEqual([f'{self.writer.compiled_dir}/{self.writer.filename}.png'], result.output_paths)
+        self.assertEqual(1, len(result.warnings))
+        self.assertIn('barcheck failed', result.warnings[0])
+        self.assertEqual(1, Writer.get_compile_metrics()['count'])
+
+    def test_compile_async_failure(self):
+        self.use_fake_lilypond()
+        os.environ['FAKE_LILYPOND_EXIT'] = '1'
+        self.addCleanup(os.environ.pop, 'FAKE_LILYPOND_EXIT')
+        Writer.reset_compile_metrics()
+
+        result = asyncio.run(self.writer.compile_async('png'))
+
+        self.assertFalse(result.success)
+        self.assertEqual(1, len(result.errors))
+        self.assertEqual(1, Writer.get_compile_metrics()['failures'])
+
+        with self.assertRaises(CompilationFailed):
+            result.check()
+
+    def test_compile_async_backend(self):
+        self.use_fake_lilypond()
+        commands = []
+
+        class FakeBackend(CompileBackend):
+            async def run_async(self, command, timeout=None):
+                commands.append(command)
+                open(os.path.join(command[-2], 'test.svg'), 'w').close()
+                return 0, ''
+
+        self.writer.compile_backend = FakeBackend()
+        result = asyncio.run(self.writer.compile_async('svg'))
+
+        self.assertEqual([self.writer.get_compile_command('svg')], commands)
+        self.assertEqual([f'{self.writer.compiled_dir}/test.svg'], result.output_paths)
+
+    def test_compile_async_concurrency_limit(self):
+        self.use_fake_lilypond()
+        os.environ['FAKE_LILYPOND_SLEEP'] = '0.5'
+        self.addCleanup(os.environ.pop, 'FAKE_LILYPOND_SLEEP')
+        self.addCleanup(setattr, Writer, 'max_concurrent_compilations', Writer.max_concurrent_compilations)
+
+        async def compile_all():
+            return await asyncio.gather(*[self.writer.compile_async(ext) for ext in ['pdf', 'png', 'ps']])
+
+        Writer.max_concurrent_compilations = 3
+        start = time.perf_counter()
+        self.assertTrue(all(result.success for result in asyncio.run(compile_all())))
+        self.assertLess(time.perf_counter() - start, 1.4)
+
+        Writer.max_concurrent_compilations = 1
+        start = time.perf_counter()
+        self.assertTrue(all(result.success for result in asyncio.run(compile_all())))
+        self.assertGreaterEqual(time.perf_counter() - start, 1.5)
+
+    def test_compile_async_timeout(self):
+        self.use_fake_lilypond()
+        os.environ['FAKE_LILYPOND_SLEEP'] = '5'
+        self.addCleanup(os.environ.pop, 'FAKE_LILYPOND_SLEEP')
+
+        start = time.perf_counter()
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(self.writer.compile_async(timeout=0.2))
+
+        self.assertLess(time.perf_counter() - start, 2)
+        self.assertFalse(os.path.exists(f'{self.writer.compiled_dir}/{self.writer.filename}.pdf'))
+
+    def test_compile_async_invalid_extension(self):
+        self.use_fake_lilypond()
+
+        with self.assertRaises(AttributeError):
+            asyncio.run(self.writer.compile_async('jpg'))
+
     # endregion
 
+    def test_from_bars_key(self):
+        self.writer.from_bars([[Note('d', OctaveType.LINE_1, 1)]], (4, 4), key=Key('d', KeyType.MINOR))
+        self.assertIn('\t\t\\key d \\minor', self.writer.lines)
+
+        self.writer.from_bars([[Note('d', OctaveType.LINE_1, 1)]], (4, 4))
+        self.assertFalse(any('\\key' in line for line in self.writer.lines))
+
+    def test_get_voice_clef(self):
+        treble = [[Note('c', OctaveType.LINE_1), Note('g', OctaveType.LINE_1)]]
+        bass = [[Note('c', OctaveType.SMALL), Note('g', OctaveType.GREAT)]]
+
+        self.assertEqual('G', self.writer.get_voice_clef(treble))
+        self.assertEqual('F', self.writer.get_voice_clef(bass))
+        self.assertEqual('G', self.writer.get_voice_clef([[Rest()]]))
+
+    def test_from_voices(self):
+        voices: List[List[List[Writeable]]] = [
+            [[Note('e', OctaveType.LINE_1), Note('f', OctaveType.LINE_1),
+              Note('g', OctaveType.LINE_1, base_duration=2)]],
+            [[Note('c', OctaveType.SMALL, base_duration=2), Rest(2)]]
+        ]
+
+        self.writer.from_voices(voices, (4, 4))
+        content = '\n'.join(self.writer.lines)
+
+        self.assertEqual(2, content.count('\\new Staff {'))
+        self.assertEqual(2, content.count('\\time 4/4'))
+        self.assertIn('\\clef G', content)
+        self.assertIn('\\clef F', content)
+        self.assertIn('<<', content)
+        self.assertIn('>>', content)
+
+    def test_from_voices_single_staff(self):
+        voices: List[List[List[Writeable]]] = [
+            [[Note('e'), Note('f'), Note('g', base_duration=2)]],
+            [[Note('c', base_duration=2), Rest(2)]]
+        ]
+
+        self.writer.from_voices(voices, (4, 4), staves=False)
+        content = '\n'.join(self.writer.lines)
+
+        self.assertEqual(1, content.count('\\new Staff <<'))
+        self.assertEqual(1, content.count('\\clef'))
+        self.assertIn('\\voiceOne', content)
+        self.assertIn('\\voiceTwo', content)
+
+        with self.assertRaises(ValueError):
+            self.writer.from_voices(voices * 3, (4, 4), staves=False)
+
+    def test_from_book(self):
+        melodies: List[List[List[Writeable]]] = [
+            [[Note('c', OctaveType.LINE_1, 1)]],
+            [[Note('d', OctaveType.LINE_1, 2), Rest(2)], [Note('e', OctaveType.LINE_1, 1)]]
+        ]
+
+        self.writer.from_book(melodies, (4, 4), Key('d'), pieces=['First', 'Second "B"'], title='Exercises')
+        content = '\n'.join(self.writer.lines)
+
+        self.assertEqual(1, content.count('\\book {'))
+        self.assertEqual(2, content.count('\\score {'))
+        self.assertIn('\t\ttitle = "Exercises"', self.writer.lines)
+        self.assertIn('\t\t\tpiece = "Second \\"B\\""', self.writer.lines)
+        self.assertNotIn('bookOutputSuffix', content)
+        self.assertEqual(['output/compiled/test.pdf'], self.writer.get_output_paths())
+        self.assertEqual(melodies, Parser('test').parse(self.writer.lines).voices)
+
+    def test_from_book_split(self):
+        self.writer.from_generator_book(Generator().set_bar_count(2), 3, seed=4, split=True)
+        content = '\n'.join(self.writer.lines)
+
+        self.assertEqual(3, content.count('\\book {'))
+        self.assertIn('\t\\bookOutputSuffix "003"', self.writer.lines)
+        self.assertIn('\t\t\tpiece = "Exercise 2"', self.writer.lines)
+        self.assertEqual(['output/compiled/test-001.png', 'output/compiled/test-002.png',
+                          'output/compiled/test-003.png'], self.writer.get_output_paths('png'))
+        self.assertEqual(Generator().set_bar_count(2).generate(group=True, seed=5),
+                         Parser('test').parse(self.writer.lines).voices[1])
+
+        # Zwykły plik znów ma jeden plik wynikowy
+        self.writer.from_bars([[Note('c', OctaveType.LINE_1, 1)]], (4, 4))
+        self.assertEqual(['output/compiled/test.png'], self.writer.get_output_paths('png'))
+
+    def test_from_book_invalid_pieces(self):
+        with self.assertRaises(ValueError):
+            self.writer.from_book([[[Note('c', base_duration=1)]]], (4, 4), pieces=['First', 'Second'])
+
     def test_parse(self):
         bars: List[List[Writeable]] = [
             [Note('c'), Note('d'), Note('e'), Note('f')],
@@ -0,0 +1,63 @@
+from typing import List, Optional
+import argparse
+import json
+import sys
+
+from lib.Corpus import Corpus
+from lib.Generator import Generator
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description='Wyznacz prawdopodobieństwa generatora na podstawie plików lilypond (.ly) i MIDI (.mid)'
+    )
+    parser.add_argument('paths', nargs='+', metavar='PATH', help='Pliki lub foldery (przeszukiwane rekurencyjnie)')
+    parser.add_argument('--output', '-o', metavar='FILE',
+                        help='Plik JSON z ustawieniami generatora. Domyślnie ustawienia wypisywane są na wyjście')
+    parser.add_argument('--settings', metavar='FILE',
+                        help='Plik JSON z ustawieniami bazowymi, uzupełnianymi o wyznaczone prawdopodobieństwa')
+    parser.add_argument('--markov', metavar='FILE', help='Zapisz również łańcuch Markowa rzędu 1 do pliku .npz')
+    parser.add_argument('--workers', type=int, default=1, help='Liczba procesów przetwarzających pliki')
+    parser.add_argument('--quiet', action='store_true', help='Nie wyświetlaj postępu')
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None):
+    args = get_parser().parse_args(argv)
+
+    base = {}
+    if args.settings is not None:
+        with open(args.settings) as f:
+            base = json.load(f)
+
+    def progress(files: int, seconds: float):
+        print(f'\r{files} files, {files / max(seconds, 1e-9):.1f} files/s', end='', file=sys.stderr)
+
+    corpus = Corpus.from_paths(args.paths, args.workers, None if args.quiet else progress)
+
+    if not args.quiet:
+        print(f'\n{corpus.note_count} notes, {corpus.rest_count} rests, {corpus.skipped} files skipped',
+              file=sys.stderr)
+
+    settings = corpus.to_settings(base)
+
+    try:
+        # Upewniamy się, że wynik da się wczytać
+        Generator.from_dict(settings)
+    except Exception as e:
+        print(f'Invalid settings: {getattr(e, "message", e)}', file=sys.stderr)
+        sys.exit(2)
+
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(settings, f, indent=4)
+    else:
+        print(json.dumps(settings, indent=4))
+
+    if args.markov is not None:
+        corpus.get_markov_model().save(args.markov)
+
+
+if __name__ == '__main__':
+    main()